@@ -22,7 +22,9 @@ import cv2                 # Библиотека OpenCV для обработк
 import os                  # Функции для работы с файловой системой
 from watermark.embedding import embed      # Наши функции встраивания водяных знаков
 from watermark.extraction import extract   # Наши функции извлечения водяных знаков
+from watermark.payload import pack_payload  # Сжатие текста перед встраиванием
 from utils.image_metrics import calculate_image_metrics, format_metrics as format_image_metrics
+from utils.footprint_metrics import footprint_image_metrics
 from utils.text_metrics import calculate_text_metrics, format_metrics as format_text_metrics
 
 # ============================================================================
@@ -186,7 +188,7 @@ def on_algorithm_changed(parent):
     Показывает/скрывает соответствующие параметры для выбранного алгоритма.
     
     LSB параметры: depth (глубина)
-    DCT параметры: strength (сила), block_size (размер блока)
+    DCT параметры: strength (сила), block_size (размер блока), bits_per_block (бит на блок)
     ========================================================================
     """
     algorithm = parent.combo_algo.currentText()
@@ -200,6 +202,8 @@ def on_algorithm_changed(parent):
         parent.spinbox_strength.setVisible(False)
         parent.label_block_size.setVisible(False)
         parent.spinbox_block_size.setVisible(False)
+        parent.label_bits_per_block.setVisible(False)
+        parent.spinbox_bits_per_block.setVisible(False)
     elif algorithm == "DCT":
         # Скрываем параметры LSB
         parent.label_depth.setVisible(False)
@@ -209,6 +213,8 @@ def on_algorithm_changed(parent):
         parent.spinbox_strength.setVisible(True)
         parent.label_block_size.setVisible(True)
         parent.spinbox_block_size.setVisible(True)
+        parent.label_bits_per_block.setVisible(True)
+        parent.spinbox_bits_per_block.setVisible(True)
 
 def on_restored_secret_preview_clicked(parent, event):
     """
@@ -446,7 +452,10 @@ def embed_watermark(parent):
         elif algorithm == "dct":
             strength = parent.spinbox_strength.value()  # Сила встраивания (5-50)
             block_size = parent.spinbox_block_size.value()  # Размер блока (4-16)
-            params = {"strength": strength, "block_size": block_size}
+            bits_per_block = parent.spinbox_bits_per_block.value()  # Коэффициентов на блок (1-8)
+            # Изображения загружаются через PIL, каналы идут в порядке RGB
+            params = {"strength": strength, "block_size": block_size, "bits_per_block": bits_per_block,
+                      "channel_order": "rgb"}
         else:
             raise ValueError(f"Неизвестный алгоритм: {algorithm}")
 
@@ -492,6 +501,13 @@ def embed_watermark(parent):
             if text_size_bytes > 10000:  # 10 KB
                 parent.result_text.append(f"⚠️ Большой текст ({text_size_bytes} байт). Может потребоваться большой контейнер.")
             
+            # Текст сжимается перед встраиванием: кодек выбирается автоматически
+            # и записывается в заголовок, поэтому ёмкость проверяем по сжатому размеру
+            params["codec"] = "auto"
+            payload_size_bytes = len(pack_payload(secret.encode("utf-8"), "auto"))
+            if payload_size_bytes < text_size_bytes:
+                parent.result_text.append(f"🗜️ Текст сжат: {text_size_bytes} → {payload_size_bytes} байт (с заголовком)")
+            
             # Проверка ёмкости контейнера
             h, w = cover.shape[:2]
             if algorithm == "lsb":
@@ -500,11 +516,11 @@ def embed_watermark(parent):
                 capacity_bits = w * h * channels * depth
                 capacity_bytes = capacity_bits // 8
             elif algorithm == "dct":
-                # Для DCT: capacity = (w // block_size) * (h // block_size) бит
-                capacity_bits = (w // block_size) * (h // block_size)
+                # Для DCT: capacity = (w // block_size) * (h // block_size) * bits_per_block бит
+                capacity_bits = (w // block_size) * (h // block_size) * bits_per_block
                 capacity_bytes = capacity_bits // 8
             
-            required_bytes = text_size_bytes
+            required_bytes = payload_size_bytes
             
             if required_bytes > capacity_bytes:
                 # Вычисляем рекомендуемый размер контейнера
@@ -512,7 +528,7 @@ def embed_watermark(parent):
                     min_pixels = required_bytes * 8 // (channels * depth)
                     min_side = int(np.sqrt(min_pixels)) + 1
                 elif algorithm == "dct":
-                    min_blocks = required_bytes * 8
+                    min_blocks = -(-required_bytes * 8 // bits_per_block)
                     min_side = int(np.sqrt(min_blocks)) * block_size + block_size
                 
                 error_msg = (
@@ -522,11 +538,11 @@ def embed_watermark(parent):
                     f"Требуется: {required_bytes} байт ({required_bytes * 8} бит)\n\n"
                     f"Рекомендации:\n"
                     f"1. Используйте контейнер минимум {min_side}×{min_side}\n"
-                    f"2. Уменьшите размер текста (сейчас {text_size_bytes} байт)\n"
+                    f"2. Уменьшите размер текста (сейчас {text_size_bytes} байт, после сжатия {payload_size_bytes})\n"
                 )
                 
                 if algorithm == "dct":
-                    error_msg += f"3. Используйте LSB алгоритм (выше ёмкость)\n"
+                    error_msg += f"3. Увеличьте число бит на блок (сейчас {bits_per_block}) или используйте LSB\n"
                 elif algorithm == "lsb" and depth < 8:
                     error_msg += f"3. Увеличьте глубину встраивания (сейчас {depth})\n"
                 
@@ -536,12 +552,14 @@ def embed_watermark(parent):
             
             parent.embedded_secret_type = "text"
             parent.embedded_secret_length = text_size_bytes
+            parent.embedded_codec = params["codec"]
             parent.original_secret = secret  # Сохраняем оригинальный секрет для метрик
             if algorithm == "lsb":
                 parent.embedded_depth = depth
             elif algorithm == "dct":
                 parent.embedded_strength = strength
                 parent.embedded_block_size = block_size
+                parent.embedded_bits_per_block = bits_per_block
         elif secret_type == "image":
             # Загружаем секретное изображение и принудительно конвертируем в RGB
             secret = np.array(Image.open(wm_path).convert('RGB'))
@@ -586,6 +604,7 @@ def embed_watermark(parent):
             elif algorithm == "dct":
                 parent.embedded_strength = strength
                 parent.embedded_block_size = block_size
+                parent.embedded_bits_per_block = bits_per_block
 
         # Сохраняем используемый алгоритм
         parent.embedded_algorithm = algorithm
@@ -600,8 +619,9 @@ def embed_watermark(parent):
         old_stdout = sys.stdout
         sys.stdout = StringIO()
         
-        # Вызываем алгоритм встраивания (из модуля watermark.embedding)
-        result = embed(cover, secret, params, method=algorithm)
+        # Вызываем алгоритм встраивания (из модуля watermark.embedding);
+        # отпечаток изменений из info нужен для быстрого расчёта метрик
+        result, embed_info = embed(cover, secret, dict(params, return_info=True), method=algorithm)
         
         # Получаем вывод о масштабировании (если было)
         output = sys.stdout.getvalue()
@@ -636,8 +656,8 @@ def embed_watermark(parent):
         # ====================================================================
         
         try:
-            # Расчёт метрик качества (исходное vs стегоизображение)
-            stego_metrics = calculate_image_metrics(cover, result)
+            # Расчёт метрик качества (исходное vs стегоизображение) только по изменённым отсчётам
+            stego_metrics = footprint_image_metrics(cover, embed_info["footprint"])
             formatted_stego_metrics = format_image_metrics(stego_metrics)
             
             # Сохраняем подробные метрики для диалога
@@ -721,12 +741,18 @@ def extract_watermark(parent):
         elif algorithm == "dct":
             strength = getattr(parent, "embedded_strength", parent.spinbox_strength.value())
             block_size = getattr(parent, "embedded_block_size", parent.spinbox_block_size.value())
-            params = {"strength": strength, "block_size": block_size}
+            bits_per_block = getattr(parent, "embedded_bits_per_block", parent.spinbox_bits_per_block.value())
+            # Изображения загружаются через PIL, каналы идут в порядке RGB
+            params = {"strength": strength, "block_size": block_size, "bits_per_block": bits_per_block,
+                      "channel_order": "rgb"}
         else:
             raise ValueError(f"Неизвестный алгоритм: {algorithm}")
         
         if secret_type == "text":
             params["length"] = getattr(parent, "embedded_secret_length", 10)
+            codec = getattr(parent, "embedded_codec", None)
+            if codec:
+                params["codec"] = codec
         elif secret_type == "image":
             params["secret_shape"] = getattr(parent, "embedded_secret_shape", (64, 64, 3))
         
@@ -867,6 +893,7 @@ def reset_gui(parent):
     parent.spinbox_depth.setValue(1)
     parent.spinbox_strength.setValue(15)
     parent.spinbox_block_size.setValue(8)
+    parent.spinbox_bits_per_block.setValue(1)
     parent.combo_algo.setCurrentIndex(0)  # Вернуть на LSB
     parent.cover_image_label.clear()
     parent.cover_image_label.setText("Изображение не загружено")
@@ -892,7 +919,8 @@ def reset_gui(parent):
         'embedded_secret_length', 'embedded_secret_shape', 'embedded_depth', 
         'embedded_strength', 'embedded_block_size', 'embedded_algorithm',
         'embedded_original_secret_shape', 'secret_type', 'extracted_secret',
-        'original_secret', 'stego_metrics', 'secret_metrics', 'embedded_text_encoding'
+        'original_secret', 'stego_metrics', 'secret_metrics', 'embedded_text_encoding',
+        'embedded_codec', 'embedded_bits_per_block'
     ]
     for attr in attributes_to_clear:
         if hasattr(parent, attr):
@@ -90,6 +90,13 @@ def create_main_layout(parent):
     spinbox_block_size.setVisible(False)         # Скрываем по умолчанию
     label_block_size.setVisible(False)           # Скрываем надпись
     
+    label_bits_per_block = QLabel("Бит на блок:")  # Надпись для числа коэффициентов
+    spinbox_bits_per_block = QSpinBox()            # Сколько коэффициентов блока несут биты
+    spinbox_bits_per_block.setRange(1, 8)          # Диапазон: от 1 до 8 (ёмкость растёт во столько же раз)
+    spinbox_bits_per_block.setValue(1)             # Значение по умолчанию: 1 бит
+    spinbox_bits_per_block.setVisible(False)       # Скрываем по умолчанию
+    label_bits_per_block.setVisible(False)         # Скрываем надпись
+    
     # Размещаем все элементы в горизонтальную компоновку
     algo_layout.addWidget(label_algo)
     algo_layout.addWidget(combo_algo)
@@ -99,6 +106,8 @@ def create_main_layout(parent):
     algo_layout.addWidget(spinbox_strength)
     algo_layout.addWidget(label_block_size)
     algo_layout.addWidget(spinbox_block_size)
+    algo_layout.addWidget(label_bits_per_block)
+    algo_layout.addWidget(spinbox_bits_per_block)
     algo_layout.addStretch()  # Добавляем растягивающийся элемент для красивого выравнивания
     
     # Добавляем всю секцию в главную вертикальную компоновку
@@ -272,6 +281,8 @@ def create_main_layout(parent):
     parent.label_strength = label_strength
     parent.spinbox_block_size = spinbox_block_size
     parent.label_block_size = label_block_size
+    parent.spinbox_bits_per_block = spinbox_bits_per_block
+    parent.label_bits_per_block = label_bits_per_block
     parent.btn_load_cover = btn_load_cover
     parent.btn_load_wm = btn_load_wm
     parent.info_label = info_label
@@ -0,0 +1,52 @@
+"""
+Бенчмарк BER по упакованной нагрузке.
+
+Сравнивает сравнение распакованных битов (np.unpackbits обеих нагрузок)
+с XOR по байтам и popcount, а также прежний косвенный путь через текст:
+декодирование с errors="replace" и расстояние Левенштейна.
+
+Запуск: python -m tests.benchmarks.bench_bit_metrics
+"""
+import numpy as np
+from utils.bit_metrics import bit_error_metrics
+from utils.levenshtein import levenshtein_distance
+from tests.benchmarks.timing import best_time
+
+
+def _unpacked_ber(original, extracted):
+    """Сравнение по распакованным битам."""
+    return np.count_nonzero(np.unpackbits(original) != np.unpackbits(extracted)) / (original.size * 8)
+
+
+def _text_distance(original, extracted):
+    """Косвенная оценка: строки после декодирования с заменой."""
+    return levenshtein_distance(original.tobytes().decode("utf-8", errors="replace"),
+                                extracted.tobytes().decode("utf-8", errors="replace"))
+
+
+def run_benchmark(seed=0):
+    """
+    Returns:
+        Список словарей с полями size, mode, value, seconds
+    """
+    rng = np.random.default_rng(seed)
+    results = []
+    for size in (10_000, 1_000_000, 16_000_000):
+        original = rng.integers(32, 127, size, dtype=np.uint8)
+        extracted = original.copy()
+        flipped = rng.choice(size * 8, size // 100, replace=False)
+        extracted[flipped // 8] ^= (0x80 >> (flipped % 8)).astype(np.uint8)
+        modes = [("распакованные биты", lambda: _unpacked_ber(original, extracted)),
+                 ("XOR + popcount", lambda: bit_error_metrics(original, extracted)["ber"])]
+        if size <= 10_000:
+            modes.append(("текст + Левенштейн", lambda: _text_distance(original, extracted)))
+        for mode, func in modes:
+            seconds, value = best_time(func, 3)
+            results.append({"size": size, "mode": mode, "value": value, "seconds": seconds})
+    return results
+
+
+if __name__ == "__main__":
+    print(f"{'байт':>10} {'режим':<20} {'значение':>10} {'с':>8}")
+    for row in run_benchmark():
+        print(f"{row['size']:>10} {row['mode']:<20} {row['value']:>10.4g} {row['seconds']:>8.4f}")
@@ -0,0 +1,50 @@
+"""
+Бенчмарк NumPy-движка свёрточного автокодировщика.
+
+Печатает пропускную способность кодировщика и декодера в плитках 128x128
+в секунду для разных размеров пакета.
+
+Запуск: python -m tests.benchmarks.bench_cnn_ae
+"""
+import numpy as np
+from watermark.algorithms.cnn_autoencoder.cnn_model import TILE, CELLS, reference_weights, encode, decode
+from tests.benchmarks.timing import best_time
+
+
+def _tiles_per_second(func, tiles, repeats):
+    return tiles / best_time(func, repeats)[0]
+
+
+def run_benchmark(batch_sizes=(1, 8, 32, 128), total_tiles=256, repeats=3, seed=0):
+    """
+    Returns:
+        Список словарей: batch_size, encode_tiles_per_s, decode_tiles_per_s
+    """
+    rng = np.random.default_rng(seed)
+    weights = reference_weights()
+    covers = rng.uniform(0, 255, (total_tiles, 1, TILE, TILE)).astype(np.float32)
+    messages = rng.choice(np.array([-1, 1], dtype=np.float32), (total_tiles, 1, CELLS, CELLS))
+    results = []
+    for batch_size in batch_sizes:
+        batches = range(0, total_tiles, batch_size)
+
+        def run_encode():
+            for first in batches:
+                encode(weights, covers[first:first + batch_size], messages[first:first + batch_size])
+
+        def run_decode():
+            for first in batches:
+                decode(weights, covers[first:first + batch_size])
+
+        results.append({
+            "batch_size": batch_size,
+            "encode_tiles_per_s": _tiles_per_second(run_encode, total_tiles, repeats),
+            "decode_tiles_per_s": _tiles_per_second(run_decode, total_tiles, repeats),
+        })
+    return results
+
+
+if __name__ == "__main__":
+    print(f"{'пакет':>6} {'кодировщик, плиток/с':>22} {'декодер, плиток/с':>19}")
+    for row in run_benchmark():
+        print(f"{row['batch_size']:>6} {row['encode_tiles_per_s']:>22.0f} {row['decode_tiles_per_s']:>19.0f}")
@@ -0,0 +1,58 @@
+"""
+Бенчмарк адаптивного выбора блоков DCT по карте активности.
+
+Печатает время построения карты активности (интегральные изображения),
+время повторного запроса из кэша, время встраивания в растровом и
+адаптивном режимах (с проверкой порядка по стего) и PSNR плоской части
+контейнера: в адаптивном режиме она остаётся нетронутой.
+
+Запуск: python -m tests.benchmarks.bench_dct_activity
+"""
+import numpy as np
+from watermark.algorithms.dct import dct_activity
+from watermark.algorithms.dct.dct_core import luma, embed_luma, DEFAULT_POSITIONS
+from utils.image_metrics import calculate_psnr
+from tests.benchmarks.timing import best_ms
+
+
+def run_benchmark(size=1024, secret_bits=8000, strength=12, repeats=3, seed=0):
+    """
+    Returns:
+        Словарь: map_ms, cached_ms, raster_ms, adaptive_ms, flat_psnr_raster, flat_psnr_adaptive
+    """
+    rng = np.random.default_rng(seed)
+    yy, xx = np.mgrid[0:size, 0:size]
+    cover = np.stack([60 + xx * 0.1, 70 + yy * 0.1, 80 + (xx + yy) * 0.05], axis=-1)
+    half = size // 2
+    cover[half:, :] += rng.normal(0, 15, (size - half, size, 3))
+    cover = np.clip(cover, 0, 255).astype(np.uint8)
+    bits = rng.integers(0, 2, secret_bits).astype(np.uint8)
+    y_channel = luma(cover)
+
+    def fresh_map():
+        dct_activity.clear_cache()
+        return dct_activity.activity_map(y_channel, 8, DEFAULT_POSITIONS)
+
+    map_ms, _ = best_ms(fresh_map, repeats)
+    cached_ms, _ = best_ms(lambda: dct_activity.activity_map(y_channel, 8, DEFAULT_POSITIONS), repeats)
+    raster_ms, raster = best_ms(lambda: embed_luma(cover, bits, strength, 8), repeats)
+    adaptive_ms, adaptive = best_ms(lambda: dct_activity.embed_adaptive(cover, bits, strength, 8, DEFAULT_POSITIONS),
+                                    repeats)
+    return {
+        "map_ms": map_ms,
+        "cached_ms": cached_ms,
+        "raster_ms": raster_ms,
+        "adaptive_ms": adaptive_ms,
+        "flat_psnr_raster": calculate_psnr(cover[:half], raster[:half]),
+        "flat_psnr_adaptive": calculate_psnr(cover[:half], adaptive[:half]),
+    }
+
+
+if __name__ == "__main__":
+    row = run_benchmark()
+    print(f"{'карта активности, мс':>30} {row['map_ms']:>8.1f}")
+    print(f"{'карта из кэша, мс':>30} {row['cached_ms']:>8.1f}")
+    print(f"{'встраивание в растре, мс':>30} {row['raster_ms']:>8.1f}")
+    print(f"{'адаптивное встраивание, мс':>30} {row['adaptive_ms']:>8.1f}")
+    print(f"{'PSNR плоской части (растр)':>30} {row['flat_psnr_raster']:>8.2f}")
+    print(f"{'PSNR плоской части (адапт.)':>30} {row['flat_psnr_adaptive']:>8.2f}")
@@ -0,0 +1,75 @@
+"""
+Бенчмарк целочисленного DCT (transform='int') против float-пути.
+
+Для обеих реализаций печатает время встраивания и извлечения при заполнении
+всей ёмкости, пиковую дополнительную память (tracemalloc) и PSNR.
+Дополнительно сравнивается полное DCT всех блоков: fdct_islow против
+поблочного cv2.dct.
+
+Полное DCT всех блоков целочисленная бабочка считает быстрее cv2.dct,
+а пачки по INT_CHUNK_BLOCKS держат пиковую память ниже float-пути. Время
+встраивания float-путь выигрывает: он проецирует блоки только на k
+базисных функций, а не считает все 64 коэффициента.
+
+Запуск: python -m tests.benchmarks.bench_dct_int
+"""
+import tracemalloc
+import numpy as np
+import cv2
+from watermark.algorithms.dct.dct_core import capacity_bits, embed_bits, extract_bits, mid_frequency_positions
+from watermark.algorithms.dct.dct_int import fdct_islow
+from utils.image_metrics import calculate_psnr
+from tests.benchmarks.timing import best_time
+
+
+def _measure(func, repeats):
+    """Лучшее время (мс) и пиковая память (МБ) вызова func."""
+    best, _ = best_time(func, repeats)
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best * 1000, peak / 2 ** 20
+
+
+def run_benchmark(size=1024, k=4, strength=10, repeats=3, seed=0):
+    """
+    Returns:
+        Список словарей: transform, embed_ms, extract_ms, peak_mb, psnr
+    """
+    rng = np.random.default_rng(seed)
+    cover = rng.integers(40, 210, (size, size)).astype(np.float32)
+    positions = mid_frequency_positions(k)
+    bits = rng.integers(0, 2, capacity_bits(cover.shape, 8, positions)).astype(np.uint8)
+    results = []
+    for transform in ("float", "int"):
+        stego = cover.copy()
+        embed_ms, peak_mb = _measure(lambda: embed_bits(cover.copy(), bits, strength, 8, positions, transform),
+                                     repeats)
+        embed_bits(stego, bits, strength, 8, positions, transform)
+        stego = np.clip(np.round(stego), 0, 255).astype(np.float32)
+        extract_ms, _ = _measure(lambda: extract_bits(stego, bits.size, strength, 8, positions=positions,
+                                                      transform=transform), repeats)
+        results.append({
+            "transform": transform,
+            "embed_ms": embed_ms,
+            "extract_ms": extract_ms,
+            "peak_mb": peak_mb,
+            "psnr": calculate_psnr(cover.astype(np.uint8), stego.astype(np.uint8)),
+        })
+    blocks = cover.reshape(size // 8, 8, size // 8, 8).swapaxes(1, 2).reshape(-1, 8, 8)
+    cv2_ms, _ = _measure(lambda: [cv2.dct(block) for block in blocks - 128], 1)
+    int_ms, _ = _measure(lambda: fdct_islow(blocks.astype(np.int32) - 128), repeats)
+    results.append({"transform": "cv2.dct (все блоки)", "embed_ms": cv2_ms})
+    results.append({"transform": "fdct_islow (все блоки)", "embed_ms": int_ms})
+    return results
+
+
+if __name__ == "__main__":
+    print(f"{'реализация':>24} {'встр., мс':>10} {'извл., мс':>10} {'пик, МБ':>8} {'PSNR, дБ':>9}")
+    for row in run_benchmark():
+        if "psnr" in row:
+            print(f"{row['transform']:>24} {row['embed_ms']:>10.1f} {row['extract_ms']:>10.1f} "
+                  f"{row['peak_mb']:>8.1f} {row['psnr']:>9.2f}")
+        else:
+            print(f"{row['transform']:>24} {row['embed_ms']:>10.1f}")
@@ -0,0 +1,49 @@
+"""
+Бенчмарк многокоэффициентного QIM в DCT.
+
+Для k коэффициентов на блок печатает ёмкость, время встраивания, время на
+блок и PSNR при заполнении всей ёмкости. Ёмкость растёт в k раз, а время
+на блок почти не меняется: коэффициенты всех блоков считаются одной
+векторной операцией.
+
+Запуск: python -m tests.benchmarks.bench_dct_multi
+"""
+import time
+import numpy as np
+from watermark.algorithms.dct.dct_core import capacity_bits, embed_bits, mid_frequency_positions
+from utils.image_metrics import calculate_psnr
+
+
+def run_benchmark(size=1024, ks=(1, 2, 4, 8), strength=12, repeats=3, seed=0):
+    """
+    Returns:
+        Список словарей: k, capacity_bytes, embed_ms, us_per_block, psnr
+    """
+    rng = np.random.default_rng(seed)
+    cover = rng.integers(40, 210, (size, size)).astype(np.float32)
+    blocks = (size // 8) ** 2
+    results = []
+    for k in ks:
+        positions = mid_frequency_positions(k)
+        bits = rng.integers(0, 2, capacity_bits(cover.shape, 8, positions)).astype(np.uint8)
+        best = float("inf")
+        for _ in range(repeats):
+            stego = cover.copy()
+            start = time.perf_counter()
+            embed_bits(stego, bits, strength, 8, positions)
+            best = min(best, time.perf_counter() - start)
+        results.append({
+            "k": k,
+            "capacity_bytes": bits.size // 8,
+            "embed_ms": best * 1000,
+            "us_per_block": best * 1e6 / blocks,
+            "psnr": calculate_psnr(cover.astype(np.uint8), np.clip(np.round(stego), 0, 255).astype(np.uint8)),
+        })
+    return results
+
+
+if __name__ == "__main__":
+    print(f"{'k':>3} {'ёмкость, байт':>14} {'встр., мс':>10} {'мкс/блок':>9} {'PSNR, дБ':>9}")
+    for row in run_benchmark():
+        print(f"{row['k']:>3} {row['capacity_bytes']:>14} {row['embed_ms']:>10.1f} "
+              f"{row['us_per_block']:>9.2f} {row['psnr']:>9.2f}")
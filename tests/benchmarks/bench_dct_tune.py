@@ -0,0 +1,87 @@
+"""
+Бенчмарк автоматического подбора силы встраивания DCT.
+
+Для целей по PSNR и по BER после JPEG сравнивается подбор с кэшем
+коэффициентов-носителей (StrengthTuner) и тот же поиск, где каждая проба —
+полное встраивание через embed, сравнение всего изображения и извлечение
+через extract. Время подбора выражено в «встраиваниях» — во сколько раз
+оно больше одного вызова embed.
+
+Запуск: python -m tests.benchmarks.bench_dct_tune
+"""
+import math
+import numpy as np
+from watermark.embedding import embed
+from watermark.extraction import extract
+from watermark.algorithms.dct import dct_tune
+from utils.image_metrics import calculate_psnr
+from utils.bit_metrics import bit_error_metrics
+from utils.robustness import attack_image
+from tests.benchmarks.timing import best_ms
+
+
+def _naive_tune(cover, text, min_psnr=None, max_ber=None, quality=dct_tune.DEFAULT_JPEG_QUALITY):
+    """Тот же поиск, но каждая проба — embed, PSNR всего изображения и extract."""
+    calls = []
+    payload = np.frombuffer(text.encode("utf-8"), dtype=np.uint8)
+
+    def measure(strength):
+        calls.append(strength)
+        stego = embed(cover, text, {"strength": strength}, method="dct")
+        result = {"strength": strength, "psnr": calculate_psnr(cover, stego)}
+        if max_ber is not None:
+            attacked = attack_image(stego, "jpeg", {"quality": quality})
+            extracted = extract(attacked, {"strength": strength, "length": payload.size}, method="dct")
+            result["ber"] = bit_error_metrics(payload, np.frombuffer(extracted.encode("utf-8"), np.uint8))["ber"]
+        return result
+
+    low, high = dct_tune.DEFAULT_RANGE
+    if max_ber is not None:
+        floor = 0.5 / (payload.size * 8)
+        best = dct_tune._search(measure, lambda r: r["ber"] <= max_ber,
+                                lambda r: math.log((r["ber"] + floor) / (max_ber + 2 * floor)),
+                                high, low, dct_tune.DEFAULT_TOLERANCE)
+    else:
+        best = dct_tune._search(measure, lambda r: r["psnr"] >= min_psnr, lambda r: min_psnr - r["psnr"],
+                                low, high, dct_tune.DEFAULT_TOLERANCE)
+    return dict(best, evaluations=len(calls))
+
+
+def run_benchmark(size=1024, text_bytes=1500, repeats=3, seed=0):
+    """
+    Returns:
+        Список словарей: target, tune_ms, tune_embeds, evaluations, naive_ms, naive_embeds,
+        naive_evaluations, strength
+    """
+    rng = np.random.default_rng(seed)
+    yy, xx = np.mgrid[0:size, 0:size]
+    cover = np.stack([60 + xx * 0.1, 70 + yy * 0.1, 80 + (xx + yy) * 0.05], axis=-1)
+    cover = np.clip(cover + rng.normal(0, 12, (size, size, 3)), 0, 255).astype(np.uint8)
+    alphabet = "абвгдежзийклмнопрстуфхцчшщыьэюя ,."
+    text = "".join(rng.choice(list(alphabet), text_bytes // 2))
+    embed_ms, _ = best_ms(lambda: embed(cover, text, {"strength": 15}, method="dct"), repeats)
+
+    rows = []
+    for target, kwargs in (("psnr>=45", {"min_psnr": 45.0}), ("ber<=0.01, jpeg 75", {"max_ber": 0.01})):
+        tune_ms, tuned = best_ms(lambda: dct_tune.tune_strength(cover, text, {}, **kwargs), repeats)
+        naive_ms, naive = best_ms(lambda: _naive_tune(cover, text, **kwargs), 1)
+        rows.append({
+            "target": target,
+            "tune_ms": tune_ms,
+            "tune_embeds": tune_ms / embed_ms,
+            "evaluations": tuned["evaluations"],
+            "naive_ms": naive_ms,
+            "naive_embeds": naive_ms / embed_ms,
+            "naive_evaluations": naive["evaluations"],
+            "strength": tuned["strength"],
+        })
+    return rows
+
+
+if __name__ == "__main__":
+    print(f"{'цель':>20} {'подбор, мс':>11} {'встраиваний':>12} {'проб':>5} "
+          f"{'наивно, мс':>11} {'встраиваний':>12} {'проб':>5} {'strength':>9}")
+    for row in run_benchmark():
+        print(f"{row['target']:>20} {row['tune_ms']:>11.1f} {row['tune_embeds']:>12.1f} {row['evaluations']:>5} "
+              f"{row['naive_ms']:>11.1f} {row['naive_embeds']:>12.1f} {row['naive_evaluations']:>5} "
+              f"{row['strength']:>9.2f}")
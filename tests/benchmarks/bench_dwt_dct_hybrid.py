@@ -0,0 +1,68 @@
+"""
+Бенчмарк гибридного DWT-DCT.
+
+Сравнивает время встраивания:
+- наивного конвейера (полный DWT, DCT каждого блока LL, полные обратные);
+- метода dwt_dct (считаются только блоки с нагрузкой);
+- методов с одним преобразованием: dwt и dct.
+
+Все методы настроены на одинаковую ёмкость: один бит на квадрат 16x16 пикселей.
+
+Запуск: python -m tests.benchmarks.bench_dwt_dct_hybrid
+"""
+import cv2
+import numpy as np
+from watermark.embedding import embed
+from watermark.algorithms.dct.dct_core import to_luma, from_luma
+from watermark.algorithms.dwt.dwt_core import forward, inverse, subband, qim_embed
+from watermark.utils import bytes_to_bits
+from tests.benchmarks.timing import best_ms
+
+
+def _naive(image, secret, params):
+    """Конвейер «в лоб»: все блоки LL проходят DCT и IDCT."""
+    levels, block_size, strength = params["levels"], 8, params["strength"]
+    bits = bytes_to_bits(secret.encode("utf-8"))
+    y_channel, ycrcb = to_luma(image)
+    span = block_size << levels
+    region = y_channel[:y_channel.shape[0] // span * span, :y_channel.shape[1] // span * span]
+    forward(region, levels, "haar")
+    ll = subband(region, levels, "LL")
+    blocks_per_row = ll.shape[1] // block_size
+    for index in range(ll.shape[0] // block_size * blocks_per_row):
+        i, j = index // blocks_per_row * block_size, index % blocks_per_row * block_size
+        block = cv2.dct(np.ascontiguousarray(ll[i:i + block_size, j:j + block_size]))
+        if index < bits.size:
+            block[4, 4] = qim_embed(block[4:5, 4], bits[index:index + 1], strength)[0]
+        ll[i:i + block_size, j:j + block_size] = cv2.idct(block)
+    inverse(region, levels, "haar")
+    return from_luma(np.round(y_channel), ycrcb)
+
+
+def run_benchmark(size=1024, fractions=(0.05, 0.25, 1.0), repeats=3, seed=0):
+    """
+    Returns:
+        Список словарей: fraction, naive_ms, dwt_dct_ms, dwt_ms, dct_ms
+    """
+    rng = np.random.default_rng(seed)
+    cover = rng.integers(40, 210, (size, size, 3), dtype=np.uint8)
+    params = {"levels": 1, "strength": 8}
+    capacity = (size // 16) ** 2 // 8
+    results = []
+    for fraction in fractions:
+        secret = "x" * max(1, int(capacity * fraction))
+        results.append({
+            "fraction": fraction,
+            "naive_ms": best_ms(lambda: _naive(cover, secret, params), repeats)[0],
+            "dwt_dct_ms": best_ms(lambda: embed(cover, secret, params, method="dwt_dct"), repeats)[0],
+            "dwt_ms": best_ms(lambda: embed(cover, secret, {"levels": 4, "band": "LL"}, method="dwt"), repeats)[0],
+            "dct_ms": best_ms(lambda: embed(cover, secret, {"block_size": 16}, method="dct"), repeats)[0],
+        })
+    return results
+
+
+if __name__ == "__main__":
+    print(f"{'доля':>6} {'наивный, мс':>12} {'dwt_dct, мс':>12} {'dwt, мс':>9} {'dct, мс':>9}")
+    for row in run_benchmark():
+        print(f"{row['fraction']:>6.2f} {row['naive_ms']:>12.1f} {row['dwt_dct_ms']:>12.1f} "
+              f"{row['dwt_ms']:>9.1f} {row['dct_ms']:>9.1f}")
@@ -0,0 +1,44 @@
+"""
+Бенчмарк метрик по отпечатку изменений.
+
+Сравнивает calculate_image_metrics(cover, stego) с footprint_image_metrics
+по info['footprint'] для секретов разной длины: полный расчёт не зависит
+от нагрузки, расчёт по отпечатку растёт вместе с ней.
+
+Запуск: python -m tests.benchmarks.bench_footprint_metrics
+"""
+import numpy as np
+from watermark.embedding import embed
+from utils.image_metrics import calculate_image_metrics
+from utils.footprint_metrics import footprint_image_metrics
+from tests.benchmarks.timing import best_ms
+
+
+def run_benchmark(shape=(3000, 4000, 3), sizes=(256, 2048, 16384), repeats=3, seed=0):
+    """
+    Returns:
+        Список словарей с полями method, secret_bytes, changed, full_ms, footprint_ms
+    """
+    rng = np.random.default_rng(seed)
+    cover = rng.integers(0, 256, shape, dtype=np.uint8)
+    results = []
+    for method, params in (("lsb", {"depth": 1}), ("dct", {"strength": 10})):
+        for size in sizes:
+            secret = rng.integers(0x30, 0x7A, size, dtype=np.uint8).tobytes().decode("ascii")
+            stego, info = embed(cover, secret, dict(params, return_info=True), method=method)
+            footprint = info["footprint"]
+            results.append({
+                "method": method,
+                "secret_bytes": size,
+                "changed": footprint["indices"].size,
+                "full_ms": best_ms(lambda: calculate_image_metrics(cover, stego), repeats)[0],
+                "footprint_ms": best_ms(lambda: footprint_image_metrics(cover, footprint), repeats)[0],
+            })
+    return results
+
+
+if __name__ == "__main__":
+    print(f"{'метод':<6} {'секрет, Б':>10} {'изменено':>10} {'полный, мс':>11} {'отпечаток, мс':>14}")
+    for row in run_benchmark():
+        print(f"{row['method']:<6} {row['secret_bytes']:>10} {row['changed']:>10} "
+              f"{row['full_ms']:>11.1f} {row['footprint_ms']:>14.1f}")
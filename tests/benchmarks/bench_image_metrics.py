@@ -0,0 +1,53 @@
+"""
+Бенчмарк объединённого ядра метрик изображений.
+
+Сравнивает прежний расчёт (PSNR, MSE и MAE по отдельности, каждый со своей
+разностью во float64) с difference_stats: один проход кусками в int16.
+
+Запуск: python -m tests.benchmarks.bench_image_metrics
+"""
+import tracemalloc
+import numpy as np
+from utils.image_metrics import difference_stats
+from tests.benchmarks.timing import best_time
+
+
+def _separate(original, compared):
+    """Прежняя схема: три отдельные разности во float64."""
+    mse = np.mean((original.astype(float) - compared.astype(float)) ** 2)
+    psnr = 20 * np.log10(255.0 / np.sqrt(mse))
+    mse = np.mean((original.astype(float) - compared.astype(float)) ** 2)
+    mae = np.mean(np.abs(original.astype(float) - compared.astype(float)))
+    return psnr, mse, mae
+
+
+def _measure(func, repeats):
+    """Лучшее время и пик памяти."""
+    best, _ = best_time(func, repeats)
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak
+
+
+def run_benchmark(sizes=(512, 1024, 2048), repeats=5, seed=0):
+    """
+    Returns:
+        Список словарей с полями size, mode, ms, peak_mb
+    """
+    rng = np.random.default_rng(seed)
+    results = []
+    for size in sizes:
+        original = rng.integers(0, 256, (size, size, 3), dtype=np.uint8)
+        compared = original ^ rng.integers(0, 2, original.shape, dtype=np.uint8)
+        for mode, func in (("раздельно", _separate), ("ядро", difference_stats)):
+            seconds, peak = _measure(lambda: func(original, compared), repeats)
+            results.append({"size": size, "mode": mode, "ms": seconds * 1000, "peak_mb": peak / 2 ** 20})
+    return results
+
+
+if __name__ == "__main__":
+    print(f"{'размер':>7} {'режим':<10} {'мс':>8} {'пик, МБ':>8}")
+    for row in run_benchmark():
+        print(f"{row['size']:>7} {row['mode']:<10} {row['ms']:>8.1f} {row['peak_mb']:>8.1f}")
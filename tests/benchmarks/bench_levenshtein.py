@@ -0,0 +1,80 @@
+"""
+Бенчмарк расстояния Левенштейна.
+
+Сравнивает прежнее ДП по матрице (n+1)x(m+1) со списками Python
+с бит-параллельным алгоритмом Майерса на коротких строках, затем
+меряет алгоритм Майерса на документах до 100 КБ с разным числом ошибок,
+без порога и в ленточном режиме с порогом. На двух несвязанных текстах
+по 100 КБ поиск без порога сравнивается с одним полным проходом и должен
+укладываться в DISSIMILAR_RATIO его времён.
+
+Запуск: python -m tests.benchmarks.bench_levenshtein
+"""
+import random
+from unittest import mock
+from utils import levenshtein
+from utils.levenshtein import levenshtein_distance
+from tests.benchmarks.timing import best_time
+
+# Допустимое отношение поиска без порога к полному проходу на несвязанных текстах
+DISSIMILAR_RATIO = 2
+
+
+def _matrix_distance(first, second):
+    """Прежняя реализация calculate_levenshtein_distance."""
+    dp = [[0] * (len(second) + 1) for _ in range(len(first) + 1)]
+    for i in range(len(first) + 1):
+        dp[i][0] = i
+    for j in range(len(second) + 1):
+        dp[0][j] = j
+    for i in range(1, len(first) + 1):
+        for j in range(1, len(second) + 1):
+            if first[i - 1] == second[j - 1]:
+                dp[i][j] = dp[i - 1][j - 1]
+            else:
+                dp[i][j] = 1 + min(dp[i - 1][j], dp[i][j - 1], dp[i - 1][j - 1])
+    return dp[-1][-1]
+
+
+def _document(rng, length, errors):
+    """Случайный текст и его копия с errors заменами, разбросанными по всей длине."""
+    alphabet = "абвгдежзийклмнопрстуфхцчшщыьэюя ,."
+    original = "".join(rng.choice(alphabet) for _ in range(length))
+    chars = list(original)
+    for position in rng.sample(range(length), errors):
+        chars[position] = "#"
+    return original, "".join(chars)
+
+
+def run_benchmark(seed=0):
+    """
+    Returns:
+        Список словарей с полями case, mode, distance, seconds
+    """
+    rng = random.Random(seed)
+    results = []
+    original, compared = _document(rng, 1000, 50)
+    for mode, func in (("матрица", _matrix_distance), ("Майерс", levenshtein_distance)):
+        seconds, distance = best_time(lambda: func(original, compared))
+        results.append({"case": "1 КБ, 50 ошибок", "mode": mode, "distance": distance, "seconds": seconds})
+    for length, errors in ((10_000, 100), (100_000, 100), (100_000, 5_000)):
+        original, compared = _document(rng, length, errors)
+        case = f"{length // 1000} КБ, {errors} ошибок"
+        for mode, limit in (("Майерс", None), ("порог 200", 200)):
+            seconds, distance = best_time(lambda: levenshtein_distance(original, compared, limit))
+            results.append({"case": case, "mode": mode, "distance": distance, "seconds": seconds})
+    original, compared = _document(rng, 100_000, 0)[0], _document(rng, 100_000, 0)[0]
+    seconds = {}
+    # Доля 1 / (длина + 1) — полоса всегда шире неё, сразу полный вектор
+    for mode, fraction in (("Майерс", levenshtein.FULL_BAND_FRACTION), ("полный", len(compared) + 1)):
+        with mock.patch.object(levenshtein, "FULL_BAND_FRACTION", fraction):
+            seconds[mode], distance = best_time(lambda: levenshtein_distance(original, compared))
+        results.append({"case": "100 КБ, несвязанные", "mode": mode, "distance": distance, "seconds": seconds[mode]})
+    assert seconds["Майерс"] < DISSIMILAR_RATIO * seconds["полный"], seconds
+    return results
+
+
+if __name__ == "__main__":
+    print(f"{'случай':<22} {'режим':<10} {'расстояние':>10} {'с':>8}")
+    for row in run_benchmark():
+        print(f"{row['case']:<22} {row['mode']:<10} {row['distance']:>10} {row['seconds']:>8.3f}")
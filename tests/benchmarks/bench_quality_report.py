@@ -0,0 +1,78 @@
+"""
+Бенчмарк потокового сводного отчёта о качестве.
+
+Сравнивает накопление словарей метрик в списке с последующим расчётом
+средних и квантилей numpy с потоковым QualityReport (Уэлфорд, скетч
+квантилей, гистограммы) по времени и пиковой памяти, а также слияние
+отчётов нескольких «рабочих».
+
+Запуск: python -m tests.benchmarks.bench_quality_report
+"""
+import tracemalloc
+import numpy as np
+from utils.quality_report import QualityReport
+from tests.benchmarks.timing import best_time
+
+METHODS = (("lsb", {"depth": 1}), ("lsb", {"depth": 2}), ("dct", {"strength": 5}), ("dwt", {"alpha": 0.1}))
+
+
+def _metric_stream(count, seed):
+    """Словари метрик, как у calculate_image_metrics плюс доля ёмкости."""
+    rng = np.random.default_rng(seed)
+    for index in range(count):
+        method, params = METHODS[index % len(METHODS)]
+        yield method, params, {"psnr": float(rng.normal(45, 4)), "ssim": float(rng.uniform(0.9, 1.0)),
+                               "mse": float(rng.exponential(2)), "mae": float(rng.exponential(1)),
+                               "max_error": 1.0, "capacity_use": float(rng.uniform(0, 1))}
+
+
+def _list_report(count):
+    rows = list(_metric_stream(count, 0))
+    summary = {}
+    for method, params in METHODS:
+        group = [metrics for m, p, metrics in rows if m == method and p == params]
+        for name in group[0]:
+            values = np.array([metrics[name] for metrics in group])
+            summary[(method, str(params), name)] = (values.mean(), values.std(ddof=1),
+                                                    np.percentile(values, [5, 25, 50, 75, 95]))
+    return summary
+
+
+def _stream_report(count, workers=1):
+    reports = [QualityReport() for _ in range(workers)]
+    for index, (method, params, metrics) in enumerate(_metric_stream(count, 0)):
+        reports[index % workers].add(method, params, metrics)
+    total = QualityReport()
+    for report in reports:
+        total.merge(report)
+    return total.to_json()
+
+
+def _measure(func, *args):
+    """Время без трассировки памяти и пик памяти отдельным запуском."""
+    seconds, _ = best_time(lambda: func(*args))
+    tracemalloc.start()
+    func(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak / 2 ** 20
+
+
+def run_benchmark(count=50_000):
+    """
+    Returns:
+        Список словарей с полями mode, seconds, peak_mb
+    """
+    results = []
+    for mode, func, args in (("список + numpy", _list_report, (count,)),
+                             ("поток", _stream_report, (count,)),
+                             ("поток, 8 рабочих", _stream_report, (count, 8))):
+        seconds, peak_mb = _measure(func, *args)
+        results.append({"mode": mode, "seconds": seconds, "peak_mb": peak_mb})
+    return results
+
+
+if __name__ == "__main__":
+    print(f"{'режим':<18} {'с':>8} {'пик, МБ':>9}")
+    for row in run_benchmark():
+        print(f"{row['mode']:<18} {row['seconds']:>8.3f} {row['peak_mb']:>9.2f}")
@@ -0,0 +1,47 @@
+"""
+Бенчмарк проверки устойчивости.
+
+Прогоняет полную сетку атак DEFAULT_GRID для LSB, DCT и DWT по набору
+контейнеров 512x512: в одном процессе, пулом процессов и повторно
+с заполненным кэшем. Пересчитывает время на корпус из 1000 изображений.
+
+Запуск: python -m tests.benchmarks.bench_robustness
+"""
+import os
+import tempfile
+import numpy as np
+from utils.robustness import DEFAULT_GRID, run_robustness
+from tests.benchmarks.timing import best_time
+
+CONFIGS = (("lsb", {"depth": 1}), ("dct", {}), ("dwt", {}))
+
+
+def _covers(count, seed):
+    rng = np.random.default_rng(seed)
+    yy, xx = np.mgrid[0:512, 0:512]
+    base = np.stack([xx / 2, yy / 2, (xx + yy) / 4], axis=-1)
+    return [np.clip(base + rng.normal(0, 20, base.shape), 0, 255).astype(np.uint8) for _ in range(count)]
+
+
+def run_benchmark(count=24, seed=0):
+    """
+    Returns:
+        Список словарей с полями mode, seconds, per_1000_min
+    """
+    covers = _covers(count, seed)
+    secret = np.random.default_rng(seed).integers(0, 256, (16, 16), dtype=np.uint8)
+    workers = os.cpu_count() or 1
+    results = []
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for mode, options in (("1 процесс", {}),
+                              (f"пул ({workers}) + кэш", {"workers": workers, "cache_dir": cache_dir}),
+                              ("повтор с кэшем", {"workers": workers, "cache_dir": cache_dir})):
+            seconds, _ = best_time(lambda: run_robustness(covers, secret, CONFIGS, DEFAULT_GRID, **options))
+            results.append({"mode": mode, "seconds": seconds, "per_1000_min": seconds / count * 1000 / 60})
+    return results
+
+
+if __name__ == "__main__":
+    print(f"{'режим':<22} {'с':>8} {'мин на 1000':>12}")
+    for row in run_benchmark():
+        print(f"{row['mode']:<22} {row['seconds']:>8.2f} {row['per_1000_min']:>12.1f}")
@@ -0,0 +1,56 @@
+"""
+Бенчмарк быстрого SSIM.
+
+Сравнивает прежний расчёт (float64, пять cv2.GaussianBlur 11x11) с utils.ssim:
+float32 с раздельными проходами, прямоугольное окно через интегральное
+изображение, режим downsample и MS-SSIM.
+
+Запуск: python -m tests.benchmarks.bench_ssim
+"""
+import numpy as np
+import cv2
+from utils.ssim import ssim, ms_ssim
+from tests.benchmarks.timing import best_time
+
+
+def _float64_ssim(original, compared):
+    """Прежняя реализация calculate_ssim."""
+    x = cv2.cvtColor(original, cv2.COLOR_BGR2GRAY).astype(np.float64)
+    y = cv2.cvtColor(compared, cv2.COLOR_BGR2GRAY).astype(np.float64)
+    blur = lambda v: cv2.GaussianBlur(v, (11, 11), 1.5)
+    mu1, mu2 = blur(x), blur(y)
+    sigma11 = blur(x ** 2) - mu1 ** 2
+    sigma22 = blur(y ** 2) - mu2 ** 2
+    sigma12 = blur(x * y) - mu1 * mu2
+    c1, c2 = (0.01 * 255) ** 2, (0.03 * 255) ** 2
+    return float((((2 * mu1 * mu2 + c1) * (2 * sigma12 + c2))
+                  / ((mu1 ** 2 + mu2 ** 2 + c1) * (sigma11 + sigma22 + c2))).mean())
+
+
+def run_benchmark(shapes=((1024, 1024), (4000, 6000)), repeats=3, seed=0):
+    """
+    Returns:
+        Список словарей с полями shape, mode, ms, ssim
+    """
+    rng = np.random.default_rng(seed)
+    modes = (
+        ("float64", _float64_ssim),
+        ("gaussian", ssim),
+        ("box", lambda a, b: ssim(a, b, window="box")),
+        ("downsample", lambda a, b: ssim(a, b, downsample=True)),
+        ("ms-ssim", ms_ssim),
+    )
+    results = []
+    for shape in shapes:
+        original = rng.integers(0, 256, shape + (3,), dtype=np.uint8)
+        compared = np.clip(original + rng.normal(0, 5, original.shape), 0, 255).astype(np.uint8)
+        for mode, func in modes:
+            best, value = best_time(lambda: func(original, compared), repeats)
+            results.append({"shape": f"{shape[0]}x{shape[1]}", "mode": mode, "ms": best * 1000, "ssim": value})
+    return results
+
+
+if __name__ == "__main__":
+    print(f"{'размер':>10} {'режим':<11} {'мс':>9} {'SSIM':>8}")
+    for row in run_benchmark():
+        print(f"{row['shape']:>10} {row['mode']:<11} {row['ms']:>9.1f} {row['ssim']:>8.4f}")
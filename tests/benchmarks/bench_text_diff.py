@@ -0,0 +1,73 @@
+"""
+Бенчмарк посимвольного diff и метрик текста.
+
+Сравнивает difflib.SequenceMatcher с diff Майерса (utils.text_diff) на
+одной длинной строке без переводов строк — типичном восстановленном секрете,
+и меряет calculate_text_metrics и get_inline_diff на мегабайтном тексте.
+Метрики (расстояние в полосе по оценке из сценария diff) должны укладываться
+в METRICS_DIFF_RATIO времён inline diff. От 1000 ошибок на мегабайт общий
+бюджет diff исчерпывается и расстояние — верхняя оценка; на мусоре (текст
+с неверным ключом) бюджет держит время метрик в GARBAGE_SECONDS.
+
+Запуск: python -m tests.benchmarks.bench_text_diff
+"""
+import difflib
+import random
+from utils.text_diff import diff_ratio
+from utils.text_metrics import calculate_text_metrics, get_inline_diff
+from tests.benchmarks.timing import best_time
+
+# Допустимое отношение времени метрик ко времени inline diff на 1 МБ со 100 заменами
+METRICS_DIFF_RATIO = 20
+# Допустимое время метрик для 1 МБ мусора, с
+GARBAGE_SECONDS = 0.5
+
+
+def _document(rng, length, errors):
+    """Случайный текст одной строкой и его копия с errors заменами."""
+    alphabet = "абвгдежзийклмнопрстуфхцчшщыьэюя ,."
+    original = "".join(rng.choice(alphabet) for _ in range(length))
+    chars = list(original)
+    for position in rng.sample(range(length), errors):
+        chars[position] = "#"
+    return original, "".join(chars)
+
+
+def run_benchmark(seed=0):
+    """
+    Returns:
+        Список словарей с полями case, mode, value, seconds
+    """
+    rng = random.Random(seed)
+    results = []
+    for length, errors in ((10_000, 100), (100_000, 100)):
+        original, compared = _document(rng, length, errors)
+        case = f"{length // 1000} КБ, {errors} ошибок"
+        modes = (("SequenceMatcher", lambda: difflib.SequenceMatcher(None, original, compared).ratio()),
+                 ("Майерс", lambda: diff_ratio(original, compared)))
+        for mode, func in modes:
+            seconds, value = best_time(func)
+            results.append({"case": case, "mode": mode, "value": value, "seconds": seconds})
+    for errors in (100, 1000, 10_000):
+        original, compared = _document(rng, 1_000_000, errors)
+        case = f"1 МБ, {errors} ошибок"
+        modes = (("метрики", lambda: calculate_text_metrics(original, compared)["similarity_ratio"]),
+                 ("inline diff", lambda: len(get_inline_diff(original, compared))))
+        seconds = {}
+        for mode, func in modes:
+            seconds[mode], value = best_time(func)
+            results.append({"case": case, "mode": mode, "value": value, "seconds": seconds[mode]})
+        if errors == 100:
+            assert seconds["метрики"] < METRICS_DIFF_RATIO * seconds["inline diff"], seconds
+    original, _ = _document(rng, 1_000_000, 0)
+    garbage, _ = _document(rng, 1_000_000, 0)
+    seconds, value = best_time(lambda: calculate_text_metrics(original, garbage)["similarity_ratio"])
+    results.append({"case": "1 МБ, мусор", "mode": "метрики", "value": value, "seconds": seconds})
+    assert seconds < GARBAGE_SECONDS, seconds
+    return results
+
+
+if __name__ == "__main__":
+    print(f"{'случай':<20} {'режим':<16} {'значение':>10} {'с':>8}")
+    for row in run_benchmark():
+        print(f"{row['case']:<20} {row['mode']:<16} {row['value']:>10.4g} {row['seconds']:>8.3f}")
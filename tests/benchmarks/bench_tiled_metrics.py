@@ -0,0 +1,55 @@
+"""
+Бенчмарк потоковых метрик по полосам.
+
+Сравнивает calculate_image_metrics по изображениям, целиком загруженным
+в память, с tiled_image_metrics по np.memmap: время и пик памяти NumPy
+(tracemalloc, без учёта страниц самих memmap-файлов).
+
+Запуск: python -m tests.benchmarks.bench_tiled_metrics
+"""
+import os
+import tempfile
+import tracemalloc
+import numpy as np
+from utils.image_metrics import calculate_image_metrics
+from utils.tiled_metrics import tiled_image_metrics
+from tests.benchmarks.timing import best_time
+
+
+def _measure(func):
+    """Время и пик памяти одного запуска."""
+    tracemalloc.start()
+    seconds, metrics = best_time(func)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return metrics, seconds, peak
+
+
+def run_benchmark(shape=(4096, 4096, 3), tile_rows=(64, 256, 1024), seed=0):
+    """
+    Returns:
+        Список словарей с полями mode, seconds, peak_mb, ssim_delta
+    """
+    rng = np.random.default_rng(seed)
+    with tempfile.TemporaryDirectory() as directory:
+        images = []
+        for name in ("cover.npy", "stego.npy"):
+            image = np.lib.format.open_memmap(os.path.join(directory, name), mode="w+", dtype=np.uint8, shape=shape)
+            for row in range(0, shape[0], 512):
+                image[row:row + 512] = rng.integers(0, 256, image[row:row + 512].shape, dtype=np.uint8)
+            images.append(image)
+        images[1][::7] ^= 1
+        expected, seconds, peak = _measure(lambda: calculate_image_metrics(np.array(images[0]), np.array(images[1])))
+        results = [{"mode": "в памяти", "seconds": seconds, "peak_mb": peak / 2 ** 20, "ssim_delta": 0.0}]
+        for rows in tile_rows:
+            metrics, seconds, peak = _measure(lambda: tiled_image_metrics(images[0], images[1], tile_rows=rows))
+            results.append({"mode": f"полосы {rows}", "seconds": seconds, "peak_mb": peak / 2 ** 20,
+                            "ssim_delta": abs(metrics["ssim"] - expected["ssim"])})
+        del images
+    return results
+
+
+if __name__ == "__main__":
+    print(f"{'режим':<12} {'с':>7} {'пик, МБ':>8} {'|ΔSSIM|':>9}")
+    for row in run_benchmark():
+        print(f"{row['mode']:<12} {row['seconds']:>7.2f} {row['peak_mb']:>8.1f} {row['ssim_delta']:>9.1e}")
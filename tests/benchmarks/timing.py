@@ -0,0 +1,28 @@
+"""
+Общий замер времени для бенчмарков.
+
+Вызов повторяется repeats раз и берётся лучшее время: оно меньше всего
+зависит от фоновой нагрузки машины.
+"""
+import time
+
+
+def best_time(func, repeats: int = 1):
+    """
+    Лучшее время вызова func() из repeats запусков.
+
+    Returns:
+        (секунды, результат последнего вызова)
+    """
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def best_ms(func, repeats: int = 1):
+    """То же, что best_time, но время в миллисекундах."""
+    seconds, result = best_time(func, repeats)
+    return seconds * 1000, result
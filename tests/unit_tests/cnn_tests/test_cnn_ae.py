@@ -0,0 +1,94 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from watermark.embedding import embed
+from watermark.extraction import extract
+from watermark.algorithms.cnn_autoencoder.cnn_core import conv2d, conv_transpose2d
+from watermark.algorithms.cnn_autoencoder.cnn_model import reference_weights, save_weights, load_weights
+
+
+def _naive_conv(x, weight, bias, stride, padding):
+    x = np.pad(x, ((0, 0), (0, 0), (padding, padding), (padding, padding)))
+    n, _, h, w = x.shape
+    out_channels, _, k, _ = weight.shape
+    ho, wo = (h - k) // stride + 1, (w - k) // stride + 1
+    out = np.zeros((n, out_channels, ho, wo))
+    for i in range(ho):
+        for j in range(wo):
+            patch = x[:, :, i * stride:i * stride + k, j * stride:j * stride + k]
+            out[:, :, i, j] = np.tensordot(patch, weight, axes=([1, 2, 3], [1, 2, 3])) + bias
+    return out
+
+
+class TestCNNAutoencoder(unittest.TestCase):
+    """
+    Юнит-тесты для NumPy-движка свёрточного автокодировщика.
+    """
+
+    def test_conv2d_matches_naive(self):
+        """im2col + GEMM совпадает с наивной свёрткой, смещение и ReLU применяются"""
+        x = np.random.randn(2, 3, 11, 9).astype(np.float32)
+        weight = np.random.randn(4, 3, 3, 3).astype(np.float32)
+        bias = np.random.randn(4).astype(np.float32)
+        for stride, padding in ((1, 1), (2, 0), (3, 2)):
+            with self.subTest(stride=stride, padding=padding):
+                expected = _naive_conv(x, weight, bias, stride, padding)
+                np.testing.assert_allclose(conv2d(x, weight, bias, stride, padding), expected, rtol=1e-4, atol=1e-4)
+                relu = conv2d(x, weight, bias, stride, padding, activation="relu")
+                np.testing.assert_allclose(relu, np.maximum(expected, 0), rtol=1e-4, atol=1e-4)
+
+    def test_conv_transpose_is_adjoint(self):
+        """Транспонированная свёртка сопряжена свёртке с тем же ядром"""
+        x = np.random.randn(2, 3, 16, 8).astype(np.float32)
+        y = np.random.randn(2, 2, 4, 2).astype(np.float32)
+        weight = np.random.randn(2, 3, 4, 4).astype(np.float32)
+        forward = conv2d(x, weight, np.zeros(2, dtype=np.float32), stride=4)
+        backward = conv_transpose2d(y, weight, np.zeros(3, dtype=np.float32))
+        self.assertAlmostEqual(float((forward * y).sum()), float((x * backward).sum()), places=2)
+
+    def test_weights_memory_mapped(self):
+        """Веса из .npz без сжатия отображаются в память, сжатый архив отвергается"""
+        weights = reference_weights(4.0)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "model.npz")
+            save_weights(path, weights)
+            loaded = load_weights(path)
+            for name, value in weights.items():
+                self.assertIsInstance(loaded[name], np.memmap)
+                np.testing.assert_array_equal(loaded[name], value)
+            compressed = os.path.join(tmp, "compressed.npz")
+            np.savez_compressed(compressed, **weights)
+            with self.assertRaises(ValueError):
+                load_weights(compressed)
+            cover = np.random.randint(30, 220, (256, 256, 3), dtype=np.uint8)
+            params = {"weights": path, "codec": "auto"}
+            stego = embed(cover, "Веса из файла", params, method="cnn_ae")
+            self.assertEqual("Веса из файла", extract(stego, params, method="cnn_ae"))
+            del loaded
+
+    def test_cnn_text_any_resolution(self):
+        """Размер, не кратный плитке: ёмкость — все целые ячейки 8x8"""
+        for shape in ((300, 421, 3), (130, 129)):
+            with self.subTest(shape=shape):
+                cover = np.random.randint(30, 220, shape, dtype=np.uint8)
+                secret = "z" * ((shape[0] // 8) * (shape[1] // 8) // 8)
+                stego = embed(cover, secret, {"batch_size": 3}, method="cnn_ae")
+                self.assertEqual(secret, extract(stego, {"length": len(secret)}, method="cnn_ae"))
+                with self.assertRaises(ValueError):
+                    embed(cover, secret + "z", {}, method="cnn_ae")
+
+    def test_cnn_image_embed_extract(self):
+        """Встраивание изображения; плитки без нагрузки не меняются"""
+        cover = np.random.randint(30, 220, (512, 512), dtype=np.uint8)
+        secret = np.random.randint(0, 256, (16, 16), dtype=np.uint8)
+        params = {"strength": 4}
+        stego = embed(cover, secret, params, method="cnn_ae")
+        params["secret_shape"] = secret.shape
+        np.testing.assert_array_equal(secret, extract(stego, params, method="cnn_ae"))
+        # 2048 битов занимают первые 8 плиток — две строки по 4 плитки
+        np.testing.assert_array_equal(stego[256:], cover[256:])
+
+
+if __name__ == "__main__":
+    unittest.main()
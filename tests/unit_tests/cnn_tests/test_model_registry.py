@@ -0,0 +1,80 @@
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+import numpy as np
+from watermark.algorithms.model_registry import ModelRegistry
+from watermark.algorithms.cnn_autoencoder.cnn_model import reference_weights, save_weights, load_weights
+
+
+class TestModelRegistry(unittest.TestCase):
+    """
+    Юнит-тесты для реестра весов моделей.
+    """
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.paths = []
+        for i in range(3):
+            path = os.path.join(self.tmp.name, f"model{i}.npz")
+            save_weights(path, reference_weights(1.0 + i))
+            self.paths.append(path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_warm_call_does_no_file_io(self):
+        """Повторный вызов отдаёт те же массивы, не открывая файлов"""
+        registry = ModelRegistry()
+        registry.register("main", self.paths[0])
+        cold = registry.get("main", load_weights)
+        # Файл не удаляется: он отображён в память, а на Windows такой файл удалить нельзя
+        no_io = AssertionError("повторный вызов обратился к файлу")
+        with mock.patch("builtins.open", side_effect=no_io), mock.patch.object(np, "memmap", side_effect=no_io), \
+                mock.patch.object(np, "load", side_effect=no_io):
+            warm = registry.get("main", load_weights)
+        self.assertIs(cold, warm)
+        self.assertEqual((registry.loads, registry.hits), (1, 1))
+        # Путь и имя указывают на одну модель
+        self.assertIs(cold, registry.get(self.paths[0]))
+        self.assertFalse(warm["enc.probe.weight"].flags.writeable)
+
+    def test_lru_eviction(self):
+        """Вытесняется давно не использованная модель"""
+        registry = ModelRegistry(max_models=2)
+        registry.get(self.paths[0])
+        registry.get(self.paths[1])
+        registry.get(self.paths[0])
+        registry.get(self.paths[2])
+        self.assertIn(self.paths[0], registry)
+        self.assertNotIn(self.paths[1], registry)
+        self.assertEqual(len(registry), 2)
+
+    def test_concurrent_first_call_loads_once(self):
+        """Параллельные первые вызовы загружают модель один раз"""
+        calls = []
+        barrier = threading.Barrier(8)
+
+        def slow_loader(key):
+            calls.append(key)
+            return {"weight": np.ones(4)}
+
+        registry = ModelRegistry()
+        results = []
+
+        def worker():
+            barrier.wait()
+            results.append(registry.get("shared", slow_loader))
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(result is results[0] for result in results))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+import numpy as np
+import cv2
+from watermark.embedding import embed
+from watermark.extraction import extract
+from watermark.algorithms.dct import dct_activity
+from watermark.algorithms.dct.dct_core import luma, mid_frequency_positions
+
+
+def _mixed_cover(seed=40):
+    """Контейнер с плоским градиентом и текстурной областью без насыщения."""
+    rng = np.random.default_rng(seed)
+    yy, xx = np.mgrid[0:256, 0:256]
+    cover = np.stack([60 + xx * 0.3, 70 + yy * 0.3, 80 + (xx + yy) * 0.15], axis=-1)
+    cover[32:160, 96:224] += rng.normal(0, 15, (128, 128, 3))
+    return np.clip(cover, 0, 255).astype(np.uint8)
+
+
+class TestDCTActivity(unittest.TestCase):
+    """
+    Юнит-тесты для карты активности и адаптивного выбора блоков.
+    """
+
+    def setUp(self):
+        dct_activity.clear_cache()
+        self.cover = _mixed_cover()
+
+    def test_block_activity_matches_dct_energy(self):
+        """Активность — энергия AC без носителей, делённая на площадь блока"""
+        y_channel = luma(self.cover)
+        positions = mid_frequency_positions(2)
+        activity = dct_activity.block_activity(y_channel, 8, positions)
+        for by, bx in ((0, 0), (5, 14), (10, 20), (31, 31)):
+            coefficients = cv2.dct(y_channel[by * 8:by * 8 + 8, bx * 8:bx * 8 + 8].astype(np.float64))
+            coefficients[0, 0] = 0
+            for u, v in positions:
+                coefficients[u, v] = 0
+            self.assertAlmostEqual(activity[by, bx], np.square(coefficients).sum() / 64, places=4)
+
+    def test_activity_map_is_cached(self):
+        """Повторный запрос карты для того же содержимого берётся из кэша"""
+        y_channel = luma(self.cover)
+        first = dct_activity.activity_map(y_channel, 8, ((4, 4),))
+        self.assertIs(first, dct_activity.activity_map(y_channel.copy(), 8, ((4, 4),)))
+        self.assertFalse(first.flags.writeable)
+
+    def test_adaptive_text_embed_extract(self):
+        """Текст пишется только в текстурные блоки и извлекается по стего"""
+        secret = "Adaptive placement " * 3  # 456 бит при 256 текстурных блоках
+        for params in ({"strength": 12, "adaptive": True, "bits_per_block": 2},
+                       {"strength": 12, "adaptive": True, "bits_per_block": 3, "codec": "auto"}):
+            with self.subTest(params=params):
+                stego = embed(self.cover, secret, dict(params), method="dct")
+                read_params = dict(params, length=len(secret.encode("utf-8")))
+                self.assertEqual(secret, extract(stego, read_params, method="dct"))
+                # Плоские области вне текстуры не тронуты
+                np.testing.assert_array_equal(self.cover[:32], stego[:32])
+                np.testing.assert_array_equal(self.cover[160:], stego[160:])
+
+    def test_adaptive_image_embed_extract(self):
+        """Изображение встраивается адаптивно и извлекается без потерь"""
+        secret = np.random.randint(0, 256, (8, 8), dtype=np.uint8)
+        params = {"strength": 15, "adaptive": True, "min_activity": 50, "bits_per_block": 4,
+                  "secret_shape": secret.shape}
+        stego = embed(self.cover, secret, params, method="dct")
+        np.testing.assert_array_equal(secret, extract(stego, params, method="dct"))
+
+    def test_adaptive_capacity_error(self):
+        """На плоском контейнере текстурных блоков нет — ValueError"""
+        flat = np.full((128, 128), 120, dtype=np.uint8)
+        with self.assertRaises(ValueError):
+            embed(flat, "x", {"adaptive": True}, method="dct")
+        with self.assertRaises(ValueError):
+            embed(self.cover, "x", {"adaptive": True, "min_activity": -1}, method="dct")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -138,6 +138,24 @@ class TestDCTImage(unittest.TestCase):
         
         self.assertEqual(secret.shape, recovered.shape)
 
+    
+    def test_dct_image_bit_planes_preview(self):
+        """Тест превью по старшим битовым плоскостям"""
+        cover = np.random.randint(50, 200, (256, 256), dtype=np.uint8)
+        secret = np.random.randint(0, 255, (8, 8), dtype=np.uint8)
+        params = {"strength": 15, "block_size": 8, "layout": "planes"}
+        
+        stego = embed(cover, secret, params, method="dct")
+        
+        params["secret_shape"] = secret.shape
+        np.testing.assert_array_equal(secret, extract(stego, params, method="dct"))
+        
+        params["planes"] = 2
+        preview = extract(stego, params, method="dct")
+        self.assertEqual(secret.shape, preview.shape)
+        error = np.abs(preview.astype(int) - secret.astype(int))
+        self.assertLessEqual(error.max(), 32)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+import numpy as np
+import cv2
+from watermark.embedding import embed
+from watermark.extraction import extract
+from watermark.algorithms.dct.dct_int import fdct_islow, idct_islow
+
+
+class TestDCTInt(unittest.TestCase):
+    """
+    Юнит-тесты для целочисленного DCT 8x8 (transform='int').
+    """
+
+    def setUp(self):
+        rng = np.random.default_rng(37)
+        self.blocks = rng.integers(0, 256, (500, 8, 8)).astype(np.int32) - 128
+
+    def test_fdct_error_bound_against_cv2(self):
+        """Коэффициенты отличаются от cv2.dct не больше чем на 0.25"""
+        coefficients = fdct_islow(self.blocks) / 8
+        reference = np.stack([cv2.dct(block.astype(np.float32)) for block in self.blocks])
+        self.assertLessEqual(np.abs(coefficients - reference).max(), 0.25)
+
+    def test_idct_roundtrip_error_bound(self):
+        """Прямое и обратное преобразования возвращают пиксели с точностью до 1"""
+        restored = idct_islow(fdct_islow(self.blocks))
+        self.assertLessEqual(np.abs(restored - self.blocks).max(), 1)
+
+    def test_idct_sparse_delta_error_bound(self):
+        """Изменение одного коэффициента восстанавливается с точностью до 1"""
+        delta = np.zeros_like(self.blocks)
+        delta[:, 4, 4] = np.arange(-250, 250) * 8
+        reference = np.stack([cv2.idct((block / 8).astype(np.float32)) for block in delta])
+        self.assertLessEqual(np.abs(idct_islow(delta) - reference).max(), 1)
+
+    def test_dct_text_int_extraction_parity(self):
+        """Целочисленное и float-извлечение читают одни и те же биты"""
+        cover = np.random.randint(50, 200, (256, 256, 3), dtype=np.uint8)
+        secret = "Целочисленное DCT"
+        for embed_transform in ("float", "int"):
+            params = {"strength": 10, "transform": embed_transform, "bits_per_block": 2}
+            stego = embed(cover, secret, params, method="dct")
+            for extract_transform in ("float", "int"):
+                with self.subTest(embed=embed_transform, extract=extract_transform):
+                    extract_params = dict(params, transform=extract_transform, length=len(secret.encode("utf-8")))
+                    self.assertEqual(secret, extract(stego, extract_params, method="dct"))
+
+    def test_dct_image_int_transform(self):
+        """Изображение встраивается и извлекается целочисленным DCT"""
+        cover = np.random.randint(50, 200, (256, 256), dtype=np.uint8)
+        secret = np.random.randint(0, 256, (8, 8), dtype=np.uint8)
+        params = {"strength": 15, "transform": "int", "secret_shape": secret.shape}
+        stego = embed(cover, secret, params, method="dct")
+        np.testing.assert_array_equal(secret, extract(stego, params, method="dct"))
+
+    def test_dct_image_int_transform_color_cover(self):
+        """Цветной контейнер: целочисленное DCT работает с округлённой дробной яркостью"""
+        cover = np.random.default_rng(37).integers(50, 200, (256, 256, 3), dtype=np.uint8)
+        secret = np.random.randint(0, 256, (8, 8), dtype=np.uint8)
+        for channel_order in ("bgr", "rgb"):
+            with self.subTest(channel_order=channel_order):
+                params = {"strength": 15, "transform": "int", "secret_shape": secret.shape,
+                          "channel_order": channel_order}
+                stego = embed(cover, secret, params, method="dct")
+                np.testing.assert_array_equal(secret, extract(stego, params, method="dct"))
+
+    def test_dct_int_requires_8x8_blocks(self):
+        """Целочисленное DCT доступно только для блоков 8x8"""
+        cover = np.random.randint(50, 200, (128, 128), dtype=np.uint8)
+        with self.assertRaises(ValueError):
+            embed(cover, "x", {"block_size": 16, "transform": "int"}, method="dct")
+        with self.assertRaises(ValueError):
+            embed(cover, "x", {"transform": "fixed"}, method="dct")
+
+
+if __name__ == "__main__":
+    unittest.main()
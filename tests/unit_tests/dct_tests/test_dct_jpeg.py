@@ -0,0 +1,95 @@
+import io
+import unittest
+import numpy as np
+import cv2
+from PIL import Image
+from watermark.embedding import embed
+from watermark.extraction import extract
+from watermark.algorithms.dct.jpeg_coeffs import read_jpeg, write_jpeg
+
+
+def _cover(h=200, w=264):
+    """Гладкий цветной контейнер с шумом, похожий на фотографию."""
+    rng = np.random.default_rng(38)
+    yy, xx = np.mgrid[0:h, 0:w]
+    image = np.stack([xx * 0.7, yy * 0.9, (xx + yy) * 0.4], axis=-1) % 256
+    return np.clip(image + rng.normal(0, 12, image.shape), 0, 255).astype(np.uint8)
+
+
+def _pil_jpeg(image, **options):
+    buffer = io.BytesIO()
+    Image.fromarray(image).save(buffer, "JPEG", **options)
+    return buffer.getvalue()
+
+
+def _decode(data):
+    return cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_UNCHANGED)
+
+
+class TestDCTJpeg(unittest.TestCase):
+    """
+    Юнит-тесты для встраивания в квантованные коэффициенты JPEG.
+    """
+
+    def setUp(self):
+        self.cover = _cover()
+        self.jpeg = cv2.imencode(".jpg", self.cover, [cv2.IMWRITE_JPEG_QUALITY, 85])[1].tobytes()
+
+    def test_jpeg_roundtrip_is_lossless(self):
+        """Разбор и запись без изменений дают те же пиксели при декодировании"""
+        variants = {
+            "cv2": self.jpeg,
+            "restart": cv2.imencode(".jpg", self.cover, [cv2.IMWRITE_JPEG_QUALITY, 80,
+                                                         cv2.IMWRITE_JPEG_RST_INTERVAL, 3])[1].tobytes(),
+            "pil_444": _pil_jpeg(self.cover, quality=90, subsampling=0),
+            "pil_optimized": _pil_jpeg(self.cover, quality=75, optimize=True),
+            "grayscale": _pil_jpeg(self.cover[..., 0], quality=70),
+        }
+        for name, data in variants.items():
+            with self.subTest(variant=name):
+                rewritten = write_jpeg(read_jpeg(data))
+                np.testing.assert_array_equal(_decode(data), _decode(rewritten))
+
+    def test_jpeg_text_embed_extract(self):
+        """Текст извлекается из JPEG по длине и по заголовку сжатия"""
+        secret = "Секрет в коэффициентах JPEG. " * 10
+        for params in ({}, {"codec": "auto"}):
+            with self.subTest(params=params):
+                stego = embed(self.jpeg, secret, dict(params), method="dct")
+                self.assertIsInstance(stego, bytes)
+                extract_params = dict(params) if params else {"length": len(secret.encode("utf-8"))}
+                self.assertEqual(secret, extract(stego, extract_params, method="dct"))
+
+    def test_jpeg_image_embed_extract(self):
+        """Изображение извлекается из JPEG, стего декодируется близко к контейнеру"""
+        secret = np.random.randint(0, 256, (12, 12, 3), dtype=np.uint8)
+        stego = embed(self.jpeg, secret, {}, method="dct")
+        np.testing.assert_array_equal(secret, extract(stego, {"secret_shape": secret.shape}, method="dct"))
+        self.assertGreater(cv2.PSNR(_decode(self.jpeg), _decode(stego)), 35)
+
+    def test_jpeg_changes_only_carriers(self):
+        """Меняются только AC-коэффициенты яркости с |c| >= 2, на единицу и без обнуления"""
+        secret = "carrier check " * 20
+        before = read_jpeg(self.jpeg)
+        after = read_jpeg(embed(self.jpeg, secret, {}, method="dct"))
+        for index in (1, 2):
+            np.testing.assert_array_equal(before.coefficients[index], after.coefficients[index])
+        old, new = before.coefficients[0].astype(int), after.coefficients[0].astype(int)
+        changed = old != new
+        np.testing.assert_array_equal(old[..., 0], new[..., 0])
+        self.assertTrue(np.all(np.abs(old[changed]) >= 2))
+        self.assertTrue(np.all(np.abs(new[changed]) >= 2))
+        self.assertTrue(np.all(np.abs(old[changed] - new[changed]) == 1))
+        self.assertLessEqual(changed.sum(), len(secret) * 8)
+
+    def test_jpeg_unsupported_and_capacity_errors(self):
+        """Прогрессивный JPEG и слишком большой секрет — ValueError"""
+        progressive = _pil_jpeg(self.cover, quality=85, progressive=True)
+        with self.assertRaises(ValueError):
+            embed(progressive, "x", {}, method="dct")
+        with self.assertRaises(ValueError):
+            embed(self.jpeg, "x" * 100000, {}, method="dct")
+
+
+if __name__ == "__main__":
+    unittest.main()
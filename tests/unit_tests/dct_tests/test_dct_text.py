@@ -1,7 +1,9 @@
 import unittest
 import numpy as np
+import cv2
 from watermark.embedding import embed
 from watermark.extraction import extract
+from watermark.algorithms.dct.dct_core import DEFAULT_POSITIONS, default_positions, resolve_positions
 
 
 class TestDCTText(unittest.TestCase):
@@ -113,6 +115,84 @@ class TestDCTText(unittest.TestCase):
         recovered = extract(stego, params, method="dct")
         
         self.assertEqual(secret, recovered)
+    
+    def test_dct_text_multiple_bits_per_block(self):
+        """Несколько коэффициентов на блок: ёмкость растёт в k раз"""
+        cover = np.random.randint(50, 200, (128, 128, 3), dtype=np.uint8)
+        # 256 блоков: 32 байта при 1 бите на блок, 128 байт при 4
+        secret = "k-bit QIM " * 12
+        with self.assertRaises(ValueError):
+            embed(cover, secret, {"strength": 12}, method="dct")
+        for params in ({"strength": 12, "bits_per_block": 4},
+                       {"strength": 12, "positions": [(4, 4), (2, 5), (5, 2), (3, 3)]}):
+            with self.subTest(params=params):
+                stego = embed(cover, secret, params, method="dct")
+                read_params = dict(params, length=len(secret.encode("utf-8")))
+                self.assertEqual(secret, extract(stego, read_params, method="dct"))
+    
+    def test_dct_text_default_position_follows_block_size(self):
+        """По умолчанию [4, 4], в блоках меньше 5x5 — первая среднечастотная позиция"""
+        cover = np.random.randint(50, 200, (64, 64), dtype=np.uint8)
+        # 256 блоков 4x4 и 16 блоков 16x16
+        for block_size, position, secret in ((4, (2, 2), "Блок 4x4"), (16, (4, 4), "16")):
+            with self.subTest(block_size=block_size):
+                self.assertEqual(default_positions(block_size), (position,))
+                self.assertEqual(resolve_positions({}, block_size), (position,))
+                params = {"strength": 20, "block_size": block_size}
+                stego = embed(cover, secret, params, method="dct")
+                read_params = dict(params, length=len(secret.encode("utf-8")))
+                self.assertEqual(secret, extract(stego, read_params, method="dct"))
+        self.assertEqual(default_positions(8), DEFAULT_POSITIONS)
+
+    def test_dct_text_baseline_block_16_still_extracts(self):
+        """Текст, встроенный прежней реализацией с блоком 16x16, читается параметрами по умолчанию"""
+        cover = np.random.default_rng(36).integers(50, 200, (64, 64)).astype(np.uint8)
+        secret = "16"
+        bits = np.unpackbits(np.frombuffer(secret.encode("utf-8"), dtype=np.uint8))
+        y_channel = cover.astype(np.float32)
+        # Прежний dct_text.embed_text: чётность round(coeff / strength) в [4, 4] каждого блока
+        for index, bit in enumerate(bits):
+            i, j = divmod(index, 4)
+            block = y_channel[i * 16:(i + 1) * 16, j * 16:(j + 1) * 16]
+            dct_block = cv2.dct(block)
+            quantized = round(dct_block[4, 4] / 20)
+            if quantized % 2 != bit:
+                quantized += 1 if bit else -1
+            dct_block[4, 4] = quantized * 20
+            block[:] = cv2.idct(dct_block)
+        stego = np.clip(y_channel, 0, 255).astype(np.uint8)
+        params = {"strength": 20, "block_size": 16, "length": len(secret)}
+        self.assertEqual(secret, extract(stego, params, method="dct"))
+
+    def test_dct_text_invalid_positions(self):
+        """Позиции вне блока, DC-коэффициент и повторы отвергаются"""
+        cover = np.random.randint(50, 200, (64, 64), dtype=np.uint8)
+        for positions in ([(8, 1)], [(0, 0)], [(4, 4), (4, 4)]):
+            with self.subTest(positions=positions):
+                with self.assertRaises(ValueError):
+                    embed(cover, "a", {"positions": positions}, method="dct")
+
+    
+    def test_dct_text_channel_order(self):
+        """RGB-массив (PIL) встраивается и извлекается с channel_order='rgb'"""
+        cover = np.random.randint(50, 200, (128, 128, 3), dtype=np.uint8)
+        secret = "RGB order"
+        params = {"strength": 12, "channel_order": "rgb", "length": len(secret.encode("utf-8"))}
+        stego = embed(cover, secret, params, method="dct")
+        self.assertEqual(secret, extract(stego, params, method="dct"))
+        with self.assertRaises(ValueError):
+            embed(cover, secret, {"channel_order": "rbg"}, method="dct")
+    
+    def test_dct_text_fused_colour_keeps_chroma(self):
+        """Меняются только строки блоков с нагрузкой, цветность сохраняется"""
+        import cv2
+        cover = np.random.randint(50, 200, (256, 256, 3), dtype=np.uint8)
+        stego = embed(cover, "chroma", {"strength": 12}, method="dct")
+        # 48 битов занимают первую строку из 32 блоков и часть второй
+        np.testing.assert_array_equal(cover[16:], stego[16:])
+        before = cv2.cvtColor(cover, cv2.COLOR_BGR2YCrCb)[..., 1:].astype(int)
+        after = cv2.cvtColor(stego, cv2.COLOR_BGR2YCrCb)[..., 1:].astype(int)
+        self.assertLessEqual(np.abs(before - after).max(), 1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,98 @@
+import unittest
+import numpy as np
+from watermark.embedding import embed
+from watermark.extraction import extract
+from watermark.algorithms.dct import dct_tune
+from watermark.algorithms.dct.dct_core import embed_luma, luma, extract_bits
+from utils.image_metrics import calculate_psnr
+from utils.robustness import attack_image
+
+
+def _textured_cover(shape=(256, 256, 3), seed=50):
+    """Градиент с шумом и насыщенной тёмной полосой (проверка отсечения на границах)."""
+    rng = np.random.default_rng(seed)
+    yy, xx = np.mgrid[0:shape[0], 0:shape[1]]
+    base = 60 + xx * 0.3 + yy * 0.2
+    cover = (base[..., None] if len(shape) == 3 else base) + rng.normal(0, 12, shape)
+    cover[:24] = rng.integers(0, 4, cover[:24].shape)
+    return np.clip(cover, 0, 255).astype(np.uint8)
+
+
+class TestDCTTune(unittest.TestCase):
+    """
+    Юнит-тесты для автоматического подбора силы встраивания.
+    """
+
+    def setUp(self):
+        self.rng = np.random.default_rng(50)
+        self.cover = _textured_cover((384, 384, 3))
+        self.text = "Подбор силы встраивания " * 4
+
+    def test_probe_matches_embed(self):
+        """Стего, PSNR и BER пробы совпадают с embed_luma, calculate_psnr и полным JPEG"""
+        for shape in ((256, 256, 3), (256, 256), (256, 200, 4)):
+            cover = _textured_cover(shape)
+            bits = self.rng.integers(0, 2, 500).astype(np.uint8)
+            tuner = dct_tune.StrengthTuner(cover, bits)
+            for strength in (5, 17.3, 41):
+                stego = embed_luma(cover, bits, strength, 8)
+                np.testing.assert_array_equal(tuner.stego(strength), stego)
+                self.assertAlmostEqual(tuner.psnr(tuner.luma_change(strength)), calculate_psnr(cover, stego),
+                                       places=9)
+                if len(shape) == 3 and shape[2] == 3:
+                    attacked = attack_image(stego, "jpeg", {"quality": 75})
+                    ber = np.mean(extract_bits(luma(attacked), bits.size, strength, 8) != bits)
+                    self.assertEqual(tuner.jpeg_ber(stego, strength, 75), ber)
+        self.assertEqual(tuner.evaluate(20.0, quality=75)["strength"], 20.0)
+        self.assertEqual(tuner.evaluations, 1)
+
+    def test_tune_min_psnr(self):
+        """Наибольшая сила с PSNR не ниже цели за несколько проб"""
+        result = dct_tune.tune_strength(self.cover, self.text, {}, min_psnr=45.0)
+        strength = result["strength"]
+        self.assertLessEqual(result["evaluations"], 8)
+        stego = embed(self.cover, self.text, {"strength": strength}, method="dct")
+        self.assertEqual(calculate_psnr(self.cover, stego), result["psnr"])
+        self.assertGreaterEqual(result["psnr"], 45.0)
+        stronger = embed(self.cover, self.text, {"strength": strength + dct_tune.DEFAULT_TOLERANCE}, method="dct")
+        self.assertLess(calculate_psnr(self.cover, stronger), 45.5)
+        # Без ограничения сверху отвечает верхняя граница отрезка
+        self.assertEqual(dct_tune.tune_strength(self.cover, self.text, {}, min_psnr=10.0)["strength"], 50.0)
+
+    def test_tune_max_ber_after_jpeg(self):
+        """Наименьшая сила, при которой текст переживает JPEG; min_psnr как ограничение"""
+        result = dct_tune.tune_strength(self.cover, self.text, {}, max_ber=0.0, quality=80)
+        self.assertEqual(result["ber"], 0.0)
+        self.assertLessEqual(result["evaluations"], 12)
+        params = {"strength": result["strength"]}
+        stego = embed(self.cover, self.text, params, method="dct")
+        length = len(self.text.encode("utf-8"))
+        attacked = attack_image(stego, "jpeg", {"quality": 80})
+        self.assertEqual(extract(attacked, dict(params, length=length), method="dct"), self.text)
+        with self.assertRaises(ValueError):
+            dct_tune.tune_strength(self.cover, self.text, {}, max_ber=0.0, quality=80,
+                                   min_psnr=60.0)
+
+    def test_payload_and_errors(self):
+        """Биты секрета как у embed, недостижимые цели и неподдерживаемые параметры"""
+        image = self.rng.integers(0, 256, (8, 8, 3)).astype(np.uint8)
+        for secret, params in ((image, {"strength": 12, "layout": "planes"}),
+                               (image, {"strength": 12, "image_codec": "png"}),
+                               (self.text * 4, {"strength": 12, "codec": "zlib"})):
+            with self.subTest(params=params):
+                tuner = dct_tune.StrengthTuner(self.cover, dct_tune.payload_bits(self.cover, secret, params))
+                np.testing.assert_array_equal(tuner.stego(12), embed(self.cover, secret, params, method="dct"))
+        with self.assertRaises(ValueError):
+            dct_tune.payload_bits(self.cover, np.zeros((64, 64, 3), np.uint8), {})
+        with self.assertRaises(ValueError):
+            dct_tune.tune_strength(self.cover, self.text, {})
+        with self.assertRaises(ValueError):
+            dct_tune.tune_strength(self.cover, self.text, {}, min_psnr=80.0)
+        with self.assertRaises(ValueError):
+            dct_tune.tune_strength(self.cover, self.text, {"transform": "int"}, min_psnr=40.0)
+        with self.assertRaises(ValueError):
+            dct_tune.tune_strength(self.cover, self.text, {"adaptive": True}, min_psnr=40.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+import cv2
+import numpy as np
+from watermark.embedding import embed
+from watermark.extraction import extract
+from watermark.algorithms.dwt.dwt_core import forward, inverse, subband, qim_embed
+from watermark.algorithms.dwt_dct.dwt_dct_core import embed_bits
+
+
+def _naive_embed(y_channel, bits, strength, levels, block_size):
+    """Полный DWT, DCT каждого блока LL и полные обратные преобразования."""
+    span = block_size << levels
+    height, width = y_channel.shape[0] // span * span, y_channel.shape[1] // span * span
+    region = y_channel[:height, :width]
+    forward(region, levels, "haar")
+    ll = subband(region, levels, "LL")
+    blocks_per_row = ll.shape[1] // block_size
+    for index, bit in enumerate(bits):
+        i, j = index // blocks_per_row * block_size, index % blocks_per_row * block_size
+        block = cv2.dct(np.ascontiguousarray(ll[i:i + block_size, j:j + block_size]))
+        block[4, 4] = qim_embed(np.array([block[4, 4]]), np.array([bit]), strength)[0]
+        ll[i:i + block_size, j:j + block_size] = cv2.idct(block)
+    inverse(region, levels, "haar")
+
+
+class TestDWTDCT(unittest.TestCase):
+    """
+    Юнит-тесты для гибридного метода DWT-DCT.
+    """
+
+    def test_matches_full_pipeline(self):
+        """Локальный расчёт совпадает с полным DWT + DCT + обратными преобразованиями"""
+        y_channel = (np.random.rand(200, 333) * 200 + 25).astype(np.float32)
+        bits = np.random.randint(0, 2, 40).astype(np.uint8)
+        for levels in (1, 2):
+            with self.subTest(levels=levels):
+                fast, naive = y_channel.copy(), y_channel.copy()
+                embed_bits(fast, bits, 10, levels, 8)
+                _naive_embed(naive, bits, 10, levels, 8)
+                np.testing.assert_allclose(fast, naive, atol=1e-3)
+
+    def test_only_payload_blocks_change(self):
+        """Пиксели вне блоков с нагрузкой не меняются"""
+        cover = np.random.randint(40, 210, (256, 256), dtype=np.uint8)
+        secret = "abc"
+        stego = embed(cover, secret, {"levels": 1}, method="dwt_dct")
+        # 24 бита — первые 24 блока LL по 16x16 пикселей: вся первая строка блоков и 8 из второй
+        np.testing.assert_array_equal(stego[32:], cover[32:])
+        np.testing.assert_array_equal(stego[16:32, 128:], cover[16:32, 128:])
+        self.assertEqual(secret, extract(stego, {"levels": 1, "length": 3}, method="dwt_dct"))
+
+    def test_small_blocks(self):
+        """Блок 4x4 несёт бит в [2, 2], блок меньше 2x2 — ValueError, а не IndexError"""
+        cover = np.random.default_rng(35).integers(40, 210, (128, 128)).astype(np.uint8)
+        params = {"levels": 1, "block_size": 4, "strength": 12}
+        stego = embed(cover, "Блок 4x4", params, method="dwt_dct")
+        read_params = dict(params, length=len("Блок 4x4".encode("utf-8")))
+        self.assertEqual("Блок 4x4", extract(stego, read_params, method="dwt_dct"))
+        with self.assertRaises(ValueError):
+            embed(cover, "a", dict(params, block_size=1), method="dwt_dct")
+
+    def test_dwt_dct_text_and_image(self):
+        """Текст со сжатием и изображение на цветном контейнере"""
+        cover = np.random.randint(40, 210, (512, 384, 3), dtype=np.uint8)
+        secret = "Гибрид DWT-DCT " * 20
+        params = {"codec": "auto", "strength": 10}
+        stego = embed(cover, secret, params, method="dwt_dct")
+        self.assertEqual(secret, extract(stego, params, method="dwt_dct"))
+        logo = np.random.randint(0, 256, (8, 12), dtype=np.uint8)
+        params = {"levels": 1, "secret_shape": logo.shape}
+        stego = embed(cover, logo, params, method="dwt_dct")
+        np.testing.assert_array_equal(logo, extract(stego, params, method="dwt_dct"))
+        with self.assertRaises(ValueError):
+            embed(cover, np.zeros((40, 40), dtype=np.uint8), params, method="dwt_dct")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+import unittest
+import numpy as np
+from watermark.embedding import embed
+from watermark.extraction import extract
+
+
+class TestDWTImage(unittest.TestCase):
+    """
+    Юнит-тесты для DWT алгоритма встраивания и извлечения изображений.
+    """
+
+    def test_dwt_image_embed_extract_basic(self):
+        """Базовая проверка встраивания и извлечения изображения"""
+        cover = np.random.randint(50, 200, (256, 256, 3), dtype=np.uint8)
+        secret = np.random.randint(0, 256, (16, 16), dtype=np.uint8)
+        params = {"wavelet": "cdf53", "levels": 2, "strength": 12}
+        stego = embed(cover, secret, params, method="dwt")
+        params["secret_shape"] = secret.shape
+        np.testing.assert_array_equal(secret, extract(stego, params, method="dwt"))
+
+    def test_dwt_image_bit_planes_preview(self):
+        """Превью из старших битовых плоскостей"""
+        cover = np.random.randint(50, 200, (256, 256), dtype=np.uint8)
+        secret = np.random.randint(0, 256, (12, 20), dtype=np.uint8)
+        params = {"levels": 1, "layout": "planes", "secret_shape": secret.shape}
+        stego = embed(cover, secret, params, method="dwt")
+        preview = extract(stego, dict(params, planes=3), method="dwt")
+        self.assertLessEqual(np.abs(preview.astype(int) - secret.astype(int)).max(), 16)
+
+    def test_dwt_image_capacity_error(self):
+        """Слишком большой секрет без кодека — ошибка"""
+        cover = np.random.randint(50, 200, (64, 64), dtype=np.uint8)
+        secret = np.zeros((32, 32), dtype=np.uint8)
+        with self.assertRaises(ValueError):
+            embed(cover, secret, {"levels": 2}, method="dwt")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from watermark.embedding import embed
+from watermark.extraction import extract
+from watermark.algorithms.dwt.dwt_stream import halo_rows
+
+
+class TestDWTStream(unittest.TestCase):
+    """
+    Юнит-тесты для потокового (полосового) режима DWT.
+    """
+
+    def test_stream_matches_full_transform(self):
+        """Полосовое встраивание совпадает с обычным побитово"""
+        secret = "Полосовой DWT " * 40
+        for shape in ((300, 217, 3), (261, 190)):
+            cover = np.random.randint(40, 210, shape, dtype=np.uint8)
+            for wavelet in ("haar", "cdf53"):
+                for levels in (1, 3):
+                    with self.subTest(shape=shape, wavelet=wavelet, levels=levels):
+                        params = {"wavelet": wavelet, "levels": levels, "band": "HL", "codec": "auto"}
+                        full = embed(cover, secret, params, method="dwt")
+                        # Полоса меньше ореола — худший случай для границ окна
+                        stream_params = dict(params, strip_rows=halo_rows(levels, wavelet) // 2 or 8)
+                        streamed = embed(cover, secret, stream_params, method="dwt")
+                        np.testing.assert_array_equal(full, streamed)
+                        self.assertEqual(secret, extract(full, stream_params, method="dwt"))
+
+    def test_stream_memmap(self):
+        """Контейнер и результат — файлы np.memmap"""
+        shape = (1024, 768)
+        secret = np.random.randint(0, 256, (40, 40), dtype=np.uint8)
+        with tempfile.TemporaryDirectory() as tmp:
+            cover = np.memmap(os.path.join(tmp, "cover.raw"), dtype=np.uint8, mode="w+", shape=shape)
+            cover[:] = np.random.randint(40, 210, shape, dtype=np.uint8)
+            out = np.memmap(os.path.join(tmp, "stego.raw"), dtype=np.uint8, mode="w+", shape=shape)
+            params = {"wavelet": "cdf53", "levels": 2, "strip_rows": 64, "out": out}
+            result = embed(cover, secret, params, method="dwt")
+            self.assertIs(result, out)
+            out.flush()
+            stego = np.memmap(os.path.join(tmp, "stego.raw"), dtype=np.uint8, mode="r", shape=shape)
+            read_params = {"wavelet": "cdf53", "levels": 2, "strip_rows": 64, "secret_shape": secret.shape}
+            np.testing.assert_array_equal(secret, extract(stego, read_params, method="dwt"))
+            del cover, out, stego, result
+
+    def test_stream_refuses_in_place(self):
+        """Ореол читается из исходных строк, поэтому на месте работать нельзя"""
+        cover = np.random.randint(40, 210, (64, 64), dtype=np.uint8)
+        with self.assertRaises(ValueError):
+            embed(cover, "abc", {"strip_rows": 16, "out": cover}, method="dwt")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+import numpy as np
+from watermark.embedding import embed
+from watermark.extraction import extract
+from watermark.algorithms.dwt.dwt_core import WAVELETS, BANDS, forward, inverse, subband
+
+
+class TestDWTText(unittest.TestCase):
+    """
+    Юнит-тесты для DWT алгоритма встраивания и извлечения текста.
+    """
+
+    def test_lifting_perfect_reconstruction(self):
+        """Прямое и обратное преобразования взаимно обратны"""
+        data = np.random.rand(64, 96) * 255
+        for wavelet in WAVELETS:
+            with self.subTest(wavelet=wavelet):
+                coeffs = data.copy()
+                forward(coeffs, 3, wavelet)
+                self.assertFalse(np.allclose(coeffs, data))
+                inverse(coeffs, 3, wavelet)
+                np.testing.assert_allclose(coeffs, data, atol=1e-9)
+
+    def test_haar_subbands(self):
+        """LL Хаара — среднее блока 2x2, детали линейного градиента нулевые у CDF 5/3"""
+        data = np.random.rand(8, 8)
+        coeffs = data.copy()
+        forward(coeffs, 1, "haar")
+        means = (data[0::2, 0::2] + data[0::2, 1::2] + data[1::2, 0::2] + data[1::2, 1::2]) / 4
+        np.testing.assert_allclose(subband(coeffs, 1, "LL"), means)
+        ramp = np.add.outer(np.arange(16.0), 2 * np.arange(16.0))
+        forward(ramp, 1, "cdf53")
+        # Последний столбец и строка зависят от симметричного продолжения
+        self.assertEqual(np.abs(subband(ramp, 1, "HH")[:-1, :-1]).max(), 0)
+
+    def test_dwt_text_embed_extract_all_bands(self):
+        """Встраивание и извлечение в каждом поддиапазоне для обоих вейвлетов"""
+        cover = np.random.randint(50, 200, (128, 128, 3), dtype=np.uint8)
+        secret = "DWT водяной знак"
+        for wavelet in WAVELETS:
+            for band in BANDS:
+                with self.subTest(wavelet=wavelet, band=band):
+                    params = {"wavelet": wavelet, "band": band, "levels": 2, "strength": 12}
+                    stego = embed(cover, secret, params, method="dwt")
+                    params["length"] = len(secret.encode("utf-8"))
+                    self.assertEqual(secret, extract(stego, params, method="dwt"))
+
+    def test_dwt_text_odd_sized_grayscale(self):
+        """Ч/б изображение со сторонами, не кратными 2^levels"""
+        cover = np.random.randint(50, 200, (203, 317), dtype=np.uint8)
+        secret = "Нечётный размер " * 10
+        params = {"levels": 3, "strength": 10, "codec": "auto"}
+        stego = embed(cover, secret, params, method="dwt")
+        self.assertEqual(secret, extract(stego, params, method="dwt"))
+        # Остаток за пределами области преобразования не меняется
+        np.testing.assert_array_equal(stego[200:], cover[200:])
+
+    def test_dwt_text_capacity_error(self):
+        """Превышение ёмкости поддиапазона"""
+        cover = np.random.randint(50, 200, (64, 64), dtype=np.uint8)
+        with self.assertRaises(ValueError):
+            embed(cover, "x" * 100, {"levels": 2}, method="dwt")
+
+
+if __name__ == "__main__":
+    unittest.main()
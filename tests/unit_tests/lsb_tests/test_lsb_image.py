@@ -17,7 +17,25 @@ class TestLSBImage(unittest.TestCase):
         params["secret_shape"] = secret.shape
         recovered = extract(stego, params, method="lsb")
         np.testing.assert_array_equal(secret, recovered)
-        
+
+    def test_lsb_image_bit_planes_preview(self):
+        # Раскладка по битовым плоскостям: полное извлечение точное,
+        # превью из k плоскостей отличается не больше чем на полшага квантования
+        cover = np.random.randint(0, 256, (128, 128, 3), dtype=np.uint8)
+        secret = np.random.randint(0, 256, (32, 32, 3), dtype=np.uint8)
+        params = {"depth": 2, "layout": "planes"}
+        stego = embed(cover, secret, params, method="lsb")
+        params["secret_shape"] = secret.shape
+        np.testing.assert_array_equal(secret, extract(stego, params, method="lsb"))
+        for planes in (1, 3, 5):
+            params["planes"] = planes
+            preview = extract(stego, params, method="lsb")
+            error = np.abs(preview.astype(int) - secret.astype(int))
+            self.assertLessEqual(error.max(), 1 << (7 - planes))
+        # Превью без раскладки по плоскостям невозможно
+        with self.assertRaises(ValueError):
+            extract(stego, {"depth": 2, "secret_shape": secret.shape, "planes": 2}, method="lsb")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -2,6 +2,7 @@ import unittest
 import numpy as np
 from watermark.embedding import embed
 from watermark.extraction import extract
+from watermark.algorithms.lsb.lsb_core import keyed_indices
 
 class TestLSBText(unittest.TestCase):
     def test_lsb_text_embed_extract(self):
@@ -18,5 +19,56 @@ class TestLSBText(unittest.TestCase):
         recovered = recovered[:len(secret)]  # Если нужно обрезать по символам
         self.assertEqual(secret, recovered)
 
+    def test_lsb_text_keyed_placement(self):
+        # Разбросанное по ключу встраивание: без ключа текст не читается
+        cover = np.random.randint(0, 256, (128, 128, 3), dtype=np.uint8)
+        secret = "Ключевое размещение LSB"
+        params = {"depth": 2, "key": "секретный ключ"}
+        stego = embed(cover, secret, params, method="lsb")
+        params["length"] = len(secret.encode("utf-8"))
+        self.assertEqual(secret, extract(stego, params, method="lsb"))
+        # Изменения разбросаны, а не сосредоточены в первых пикселях
+        changed = np.nonzero(stego.reshape(-1) != cover.reshape(-1))[0]
+        self.assertGreater(changed.max(), cover.size // 2)
+        wrong = dict(params, key="другой ключ")
+        self.assertNotEqual(secret, extract(stego, wrong, method="lsb"))
+
+    def test_keyed_indices_is_injective_on_huge_domain(self):
+        # Позиции для гигапиксельного контейнера считаются только для длины секрета
+        domain = 3 * 40000 * 30000
+        positions = keyed_indices("key", domain, 0, 50000)
+        self.assertEqual(positions.size, 50000)
+        self.assertEqual(np.unique(positions).size, 50000)
+        self.assertTrue((positions >= 0).all() and (positions < domain).all())
+        # Куски перестановки согласованы с целой
+        np.testing.assert_array_equal(positions[1000:2000], keyed_indices("key", domain, 1000, 2000))
+        # На маленьком домене это полная перестановка
+        np.testing.assert_array_equal(np.sort(keyed_indices(7, 1000, 0, 1000)), np.arange(1000))
+
+    def test_lsb_text_matrix_embedding(self):
+        # Матричное встраивание: не больше одного изменения на группу из 2^k - 1 отсчётов
+        cover = np.random.randint(0, 256, (128, 128, 3), dtype=np.uint8)
+        secret = "Матричное встраивание кодом Хэмминга. " * 20
+        for k in (2, 3, 4):
+            with self.subTest(k=k):
+                params = {"depth": 1, "matrix_k": k, "return_info": True}
+                stego, info = embed(cover, secret, params, method="lsb")
+                params["length"] = len(secret.encode("utf-8"))
+                self.assertEqual(secret, extract(stego, params, method="lsb"))
+                diff = stego.astype(int) - cover.astype(int)
+                self.assertLessEqual(np.abs(diff).max(), 1)
+                groups = -(-info["bits"] // k)
+                self.assertLessEqual(info["changes"], groups)
+                self.assertEqual(info["changes"], np.count_nonzero(diff))
+                # Обычный LSB даёт около 2 битов на изменение
+                self.assertGreater(info["bits_per_change"], 2.2)
+
+    def test_lsb_text_matrix_with_codec_and_key(self):
+        cover = np.random.randint(0, 256, (96, 96, 3), dtype=np.uint8)
+        secret = "Сжатый текст с ключом. " * 30
+        params = {"matrix_k": 3, "codec": "auto", "key": 42}
+        stego = embed(cover, secret, params, method="lsb")
+        self.assertEqual(secret, extract(stego, params, method="lsb"))
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,13 @@
+from .test_image_metrics import TestImageMetrics
+from .test_ssim import TestSSIM
+from .test_tiled_metrics import TestTiledMetrics
+from .test_footprint_metrics import TestFootprintMetrics
+from .test_text_metrics import TestTextMetrics
+from .test_bit_metrics import TestBitMetrics
+from .test_text_diff import TestTextDiff
+from .test_quality_report import TestQualityReport
+
+__all__ = [
+    'TestImageMetrics', 'TestSSIM', 'TestTiledMetrics', 'TestFootprintMetrics',
+    'TestTextMetrics', 'TestBitMetrics', 'TestTextDiff', 'TestQualityReport',
+]
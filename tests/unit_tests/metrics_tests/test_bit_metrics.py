@@ -0,0 +1,102 @@
+import unittest
+import numpy as np
+from watermark.utils import bytes_to_bits, image_to_bits
+from utils import bit_metrics
+from utils.bit_metrics import bit_error_metrics, pixel_error_map, BitErrorAccumulator
+
+
+class TestBitMetrics(unittest.TestCase):
+    """
+    Юнит-тесты для BER по упакованным битам нагрузки.
+    """
+
+    def setUp(self):
+        self.rng = np.random.default_rng(46)
+
+    def _corrupt(self, payload, count):
+        bits = bytes_to_bits(payload)
+        flipped = self.rng.choice(bits.size, count, replace=False)
+        bits[flipped] ^= 1
+        return np.packbits(bits), np.sort(flipped)
+
+    def test_matches_unpacked_reference(self):
+        """Popcount по XOR совпадает со сравнением распакованных битов, позиции ошибок точные"""
+        for size, count in ((1, 3), (1000, 0), (1000, 37), (4096, 4096)):
+            with self.subTest(size=size, count=count):
+                original = self.rng.integers(0, 256, size, dtype=np.uint8)
+                extracted, flipped = self._corrupt(original, count)
+                metrics = bit_error_metrics(original, extracted, return_positions=True)
+                reference = np.count_nonzero(bytes_to_bits(original) != bytes_to_bits(extracted))
+                self.assertEqual(metrics["bit_errors"], reference)
+                self.assertEqual(metrics["ber"], reference / (size * 8))
+                self.assertEqual(metrics["byte_errors"], np.count_nonzero(original != extracted))
+                np.testing.assert_array_equal(metrics["positions"], flipped)
+        # Таблица для numpy без bitwise_count
+        values = np.arange(256, dtype=np.uint8)
+        np.testing.assert_array_equal(bit_metrics._POPCOUNT, [bin(v).count("1") for v in range(256)])
+        np.testing.assert_array_equal(bit_metrics.popcount(values), bit_metrics._POPCOUNT)
+
+    def test_lengths_and_inputs(self):
+        """Недостающие байты — ошибки целиком, лишние отбрасываются; str, bytes и пустая нагрузка"""
+        metrics = bit_error_metrics(b"\x0f\xf0\xaa", b"\x0f")
+        self.assertEqual(metrics["missing_bytes"], 2)
+        self.assertEqual(metrics["bit_errors"], 16)
+        self.assertEqual(metrics["byte_errors"], 2)
+        metrics = bit_error_metrics("текст", "текст" + "лишнее")
+        self.assertEqual(metrics["bit_errors"], 0)
+        self.assertEqual(metrics["missing_bytes"], 0)
+        metrics = bit_error_metrics(b"", b"")
+        self.assertEqual((metrics["ber"], metrics["byte_error_rate"]), (0.0, 0.0))
+        with self.assertRaises(ValueError):
+            bit_error_metrics(np.zeros(4, dtype=np.float32), b"")
+
+    def test_regions_and_pixel_map(self):
+        """Гистограмма по участкам нагрузки и карта ошибок по блокам для 'raster' и 'planes'"""
+        secret = self.rng.integers(0, 256, (20, 30, 3), dtype=np.uint8)
+        # Портим все биты пикселя (12, 25) и старший бит пикселя (3, 4)
+        damaged = secret.copy()
+        damaged[12, 25] ^= 0xFF
+        damaged[3, 4, 0] ^= 0x80
+        for layout in ("raster", "planes"):
+            with self.subTest(layout=layout):
+                original = np.packbits(image_to_bits(secret.reshape(-1), layout))
+                extracted = np.packbits(image_to_bits(damaged.reshape(-1), layout))
+                metrics = bit_error_metrics(original, extracted, region_bits=1000, return_positions=True)
+                self.assertEqual(metrics["bit_errors"], 25)
+                self.assertEqual(metrics["regions"].sum(), 25)
+                self.assertEqual(metrics["regions"].size, -(-secret.size * 8 // 1000))
+                error_map = pixel_error_map(metrics["positions"], secret.shape, layout, block_size=8)
+                self.assertEqual(error_map.shape, (3, 4))
+                expected = np.zeros((3, 4), dtype=np.int64)
+                expected[1, 3] = 24
+                expected[0, 0] = 1
+                np.testing.assert_array_equal(error_map, expected)
+
+    def test_accumulator_and_merge(self):
+        """Итоги по набору совпадают с расчётом по склеенной нагрузке, merge эквивалентен add"""
+        pairs = []
+        for size, count in ((500, 10), (800, 0), (300, 40)):
+            original = self.rng.integers(0, 256, size, dtype=np.uint8)
+            pairs.append((original, self._corrupt(original, count)[0]))
+        total = BitErrorAccumulator(region_bits=512)
+        first, second = BitErrorAccumulator(region_bits=512), BitErrorAccumulator(region_bits=512)
+        for index, (original, extracted) in enumerate(pairs):
+            total.add(original, extracted)
+            (first if index < 2 else second).add(original, extracted)
+        result = total.result()
+        joined = bit_error_metrics(np.concatenate([p[0] for p in pairs]), np.concatenate([p[1] for p in pairs]))
+        for name in ("bits", "bit_errors", "ber", "bytes", "byte_errors", "byte_error_rate"):
+            self.assertEqual(result[name], joined[name])
+        self.assertEqual((result["items"], result["items_with_errors"]), (3, 2))
+        self.assertAlmostEqual(result["worst_ber"], 40 / 2400)
+        self.assertAlmostEqual(result["mean_ber"], (10 / 4000 + 40 / 2400) / 3)
+        self.assertEqual(result["regions"].sum(), 50)
+        merged = first.merge(second).result()
+        for name, value in result.items():
+            np.testing.assert_array_equal(merged[name], value)
+        with self.assertRaises(ValueError):
+            first.merge(BitErrorAccumulator())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+import numpy as np
+from watermark.embedding import embed
+from watermark.utils import modification_footprint
+from utils import footprint_metrics
+from utils.image_metrics import calculate_image_metrics
+from utils.ssim import ssim
+from utils.footprint_metrics import footprint_image_metrics
+
+
+class TestFootprintMetrics(unittest.TestCase):
+    """
+    Юнит-тесты для метрик по отпечатку изменений встраивания.
+    """
+
+    def setUp(self):
+        rng = np.random.default_rng(44)
+        yy, xx = np.mgrid[0:200, 0:300]
+        base = np.stack([xx * 0.5, yy * 0.7, (xx + yy) * 0.3], axis=-1) + rng.normal(0, 25, (200, 300, 3))
+        self.cover = np.clip(base + 20, 0, 255).astype(np.uint8)
+        self.secret = "Отпечаток изменений " * 12
+
+    def assertMetricsEqual(self, cover, stego, footprint, **options):
+        expected = calculate_image_metrics(cover, stego)
+        metrics = footprint_image_metrics(cover, footprint, **options)
+        for name in ('mse', 'mae', 'psnr', 'max_error', 'channels'):
+            self.assertEqual(metrics[name], expected[name])
+        self.assertAlmostEqual(metrics['ssim'], expected['ssim'], places=9)
+
+    def test_lsb_footprint_metrics(self):
+        """LSB: растровый, по ключу и матричный режимы; расчёт по полосе и по плиткам"""
+        cases = ({"depth": 1}, {"depth": 3}, {"depth": 1, "key": "секрет"}, {"matrix_k": 3})
+        for params in cases:
+            with self.subTest(params=params):
+                stego, info = embed(self.cover, self.secret, dict(params, return_info=True), method="lsb")
+                footprint = info["footprint"]
+                self.assertEqual(footprint["indices"].size, info["changes"] if "matrix_k" in params
+                                 else np.count_nonzero(stego != self.cover))
+                # Плотный расчёт по полосе и поэлементный по плиткам дают одно и то же
+                for density in (0, 10 ** 9):
+                    with self.subTest(band_density=density):
+                        old = footprint_metrics.BAND_DENSITY
+                        try:
+                            footprint_metrics.BAND_DENSITY = density
+                            self.assertMetricsEqual(self.cover, stego, footprint)
+                        finally:
+                            footprint_metrics.BAND_DENSITY = old
+
+    def test_dct_footprint_metrics(self):
+        """DCT: растровый и адаптивный режимы, текст и изображение"""
+        secret_img = np.random.default_rng(45).integers(0, 256, (12, 12), dtype=np.uint8)
+        cases = (
+            (self.secret[:40], {"strength": 12}),
+            (self.secret[:40], {"strength": 12, "adaptive": True, "min_activity": 100}),
+            (secret_img, {"strength": 15, "bits_per_block": 2}),
+        )
+        for secret, params in cases:
+            with self.subTest(params=params):
+                stego, info = embed(self.cover, secret, dict(params, return_info=True), method="dct")
+                changed = np.flatnonzero(stego.reshape(-1) != self.cover.reshape(-1))
+                np.testing.assert_array_equal(info["footprint"]["indices"], changed)
+                self.assertMetricsEqual(self.cover, stego, info["footprint"])
+
+    def test_footprint_ssim_windows_and_grayscale(self):
+        """Ч/б изображение, изменения у краёв, прямоугольное окно, пустой отпечаток"""
+        cover = self.cover[..., 1].copy()
+        stego = cover.copy()
+        stego[0, :5] ^= 1
+        stego[199, 299] ^= 4
+        stego[100, 64] ^= 2
+        footprint = modification_footprint(cover, stego, np.arange(cover.size)[::-1])
+        self.assertEqual(footprint["indices"].size, 7)
+        self.assertMetricsEqual(cover, stego, footprint)
+        box = footprint_image_metrics(cover, footprint, window="box")
+        self.assertAlmostEqual(box['ssim'], ssim(cover, stego, window="box"), places=9)
+        empty = footprint_image_metrics(cover, modification_footprint(cover, cover, slice(0, 100)))
+        self.assertEqual((empty['mse'], empty['ssim']), (0.0, 1.0))
+
+    def test_footprint_errors(self):
+        """Несовпадение формы и слишком большое окно"""
+        stego, info = embed(self.cover, "abc", {"depth": 1, "return_info": True}, method="lsb")
+        with self.assertRaises(ValueError):
+            footprint_image_metrics(self.cover[:100], info["footprint"])
+        with self.assertRaises(ValueError):
+            footprint_image_metrics(self.cover, info["footprint"], win_size=2 * footprint_metrics.TILE_SIZE + 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+import numpy as np
+from utils import image_metrics
+from utils.image_metrics import difference_stats, calculate_image_metrics, format_metrics
+
+
+def _reference(original, compared):
+    """Метрики по определению во float64 (как считались до объединённого ядра)."""
+    diff = original.astype(np.float64) - compared.astype(np.float64)
+    return np.mean(diff ** 2), np.mean(np.abs(diff)), np.abs(diff).max()
+
+
+class TestImageMetrics(unittest.TestCase):
+    """
+    Юнит-тесты для метрик качества изображений.
+    """
+
+    def setUp(self):
+        rng = np.random.default_rng(41)
+        self.original = rng.integers(0, 256, (97, 131, 3), dtype=np.uint8)
+        noise = rng.integers(-6, 7, self.original.shape)
+        self.compared = np.clip(self.original.astype(int) + noise, 0, 255).astype(np.uint8)
+
+    def test_difference_stats_matches_float_reference(self):
+        """Целочисленное ядро даёт те же MSE, MAE и максимум, что и float64"""
+        stats = difference_stats(self.original, self.compared)
+        mse, mae, max_error = _reference(self.original, self.compared)
+        self.assertAlmostEqual(stats['mse'], mse, places=10)
+        self.assertAlmostEqual(stats['mae'], mae, places=10)
+        self.assertEqual(stats['max_error'], max_error)
+        self.assertAlmostEqual(stats['psnr'], 20 * np.log10(255 / np.sqrt(mse)), places=10)
+
+    def test_difference_stats_per_channel(self):
+        """Статистика по каналам совпадает с расчётом по отдельным плоскостям"""
+        compared = self.compared.copy()
+        compared[..., 1] = self.original[..., 1]  # зелёный канал без изменений
+        stats = difference_stats(self.original, compared)
+        self.assertEqual(len(stats['channels']), 3)
+        for c, channel in enumerate(stats['channels']):
+            mse, mae, max_error = _reference(self.original[..., c], compared[..., c])
+            self.assertAlmostEqual(channel['mse'], mse, places=10)
+            self.assertAlmostEqual(channel['mae'], mae, places=10)
+            self.assertEqual(channel['max_error'], max_error)
+        self.assertEqual(stats['channels'][1]['psnr'], float('inf'))
+
+    def test_difference_stats_chunking_and_extremes(self):
+        """Результат не зависит от размера куска; разность 255 не переполняет uint16"""
+        original = np.zeros((64, 64), dtype=np.uint8)
+        compared = np.full((64, 64), 255, dtype=np.uint8)
+        compared[::2] = 0
+        expected = difference_stats(original, compared)
+        old = image_metrics.CHUNK_ELEMENTS
+        try:
+            image_metrics.CHUNK_ELEMENTS = 100  # кусок не делит изображение нацело
+            chunked = difference_stats(original, compared)
+        finally:
+            image_metrics.CHUNK_ELEMENTS = old
+        self.assertEqual(chunked, expected)
+        self.assertEqual(expected['mse'], 255 ** 2 / 2)
+        self.assertEqual(expected['max_error'], 255)
+        self.assertEqual(len(expected['channels']), 1)
+
+    def test_difference_stats_float_and_identical(self):
+        """Не-uint8 входы считаются во float64; одинаковые изображения — PSNR бесконечен"""
+        original = self.original.astype(np.float32) / 3
+        stats = difference_stats(original, self.compared.astype(np.float32) / 3)
+        mse, mae, _ = _reference(original, self.compared.astype(np.float32) / 3)
+        self.assertAlmostEqual(stats['mse'], mse, places=6)
+        self.assertAlmostEqual(stats['mae'], mae, places=6)
+        same = difference_stats(self.original, self.original)
+        self.assertEqual((same['mse'], same['max_error'], same['psnr']), (0.0, 0.0, float('inf')))
+        with self.assertRaises(ValueError):
+            difference_stats(self.original, self.original[:10])
+
+    def test_calculate_image_metrics_fields(self):
+        """calculate_image_metrics возвращает прежние ключи, максимум и каналы"""
+        metrics = calculate_image_metrics(self.original, self.compared)
+        for name in ('psnr', 'mse', 'mae', 'ssim', 'max_error', 'channels'):
+            self.assertIn(name, metrics)
+        self.assertIn("Max", format_metrics(metrics))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import csv
+import io
+import json
+import pickle
+import unittest
+import numpy as np
+from utils.quality_report import RunningStats, QuantileSketch, Histogram, QualityReport, params_label
+
+
+class TestQualityReport(unittest.TestCase):
+    """
+    Юнит-тесты для потокового сводного отчёта о качестве.
+    """
+
+    def setUp(self):
+        self.rng = np.random.default_rng(48)
+
+    def test_running_stats_and_merge(self):
+        """Уэлфорд и объединение по Чану совпадают с numpy"""
+        values = self.rng.normal(40, 5, 1000)
+        whole, left, right = RunningStats(), RunningStats(), RunningStats()
+        for index, value in enumerate(values):
+            whole.add(value)
+            (left if index < 300 else right).add(value)
+        merged = left.merge(right).merge(RunningStats())
+        for stats in (whole, merged):
+            self.assertEqual(stats.count, 1000)
+            self.assertAlmostEqual(stats.mean, values.mean(), places=10)
+            self.assertAlmostEqual(stats.variance, values.var(ddof=1), places=8)
+            self.assertEqual((stats.min, stats.max), (values.min(), values.max()))
+
+    def test_sketch_quantiles(self):
+        """Квантили с относительной погрешностью alpha, отрицательные и нулевые значения, слияние"""
+        values = np.concatenate([self.rng.lognormal(3, 1, 5000), -self.rng.lognormal(0, 1, 1000), np.zeros(200)])
+        sketch, left, right = QuantileSketch(0.01), QuantileSketch(0.01), QuantileSketch(0.01)
+        for index, value in enumerate(values):
+            sketch.add(value)
+            (left if index % 2 else right).add(value)
+        merged = left.merge(right)
+        ordered = np.sort(values)
+        for q in (0.0, 0.01, 0.1, 0.16, 0.5, 0.9, 0.99, 1.0):
+            expected = ordered[int(q * (values.size - 1))]
+            for candidate in (sketch, merged):
+                self.assertLessEqual(abs(candidate.quantile(q) - expected), 0.01 * abs(expected) + 1e-12)
+        self.assertIsNone(QuantileSketch().quantile(0.5))
+        # Ограничение числа корзин: верхние квантили не страдают
+        small = QuantileSketch(0.01, max_buckets=50)
+        for value in values[:5000]:
+            small.add(value)
+        self.assertLessEqual(len(small.positive), 50)
+        expected = np.sort(values[:5000])[int(0.99 * 4999)]
+        self.assertLessEqual(abs(small.quantile(0.99) - expected), 0.01 * expected)
+        with self.assertRaises(ValueError):
+            sketch.merge(QuantileSketch(0.02))
+
+    def test_histogram(self):
+        """Корзины, выходы за границы, объединение"""
+        histogram = Histogram(0.0, 1.0, 0.25)
+        for value in (-0.1, 0.0, 0.2, 0.25, 0.99, 1.0, 3.0):
+            histogram.add(value)
+        np.testing.assert_array_equal(histogram.counts, [2, 1, 0, 2])
+        self.assertEqual((histogram.underflow, histogram.overflow), (1, 1))
+        histogram.merge(Histogram(0.0, 1.0, 0.25))
+        with self.assertRaises(ValueError):
+            histogram.merge(Histogram(0.0, 1.0, 0.5))
+
+    def test_report_groups_merge_and_export(self):
+        """Группы по методу и параметрам, слияние через pickle, JSON и CSV"""
+        workers = [QualityReport(), QualityReport()]
+        psnr = []
+        for index in range(400):
+            value = float(self.rng.normal(45, 3))
+            psnr.append(value)
+            metrics = {"psnr": value, "ssim": float(self.rng.uniform(0.95, 1.0)), "capacity_use": 0.3,
+                       "channels": [1, 2], "name": "x", "exact": True}
+            workers[index % 2].add("lsb", {"depth": 1, "key": "секрет", "return_info": True}, metrics)
+            workers[index % 2].add("dct", {"strength": 5}, {"psnr": float("inf"), "ssim": 1.0})
+        report = QualityReport().merge(pickle.loads(pickle.dumps(workers[0]))).merge(workers[1])
+        data = json.loads(report.to_json())
+        self.assertEqual([(g["method"], g["params"]) for g in data["groups"]],
+                         [("dct", "strength=5"), ("lsb", "depth=1,key=*")])
+        lsb = data["groups"][1]["metrics"]
+        self.assertEqual(sorted(lsb), ["capacity_use", "psnr", "ssim"])
+        self.assertEqual(lsb["psnr"]["count"], 400)
+        self.assertAlmostEqual(lsb["psnr"]["mean"], np.mean(psnr), places=9)
+        self.assertAlmostEqual(lsb["psnr"]["std"], np.std(psnr, ddof=1), places=9)
+        self.assertAlmostEqual(lsb["psnr"]["p50"], np.median(psnr), delta=0.5)
+        self.assertEqual(sum(lsb["ssim"]["histogram"]["counts"]), 400)
+        dct = data["groups"][0]["metrics"]
+        self.assertEqual((dct["psnr"]["count"], dct["psnr"]["infinite"], dct["psnr"]["mean"]), (0, 400, None))
+        self.assertEqual(dct["ssim"]["histogram"]["counts"][-1], 400)
+        rows = list(csv.DictReader(io.StringIO(report.to_csv())))
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0]["method"], "dct")
+        self.assertEqual(rows[0]["mean"], "")
+        self.assertEqual(params_label(None), "")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import unittest
+import numpy as np
+import cv2
+from skimage.metrics import structural_similarity
+from utils import ssim as ssim_module
+from utils.ssim import ssim, ssim_map, ms_ssim, downsample_factor, MS_SSIM_WEIGHTS
+from utils.image_metrics import calculate_ssim
+
+
+def _pair(shape=(180, 240), seed=42, noise=8):
+    """Гладкая картинка с текстурой и её зашумлённая копия."""
+    rng = np.random.default_rng(seed)
+    yy, xx = np.mgrid[0:shape[0], 0:shape[1]]
+    base = np.stack([xx * 0.6, yy * 0.8, (xx + yy) * 0.4], axis=-1) + rng.normal(0, 20, shape + (3,))
+    original = np.clip(base, 0, 255).astype(np.uint8)
+    compared = np.clip(original + rng.normal(0, noise, original.shape), 0, 255).astype(np.uint8)
+    return original, compared
+
+
+def _float64_maps(x, y):
+    """Исходная реализация: float64 и cv2.GaussianBlur 11x11."""
+    blur = lambda v: cv2.GaussianBlur(v, (11, 11), 1.5)
+    mu1, mu2 = blur(x), blur(y)
+    sigma11 = blur(x * x) - mu1 ** 2
+    sigma22 = blur(y * y) - mu2 ** 2
+    sigma12 = blur(x * y) - mu1 * mu2
+    c1, c2 = (0.01 * 255) ** 2, (0.03 * 255) ** 2
+    luminance = (2 * mu1 * mu2 + c1) / (mu1 ** 2 + mu2 ** 2 + c1)
+    return luminance, (2 * sigma12 + c2) / (sigma11 + sigma22 + c2)
+
+
+def _gray64(image):
+    return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY).astype(np.float64)
+
+
+class TestSSIM(unittest.TestCase):
+    """
+    Юнит-тесты для быстрого SSIM и MS-SSIM.
+    """
+
+    def setUp(self):
+        self.original, self.compared = _pair()
+
+    def test_ssim_matches_float64_reference(self):
+        """float32 и раздельные проходы дают значение прежней реализации"""
+        luminance, cs = _float64_maps(_gray64(self.original), _gray64(self.compared))
+        expected = float((luminance * cs).mean())
+        self.assertAlmostEqual(ssim(self.original, self.compared), expected, places=5)
+        self.assertAlmostEqual(calculate_ssim(self.original, self.compared), expected, places=5)
+        self.assertAlmostEqual(ssim(self.original, self.original), 1.0, places=6)
+
+    def test_ssim_map_matches_skimage(self):
+        """Внутри изображения карты совпадают со skimage (гауссово и прямоугольное окно)"""
+        x, y = _gray64(self.original), _gray64(self.compared)
+        cases = (("gaussian", 5, dict(gaussian_weights=True, sigma=1.5)),
+                 ("box", 3, dict(win_size=7)))
+        for window, border, options in cases:
+            with self.subTest(window=window):
+                _, expected = structural_similarity(x, y, data_range=255, use_sample_covariance=False,
+                                                    full=True, **options)
+                result = ssim_map(self.original, self.compared, window=window)
+                self.assertEqual(result.dtype, np.float32)
+                inner = (slice(border, -border),) * 2
+                np.testing.assert_allclose(result[inner], expected[inner], atol=1e-4)
+
+    def test_box_window_sizes(self):
+        """Прямоугольное окно через интегральное изображение совпадает с cv2.boxFilter"""
+        x = _gray64(self.original).astype(np.float32)
+        old = ssim_module.BOX_CHUNK_ROWS
+        try:
+            ssim_module.BOX_CHUNK_ROWS = 17  # полосы не делят высоту нацело
+            for size in (3, 7, 15):
+                result = ssim_module._box_sum(x, size, np.empty_like(x))
+                expected = cv2.boxFilter(x, cv2.CV_32F, (size, size), borderType=cv2.BORDER_REFLECT_101)
+                np.testing.assert_allclose(result, expected, atol=1e-3)
+        finally:
+            ssim_module.BOX_CHUNK_ROWS = old
+        with self.assertRaises(ValueError):
+            ssim(self.original, self.compared, window="box", win_size=8)
+        with self.assertRaises(ValueError):
+            ssim(self.original, self.compared, window="median")
+
+    def test_downsample_mode(self):
+        """Режим downsample: f = round(min(H, W) / 256) и SSIM по усреднённым блокам"""
+        self.assertEqual(downsample_factor((180, 240)), 1)
+        self.assertEqual(downsample_factor((1080, 1920, 3)), 4)
+        original, compared = _pair((520, 600), noise=20)
+        small = lambda img: cv2.resize(img, (300, 260), interpolation=cv2.INTER_AREA)
+        luminance, cs = _float64_maps(small(_gray64(original)), small(_gray64(compared)))
+        self.assertAlmostEqual(ssim(original, compared, downsample=True), float((luminance * cs).mean()), places=4)
+        # Уменьшение усредняет шум, поэтому оценка выше, чем на полном разрешении
+        self.assertGreater(ssim(original, compared, downsample=True), ssim(original, compared))
+
+    def test_ms_ssim(self):
+        """MS-SSIM совпадает с расчётом по определению во float64"""
+        original, compared = _pair((256, 320), noise=12)
+        x, y = _gray64(original), _gray64(compared)
+        expected = 1.0
+        for level, weight in enumerate(MS_SSIM_WEIGHTS):
+            luminance, cs = _float64_maps(x, y)
+            if level == len(MS_SSIM_WEIGHTS) - 1:
+                expected *= max((luminance * cs).mean(), 0) ** weight
+            else:
+                expected *= max(cs.mean(), 0) ** weight
+                size = (x.shape[1] // 2, x.shape[0] // 2)
+                x = cv2.resize(x, size, interpolation=cv2.INTER_AREA)
+                y = cv2.resize(y, size, interpolation=cv2.INTER_AREA)
+        self.assertAlmostEqual(ms_ssim(original, compared), expected, places=4)
+        self.assertAlmostEqual(ms_ssim(original, original), 1.0, places=5)
+        with self.assertRaises(ValueError):
+            ms_ssim(original[:150], compared[:150])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import random
+import time
+import unittest
+from utils.text_diff import bounded_diff, diff_opcodes, diff_ratio, opcodes_cost, forward_match, backward_match
+from utils.text_metrics import calculate_similarity_ratio, get_inline_diff
+
+
+def _lcs_length(first, second):
+    """Длина наибольшей общей подпоследовательности динамическим программированием."""
+    previous = [0] * (len(second) + 1)
+    for a in first:
+        current = [0]
+        for j, b in enumerate(second):
+            current.append(previous[j] + 1 if a == b else max(previous[j + 1], current[j]))
+        previous = current
+    return previous[-1]
+
+
+class TestTextDiff(unittest.TestCase):
+    """
+    Юнит-тесты для посимвольного diff Майерса.
+    """
+
+    def setUp(self):
+        self.rng = random.Random(47)
+
+    def assertValidScript(self, first, second, opcodes):
+        """Сценарий покрывает обе последовательности подряд, 'equal' действительно совпадает."""
+        i = j = 0
+        for tag, i1, i2, j1, j2 in opcodes:
+            self.assertEqual((i1, j1), (i, j))
+            if tag == 'equal':
+                self.assertEqual(first[i1:i2], second[j1:j2])
+            i, j = i2, j2
+        self.assertEqual((i, j), (len(first), len(second)))
+
+    def test_minimal_script(self):
+        """Совпадений столько же, сколько в НОП; строки, списки и пустые входы"""
+        for _ in range(300):
+            alphabet = self.rng.choice(("ab", "abc d", "абв😀"))
+            first = "".join(self.rng.choice(alphabet) for _ in range(self.rng.randint(0, 40)))
+            second = "".join(self.rng.choice(alphabet) for _ in range(self.rng.randint(0, 40)))
+            opcodes = diff_opcodes(first, second, max_edits=100)
+            self.assertValidScript(first, second, opcodes)
+            matched = sum(i2 - i1 for tag, i1, i2, _, _ in opcodes if tag == 'equal')
+            self.assertEqual(matched, _lcs_length(first, second), (first, second))
+        lines = ["a\n", "b\n", "c\n", "d\n"]
+        self.assertEqual(diff_opcodes(lines, ["a\n", "x\n", "c\n", "d\n"]),
+                         [('equal', 0, 1, 0, 1), ('replace', 1, 2, 1, 2), ('equal', 2, 4, 2, 4)])
+        self.assertEqual(diff_opcodes("", "abc"), [('insert', 0, 0, 0, 3)])
+        self.assertEqual(diff_ratio("", ""), 1.0)
+        self.assertEqual(forward_match("abcdef", "abcxef", 0, 0, 6), 3)
+        self.assertEqual(backward_match("abcdef", "abcxef", 6, 6, 6), 2)
+        with self.assertRaises(ValueError):
+            diff_opcodes("a", "b", max_edits=0)
+
+    def test_edit_cap(self):
+        """С малым max_edits сценарий остаётся корректным и почти минимальным"""
+        for _ in range(100):
+            first = "".join(self.rng.choice("abcd") for _ in range(self.rng.randint(0, 60)))
+            second = "".join(self.rng.choice("abcd") for _ in range(self.rng.randint(0, 60)))
+            self.assertValidScript(first, second, diff_opcodes(first, second, max_edits=2))
+        alphabet = "абвгдежзийклмнопрстуфхцчшщыьэюя ,."
+        first = "".join(self.rng.choice(alphabet) for _ in range(20000))
+        chars = list(first)
+        for position in self.rng.sample(range(len(chars)), 400):
+            chars[position] = "#"
+        second = "".join(chars)
+        opcodes = diff_opcodes(first, second, max_edits=16)
+        self.assertValidScript(first, second, opcodes)
+        matched = sum(i2 - i1 for tag, i1, i2, _, _ in opcodes if tag == 'equal')
+        self.assertGreaterEqual(matched, len(first) - 420)
+
+    def test_total_edit_budget(self):
+        """Общий бюджет: непохожие строки — быстро и с заменой в хвосте, похожие — полностью"""
+        alphabet = "абвгдежзийклмнопрстуфхцчшщыьэюя ,."
+        first = "".join(self.rng.choice(alphabet) for _ in range(1000000))
+        garbage = "".join(self.rng.choice(alphabet) for _ in range(1000000))
+        start = time.perf_counter()
+        opcodes, complete = bounded_diff(first, garbage)
+        self.assertLess(time.perf_counter() - start, 2.0)
+        self.assertFalse(complete)
+        self.assertValidScript(first, garbage, opcodes)
+        self.assertEqual(opcodes[-1][0], 'replace')
+        chars = list(first[:20000])
+        for position in self.rng.sample(range(len(chars)), 400):
+            chars[position] = "#"
+        second = "".join(chars)
+        opcodes, complete = bounded_diff(first[:20000], second)
+        self.assertTrue(complete)
+        self.assertLessEqual(opcodes_cost(opcodes), 420)
+        opcodes, complete = bounded_diff(first[:20000], second, max_total_edits=100)
+        self.assertFalse(complete)
+        self.assertValidScript(first[:20000], second, opcodes)
+        with self.assertRaises(ValueError):
+            diff_opcodes("a", "b", max_total_edits=0)
+
+    def test_similarity_and_inline_diff_on_long_line(self):
+        """Метрики и посимвольный diff на длинной строке без переводов строк"""
+        alphabet = "абвгдежзийклмнопрстуфхцчшщыьэюя ,."
+        original = "".join(self.rng.choice(alphabet) for _ in range(300000))
+        chars = list(original)
+        for position in self.rng.sample(range(len(chars)), 30):
+            chars[position] = "#"
+        del chars[1000:1010]
+        compared = "".join(chars)
+        start = time.perf_counter()
+        ratio = calculate_similarity_ratio(original, compared)
+        inline = get_inline_diff(original, compared)
+        self.assertLess(time.perf_counter() - start, 5.0)
+        self.assertAlmostEqual(ratio, 2 * (len(original) - 40) / (len(original) + len(compared)), delta=1e-5)
+        self.assertEqual("".join(text for tag, text in inline if tag != 'insert'), original)
+        self.assertEqual("".join(text for tag, text in inline if tag != 'delete'), compared)
+        self.assertEqual(calculate_similarity_ratio("abcd", "abcd"), 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+import random
+import unittest
+from unittest import mock
+from utils import levenshtein
+from utils.levenshtein import levenshtein_distance
+from utils import text_metrics
+from utils.text_metrics import calculate_text_metrics, calculate_levenshtein_distance, format_metrics
+from utils.text_diff import diff_opcodes, opcodes_cost
+
+
+def _reference(first, second):
+    """Классическое динамическое программирование по строкам."""
+    previous = list(range(len(second) + 1))
+    for i, a in enumerate(first, 1):
+        current = [i] + [0] * len(second)
+        for j, b in enumerate(second, 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (a != b))
+        previous = current
+    return previous[-1]
+
+
+def _mutate(rng, text, alphabet, edits):
+    """Случайные замены, вставки и удаления."""
+    chars = list(text)
+    for _ in range(edits):
+        position = rng.randint(0, len(chars))
+        operation = rng.random()
+        if operation < 0.4 and position < len(chars):
+            chars[position] = rng.choice(alphabet)
+        elif operation < 0.7:
+            chars.insert(position, rng.choice(alphabet))
+        elif position < len(chars):
+            del chars[position]
+    return "".join(chars)
+
+
+class TestTextMetrics(unittest.TestCase):
+    """
+    Юнит-тесты для расстояния Левенштейна и метрик текста.
+    """
+
+    def setUp(self):
+        self.rng = random.Random(45)
+
+    def _pairs(self, count, max_length=120):
+        for trial in range(count):
+            alphabet = "ab" if trial % 3 == 0 else "абвгд ёz😀"
+            first = "".join(self.rng.choice(alphabet) for _ in range(self.rng.randint(0, max_length)))
+            if trial % 4 == 0:
+                second = "".join(self.rng.choice(alphabet) for _ in range(self.rng.randint(0, max_length)))
+            else:
+                second = _mutate(self.rng, first, alphabet, self.rng.randint(0, 25))
+            yield first, second
+
+    def test_matches_dynamic_programming(self):
+        """Бит-параллельный алгоритм совпадает с классическим ДП"""
+        for first, second in self._pairs(250):
+            self.assertEqual(levenshtein_distance(first, second), _reference(first, second), (first, second))
+
+    def test_banded_cutoff(self):
+        """С порогом k: точное расстояние до k, иначе k + 1"""
+        for first, second in self._pairs(200):
+            expected = _reference(first, second)
+            for max_distance in (0, 1, 5, 17, 64, 200):
+                self.assertEqual(levenshtein_distance(first, second, max_distance), min(expected, max_distance + 1))
+        with self.assertRaises(ValueError):
+            levenshtein_distance("a", "b", -1)
+
+    def test_growing_band_and_multiple_blocks(self):
+        """Поиск без порога растущей полосой и блоки при длинных строках"""
+        with mock.patch.object(levenshtein, "INITIAL_BAND", 1), mock.patch.object(levenshtein, "MIN_BLOCK_BITS", 8), \
+                mock.patch.object(levenshtein, "DIAGONAL_LIMIT", 0):
+            for first, second in self._pairs(60, max_length=200):
+                self.assertEqual(levenshtein_distance(first, second), _reference(first, second))
+        first = "".join(self.rng.choice("abcdef") for _ in range(3000))
+        second = _mutate(self.rng, first, "xyz", 40)
+        expected = _reference(first[:600], second[:600])  # короткий префикс для сверки с ДП
+        self.assertEqual(levenshtein_distance(first[:600], second[:600], 50), min(expected, 51))
+        self.assertLessEqual(levenshtein_distance(first, second), 40)
+        # Непохожие строки и исчерпанный запас работы — сразу полный вектор
+        other = "".join(self.rng.choice("xyz") for _ in range(3000))
+        with mock.patch.object(levenshtein, "_banded_distance", wraps=levenshtein._banded_distance) as spy:
+            self.assertEqual(levenshtein_distance(first, other), 3000)
+            with mock.patch.object(levenshtein, "BAND_WORK_LIMIT", 0):
+                self.assertEqual(levenshtein_distance(first[:600], second[:600]), expected)
+        self.assertEqual(spy.call_count, 0)
+
+    def test_diagonal_search(self):
+        """Поиск по диагоналям совпадает с ДП и находит малое расстояние на длинном тексте"""
+        for first, second in self._pairs(150):
+            expected = _reference(first, second)
+            for max_distance in (0, 3, 30):
+                self.assertEqual(levenshtein._diagonal_distance(first, second, max_distance),
+                                 min(expected, max_distance + 1))
+        first = "".join(self.rng.choice("абвгдежз ,.") for _ in range(50000))
+        second = _mutate(self.rng, first, "xyz", 60)
+        distance = levenshtein_distance(first, second)
+        self.assertLessEqual(distance, 60)
+        with mock.patch.object(levenshtein, "DIAGONAL_LIMIT", 0):
+            self.assertEqual(levenshtein_distance(first, second, 200), distance)
+
+    def test_distance_bounds(self):
+        """Оценка по триграммам не больше расстояния, стоимость сценария diff — не меньше"""
+        for first, second in self._pairs(200):
+            expected = _reference(first, second)
+            self.assertLessEqual(levenshtein._qgram_bound(first, second), expected)
+            self.assertGreaterEqual(opcodes_cost(diff_opcodes(first, second)), expected)
+        # Оценка больше предела: поиск по диагоналям не запускается
+        first = "".join(self.rng.choice("абвгдежз ,.") for _ in range(50000))
+        second = "".join(char if index % 50 else "#" for index, char in enumerate(first))
+        with mock.patch.object(levenshtein, "_diagonal_distance", wraps=levenshtein._diagonal_distance) as spy:
+            self.assertEqual(levenshtein_distance(first, second, 1200), 1000)
+            self.assertEqual(levenshtein_distance(first, second, 900), 901)
+        self.assertEqual(spy.call_count, 0)
+
+    def test_text_metrics_share_one_distance(self):
+        """calculate_text_metrics считает расстояние один раз"""
+        original, compared = "Секретное сообщение", "Секретнoе сообщенне!"
+        with mock.patch.object(text_metrics, "levenshtein_distance", wraps=levenshtein_distance) as spy:
+            metrics = calculate_text_metrics(original, compared)
+        self.assertEqual(spy.call_count, 1)
+        self.assertEqual(metrics['levenshtein_distance'], 3)
+        self.assertAlmostEqual(metrics['character_error_rate'], 3 / len(original) * 100)
+        self.assertAlmostEqual(metrics['accuracy'], (1 - 3 / len(original)) * 100)
+        self.assertEqual(calculate_text_metrics("", "")['accuracy'], 100.0)
+        self.assertEqual(calculate_text_metrics("", "abc")['character_error_rate'], 100.0)
+        self.assertEqual(calculate_levenshtein_distance("kitten", "sitting", max_distance=2), 3)
+
+    def test_text_metrics_bound_for_garbage(self):
+        """Мусор при неверном ключе: точное расстояние не считается, дана верхняя оценка"""
+        alphabet = "абвгдежзийклмнопрстуфхцчшщыьэюя ,."
+        original = "".join(self.rng.choice(alphabet) for _ in range(20000))
+        garbage = "".join(self.rng.choice(alphabet) for _ in range(20000))
+        with mock.patch.object(text_metrics, "levenshtein_distance", wraps=levenshtein_distance) as spy:
+            metrics = calculate_text_metrics(original, garbage)
+        self.assertEqual(spy.call_count, 0)
+        self.assertFalse(metrics['levenshtein_exact'])
+        self.assertGreaterEqual(metrics['levenshtein_distance'], levenshtein_distance(original, garbage))
+        self.assertIn("≤", format_metrics(metrics))
+        self.assertTrue(calculate_text_metrics(original, original[:-1])['levenshtein_exact'])
+
+
+if __name__ == '__main__':
+    unittest.main()
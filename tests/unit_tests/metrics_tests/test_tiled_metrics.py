@@ -0,0 +1,74 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from utils.image_metrics import calculate_image_metrics, compare_images
+from utils.ssim import ssim
+from utils.tiled_metrics import tiled_image_metrics, streaming_image_metrics, iter_tiles
+
+
+def _pair(shape, seed=43):
+    rng = np.random.default_rng(seed)
+    original = rng.integers(0, 256, shape, dtype=np.uint8)
+    noise = rng.integers(-30, 31, shape)
+    return original, np.clip(original.astype(int) + noise, 0, 255).astype(np.uint8)
+
+
+class TestTiledMetrics(unittest.TestCase):
+    """
+    Юнит-тесты для потоковых метрик по полосам.
+    """
+
+    def setUp(self):
+        self.original, self.compared = _pair((150, 70, 3))
+        self.expected = calculate_image_metrics(self.original, self.compared)
+
+    def test_tiled_matches_in_memory(self):
+        """Результат не зависит от высоты полосы, в том числе меньше радиуса окна"""
+        for tile_rows in (1, 3, 16, 64, 150, 1000):
+            with self.subTest(tile_rows=tile_rows):
+                metrics = tiled_image_metrics(self.original, self.compared, tile_rows=tile_rows)
+                for name in ('mse', 'mae', 'psnr', 'max_error', 'channels'):
+                    self.assertEqual(metrics[name], self.expected[name])
+                self.assertAlmostEqual(metrics['ssim'], self.expected['ssim'], places=10)
+
+    def test_memmap_input_and_diff_output(self):
+        """np.memmap на входе, разностное изображение пишется в memmap как у compare_images"""
+        with tempfile.TemporaryDirectory() as directory:
+            paths = [os.path.join(directory, name) for name in ("a.npy", "b.npy", "diff.npy")]
+            arrays = [np.lib.format.open_memmap(path, mode="w+", dtype=np.uint8, shape=self.original.shape)
+                      for path in paths]
+            arrays[0][:], arrays[1][:] = self.original, self.compared
+            metrics = tiled_image_metrics(arrays[0], arrays[1], tile_rows=32, diff_out=arrays[2])
+            expected_diff, _ = compare_images(self.original, self.compared)
+            np.testing.assert_array_equal(arrays[2], expected_diff)
+            self.assertEqual(metrics['mse'], self.expected['mse'])
+            del arrays
+
+    def test_streaming_uneven_tiles_grayscale_and_box(self):
+        """Полосы разной высоты, ч/б изображение, прямоугольное окно"""
+        original, compared = _pair((97, 53), seed=44)
+        cuts = [0, 2, 9, 40, 41, 97]
+        tiles = lambda image: (image[a:b] for a, b in zip(cuts, cuts[1:]))
+        for window in ("gaussian", "box"):
+            with self.subTest(window=window):
+                metrics = streaming_image_metrics(tiles(original), tiles(compared), window=window)
+                self.assertAlmostEqual(metrics['ssim'], ssim(original, compared, window=window), places=6)
+                self.assertEqual(metrics['mae'], calculate_image_metrics(original, compared)['mae'])
+        metrics = streaming_image_metrics(tiles(original), tiles(compared), with_ssim=False)
+        self.assertNotIn('ssim', metrics)
+
+    def test_streaming_errors(self):
+        """Несовпадение полос и размеров"""
+        with self.assertRaises(ValueError):
+            tiled_image_metrics(self.original, self.compared[:100])
+        with self.assertRaises(ValueError):
+            streaming_image_metrics(iter_tiles(self.original, 10), iter_tiles(self.compared, 20))
+        with self.assertRaises(ValueError):
+            streaming_image_metrics(iter_tiles(self.original, 10), iter_tiles(self.compared[:140], 10))
+        with self.assertRaises(ValueError):
+            streaming_image_metrics(iter([]), iter([]))
+
+
+if __name__ == '__main__':
+    unittest.main()
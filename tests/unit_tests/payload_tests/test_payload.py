@@ -0,0 +1,157 @@
+import unittest
+import struct
+import numpy as np
+from watermark.payload import (pack_payload, unpack_payload, choose_codec, HEADER_SIZE, HEADER_FORMAT, CODECS,
+                               encode_image, decode_image)
+from watermark.embedding import embed
+from watermark.extraction import extract
+
+
+def _chunked(data, size):
+    """Имитирует потоковое чтение из контейнера."""
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+class TestPayloadCodec(unittest.TestCase):
+    """
+    Юнит-тесты для слоя сжатия полезной нагрузки.
+    """
+
+    def test_roundtrip_all_codecs(self):
+        """Каждый кодек восстанавливает данные при чтении мелкими кусками"""
+        data = ("Повторяющийся текст водяного знака. " * 200).encode("utf-8")
+        for codec in CODECS:
+            with self.subTest(codec=codec):
+                packed = pack_payload(data, codec)
+                self.assertEqual(data, unpack_payload(_chunked(packed, 7)))
+
+    def test_auto_compresses_redundant_text(self):
+        """Избыточный текст сжимается и занимает меньше места"""
+        data = ("abc" * 5000).encode("utf-8")
+        self.assertNotEqual(choose_codec(data), "none")
+        self.assertLess(len(pack_payload(data, "auto")), len(data) // 10)
+
+    def test_auto_keeps_random_data_raw(self):
+        """Несжимаемые данные пишутся как есть, с заголовком"""
+        data = np.random.randint(0, 256, 2000, dtype=np.uint8).tobytes()
+        packed = pack_payload(data, "auto")
+        self.assertEqual(packed[0], CODECS["none"])
+        self.assertEqual(len(packed), len(data) + HEADER_SIZE)
+
+    def test_stream_stops_after_body(self):
+        """Распаковщик не читает поток дальше конца тела"""
+        packed = pack_payload(b"short secret", "zlib")
+        def endless():
+            yield packed
+            while True:
+                yield b"\x00" * 16
+        self.assertEqual(b"short secret", unpack_payload(endless()))
+
+    def test_truncated_stream_raises(self):
+        """Обрезанный поток — ошибка, а не мусор"""
+        packed = pack_payload(b"x" * 1000, "none")
+        with self.assertRaises(ValueError):
+            unpack_payload(_chunked(packed[:100], 10))
+
+    def test_corrupted_body_raises_value_error(self):
+        """Испорченное или обрезанное сжатое тело — ValueError, а не исключение распаковщика"""
+        data = ("Повторяющийся текст водяного знака. " * 200).encode("utf-8")
+        rng = np.random.default_rng(26)
+        for codec in ("zlib", "bz2", "lzma"):
+            packed = pack_payload(data, codec)
+            for position in rng.integers(HEADER_SIZE, len(packed), 16):
+                corrupted = bytearray(packed)
+                corrupted[position] ^= 0xFF
+                with self.subTest(codec=codec, position=int(position)):
+                    # Порча может пройти незамеченной, но наружу выходит только ValueError
+                    try:
+                        unpack_payload(_chunked(bytes(corrupted), 7))
+                    except ValueError:
+                        pass
+            with self.subTest(codec=codec):
+                # Первый байт тела — заголовок сжатого потока, его порча всегда заметна
+                corrupted = bytearray(packed)
+                corrupted[HEADER_SIZE] ^= 0xFF
+                with self.assertRaises(ValueError):
+                    unpack_payload(_chunked(bytes(corrupted), 7))
+                # Заголовок согласован с обрезанным телом: поток сжатия не завершён
+                body = packed[HEADER_SIZE:-8]
+                truncated = struct.pack(HEADER_FORMAT, CODECS[codec], len(body)) + body
+                with self.assertRaises(ValueError):
+                    unpack_payload(_chunked(truncated, 7))
+
+    def test_lsb_text_with_codec(self):
+        """LSB: сжатый текст извлекается без указания длины"""
+        cover = np.random.randint(0, 256, (64, 64, 3), dtype=np.uint8)
+        secret = "Сжимаемый секрет LSB. " * 100
+        stego = embed(cover, secret, {"depth": 1, "codec": "auto"}, method="lsb")
+        recovered = extract(stego, {"depth": 1, "codec": "auto"}, method="lsb")
+        self.assertEqual(secret, recovered)
+
+    def test_dct_text_with_codec_fits_larger_secret(self):
+        """DCT: текст, не помещающийся как есть, помещается после сжатия"""
+        cover = np.random.randint(50, 200, (256, 256, 3), dtype=np.uint8)
+        secret = "DCT payload " * 60  # 720 байт > 128 байт ёмкости
+        params = {"strength": 15, "block_size": 8}
+        with self.assertRaises(ValueError):
+            embed(cover, secret, params, method="dct")
+        params["codec"] = "auto"
+        stego = embed(cover, secret, params, method="dct")
+        self.assertEqual(secret, extract(stego, params, method="dct"))
+
+
+def _logo(h=256, w=256):
+    """Гладкое секретное изображение, похожее на логотип."""
+    yy, xx = np.mgrid[0:h, 0:w]
+    logo = np.zeros((h, w, 3), dtype=np.uint8)
+    logo[..., 0] = (xx * 255 // max(w - 1, 1)).astype(np.uint8)
+    logo[..., 1] = (yy * 255 // max(h - 1, 1)).astype(np.uint8)
+    logo[(yy - h // 2) ** 2 + (xx - w // 2) ** 2 < (h // 4) ** 2] = (255, 255, 255)
+    return logo
+
+
+class TestImageCodec(unittest.TestCase):
+    """
+    Юнит-тесты для встраивания изображений в виде закодированного потока.
+    """
+
+    def test_lossless_codecs_roundtrip(self):
+        """PNG и WebP без потерь восстанавливают пиксели точно"""
+        logo = _logo(64, 96)
+        for codec in ("png", "webp"):
+            with self.subTest(codec=codec):
+                encoded = encode_image(logo, codec)
+                np.testing.assert_array_equal(logo, decode_image(encoded))
+                self.assertLess(len(encoded) * 10, logo.size)
+
+    def test_lossy_codec_fits_max_size(self):
+        """Кодек с потерями понижает качество, чтобы уложиться в лимит"""
+        logo = _logo()
+        noisy = np.clip(logo.astype(int) + np.random.randint(-20, 20, logo.shape), 0, 255).astype(np.uint8)
+        full = encode_image(noisy, "jpeg", quality=95)
+        limited = encode_image(noisy, "jpeg", quality=95, max_size=len(full) // 2)
+        self.assertLessEqual(len(limited), len(full) // 2)
+        with self.assertRaises(ValueError):
+            encode_image(noisy, "png", max_size=100)
+
+    def test_lsb_image_codec(self):
+        """LSB: закодированный секрет извлекается без secret_shape"""
+        cover = np.random.randint(0, 256, (128, 128, 3), dtype=np.uint8)
+        logo = _logo()  # 1.5 Мбит сырыми пикселями не помещается в 393 Кбит
+        params = {"depth": 1, "image_codec": "png"}
+        stego = embed(cover, logo, params, method="lsb")
+        np.testing.assert_array_equal(logo, extract(stego, params, method="lsb"))
+
+    def test_dct_image_codec_without_downscale(self):
+        """DCT: секрет встраивается целиком, без автоматического масштабирования"""
+        cover = np.random.randint(50, 200, (512, 512), dtype=np.uint8)
+        logo = _logo(32, 32)
+        params = {"strength": 15, "block_size": 8, "image_codec": "webp"}
+        stego = embed(cover, logo, params, method="dct")
+        recovered = extract(stego, params, method="dct")
+        np.testing.assert_array_equal(logo, recovered)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,3 @@
+from .test_robustness import TestRobustness
+
+__all__ = ['TestRobustness']
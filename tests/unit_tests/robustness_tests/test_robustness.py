@@ -0,0 +1,115 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+from utils import robustness
+from utils.robustness import DEFAULT_GRID, attack_image, attack_label, run_robustness
+
+
+class TestRobustness(unittest.TestCase):
+    """
+    Юнит-тесты для сетки атак и проверки устойчивости.
+    """
+
+    def setUp(self):
+        rng = np.random.default_rng(49)
+        yy, xx = np.mgrid[0:128, 0:128]
+        base = np.stack([xx, yy, (xx + yy) / 2], axis=-1) + rng.normal(0, 20, (128, 128, 3))
+        self.covers = [np.clip(base + shift, 0, 255).astype(np.uint8) for shift in (0, 40)]
+        self.secret = rng.integers(0, 256, (8, 8), dtype=np.uint8)
+        self.grid = (("none", {}), ("jpeg", {"quality": 50}), ("noise", {"sigma": 2.0}))
+
+    def _groups(self, report):
+        return {(group["method"], group["params"]): group["metrics"] for group in report.to_dict()["groups"]}
+
+    def test_attacks(self):
+        """Атаки сохраняют форму и тип, воспроизводимы, обрезка обнуляет края"""
+        image = self.covers[0]
+        for name, params in DEFAULT_GRID:
+            with self.subTest(attack=attack_label(name, params)):
+                attacked = attack_image(image, name, params)
+                self.assertEqual((attacked.shape, attacked.dtype), (image.shape, np.uint8))
+                np.testing.assert_array_equal(attacked, attack_image(image, name, params))
+        gray = image[..., 0]
+        self.assertEqual(attack_image(gray, "jpeg", {"quality": 50}).shape, gray.shape)
+        self.assertEqual(attack_image(gray, "scale", {"factor": 0.5}).shape, gray.shape)
+        cropped = attack_image(image, "crop", {"fraction": 0.1})
+        self.assertFalse(cropped[:12].any())
+        np.testing.assert_array_equal(cropped[12:116, 12:116], image[12:116, 12:116])
+        self.assertEqual(attack_label("jpeg", {"quality": 50}), "jpeg(quality=50)")
+        with self.assertRaises(ValueError):
+            attack_image(image, "rotate")
+
+    def test_noise_differs_per_image(self):
+        """Шум выводится из хеша стего: у контейнеров одной формы он разный и воспроизводимый"""
+        seeds = []
+        for _ in range(2):
+            with mock.patch.object(robustness, "attack_image", wraps=robustness.attack_image) as spy:
+                run_robustness(self.covers, self.secret, [("dwt", {})], self.grid[2:])
+            seeds.append([call.args[2]["seed"] for call in spy.call_args_list])
+        self.assertEqual(len(set(seeds[0])), 2)
+        self.assertEqual(seeds[0], seeds[1])
+
+    def test_report_per_method_and_attack(self):
+        """Без атаки BER нулевой; LSB разрушается шумом; группы по методу, параметрам и атаке"""
+        configs = [("lsb", {"depth": 1, "key": "секрет"}), ("dwt", {})]
+        groups = self._groups(run_robustness(self.covers, self.secret, configs, self.grid))
+        self.assertEqual(len(groups), 6)
+        for method, label in (("lsb", "attack=none,depth=1,key=*"), ("dwt", "attack=none")):
+            metrics = groups[(method, label)]
+            self.assertEqual(metrics["ber"]["count"], 2)
+            self.assertEqual(metrics["ber"]["max"], 0.0)
+            self.assertEqual(metrics["attack_psnr"]["infinite"], 2)
+        noisy = groups[("lsb", "attack=noise(sigma=2.0),depth=1,key=*")]
+        self.assertGreater(noisy["ber"]["mean"], 0.3)
+        self.assertEqual(noisy["failed"]["mean"], 0.0)
+        # Текстовый секрет: длина в байтах подставляется автоматически
+        groups = self._groups(run_robustness(self.covers[:1], "Проверка", [("lsb", {"depth": 1})], self.grid[:1]))
+        self.assertEqual(groups[("lsb", "attack=none,depth=1")]["ber"]["max"], 0.0)
+
+    def test_cache_makes_reruns_incremental(self):
+        """Повторный запуск берёт результаты из кэша, новая атака — только её расчёт"""
+        configs = [("lsb", {"depth": 1})]
+        with tempfile.TemporaryDirectory() as cache_dir:
+            first = run_robustness(self.covers, self.secret, configs, self.grid[:2], cache_dir=cache_dir)
+            self.assertEqual(len(os.listdir(os.path.join(cache_dir, "attacked"))), 4)
+            with mock.patch.object(robustness, "embed", wraps=robustness.embed) as embed_spy, \
+                    mock.patch.object(robustness, "extract", wraps=robustness.extract) as extract_spy:
+                second = run_robustness(self.covers, self.secret, configs, self.grid[:2], cache_dir=cache_dir)
+                self.assertEqual((embed_spy.call_count, extract_spy.call_count), (0, 0))
+                run_robustness(self.covers, self.secret, configs, self.grid, cache_dir=cache_dir)
+                self.assertEqual((embed_spy.call_count, extract_spy.call_count), (2, 2))
+            self.assertEqual(first.to_json(), second.to_json())
+            self.assertEqual(len(os.listdir(os.path.join(cache_dir, "results"))), 6)
+
+    def test_cache_distinguishes_lsb_key(self):
+        """Конфигурации, различающиеся только ключом LSB, не делят записи кэша"""
+        with tempfile.TemporaryDirectory() as cache_dir:
+            run_robustness(self.covers, self.secret, [("lsb", {"depth": 1, "key": "первый"})], self.grid[:1],
+                           cache_dir=cache_dir)
+            with mock.patch.object(robustness, "embed", wraps=robustness.embed) as embed_spy:
+                report = run_robustness(self.covers, self.secret, [("lsb", {"depth": 1, "key": "второй"})],
+                                        self.grid[:1], cache_dir=cache_dir)
+                self.assertEqual([call.args[2]["key"] for call in embed_spy.call_args_list], ["второй"] * 2)
+            self.assertEqual(len(os.listdir(os.path.join(cache_dir, "results"))), 4)
+        self.assertEqual(self._groups(report)[("lsb", "attack=none,depth=1,key=*")]["ber"]["max"], 0.0)
+
+    def test_process_pool_matches_serial(self):
+        """Пул процессов и пути к файлам дают тот же отчёт, что и расчёт в одном процессе"""
+        import cv2
+        configs = [("lsb", {"depth": 2}), ("dwt", {})]
+        with tempfile.TemporaryDirectory() as directory:
+            paths = []
+            for index, cover in enumerate(self.covers):
+                paths.append(os.path.join(directory, f"cover{index}.png"))
+                cv2.imwrite(paths[-1], cover)
+            serial = run_robustness(self.covers, self.secret, configs, self.grid)
+            parallel = run_robustness(paths, self.secret, configs, self.grid, workers=2)
+        self.assertEqual(serial.to_json(), parallel.to_json())
+        with self.assertRaises(ValueError):
+            run_robustness(self.covers, self.secret, configs, (("rotate", {}),))
+
+
+if __name__ == '__main__':
+    unittest.main()
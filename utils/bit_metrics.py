@@ -0,0 +1,225 @@
+"""
+Доля ошибочных битов (BER) полезной нагрузки.
+
+Для устойчивости водяного знака важна доля искажённых битов нагрузки,
+а не расстояние между строками после декодирования с errors="replace"
+(испорченный UTF-8 превращается в U+FFFD и теряет сведения о битах).
+Здесь сравниваются упакованные байты исходной и извлечённой нагрузки:
+XOR по байтам и подсчёт единиц (popcount) без распаковки в биты.
+В биты распаковываются только байты с ошибками — для позиций ошибок.
+
+Позиции сводятся в гистограмму по участкам нагрузки (region_bits битов)
+или, для секретного изображения, в карту ошибок по блокам пикселей.
+BitErrorAccumulator суммирует результаты по набору изображений.
+"""
+from typing import Dict, Optional
+import numpy as np
+
+# Число единичных битов в каждом значении байта (для numpy без bitwise_count)
+_POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1).astype(np.uint8)
+# Размер блока пикселей для карты ошибок по умолчанию
+DEFAULT_BLOCK_SIZE = 8
+
+
+def as_bytes(data) -> np.ndarray:
+    """Нагрузка как одномерный массив uint8: bytes, bytearray, str (UTF-8) или массив uint8."""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        return np.frombuffer(bytes(data), dtype=np.uint8)
+    data = np.asarray(data)
+    if data.dtype != np.uint8:
+        raise ValueError("Нагрузка должна быть байтами или массивом uint8")
+    return data.reshape(-1)
+
+
+def popcount(values: np.ndarray) -> np.ndarray:
+    """Число единичных битов в каждом байте массива uint8."""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(values)
+    return _POPCOUNT[values]
+
+
+def error_bytes(original, extracted) -> np.ndarray:
+    """
+    XOR исходной и извлечённой нагрузки по длине исходной.
+
+    Недостающие в извлечённой нагрузке байты считаются ошибочными целиком
+    (0xFF), лишние байты отбрасываются.
+    """
+    original = as_bytes(original)
+    extracted = as_bytes(extracted)
+    common = min(original.size, extracted.size)
+    errors = np.full(original.size, 0xFF, dtype=np.uint8)
+    np.bitwise_xor(original[:common], extracted[:common], out=errors[:common])
+    return errors
+
+
+def error_positions(errors: np.ndarray) -> np.ndarray:
+    """Номера ошибочных битов (старший бит байта первым, как bytes_to_bits) по массиву XOR."""
+    wrong = np.flatnonzero(errors)
+    bits = np.unpackbits(errors[wrong][:, None], axis=1)
+    rows, columns = np.nonzero(bits)
+    return wrong[rows] * 8 + columns
+
+
+def region_histogram(positions: np.ndarray, total_bits: int, region_bits: int) -> np.ndarray:
+    """Число ошибок в каждом участке нагрузки из region_bits битов."""
+    if region_bits <= 0:
+        raise ValueError("'region_bits' должно быть положительным")
+    return np.bincount(positions // region_bits, minlength=-(-total_bits // region_bits))
+
+
+def pixel_error_map(positions: np.ndarray, secret_shape, layout: str = "raster",
+                    block_size: int = DEFAULT_BLOCK_SIZE) -> np.ndarray:
+    """
+    Карта ошибок секретного изображения по блокам block_size x block_size.
+
+    Бит нагрузки относится к пикселю по раскладке image_to_bits: в 'raster'
+    бит t принадлежит отсчёту t // 8, в 'planes' — отсчёту t % (число отсчётов).
+    Каналы цветного секрета складываются в один блок.
+
+    Returns:
+        Массив int64 (блоков по вертикали, блоков по горизонтали)
+    """
+    height, width = secret_shape[:2]
+    channels = secret_shape[2] if len(secret_shape) == 3 else 1
+    num_samples = height * width * channels
+    if layout == "planes":
+        samples = positions % num_samples
+    else:
+        samples = positions // 8
+    samples = samples[samples < num_samples]
+    pixels = samples // channels
+    blocks_y, blocks_x = -(-height // block_size), -(-width // block_size)
+    blocks = (pixels // width) // block_size * blocks_x + (pixels % width) // block_size
+    return np.bincount(blocks, minlength=blocks_y * blocks_x).reshape(blocks_y, blocks_x)
+
+
+def bit_error_metrics(original, extracted, region_bits: Optional[int] = None,
+                      return_positions: bool = False) -> Dict:
+    """
+    BER и доля ошибочных байтов между исходной и извлечённой нагрузкой.
+
+    Args:
+        original: исходная нагрузка (bytes, str или массив uint8)
+        extracted: извлечённая нагрузка того же вида
+        region_bits: размер участка для гистограммы 'regions' (None — без неё)
+        return_positions: добавить 'positions' — номера ошибочных битов
+
+    Returns:
+        Словарь: 'bits', 'bit_errors', 'ber', 'bytes', 'byte_errors',
+        'byte_error_rate', 'missing_bytes' и при запросе 'regions', 'positions'
+    """
+    original = as_bytes(original)
+    extracted = as_bytes(extracted)
+    errors = error_bytes(original, extracted)
+    bit_errors = int(popcount(errors).sum(dtype=np.int64))
+    byte_errors = int(np.count_nonzero(errors))
+    total_bits = original.size * 8
+    result = {
+        "bits": total_bits,
+        "bit_errors": bit_errors,
+        "ber": bit_errors / total_bits if total_bits else 0.0,
+        "bytes": int(original.size),
+        "byte_errors": byte_errors,
+        "byte_error_rate": byte_errors / original.size if original.size else 0.0,
+        "missing_bytes": max(0, int(original.size - extracted.size)),
+    }
+    if region_bits is not None or return_positions:
+        positions = error_positions(errors)
+        if region_bits is not None:
+            result["regions"] = region_histogram(positions, total_bits, region_bits)
+        if return_positions:
+            result["positions"] = positions
+    return result
+
+
+class BitErrorAccumulator:
+    """
+    Накопитель BER по набору изображений.
+
+    add() считает метрики одной пары нагрузок и добавляет их к итогам;
+    гистограммы участков складываются поэлементно (более короткая
+    дополняется нулями). Накопители можно объединять через merge().
+    """
+
+    def __init__(self, region_bits: Optional[int] = None):
+        self.region_bits = region_bits
+        self.items = 0
+        self.items_with_errors = 0
+        self.bits = 0
+        self.bit_errors = 0
+        self.bytes = 0
+        self.byte_errors = 0
+        self.worst_ber = 0.0
+        self._ber_sum = 0.0
+        self.regions = np.zeros(0, dtype=np.int64)
+
+    def _add_regions(self, regions: np.ndarray) -> None:
+        if regions.size > self.regions.size:
+            self.regions = np.pad(self.regions, (0, regions.size - self.regions.size))
+        self.regions[:regions.size] += regions
+
+    def add(self, original, extracted) -> Dict:
+        """Добавляет пару нагрузок; возвращает её bit_error_metrics."""
+        metrics = bit_error_metrics(original, extracted, self.region_bits)
+        self.items += 1
+        self.items_with_errors += metrics["bit_errors"] > 0
+        self.bits += metrics["bits"]
+        self.bit_errors += metrics["bit_errors"]
+        self.bytes += metrics["bytes"]
+        self.byte_errors += metrics["byte_errors"]
+        self.worst_ber = max(self.worst_ber, metrics["ber"])
+        self._ber_sum += metrics["ber"]
+        if self.region_bits is not None:
+            self._add_regions(metrics["regions"])
+        return metrics
+
+    def merge(self, other: "BitErrorAccumulator") -> "BitErrorAccumulator":
+        """Добавляет итоги другого накопителя с тем же region_bits."""
+        if other.region_bits != self.region_bits:
+            raise ValueError("Нельзя объединить накопители с разным 'region_bits'")
+        self.items += other.items
+        self.items_with_errors += other.items_with_errors
+        self.bits += other.bits
+        self.bit_errors += other.bit_errors
+        self.bytes += other.bytes
+        self.byte_errors += other.byte_errors
+        self.worst_ber = max(self.worst_ber, other.worst_ber)
+        self._ber_sum += other._ber_sum
+        self._add_regions(other.regions)
+        return self
+
+    def result(self) -> Dict:
+        """
+        Итоги по набору: 'ber' и 'byte_error_rate' — по всем битам и байтам,
+        'mean_ber' — среднее по изображениям, 'worst_ber' — худшее изображение.
+        """
+        result = {
+            "items": self.items,
+            "items_with_errors": self.items_with_errors,
+            "bits": self.bits,
+            "bit_errors": self.bit_errors,
+            "ber": self.bit_errors / self.bits if self.bits else 0.0,
+            "bytes": self.bytes,
+            "byte_errors": self.byte_errors,
+            "byte_error_rate": self.byte_errors / self.bytes if self.bytes else 0.0,
+            "mean_ber": self._ber_sum / self.items if self.items else 0.0,
+            "worst_ber": self.worst_ber,
+        }
+        if self.region_bits is not None:
+            result["regions"] = self.regions.copy()
+        return result
+
+
+def format_bit_metrics(metrics: Dict) -> str:
+    """Форматирование BER для отображения."""
+    lines = [
+        f"BER (Bit Error Rate): {metrics['ber']:.6f} ({metrics['bit_errors']} из {metrics['bits']} бит)",
+        f"Byte Error Rate: {metrics['byte_error_rate']:.6f} ({metrics['byte_errors']} из {metrics['bytes']} байт)",
+    ]
+    if "items" in metrics:
+        lines.append(f"Изображений с ошибками: {metrics['items_with_errors']} из {metrics['items']}, "
+                     f"худший BER: {metrics['worst_ber']:.6f}")
+    return "\n".join(lines)
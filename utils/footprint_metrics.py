@@ -0,0 +1,150 @@
+"""
+Метрики качества по отпечатку изменений встраивания.
+
+Встраивание LSB и DCT с params['return_info'] возвращает info['footprint']:
+номера изменённых отсчётов и их приращения (watermark.utils.modification_footprint).
+MSE, MAE, PSNR и максимальная ошибка считаются по этим приращениям точно:
+остальные отсчёты стего совпадают с контейнером и дают нулевую разность.
+
+Карта SSIM равна ровно 1 в пикселях, окно которых не задевает изменённых
+пикселей (у одинаковых окон числитель и знаменатель совпадают). Поэтому
+карта досчитывается только в плитках TILE_SIZE x TILE_SIZE, которые окно
+изменённых пикселей задевает. Соседние плитки одной строки объединяются
+в полосу; стего для полосы собирается из контейнера и приращений. Стоимость
+отчёта растёт с объёмом нагрузки, а не с размером изображения.
+
+Если изменения плотно заполняют полосу строк (растровые LSB и DCT), поэлементная
+обработка номеров дороже плотной: тогда стего восстанавливается только для
+этой полосы, и метрики считаются по ней целиком.
+"""
+from typing import Dict
+import numpy as np
+from .image_metrics import difference_sums, stats_from_sums
+from .ssim import to_gray, gray_ssim_map, window_size
+
+# Сторона плитки, на которые делится карта SSIM
+TILE_SIZE = 64
+# Плотный расчёт по полосе, если изменена хотя бы 1/BAND_DENSITY отсчётов полосы
+BAND_DENSITY = 8
+
+
+def footprint_sums(footprint: dict):
+    """Накопители difference_sums по отпечатку: суммы модулей и квадратов, максимум, число пикселей."""
+    shape = footprint["shape"]
+    channels = shape[2] if len(shape) == 3 else 1
+    deltas = np.abs(footprint["deltas"].astype(np.int64))
+    channel = footprint["indices"] % channels
+    abs_sum = np.bincount(channel, weights=deltas, minlength=channels)
+    square_sum = np.bincount(channel, weights=deltas * deltas, minlength=channels)
+    max_error = np.array([deltas[channel == c].max(initial=0) for c in range(channels)], dtype=np.float64)
+    return abs_sum, square_sum, max_error, int(np.prod(shape[:2]))
+
+
+def _affected_tiles(pixels: np.ndarray, width: int, radius: int, tiles_y: int, tiles_x: int) -> np.ndarray:
+    """Номера плиток (в растре, по возрастанию), которые задевает окно радиуса radius вокруг изменённых пикселей."""
+    ys, xs = pixels // width, pixels % width
+    affected = np.zeros(tiles_y * tiles_x, dtype=bool)
+    # radius < TILE_SIZE: окно пересекает не больше двух плиток по каждой оси
+    for dy in (-radius, radius):
+        ty = np.clip((ys + dy) // TILE_SIZE, 0, tiles_y - 1)
+        for dx in (-radius, radius):
+            affected[ty * tiles_x + np.clip((xs + dx) // TILE_SIZE, 0, tiles_x - 1)] = True
+    return np.flatnonzero(affected)
+
+
+def _tile_runs(tiles: np.ndarray, tiles_x: int):
+    """Полосы из подряд идущих плиток одной строки: (строка, первая колонка, колонка за последней)."""
+    breaks = np.flatnonzero((np.diff(tiles) != 1) | (np.diff(tiles // tiles_x) != 0)) + 1
+    for run in np.split(tiles, breaks):
+        yield int(run[0] // tiles_x), int(run[0] % tiles_x), int(run[-1] % tiles_x) + 1
+
+
+def footprint_ssim(cover: np.ndarray, footprint: dict, window: str = "gaussian", win_size=None) -> float:
+    """
+    SSIM между контейнером и стего, заданным отпечатком изменений.
+
+    Совпадает с utils.ssim.ssim(cover, stego) с точностью до порядка суммирования.
+    """
+    height, width = cover.shape[:2]
+    channels = cover.shape[2] if cover.ndim == 3 else 1
+    size = window_size(window, win_size)
+    radius = size // 2
+    if radius >= TILE_SIZE:
+        raise ValueError(f"Окно {size} больше плитки {TILE_SIZE}")
+    indices, deltas = footprint["indices"], footprint["deltas"]
+    if indices.size == 0:
+        return 1.0
+    tiles_y, tiles_x = -(-height // TILE_SIZE), -(-width // TILE_SIZE)
+    pixels = indices // channels
+    # Каналы одного пикселя идут подряд: повторы отбрасываются без сортировки
+    distinct = pixels[np.flatnonzero(np.diff(pixels, prepend=-1))]
+    total, area = 0.0, 0
+    for tile_row, first, last in _tile_runs(_affected_tiles(distinct, width, radius, tiles_y, tiles_x), tiles_x):
+        y0, y1 = tile_row * TILE_SIZE, min((tile_row + 1) * TILE_SIZE, height)
+        x0, x1 = first * TILE_SIZE, min(last * TILE_SIZE, width)
+        # Полоса с запасом в радиус окна (у краёв изображения запаса нет, как и в полной карте)
+        top, bottom = max(y0 - radius, 0), min(y1 + radius, height)
+        left, right = max(x0 - radius, 0), min(x1 + radius, width)
+        original = cover[top:bottom, left:right]
+        stego = original.astype(np.int16)
+        # Отсчёты отпечатка отсортированы, строки полосы — непрерывный диапазон номеров
+        lo, hi = np.searchsorted(indices, [top * width * channels, bottom * width * channels])
+        ys, xs = pixels[lo:hi] // width, pixels[lo:hi] % width
+        inside = (xs >= left) & (xs < right)
+        stego.reshape(-1)[((ys[inside] - top) * (right - left) + xs[inside] - left) * channels
+                          + indices[lo:hi][inside] % channels] += deltas[lo:hi][inside]
+        ssim_values = gray_ssim_map(to_gray(original), to_gray(stego.astype(cover.dtype)), window, size)
+        total += float(ssim_values[y0 - top:y1 - top, x0 - left:x1 - left].sum(dtype=np.float64))
+        area += (y1 - y0) * (x1 - x0)
+    # Вне задетых плиток карта равна 1
+    return (total + height * width - area) / (height * width)
+
+
+def _band_metrics(cover: np.ndarray, footprint: dict, with_ssim: bool, window: str, win_size) -> Dict:
+    """Метрики по полосе строк от первого до последнего изменённого отсчёта."""
+    height, width = cover.shape[:2]
+    row_size = cover.size // height
+    indices = footprint["indices"]
+    first, last = int(indices[0] // row_size), int(indices[-1] // row_size) + 1
+    radius = window_size(window, win_size) // 2 if with_ssim else 0
+    # Строки карты SSIM, задетые изменениями, и запас в радиус окна вокруг них
+    top, bottom = max(first - radius, 0), min(last + radius, height)
+    context_top, context_bottom = max(top - radius, 0), min(bottom + radius, height)
+    original = cover[context_top:context_bottom]
+    stego = original.copy()
+    flat = stego.reshape(-1)
+    positions = indices - context_top * row_size
+    flat[positions] = (flat[positions].astype(np.int16) + footprint["deltas"]).astype(cover.dtype)
+    abs_sum, square_sum, max_error, _ = difference_sums(original, stego)
+    metrics = stats_from_sums(abs_sum, square_sum, max_error, height * width)
+    if with_ssim:
+        ssim_rows = gray_ssim_map(to_gray(original), to_gray(stego), window, win_size)[top - context_top:
+                                                                                    bottom - context_top]
+        metrics['ssim'] = (float(ssim_rows.sum(dtype=np.float64)) + (height - bottom + top) * width) / (height * width)
+    return metrics
+
+
+def footprint_image_metrics(cover: np.ndarray, footprint: dict, with_ssim: bool = True,
+                            window: str = "gaussian", win_size=None) -> Dict:
+    """
+    Метрики качества стего по контейнеру и отпечатку изменений.
+
+    Args:
+        cover: исходное изображение (контейнер)
+        footprint: info['footprint'] встраивания LSB или DCT
+        with_ssim: считать ли SSIM
+        window, win_size: окно SSIM, как в utils.ssim
+
+    Returns:
+        Словарь как у calculate_image_metrics(cover, stego)
+    """
+    if tuple(cover.shape) != tuple(footprint["shape"]):
+        raise ValueError(f"Размеры не совпадают: {cover.shape} != {footprint['shape']}")
+    indices = footprint["indices"]
+    row_size = cover.size // cover.shape[0]
+    if indices.size and indices.size * BAND_DENSITY >= (indices[-1] // row_size - indices[0] // row_size + 1) * row_size:
+        return _band_metrics(cover, footprint, with_ssim, window, win_size)
+    metrics = stats_from_sums(*footprint_sums(footprint))
+    if with_ssim:
+        metrics['ssim'] = footprint_ssim(cover, footprint, window, win_size)
+    return metrics
@@ -4,7 +4,106 @@
 
 import numpy as np
 from typing import Dict, Tuple
-import cv2
+from .ssim import ssim
+
+# Размер куска для difference_stats в элементах: буферы int16/uint16 по 128 КБ
+# помещаются в L2-кэш, поэтому разность не уходит в основную память
+CHUNK_ELEMENTS = 1 << 16
+# Максимальное значение пикселя для PSNR
+MAX_PIXEL = 255.0
+
+
+def _psnr_from_mse(mse: float) -> float:
+    """PSNR по уже посчитанному MSE."""
+    if mse == 0:
+        return float('inf')  # Изображения идентичны
+    return float(20 * np.log10(MAX_PIXEL / np.sqrt(mse)))
+
+
+def difference_sums(original: np.ndarray, compared: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, int]:
+    """
+    Накопители разности по каналам за один проход: сумма модулей,
+    сумма квадратов, максимум модуля и количество пикселей.
+
+    Разность считается один раз, кусками по CHUNK_ELEMENTS элементов.
+    Для uint8 она хранится в int16, а модуль и квадрат — в uint16
+    (255² < 2¹⁶), суммы накапливаются в uint64, поэтому результат точный.
+    Остальные типы обрабатываются так же, но во float64. Накопители
+    разных кусков изображения складываются (см. utils.tiled_metrics).
+
+    Args:
+        original: Исходное изображение (H, W) или (H, W, C)
+        compared: Изображение для сравнения той же формы
+
+    Returns:
+        Кортеж (abs_sum, square_sum, max_error, count)
+    """
+    if original.shape != compared.shape:
+        raise ValueError(f"Размеры изображений не совпадают: {original.shape} != {compared.shape}")
+    num_channels = original.shape[2] if original.ndim == 3 else 1
+    first = original.reshape(-1, num_channels)
+    second = compared.reshape(-1, num_channels)
+    narrow = original.dtype == np.uint8 and compared.dtype == np.uint8
+    work, accum = (np.int16, np.uint64) if narrow else (np.float64, np.float64)
+    rows = max(1, CHUNK_ELEMENTS // num_channels)
+    # Каналы по строкам буфера: редукции идут по непрерывной памяти
+    diff = np.empty((num_channels, min(rows, first.shape[0])), dtype=work)
+    squares = np.empty_like(diff, dtype=np.uint16 if narrow else np.float64)
+    abs_sum = np.zeros(num_channels, dtype=accum)
+    square_sum = np.zeros(num_channels, dtype=accum)
+    max_error = np.zeros(num_channels, dtype=accum)
+    for start in range(0, first.shape[0], rows):
+        chunk = first[start:start + rows]
+        d = diff[:, :chunk.shape[0]]
+        np.subtract(chunk.T, second[start:start + rows].T, out=d, dtype=work)
+        np.abs(d, out=d)
+        if narrow:
+            d = d.view(np.uint16)
+        abs_sum += d.sum(axis=1, dtype=accum)
+        sq = squares[:, :chunk.shape[0]]
+        np.multiply(d, d, out=sq)
+        square_sum += sq.sum(axis=1, dtype=accum)
+        np.maximum(max_error, d.max(axis=1, initial=0), out=max_error)
+    return abs_sum, square_sum, max_error, first.shape[0]
+
+
+def stats_from_sums(abs_sum: np.ndarray, square_sum: np.ndarray, max_error: np.ndarray, count: int) -> Dict:
+    """Словарь метрик difference_stats из накопителей difference_sums."""
+    count = max(count, 1)
+    num_channels = len(abs_sum)
+    channels = []
+    for c in range(num_channels):
+        mse = float(square_sum[c]) / count
+        channels.append({
+            'mse': mse,
+            'mae': float(abs_sum[c]) / count,
+            'psnr': _psnr_from_mse(mse),
+            'max_error': float(max_error[c]),
+        })
+    mse = float(square_sum.sum()) / (count * num_channels)
+    return {
+        'mse': mse,
+        'mae': float(abs_sum.sum()) / (count * num_channels),
+        'psnr': _psnr_from_mse(mse),
+        'max_error': float(max_error.max()),
+        'channels': channels,
+    }
+
+
+def difference_stats(original: np.ndarray, compared: np.ndarray) -> Dict:
+    """
+    Метрики разности за один проход: MSE, MAE, PSNR и максимальная ошибка,
+    в целом и по каждому каналу (см. difference_sums).
+
+    Args:
+        original: Исходное изображение (H, W) или (H, W, C)
+        compared: Изображение для сравнения той же формы
+
+    Returns:
+        Словарь: 'mse', 'mae', 'psnr', 'max_error' и 'channels' — список
+        словарей с теми же ключами для каждого канала
+    """
+    return stats_from_sums(*difference_sums(original, compared))
 
 
 def calculate_psnr(original: np.ndarray, compared: np.ndarray) -> float:
@@ -27,13 +126,7 @@ def calculate_psnr(original: np.ndarray, compared: np.ndarray) -> float:
     Returns:
         PSNR в децибелах (dB)
     """
-    mse = np.mean((original.astype(float) - compared.astype(float)) ** 2)
-    if mse == 0:
-        return float('inf')  # Изображения идентичны
-    
-    max_pixel = 255.0
-    psnr = 20 * np.log10(max_pixel / np.sqrt(mse))
-    return float(psnr)
+    return difference_stats(original, compared)['psnr']
 
 
 def calculate_mse(original: np.ndarray, compared: np.ndarray) -> float:
@@ -56,8 +149,7 @@ def calculate_mse(original: np.ndarray, compared: np.ndarray) -> float:
     Returns:
         MSE значение
     """
-    mse = np.mean((original.astype(float) - compared.astype(float)) ** 2)
-    return float(mse)
+    return difference_stats(original, compared)['mse']
 
 
 def calculate_mae(original: np.ndarray, compared: np.ndarray) -> float:
@@ -74,11 +166,10 @@ def calculate_mae(original: np.ndarray, compared: np.ndarray) -> float:
     Returns:
         MAE значение
     """
-    mae = np.mean(np.abs(original.astype(float) - compared.astype(float)))
-    return float(mae)
+    return difference_stats(original, compared)['mae']
 
 
-def calculate_ssim(original: np.ndarray, compared: np.ndarray) -> float:
+def calculate_ssim(original: np.ndarray, compared: np.ndarray, downsample: bool = False) -> float:
     """
     Расчёт SSIM (Structural Similarity Index) - индекс структурного сходства
     
@@ -92,46 +183,17 @@ def calculate_ssim(original: np.ndarray, compared: np.ndarray) -> float:
     - 0.80-0.90: приемлемое качество
     - < 0.80: заметные различия
     
+    Считается по яркости с гауссовым окном 11x11 (σ = 1.5), см. utils.ssim.
+    
     Args:
         original: Исходное изображение
         compared: Изображение для сравнения
+        downsample: уменьшить изображения до ~256 пикселей по меньшей стороне
     
     Returns:
         SSIM значение от -1 до 1
     """
-    # Преобразуем в grayscale если цветное
-    if len(original.shape) == 3:
-        original_gray = cv2.cvtColor(original, cv2.COLOR_BGR2GRAY)
-        compared_gray = cv2.cvtColor(compared, cv2.COLOR_BGR2GRAY)
-    else:
-        original_gray = original
-        compared_gray = compared
-    
-    # Параметры для SSIM
-    C1 = (0.01 * 255) ** 2
-    C2 = (0.03 * 255) ** 2
-    
-    original_gray = original_gray.astype(np.float64)
-    compared_gray = compared_gray.astype(np.float64)
-    
-    # Средние значения
-    mu1 = cv2.GaussianBlur(original_gray, (11, 11), 1.5)
-    mu2 = cv2.GaussianBlur(compared_gray, (11, 11), 1.5)
-    
-    mu1_sq = mu1 ** 2
-    mu2_sq = mu2 ** 2
-    mu1_mu2 = mu1 * mu2
-    
-    # Дисперсии и ковариация
-    sigma1_sq = cv2.GaussianBlur(original_gray ** 2, (11, 11), 1.5) - mu1_sq
-    sigma2_sq = cv2.GaussianBlur(compared_gray ** 2, (11, 11), 1.5) - mu2_sq
-    sigma12 = cv2.GaussianBlur(original_gray * compared_gray, (11, 11), 1.5) - mu1_mu2
-    
-    # SSIM формула
-    ssim_map = ((2 * mu1_mu2 + C1) * (2 * sigma12 + C2)) / \
-               ((mu1_sq + mu2_sq + C1) * (sigma1_sq + sigma2_sq + C2))
-    
-    return float(ssim_map.mean())
+    return ssim(original, compared, downsample=downsample)
 
 
 def calculate_image_metrics(original: np.ndarray, compared: np.ndarray) -> Dict[str, float]:
@@ -143,19 +205,12 @@ def calculate_image_metrics(original: np.ndarray, compared: np.ndarray) -> Dict[
         compared: Изображение для сравнения
     
     Returns:
-        Словарь с метриками: PSNR, MSE, MAE, SSIM
+        Словарь с метриками: PSNR, MSE, MAE, максимальная ошибка ('max_error'),
+        SSIM и статистика по каналам ('channels', см. difference_stats)
     """
-    # Проверка размеров
-    if original.shape != compared.shape:
-        raise ValueError(f"Размеры изображений не совпадают: {original.shape} != {compared.shape}")
-    
-    metrics = {
-        'psnr': calculate_psnr(original, compared),
-        'mse': calculate_mse(original, compared),
-        'mae': calculate_mae(original, compared),
-        'ssim': calculate_ssim(original, compared)
-    }
-    
+    # difference_stats проверяет размеры и считает разность один раз
+    metrics = difference_stats(original, compared)
+    metrics['ssim'] = calculate_ssim(original, compared)
     return metrics
 
 
@@ -172,14 +227,24 @@ def compare_images(original: np.ndarray, compared: np.ndarray) -> Tuple[np.ndarr
     """
     # Расчёт метрик
     metrics = calculate_image_metrics(original, compared)
+    return enhanced_difference(original, compared), metrics
+
+
+def enhanced_difference(original: np.ndarray, compared: np.ndarray) -> np.ndarray:
+    """
+    Разностное изображение с усиленным контрастом: |original - compared| * 10, не больше 255
     
-    # Создание разностного изображения (абсолютная разница)
-    diff = np.abs(original.astype(np.int16) - compared.astype(np.int16)).astype(np.uint8)
+    Args:
+        original: Исходное изображение
+        compared: Изображение для сравнения
     
+    Returns:
+        Массив uint8 той же формы
+    """
+    # Абсолютная разница в int16, чтобы умножение не переполняло uint8
+    diff = np.abs(original.astype(np.int16) - compared.astype(np.int16))
     # Увеличиваем контраст разностного изображения для лучшей видимости
-    diff_enhanced = np.clip(diff * 10, 0, 255).astype(np.uint8)
-    
-    return diff_enhanced, metrics
+    return np.minimum(diff * 10, 255).astype(np.uint8)
 
 
 def get_quality_description(metrics: Dict[str, float]) -> str:
@@ -221,6 +286,7 @@ def format_metrics(metrics: Dict[str, float]) -> str:
     mse = metrics.get('mse', 0)
     mae = metrics.get('mae', 0)
     ssim = metrics.get('ssim', 0)
+    max_error = metrics.get('max_error', 0)
     
     if psnr == float('inf'):
         psnr_str = "∞ (идентичны)"
@@ -232,6 +298,7 @@ def format_metrics(metrics: Dict[str, float]) -> str:
 PSNR (Peak Signal-to-Noise Ratio): {psnr_str}
 MSE  (Mean Squared Error):          {mse:.2f}
 MAE  (Mean Absolute Error):         {mae:.2f}
+Max  (Maximum Absolute Error):      {max_error:.0f}
 SSIM (Structural Similarity):       {ssim:.4f}
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 Оценка качества: {get_quality_description(metrics)}
@@ -0,0 +1,253 @@
+"""
+Расстояние Левенштейна бит-параллельным алгоритмом Майерса (в формулировке Хюрё).
+
+Столбец матрицы редакционных расстояний хранится не числами, а двумя
+битовыми векторами вертикальных приращений (+1 и -1) в целых Python
+произвольной длины: время O(n * m / 64) без матрицы в памяти. Общие
+префикс и суффикс строк отбрасываются заранее. Небольшие расстояния
+ищутся по диагоналям (Ландау — Вишкин, O(d^2)), остальные — в полосе
+диагоналей (блочный Майерс, O(n * d / 64)) или полным вектором.
+
+С порогом max_distance = k расстояние до k включительно точное, а большее
+сообщается как k + 1. Без порога полоса расширяется, пока расстояние
+не уложится в неё, так что результат всегда точный.
+"""
+import numpy as np
+from .text_diff import forward_match
+
+# Минимальная ширина блока строк в ленточном режиме
+MIN_BLOCK_BITS = 64
+# Начальный порог и его рост при поиске расстояния без порога
+INITIAL_BAND = 256
+BAND_GROWTH = 4
+# Полоса не шире 1 / FULL_BAND_FRACTION длинной строки, иначе — полный вектор
+FULL_BAND_FRACTION = 4
+# Суммарная ширина полос — не больше стольких полных проходов
+BAND_WORK_LIMIT = 1
+# До какого расстояния пробовать поиск по диагоналям
+DIAGONAL_LIMIT = 2048
+
+
+def _codes(text: str) -> np.ndarray:
+    """Коды символов строки (uint32)."""
+    return np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+
+
+def _trim(first: str, second: str):
+    """Отбрасывает общие префикс и суффикс."""
+    a, b = _codes(first), _codes(second)
+    common = min(a.size, b.size)
+    differ = np.flatnonzero(a[:common] != b[:common])
+    prefix = int(differ[0]) if differ.size else common
+    a, b = a[prefix:], b[prefix:]
+    common = min(a.size, b.size)
+    differ = np.flatnonzero(a[a.size - common:][::-1] != b[b.size - common:][::-1])
+    suffix = int(differ[0]) if differ.size else common
+    return first[prefix:len(first) - suffix], second[prefix:len(second) - suffix]
+
+
+def _qgram_bound(first: str, second: str, q: int = 3) -> int:
+    """Нижняя оценка расстояния: L1-разность частот q-грамм, делённая на 2q (правка меняет не больше q q-грамм)."""
+    grams = []
+    for text in (first, second):
+        codes = _codes(text).astype(np.int64)
+        # Коды символов Unicode укладываются в 21 бит, три — в одно int64
+        gram = np.zeros(max(codes.size - q + 1, 0), dtype=np.int64)
+        for shift in range(q):
+            gram = (gram << 21) | codes[shift:codes.size - q + 1 + shift]
+        grams.append(gram)
+    _, inverse = np.unique(np.concatenate(grams), return_inverse=True)
+    weights = np.concatenate([np.ones(grams[0].size), -np.ones(grams[1].size)])
+    difference = np.abs(np.bincount(inverse.ravel(), weights=weights)).sum()
+    return max(-(-int(difference) // (2 * q)), abs(len(first) - len(second)))
+
+
+def _match_masks(pattern: str) -> dict:
+    """Маски совпадений: символ -> число с единицами в позициях символа в pattern."""
+    codes = _codes(pattern)
+    masks = {}
+    for code in np.unique(codes):
+        bits = np.packbits(codes == code, bitorder="little")
+        masks[chr(code)] = int.from_bytes(bits.tobytes(), "little")
+    return masks
+
+
+def _full_distance(pattern: str, text: str) -> int:
+    """Алгоритм Майерса одним вектором на всю длину pattern."""
+    masks = _match_masks(pattern)
+    mask = (1 << len(pattern)) - 1
+    high = 1 << (len(pattern) - 1)
+    pv, mv, score = mask, 0, len(pattern)
+    for char in text:
+        eq = masks.get(char, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & mask)
+        mh = pv & xh
+        if ph & high:
+            score += 1
+        elif mh & high:
+            score -= 1
+        # Верхняя граница D[0][j] = j растёт на 1 с каждым столбцом
+        ph = (ph << 1) | 1
+        mh <<= 1
+        pv = (mh | ~(xv | ph)) & mask
+        mv = ph & xv
+    return score
+
+
+class _Block:
+    """Блок строк первой строки: векторы приращений и значение в нижней строке блока."""
+
+    __slots__ = ("masks", "mask", "high", "pv", "mv", "score")
+
+    def __init__(self, pattern: str, start_score: int):
+        self.masks = _match_masks(pattern)
+        self.mask = (1 << len(pattern)) - 1
+        self.high = 1 << (len(pattern) - 1)
+        # Столбец начинается вертикальным путём: все приращения +1
+        self.pv, self.mv = self.mask, 0
+        self.score = start_score + len(pattern)
+
+    def advance(self, char: str, hin: int) -> int:
+        """Шаг блока на один столбец; hin/hout — горизонтальные приращения над и под блоком."""
+        eq = self.masks.get(char, 0)
+        pv, mv = self.pv, self.mv
+        xv = eq | mv
+        if hin < 0:
+            eq |= 1
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & self.mask)
+        mh = pv & xh
+        hout = 1 if ph & self.high else (-1 if mh & self.high else 0)
+        ph <<= 1
+        mh <<= 1
+        if hin < 0:
+            mh |= 1
+        elif hin > 0:
+            ph |= 1
+        self.pv = (mh | ~(xv | ph)) & self.mask
+        self.mv = ph & xv
+        self.score += hout
+        return hout
+
+
+def _banded_distance(pattern: str, text: str, max_distance: int) -> int:
+    """
+    Блочный алгоритм Майерса в полосе -below <= j - i <= above шириной max_distance + 1
+    (text не короче pattern).
+
+    Блоки включаются, когда их верхняя строка входит в полосу снизу, и
+    выключаются, когда нижняя строка выходит из неё сверху. Значения вне
+    полосы заменяются стоимостями реальных путей (вертикальный путь для
+    нового блока, горизонтальный над первым активным), поэтому все
+    посчитанные значения не меньше истинных, а внутри полосы равны им.
+    """
+    # Путь, дошедший до диагонали s = j - i, стоит не меньше |s| + |s - shift|,
+    # поэтому путь стоимости не больше k лежит в полосе
+    # -(k - shift) / 2 <= s <= (k + shift) / 2 шириной k + 1: внутри неё
+    # значения точные, и расстояние до k тоже. Время O(n * k / 64)
+    shift = len(text) - len(pattern)
+    below, above = (max_distance - shift) // 2, (max_distance + shift) // 2
+    width = max(MIN_BLOCK_BITS, -(-(below + above + 1) // 64) * 64)
+    starts = range(0, len(pattern), width)
+    blocks = [_Block(pattern[:width], 0)]
+    first = 0
+    for column, char in enumerate(text, start=1):
+        while len(blocks) < len(starts) and starts[len(blocks)] + 1 <= column + below:
+            start = starts[len(blocks)]
+            blocks.append(_Block(pattern[start:start + width], blocks[-1].score))
+        while min(starts[first] + width, len(pattern)) < column - above:
+            blocks[first] = None  # блок выше полосы больше не нужен
+            first += 1
+        # Над первым активным блоком — граница D[0][j] = j или горизонтальный путь
+        hin = 1
+        for block in blocks[first:]:
+            hin = block.advance(char, hin)
+    return min(blocks[-1].score, max_distance + 1)
+
+
+def _diagonal_distance(first: str, second: str, max_distance: int) -> int:
+    """
+    Поиск по диагоналям: расстояние, если оно не больше max_distance, иначе max_distance + 1.
+
+    rows[d] — самая дальняя строка i диагонали j - i = d, достижимая за e правок
+    (значения вдоль диагонали не убывают, поэтому достижимые строки — префикс).
+    """
+    n, m = len(first), len(second)
+    if abs(m - n) > max_distance:
+        return max_distance + 1
+    # Диагональ d хранится в ячейке d + offset; -2 — недостижима
+    offset = max_distance + 1
+    rows = [-2] * (2 * offset + 1)
+    previous = rows[:]
+    target = offset + m - n
+    rows[offset] = forward_match(first, second, 0, 0, min(n, m))
+    for edits in range(1, max_distance + 1):
+        if rows[target] >= n:
+            return edits - 1
+        previous, rows = rows, previous
+        for index in range(offset + max(-edits, -n), offset + min(edits, m) + 1):
+            diagonal = index - offset
+            # Замена, вставка (с диагонали d - 1) и удаление (с диагонали d + 1)
+            row = max(previous[index] + 1, previous[index - 1], previous[index + 1] + 1)
+            row = min(row, n, m - diagonal)
+            if row < -diagonal or row < 0:
+                rows[index] = -2
+                continue
+            column = row + diagonal
+            if row < n and column < m and first[row] == second[column]:
+                row += forward_match(first, second, row, column, min(n - row, m - column))
+            rows[index] = row
+    return max_distance if rows[target] >= n else max_distance + 1
+
+
+def levenshtein_distance(first: str, second: str, max_distance=None) -> int:
+    """
+    Расстояние Левенштейна между строками.
+
+    Args:
+        first: первая строка
+        second: вторая строка
+        max_distance: порог для ленточного режима; если расстояние больше,
+            возвращается max_distance + 1
+
+    Returns:
+        Минимальное количество вставок, удалений и замен символов
+    """
+    if max_distance is not None and max_distance < 0:
+        raise ValueError("'max_distance' не может быть отрицательным")
+    first, second = _trim(first, second)
+    # Более короткая строка — вектор, по более длинной идут столбцы
+    if len(first) > len(second):
+        first, second = second, first
+    if max_distance is not None and len(second) - len(first) > max_distance:
+        return max_distance + 1
+    if not first:
+        return len(second)
+    # d^2 шагов по диагоналям дешевле m * d / 32 шагов блоков, пока d не больше ~m / 128
+    limit = min(DIAGONAL_LIMIT, len(second) // 128)
+    if max_distance is not None:
+        limit = min(limit, max_distance)
+    # Оценка нужна, только если поиск по диагоналям может не уложиться в предел
+    lower = _qgram_bound(first, second) if max_distance is None or max_distance > limit else 0
+    if max_distance is not None and lower > max_distance:
+        return max_distance + 1
+    if lower <= limit:
+        distance = _diagonal_distance(first, second, limit)
+        if distance <= limit or max_distance == limit:
+            return distance
+    if max_distance is not None:
+        return _banded_distance(first, second, max_distance)
+    # Порог растёт в BAND_GROWTH раз от нижней оценки: время O(n * d / 64).
+    # Полоса в 1 / FULL_BAND_FRACTION длинной строки уже не дешевле полного
+    # вектора, а неудачные полосы стоят не больше BAND_WORK_LIMIT полных
+    # проходов: у непохожих строк сразу считается полный вектор
+    band, work = max(INITIAL_BAND, lower), 0
+    while band < len(second) // FULL_BAND_FRACTION and work + band + 1 <= BAND_WORK_LIMIT * len(first):
+        distance = _banded_distance(first, second, band)
+        if distance <= band:
+            return distance
+        work += band + 1
+        band *= BAND_GROWTH
+    return _full_distance(first, second)
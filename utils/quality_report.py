@@ -0,0 +1,300 @@
+"""
+Потоковый сводный отчёт о качестве по большому набору встраиваний.
+
+Метрики каждой пары (PSNR, SSIM, BER, доля использованной ёмкости и т. п.)
+не сохраняются: они сразу добавляются в сводку группы (метод, параметры).
+Для каждой метрики группа хранит:
+- RunningStats — количество, среднее и дисперсию по Уэлфорду, минимум и максимум;
+- QuantileSketch — логарифмические корзины (как в DDSketch) с относительной
+  погрешностью квантилей alpha, память ограничена числом корзин;
+- Histogram — гистограмму с фиксированными границами (для известных метрик).
+
+Все три структуры складываются (merge) без потери точности сводки, поэтому
+отчёты рабочих процессов объединяются в один; объекты переносятся между
+процессами pickle. Итог — компактный JSON или CSV.
+"""
+import csv
+import io
+import json
+import math
+from typing import Dict, Optional
+import numpy as np
+
+# Относительная погрешность квантилей и предельное число корзин скетча
+SKETCH_ALPHA = 0.001
+SKETCH_MAX_BUCKETS = 4096
+# Значения по модулю меньше этого порога считаются нулём
+SKETCH_MIN_VALUE = 1e-9
+# Квантили в отчёте
+REPORT_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+# Гистограммы по умолчанию: метрика -> (начало, конец, шаг)
+DEFAULT_HISTOGRAMS = {
+    "psnr": (0.0, 100.0, 1.0),
+    "ssim": (0.0, 1.0, 0.01),
+    "ber": (0.0, 0.5, 0.005),
+    "capacity_use": (0.0, 1.0, 0.05),
+}
+# Параметры, не влияющие на группу; 'key' в отчёт не попадает, только его наличие
+IGNORED_PARAMS = ("return_info",)
+
+
+class RunningStats:
+    """Среднее и дисперсия по Уэлфорду, объединение — по формуле Чана."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other: "RunningStats") -> "RunningStats":
+        if other.count:
+            total = self.count + other.count
+            delta = other.mean - self.mean
+            self.mean += delta * other.count / total
+            self.m2 += other.m2 + delta * delta * self.count * other.count / total
+            self.count = total
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def variance(self) -> float:
+        """Несмещённая дисперсия (0 для одного значения)."""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+
+class QuantileSketch:
+    """
+    Скетч квантилей с логарифмическими корзинами.
+
+    Значение x > 0 попадает в корзину ceil(log_gamma(x)), gamma = (1 + alpha) / (1 - alpha);
+    оценка квантиля — середина корзины, её относительная погрешность не больше alpha.
+    Отрицательные значения хранятся так же по модулю. При переполнении
+    сливаются самые нижние корзины (страдают только малые по модулю квантили).
+    """
+
+    def __init__(self, alpha: float = SKETCH_ALPHA, max_buckets: int = SKETCH_MAX_BUCKETS):
+        if not 0 < alpha < 1:
+            raise ValueError("'alpha' должно быть в интервале (0, 1)")
+        self.alpha = alpha
+        self.max_buckets = max_buckets
+        self._log_gamma = math.log((1 + alpha) / (1 - alpha))
+        self._inverse_log_gamma = 1 / self._log_gamma
+        self.positive = {}
+        self.negative = {}
+        self.zeros = 0
+        self.count = 0
+
+    def _index(self, value: float) -> int:
+        return math.ceil(math.log(value) * self._inverse_log_gamma)
+
+    def _value(self, index: int) -> float:
+        gamma = math.exp(self._log_gamma)
+        return 2 * gamma ** index / (gamma + 1)
+
+    def _collapse(self, buckets: dict) -> None:
+        if len(buckets) > self.max_buckets:
+            keys = sorted(buckets)
+            excess = keys[:len(keys) - self.max_buckets + 1]
+            buckets[excess[-1]] += sum(buckets.pop(key) for key in excess[:-1])
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        if abs(value) < SKETCH_MIN_VALUE:
+            self.zeros += 1
+            return
+        buckets = self.positive if value > 0 else self.negative
+        index = self._index(abs(value))
+        buckets[index] = buckets.get(index, 0) + 1
+        if len(buckets) > self.max_buckets:
+            self._collapse(buckets)
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        if other.alpha != self.alpha:
+            raise ValueError("Нельзя объединить скетчи с разной погрешностью 'alpha'")
+        for buckets, others in ((self.positive, other.positive), (self.negative, other.negative)):
+            for index, count in others.items():
+                buckets[index] = buckets.get(index, 0) + count
+            self._collapse(buckets)
+        self.zeros += other.zeros
+        self.count += other.count
+        return self
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Квантиль уровня q (0..1) или None для пустого скетча."""
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        for index in sorted(self.negative, reverse=True):
+            seen += self.negative[index]
+            if seen > rank:
+                return -self._value(index)
+        seen += self.zeros
+        if seen > rank:
+            return 0.0
+        for index in sorted(self.positive):
+            seen += self.positive[index]
+            if seen > rank:
+                return self._value(index)
+        return self._value(max(self.positive))
+
+
+class Histogram:
+    """Гистограмма с равными корзинами шага step на [start, stop] (stop — в последней), с выходами за границы."""
+
+    def __init__(self, start: float, stop: float, step: float):
+        self.start, self.stop, self.step = start, stop, step
+        self.counts = np.zeros(int(round((stop - start) / step)), dtype=np.int64)
+        self.underflow = 0
+        self.overflow = 0
+
+    def add(self, value: float) -> None:
+        if value < self.start:
+            self.underflow += 1
+        elif value > self.stop:
+            self.overflow += 1
+        else:
+            self.counts[min(int((value - self.start) / self.step), self.counts.size - 1)] += 1
+
+    def merge(self, other: "Histogram") -> "Histogram":
+        if (other.start, other.stop, other.step) != (self.start, self.stop, self.step):
+            raise ValueError("Нельзя объединить гистограммы с разными границами")
+        self.counts += other.counts
+        self.underflow += other.underflow
+        self.overflow += other.overflow
+        return self
+
+    def to_dict(self) -> Dict:
+        return {"start": self.start, "stop": self.stop, "step": self.step,
+                "counts": self.counts.tolist(), "underflow": self.underflow, "overflow": self.overflow}
+
+
+class MetricSummary:
+    """Сводка одной метрики: статистики, скетч квантилей и (если задана) гистограмма."""
+
+    def __init__(self, histogram=None, alpha: float = SKETCH_ALPHA):
+        self.stats = RunningStats()
+        self.sketch = QuantileSketch(alpha)
+        self.histogram = Histogram(*histogram) if histogram else None
+        # Бесконечные значения (PSNR одинаковых изображений) считаются отдельно
+        self.infinite = 0
+
+    def add(self, value: float) -> None:
+        if math.isnan(value):
+            return
+        if math.isinf(value):
+            self.infinite += 1
+            return
+        self.stats.add(value)
+        self.sketch.add(value)
+        if self.histogram is not None:
+            self.histogram.add(value)
+
+    def merge(self, other: "MetricSummary") -> "MetricSummary":
+        self.stats.merge(other.stats)
+        self.sketch.merge(other.sketch)
+        if self.histogram is not None and other.histogram is not None:
+            self.histogram.merge(other.histogram)
+        self.infinite += other.infinite
+        return self
+
+    def to_dict(self) -> Dict:
+        stats = self.stats
+        result = {
+            "count": stats.count,
+            "infinite": self.infinite,
+            "mean": stats.mean if stats.count else None,
+            "std": math.sqrt(stats.variance) if stats.count else None,
+            "min": stats.min if stats.count else None,
+            "max": stats.max if stats.count else None,
+        }
+        for q in REPORT_QUANTILES:
+            result[f"p{round(q * 100):02d}"] = self.sketch.quantile(q)
+        if self.histogram is not None:
+            result["histogram"] = self.histogram.to_dict()
+        return result
+
+
+def params_label(params: Optional[dict]) -> str:
+    """Подпись набора параметров для группы: отсортированные пары без IGNORED_PARAMS, ключ скрыт."""
+    if not params:
+        return ""
+    items = []
+    for name in sorted(params):
+        if name in IGNORED_PARAMS:
+            continue
+        value = "*" if name == "key" and params[name] is not None else params[name]
+        items.append(f"{name}={value}")
+    return ",".join(items)
+
+
+class QualityReport:
+    """
+    Сводный отчёт по группам (метод, параметры).
+
+    add() принимает словарь метрик одной пары (например, из
+    calculate_image_metrics или footprint_image_metrics) и учитывает только
+    числовые значения. Гистограммы строятся для метрик из histograms
+    (по умолчанию DEFAULT_HISTOGRAMS), скетч и статистики — для всех.
+    """
+
+    def __init__(self, histograms: Optional[Dict] = None, alpha: float = SKETCH_ALPHA):
+        self.histograms = DEFAULT_HISTOGRAMS if histograms is None else histograms
+        self.alpha = alpha
+        self.groups = {}
+
+    def add(self, method: str, params: Optional[dict], metrics: Dict) -> None:
+        group = self.groups.setdefault((method, params_label(params)), {})
+        for name, value in metrics.items():
+            if isinstance(value, (bool, np.bool_)) or not isinstance(value, (int, float, np.integer, np.floating)):
+                continue
+            if name not in group:
+                group[name] = MetricSummary(self.histograms.get(name), self.alpha)
+            group[name].add(float(value))
+
+    def merge(self, other: "QualityReport") -> "QualityReport":
+        """Добавляет сводки другого отчёта (например, из рабочего процесса)."""
+        for key, metrics in other.groups.items():
+            group = self.groups.setdefault(key, {})
+            for name, summary in metrics.items():
+                if name in group:
+                    group[name].merge(summary)
+                else:
+                    group[name] = MetricSummary(self.histograms.get(name), self.alpha).merge(summary)
+        return self
+
+    def to_dict(self) -> Dict:
+        return {"groups": [
+            {"method": method, "params": label,
+             "metrics": {name: summary.to_dict() for name, summary in sorted(metrics.items())}}
+            for (method, label), metrics in sorted(self.groups.items())
+        ]}
+
+    def to_json(self, indent: Optional[int] = None) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=indent)
+
+    def to_csv(self) -> str:
+        """Строка на каждую пару (группа, метрика), без гистограмм."""
+        columns = ["count", "infinite", "mean", "std", "min", "max"] + \
+                  [f"p{round(q * 100):02d}" for q in REPORT_QUANTILES]
+        output = io.StringIO()
+        writer = csv.writer(output, lineterminator="\n")
+        writer.writerow(["method", "params", "metric"] + columns)
+        for group in self.to_dict()["groups"]:
+            for name, summary in group["metrics"].items():
+                row = ["" if summary[column] is None else summary[column] for column in columns]
+                writer.writerow([group["method"], group["params"], name] + row)
+        return output.getvalue()
@@ -0,0 +1,276 @@
+"""
+Проверка устойчивости методов к атакам (этап 9 плана).
+
+Для каждого контейнера и каждой конфигурации (метод, параметры) секрет
+встраивается один раз, затем к стего применяется сетка атак: сжатие JPEG,
+гауссов шум, масштабирование, обрезка, размытие. После каждой атаки секрет
+извлекается и сравнивается с исходным по BER (utils.bit_metrics). Результаты
+сводятся в QualityReport (utils.quality_report) по группам
+(метод, параметры + атака), так что в памяти нет результатов по изображениям.
+
+Секрет-изображение (uint8) даёт точный BER: извлечение возвращает сырые
+байты. У текста извлечение декодирует UTF-8 с заменой испорченных
+последовательностей, поэтому BER по тексту — оценка. Seed гауссова шума
+выводится из хеша стего: шум у каждого изображения свой, но воспроизводимый.
+
+Задачи (контейнер x конфигурация) раздаются пулу процессов. С cache_dir
+атакованные изображения сохраняются по хешу содержимого стего и описанию
+атаки, а результаты — по хешу контейнера, конфигурации, секрета и атаки:
+повторный запуск пересчитывает только новые сочетания и не встраивает
+заново то, что уже посчитано.
+"""
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+import cv2
+from watermark.embedding import embed
+from watermark.extraction import extract
+from .bit_metrics import bit_error_metrics
+from .image_metrics import calculate_psnr
+from .quality_report import QualityReport, params_label
+
+# Сетка атак по умолчанию: (атака, параметры)
+DEFAULT_GRID = (
+    ("none", {}),
+    ("jpeg", {"quality": 90}), ("jpeg", {"quality": 75}), ("jpeg", {"quality": 50}),
+    ("noise", {"sigma": 1.0}), ("noise", {"sigma": 3.0}), ("noise", {"sigma": 8.0}),
+    ("scale", {"factor": 0.75}), ("scale", {"factor": 0.5}),
+    ("crop", {"fraction": 0.05}), ("crop", {"fraction": 0.1}),
+    ("blur", {"sigma": 0.5}), ("blur", {"sigma": 1.0}),
+)
+
+
+def _jpeg(image: np.ndarray, quality: int = 75) -> np.ndarray:
+    """Сжатие JPEG с заданным качеством и обратное декодирование."""
+    ok, encoded = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, int(quality)])
+    if not ok:
+        raise ValueError("Не удалось сжать изображение в JPEG")
+    return cv2.imdecode(encoded, cv2.IMREAD_UNCHANGED).reshape(image.shape)
+
+
+@lru_cache(maxsize=4)
+def _standard_noise(shape: tuple, seed: int) -> np.ndarray:
+    """Поле стандартного нормального шума float32 для формы и seed (общее для атак с разной sigma)."""
+    field = np.random.default_rng(seed).standard_normal(shape, dtype=np.float32)
+    field.setflags(write=False)
+    return field
+
+
+def _noise(image: np.ndarray, sigma: float = 3.0, seed: int = 0) -> np.ndarray:
+    """Аддитивный гауссов шум; seed делает атаку воспроизводимой (и кэшируемой)."""
+    noisy = image + np.float32(sigma) * _standard_noise(image.shape, seed)
+    return np.clip(np.rint(noisy), 0, 255).astype(np.uint8)
+
+
+def _scale(image: np.ndarray, factor: float = 0.5) -> np.ndarray:
+    """Уменьшение в factor раз и возврат к исходному размеру."""
+    height, width = image.shape[:2]
+    size = (max(1, round(width * factor)), max(1, round(height * factor)))
+    small = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+    return cv2.resize(small, (width, height), interpolation=cv2.INTER_LINEAR).reshape(image.shape)
+
+
+def _crop(image: np.ndarray, fraction: float = 0.1) -> np.ndarray:
+    """Обрезка доли fraction с каждого края; геометрия сохраняется, края заполняются нулями."""
+    height, width = image.shape[:2]
+    dy, dx = int(height * fraction), int(width * fraction)
+    result = np.zeros_like(image)
+    result[dy:height - dy, dx:width - dx] = image[dy:height - dy, dx:width - dx]
+    return result
+
+
+def _blur(image: np.ndarray, sigma: float = 1.0) -> np.ndarray:
+    """Гауссово размытие."""
+    return cv2.GaussianBlur(image, (0, 0), sigma).reshape(image.shape)
+
+
+ATTACKS = {
+    "none": lambda image: image,
+    "jpeg": _jpeg,
+    "noise": _noise,
+    "scale": _scale,
+    "crop": _crop,
+    "blur": _blur,
+}
+
+
+def _seeded(name: str, params: dict, stego_digest: str) -> dict:
+    """Параметры атаки с seed шума из хеша стего: у каждого изображения свой шум, но воспроизводимый."""
+    if name != "noise" or "seed" in params:
+        return params
+    return dict(params, seed=int(stego_digest[:8], 16))
+
+
+def attack_label(name: str, params: Optional[dict] = None) -> str:
+    """Подпись атаки для отчёта, например 'jpeg(quality=50)'."""
+    return f"{name}({params_label(params)})" if params else name
+
+
+def attack_image(image: np.ndarray, name: str, params: Optional[dict] = None) -> np.ndarray:
+    """Применяет атаку name из ATTACKS к изображению uint8."""
+    if name not in ATTACKS:
+        raise ValueError(f"Атака '{name}' не поддерживается")
+    return ATTACKS[name](image, **(params or {}))
+
+
+def _digest(*parts) -> str:
+    """Хеш содержимого: массивы — по форме, типу и байтам, остальное — по repr."""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        if isinstance(part, np.ndarray):
+            digest.update(repr((part.shape, part.dtype.str)).encode())
+            digest.update(np.ascontiguousarray(part).view(np.uint8))
+        else:
+            digest.update(repr(part).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _save_atomic(path: str, write) -> None:
+    """Запись через временный файл: параллельные процессы не увидят недописанный файл."""
+    temporary = f"{path}.{os.getpid()}.tmp"
+    write(temporary)
+    os.replace(temporary, path)
+
+
+class AttackCache:
+    """Кэш на диске: атакованные изображения (.npy) и результаты извлечения (.json)."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(os.path.join(directory, "attacked"), exist_ok=True)
+        os.makedirs(os.path.join(directory, "results"), exist_ok=True)
+
+    def attacked(self, stego: np.ndarray, stego_digest: str, name: str, params: dict) -> np.ndarray:
+        """Атакованное стего из кэша или после атаки; stego_digest — _digest(stego), считается один раз."""
+        path = os.path.join(self.directory, "attacked", _digest(stego_digest, name, sorted(params.items())) + ".npy")
+        if os.path.exists(path):
+            return np.load(path)
+        image = attack_image(stego, name, params)
+
+        def write(temporary):
+            with open(temporary, "wb") as file:
+                np.save(file, image)
+        _save_atomic(path, write)
+        return image
+
+    def result_path(self, key: str) -> str:
+        return os.path.join(self.directory, "results", key + ".json")
+
+    def load_result(self, key: str) -> Optional[Dict]:
+        path = self.result_path(key)
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as file:
+            return json.load(file)
+
+    def save_result(self, key: str, metrics: Dict) -> None:
+        def write(temporary):
+            with open(temporary, "w", encoding="utf-8") as file:
+                json.dump(metrics, file)
+        _save_atomic(self.result_path(key), write)
+
+
+def _payload(secret) -> np.ndarray:
+    """Байты секрета для сравнения."""
+    if isinstance(secret, str):
+        return np.frombuffer(secret.encode("utf-8"), dtype=np.uint8)
+    return np.asarray(secret, dtype=np.uint8).reshape(-1)
+
+
+def _extraction_params(params: dict, secret) -> dict:
+    """Параметры извлечения: длина текста в байтах или форма секрета-изображения."""
+    if isinstance(secret, str):
+        return params if params.get("codec") else dict(params, length=len(secret.encode("utf-8")))
+    return params if params.get("image_codec") else dict(params, secret_shape=secret.shape)
+
+
+def _attack_metrics(stego: np.ndarray, attacked: np.ndarray, method: str, params: dict, secret) -> Dict:
+    """BER извлечённого секрета и PSNR атакованного стего; неудачное извлечение — failed = 1."""
+    metrics = {"attack_psnr": calculate_psnr(stego, attacked)}
+    try:
+        extracted = extract(attacked, _extraction_params(params, secret), method=method)
+    except Exception:
+        metrics["failed"] = 1.0
+        return metrics
+    errors = bit_error_metrics(_payload(secret), _payload(extracted))
+    metrics.update(failed=0.0, ber=errors["ber"], byte_error_rate=errors["byte_error_rate"])
+    return metrics
+
+
+def _load_cover(cover) -> np.ndarray:
+    if isinstance(cover, np.ndarray):
+        return cover
+    image = cv2.imread(cover, cv2.IMREAD_UNCHANGED)
+    if image is None:
+        raise ValueError(f"Не удалось прочитать контейнер: {cover}")
+    return image
+
+
+def _run_task(task) -> List[Tuple[str, dict, Dict]]:
+    """Один контейнер и одна конфигурация: встраивание и все атаки сетки."""
+    cover, method, params, secret, grid, cache_dir = task
+    cover = _load_cover(cover)
+    cache = AttackCache(cache_dir) if cache_dir else None
+    # Ключ — по настоящим параметрам: params_label скрывает key LSB и годится только для подписи
+    base_key = _digest(cover, method, sorted(params.items()), _payload(secret), isinstance(secret, str))
+    rows = []
+    stego = stego_digest = None
+    for name, attack_params in grid:
+        key = _digest(base_key, name, sorted(attack_params.items()))
+        metrics = cache.load_result(key) if cache else None
+        if metrics is None:
+            if stego is None:
+                stego = embed(cover, secret, dict(params), method=method)
+                stego_digest = _digest(stego)
+            seeded = _seeded(name, attack_params, stego_digest)
+            if cache:
+                attacked = cache.attacked(stego, stego_digest, name, seeded)
+            else:
+                attacked = attack_image(stego, name, seeded)
+            metrics = _attack_metrics(stego, attacked, method, params, secret)
+            if cache:
+                cache.save_result(key, metrics)
+        rows.append((method, dict(params, attack=attack_label(name, attack_params)), metrics))
+    return rows
+
+
+def run_robustness(covers: Iterable, secret, configs: Iterable[Tuple[str, dict]], grid=DEFAULT_GRID,
+                   cache_dir: Optional[str] = None, workers: int = 1,
+                   report: Optional[QualityReport] = None) -> QualityReport:
+    """
+    Прогон сетки атак по набору контейнеров.
+
+    Args:
+        covers: изображения (np.ndarray) или пути к файлам
+        secret: секрет — строка или изображение uint8 (точный BER)
+        configs: конфигурации (метод, параметры встраивания)
+        grid: сетка атак (атака, параметры), см. DEFAULT_GRID и ATTACKS
+        cache_dir: каталог кэша атакованных изображений и результатов (None — без кэша)
+        workers: число процессов (1 — в текущем процессе)
+        report: отчёт, в который добавлять результаты (None — новый)
+
+    Returns:
+        QualityReport с группами (метод, параметры + 'attack') и метриками
+        'ber', 'byte_error_rate', 'failed' (доля неудачных извлечений), 'attack_psnr'
+    """
+    report = QualityReport() if report is None else report
+    grid = tuple((name, dict(params)) for name, params in grid)
+    for name, _ in grid:
+        if name not in ATTACKS:
+            raise ValueError(f"Атака '{name}' не поддерживается")
+    configs = [(method, dict(params)) for method, params in configs]
+    tasks = ((cover, method, params, secret, grid, cache_dir) for cover in covers for method, params in configs)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for rows in executor.map(_run_task, tasks, chunksize=4):
+                for method, params, metrics in rows:
+                    report.add(method, params, metrics)
+    else:
+        for task in tasks:
+            for method, params, metrics in _run_task(task):
+                report.add(method, params, metrics)
+    return report
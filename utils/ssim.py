@@ -0,0 +1,201 @@
+"""
+Быстрый расчёт SSIM и MS-SSIM.
+
+Все вычисления во float32. Гауссово окно 11x11 (σ = 1.5) применяется как
+два одномерных прохода (cv2.sepFilter2D), квадраты и произведение изображений
+пишутся в один переиспользуемый буфер, результаты фильтрации — в заранее
+выделенные массивы. Вариант с прямоугольным окном считает суммы по окну
+из интегрального изображения: четыре обращения на пиксель при любом размере окна.
+
+Режим downsample — стандартное уменьшение до ~256 пикселей по меньшей стороне
+перед расчётом (усреднение блоками f x f, f = round(min(H, W) / 256)), как
+в эталонной реализации Wang et al. MS-SSIM — пятимасштабный вариант с весами
+из Wang, Simoncelli, Bovik (2003).
+"""
+import numpy as np
+import cv2
+
+# Параметры гауссова окна (как у исходного calculate_ssim)
+GAUSSIAN_SIZE = 11
+GAUSSIAN_SIGMA = 1.5
+# Размер прямоугольного окна по умолчанию (как у skimage.metrics)
+BOX_SIZE = 7
+# Высота полосы при разностях по интегральному изображению
+BOX_CHUNK_ROWS = 64
+WINDOWS = ("gaussian", "box")
+# Динамический диапазон и константы стабилизации
+DATA_RANGE = 255.0
+C1 = (0.01 * DATA_RANGE) ** 2
+C2 = (0.03 * DATA_RANGE) ** 2
+# Меньшая сторона изображения после уменьшения в режиме downsample
+DOWNSAMPLE_TARGET = 256
+# Веса масштабов MS-SSIM
+MS_SSIM_WEIGHTS = (0.0448, 0.2856, 0.3001, 0.2363, 0.1333)
+
+
+def to_gray(image: np.ndarray) -> np.ndarray:
+    """Яркость float32: цветное изображение переводится как BGR (как в calculate_ssim)."""
+    if image.ndim == 3:
+        if image.dtype not in (np.uint8, np.uint16):
+            image = image.astype(np.float32)
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    return image.astype(np.float32)
+
+
+def _box_sum(src: np.ndarray, size: int, out: np.ndarray) -> np.ndarray:
+    """
+    Среднее по окну size x size через интегральное изображение.
+
+    Интегральное изображение float64 (без потери точности на больших суммах);
+    разности по углам считаются полосами по BOX_CHUNK_ROWS строк в одном буфере.
+    """
+    radius = size // 2
+    padded = cv2.copyMakeBorder(src, radius, radius, radius, radius, cv2.BORDER_REFLECT_101)
+    integral = cv2.integral(padded, sdepth=cv2.CV_64F)
+    h, w = src.shape
+    columns = np.empty((min(BOX_CHUNK_ROWS, h) + size, w), dtype=np.float64)
+    sums = np.empty((min(BOX_CHUNK_ROWS, h), w), dtype=np.float64)
+    for row in range(0, h, BOX_CHUNK_ROWS):
+        n = min(BOX_CHUNK_ROWS, h - row)
+        # Суммы по горизонтальному окну, затем разность по вертикали
+        band = np.subtract(integral[row:row + n + size, size:size + w], integral[row:row + n + size, :w],
+                           out=columns[:n + size])
+        window = np.subtract(band[size:], band[:n], out=sums[:n])
+        np.multiply(window, 1.0 / size ** 2, out=out[row:row + n], casting="unsafe")
+    return out
+
+
+def _window_filter(window: str, size: int):
+    """Функция локального усреднения filter(src, out) для выбранного окна."""
+    if window not in WINDOWS:
+        raise ValueError(f"Неизвестное окно '{window}', допустимо: {', '.join(WINDOWS)}")
+    if size < 1 or size % 2 == 0:
+        raise ValueError("Размер окна должен быть нечётным и положительным")
+    if window == "box":
+        return lambda src, out: _box_sum(src, size, out)
+    kernel = cv2.getGaussianKernel(size, GAUSSIAN_SIGMA, cv2.CV_32F)
+    return lambda src, out: cv2.sepFilter2D(src, cv2.CV_32F, kernel, kernel, dst=out,
+                                            borderType=cv2.BORDER_REFLECT_101)
+
+
+def _ssim_maps(x: np.ndarray, y: np.ndarray, window: str, size: int):
+    """
+    Карты яркостной составляющей и контраста-структуры (cs).
+
+    SSIM = luminance * cs. Все промежуточные массивы float32,
+    после фильтрации они переиспользуются под результат.
+    """
+    smooth = _window_filter(window, size)
+    mu1, mu2 = smooth(x, np.empty_like(x)), smooth(y, np.empty_like(y))
+    product = np.empty_like(x)
+    sigma11 = smooth(np.multiply(x, x, out=product), np.empty_like(x))
+    sigma22 = smooth(np.multiply(y, y, out=product), np.empty_like(x))
+    sigma12 = smooth(np.multiply(x, y, out=product), np.empty_like(x))
+    # product: μ1μ2; sigma*: дисперсии и ковариация
+    np.multiply(mu1, mu2, out=product)
+    np.square(mu1, out=mu1)
+    np.square(mu2, out=mu2)
+    sigma11 -= mu1
+    sigma22 -= mu2
+    sigma12 -= product
+    # cs = (2σ12 + C2) / (σ1² + σ2² + C2)
+    sigma12 *= 2
+    sigma12 += C2
+    sigma11 += sigma22
+    sigma11 += C2
+    cs = np.divide(sigma12, sigma11, out=sigma12)
+    # luminance = (2μ1μ2 + C1) / (μ1² + μ2² + C1)
+    product *= 2
+    product += C1
+    mu1 += mu2
+    mu1 += C1
+    luminance = np.divide(product, mu1, out=product)
+    return luminance, cs
+
+
+def window_size(window: str, win_size=None) -> int:
+    """Размер окна: заданный или по умолчанию для окна (11 для 'gaussian', 7 для 'box')."""
+    if win_size is not None:
+        return int(win_size)
+    return GAUSSIAN_SIZE if window == "gaussian" else BOX_SIZE
+
+
+def downsample_factor(shape) -> int:
+    """Коэффициент уменьшения для режима downsample: round(min(H, W) / 256), не меньше 1."""
+    return max(1, int(round(min(shape[:2]) / DOWNSAMPLE_TARGET)))
+
+
+def _downsample(gray: np.ndarray, factor: int) -> np.ndarray:
+    """Усреднение блоками factor x factor (неполные крайние блоки отбрасываются)."""
+    if factor == 1:
+        return gray
+    h, w = gray.shape[0] // factor, gray.shape[1] // factor
+    return cv2.resize(gray[:h * factor, :w * factor], (w, h), interpolation=cv2.INTER_AREA)
+
+
+def ssim_map(original: np.ndarray, compared: np.ndarray, window: str = "gaussian",
+             win_size=None, downsample: bool = False) -> np.ndarray:
+    """
+    Карта SSIM (float32) по яркости двух изображений.
+
+    Args:
+        original: Исходное изображение
+        compared: Изображение для сравнения той же формы
+        window: 'gaussian' (11x11, σ = 1.5) или 'box' (интегральное изображение)
+        win_size: размер окна (нечётный), по умолчанию 11 или 7
+        downsample: уменьшить до ~256 пикселей по меньшей стороне перед расчётом
+
+    Returns:
+        Массив float32 той же высоты и ширины (после уменьшения, если оно включено)
+    """
+    if original.shape != compared.shape:
+        raise ValueError(f"Размеры изображений не совпадают: {original.shape} != {compared.shape}")
+    x, y = to_gray(original), to_gray(compared)
+    if downsample:
+        factor = downsample_factor(x.shape)
+        x, y = _downsample(x, factor), _downsample(y, factor)
+    return gray_ssim_map(x, y, window, win_size)
+
+
+def gray_ssim_map(x: np.ndarray, y: np.ndarray, window: str = "gaussian", win_size=None) -> np.ndarray:
+    """Карта SSIM для уже переведённых в яркость float32 массивов (см. to_gray)."""
+    luminance, cs = _ssim_maps(x, y, window, window_size(window, win_size))
+    return np.multiply(luminance, cs, out=luminance)
+
+
+def ssim(original: np.ndarray, compared: np.ndarray, window: str = "gaussian",
+         win_size=None, downsample: bool = False) -> float:
+    """SSIM — среднее карты ssim_map (параметры те же)."""
+    return float(ssim_map(original, compared, window, win_size, downsample).mean(dtype=np.float64))
+
+
+def ms_ssim(original: np.ndarray, compared: np.ndarray, window: str = "gaussian",
+            win_size=None, weights=MS_SSIM_WEIGHTS) -> float:
+    """
+    Многомасштабный SSIM.
+
+    На каждом масштабе, кроме последнего, берётся среднее cs, на последнем —
+    полный SSIM; между масштабами изображения уменьшаются вдвое усреднением 2x2.
+    Отрицательные средние обрезаются нулём, чтобы дробные степени были определены.
+
+    Raises:
+        ValueError: Если меньшая сторона не больше (win_size - 1) * 2^(масштабов - 1)
+    """
+    if original.shape != compared.shape:
+        raise ValueError(f"Размеры изображений не совпадают: {original.shape} != {compared.shape}")
+    size = window_size(window, win_size)
+    min_side = (size - 1) * 2 ** (len(weights) - 1)
+    if min(original.shape[:2]) <= min_side:
+        raise ValueError(f"Для MS-SSIM с {len(weights)} масштабами меньшая сторона "
+                         f"должна быть больше {min_side} пикселей")
+    x, y = to_gray(original), to_gray(compared)
+    result = 1.0
+    for level, weight in enumerate(weights):
+        luminance, cs = _ssim_maps(x, y, window, size)
+        if level == len(weights) - 1:
+            value = np.multiply(luminance, cs, out=cs).mean(dtype=np.float64)
+        else:
+            value = cs.mean(dtype=np.float64)
+            x, y = _downsample(x, 2), _downsample(y, 2)
+        result *= max(float(value), 0.0) ** weight
+    return float(result)
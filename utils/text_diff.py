@@ -0,0 +1,246 @@
+"""
+Посимвольный diff алгоритмом Майерса O(ND) в линейной памяти.
+
+difflib.SequenceMatcher ищет самый длинный общий блок перебором и на
+длинных строках без переводов строк (восстановленный секрет — обычно одна
+длинная строка) работает квадратично, а частые символы считает мусором
+(autojunk) и теряет совпадения. Здесь кратчайший сценарий правки ищется
+алгоритмом Майерса: время O((n + m) * D) для D правок, память линейная —
+средняя «змея» (встречный поиск с двух концов) делит задачу пополам.
+
+Участки совпадений («змеи») сравниваются не по символу, а срезами
+удваивающейся длины с двоичным поиском границы, так что длинные совпадения
+проходятся сравнением памяти, а не циклом Python. Общие префикс и суффикс
+отбрасываются так же.
+
+max_edits ограничивает глубину поиска в каждой подзадаче. Если встречные
+поиски не сошлись за max_edits / 2 шагов, задача делится в самой дальней
+достигнутой точке прямого поиска (как эвристика too_expensive в GNU diff):
+сценарий остаётся корректным, но может быть не кратчайшим, зато время
+ограничено и при очень сильно испорченном тексте.
+
+max_total_edits ограничивает суммарную глубину поиска во всех подзадачах:
+без него на непохожих строках (мусор при неверном ключе) время растёт как
+O(N * D). Когда бюджет исчерпан, оставшиеся подзадачи только обрезаются по
+общим префиксу и суффиксу, а остаток каждой становится одной заменой.
+"""
+from typing import List, Sequence, Tuple
+
+# Ограничение длины сценария правки в одной подзадаче по умолчанию
+DEFAULT_MAX_EDITS = 64
+# Суммарная глубина поиска во всех подзадачах по умолчанию
+DEFAULT_MAX_TOTAL_EDITS = 1 << 14
+
+
+def forward_match(a: Sequence, b: Sequence, i: int, j: int, limit: int) -> int:
+    """Длина общего префикса a[i:i + limit] и b[j:j + limit]."""
+    if limit <= 0 or a[i] != b[j]:
+        return 0
+    low, step = 1, 1
+    # Удваиваем шаг, пока срезы совпадают, затем ищем границу делением пополам
+    while low < limit:
+        high = min(low + step, limit)
+        if a[i + low:i + high] != b[j + low:j + high]:
+            while high - low > 1:
+                middle = (low + high) // 2
+                if a[i + low:i + middle] == b[j + low:j + middle]:
+                    low = middle
+                else:
+                    high = middle
+            return low
+        low = high
+        step *= 2
+    return low
+
+
+def backward_match(a: Sequence, b: Sequence, i: int, j: int, limit: int) -> int:
+    """Длина общего суффикса a[i - limit:i] и b[j - limit:j]."""
+    if limit <= 0 or a[i - 1] != b[j - 1]:
+        return 0
+    low, step = 1, 1
+    while low < limit:
+        high = min(low + step, limit)
+        if a[i - high:i - low] != b[j - high:j - low]:
+            while high - low > 1:
+                middle = (low + high) // 2
+                if a[i - middle:i - low] == b[j - middle:j - low]:
+                    low = middle
+                else:
+                    high = middle
+            return low
+        low = high
+        step *= 2
+    return low
+
+
+def _split_point(a: Sequence, b: Sequence, a_lo: int, a_hi: int, b_lo: int, b_hi: int, max_edits: int):
+    """
+    Точка деления подзадачи: конец средней змеи (встречные поиски сошлись)
+    или, если поиск длиннее max_edits / 2 шагов, самая дальняя точка прямого поиска.
+
+    Returns:
+        (точка деления или None, длина просмотренного сценария правки)
+    """
+    n, m = a_hi - a_lo, b_hi - b_lo
+    max_d = min((n + m + 1) // 2, max(1, max_edits // 2))
+    offset = max_d + 1
+    forward = [-1] * (2 * offset + 1)
+    backward = [-1] * (2 * offset + 1)
+    forward[offset + 1] = 0
+    backward[offset + 1] = 0
+    delta = n - m
+    odd = delta % 2 != 0
+    # Диагонали, вышедшие за границы подзадачи, дальше не рассматриваются
+    k1start = k1end = k2start = k2end = 0
+    for d in range(max_d):
+        for k1 in range(-d + k1start, d + 1 - k1end, 2):
+            index = offset + k1
+            if k1 == -d or (k1 != d and forward[index - 1] < forward[index + 1]):
+                x1 = forward[index + 1]
+            else:
+                x1 = forward[index - 1] + 1
+            y1 = x1 - k1
+            if x1 < n and y1 < m:
+                x1 += forward_match(a, b, a_lo + x1, b_lo + y1, min(n - x1, m - y1))
+                y1 = x1 - k1
+            forward[index] = x1
+            if x1 > n:
+                k1end += 2
+            elif y1 > m:
+                k1start += 2
+            elif odd:
+                other = offset + delta - k1
+                if 0 <= other < len(backward) and backward[other] != -1 and x1 >= n - backward[other]:
+                    return (x1, y1), 2 * d + 1
+        for k2 in range(-d + k2start, d + 1 - k2end, 2):
+            index = offset + k2
+            if k2 == -d or (k2 != d and backward[index - 1] < backward[index + 1]):
+                x2 = backward[index + 1]
+            else:
+                x2 = backward[index - 1] + 1
+            y2 = x2 - k2
+            if x2 < n and y2 < m:
+                x2 += backward_match(a, b, a_hi - x2, b_hi - y2, min(n - x2, m - y2))
+                y2 = x2 - k2
+            backward[index] = x2
+            if x2 > n:
+                k2end += 2
+            elif y2 > m:
+                k2start += 2
+            elif not odd:
+                other = offset + delta - k2
+                if 0 <= other < len(forward) and forward[other] != -1 and forward[other] >= n - x2:
+                    x1 = forward[other]
+                    return (x1, x1 - (other - offset)), 2 * d + 2
+    # Поиск слишком длинный: делим в точке прямого поиска, продвинувшейся дальше всех
+    best = None
+    for k1 in range(-max_d, max_d + 1):
+        x1 = forward[offset + k1]
+        y1 = x1 - k1
+        if x1 != -1 and x1 <= n and 0 <= y1 <= m and 0 < x1 + y1 < n + m and (best is None or x1 + y1 > sum(best)):
+            best = (x1, y1)
+    return best, 2 * max_d
+
+
+def bounded_diff(a: Sequence, b: Sequence, max_edits: int = DEFAULT_MAX_EDITS,
+                 max_total_edits: int = DEFAULT_MAX_TOTAL_EDITS) -> Tuple[List[Tuple[str, int, int, int, int]], bool]:
+    """
+    Сценарий правки a -> b и признак того, что бюджет поиска не исчерпан.
+
+    Args:
+        a: исходная последовательность (строка или список)
+        b: последовательность для сравнения
+        max_edits: ограничение длины поиска в одной подзадаче (см. описание модуля)
+        max_total_edits: суммарное ограничение длины поиска во всех подзадачах
+
+    Returns:
+        (список (тег, i1, i2, j1, j2), True, если все подзадачи просмотрены поиском)
+    """
+    if max_edits < 1:
+        raise ValueError("'max_edits' должно быть положительным")
+    if max_total_edits < 1:
+        raise ValueError("'max_total_edits' должно быть положительным")
+    # Совпадающие участки (i, j, длина) по порядку; подзадачи — в стеке, левая сверху
+    matches = []
+    stack = [(0, len(a), 0, len(b))]
+    budget, complete = max_total_edits, True
+    while stack:
+        a_lo, a_hi, b_lo, b_hi = stack.pop()
+        prefix = forward_match(a, b, a_lo, b_lo, min(a_hi - a_lo, b_hi - b_lo))
+        if prefix:
+            matches.append((a_lo, b_lo, prefix))
+            a_lo, b_lo = a_lo + prefix, b_lo + prefix
+        suffix = backward_match(a, b, a_hi, b_hi, min(a_hi - a_lo, b_hi - b_lo))
+        split = None
+        if a_lo < a_hi - suffix and b_lo < b_hi - suffix:
+            if budget > 0:
+                split, spent = _split_point(a, b, a_lo, a_hi - suffix, b_lo, b_hi - suffix, max_edits)
+                budget -= spent
+            else:
+                # Бюджет исчерпан: остаток подзадачи становится одной заменой
+                complete = False
+        if suffix:
+            stack.append((a_hi - suffix, a_hi, b_hi - suffix, b_hi))
+            a_hi, b_hi = a_hi - suffix, b_hi - suffix
+        if split is not None:
+            x, y = split
+            stack.append((a_lo + x, a_hi, b_lo + y, b_hi))
+            stack.append((a_lo, a_lo + x, b_lo, b_lo + y))
+    opcodes = []
+    i = j = 0
+    for match_i, match_j, size in matches + [(len(a), len(b), 0)]:
+        if i < match_i and j < match_j:
+            opcodes.append(('replace', i, match_i, j, match_j))
+        elif i < match_i:
+            opcodes.append(('delete', i, match_i, j, match_j))
+        elif j < match_j:
+            opcodes.append(('insert', i, match_i, j, match_j))
+        if size:
+            if opcodes and opcodes[-1][0] == 'equal':
+                opcodes[-1] = ('equal', opcodes[-1][1], match_i + size, opcodes[-1][3], match_j + size)
+            else:
+                opcodes.append(('equal', match_i, match_i + size, match_j, match_j + size))
+        i, j = match_i + size, match_j + size
+    return opcodes, complete
+
+
+def diff_opcodes(a: Sequence, b: Sequence, max_edits: int = DEFAULT_MAX_EDITS,
+                 max_total_edits: int = DEFAULT_MAX_TOTAL_EDITS) -> List[Tuple[str, int, int, int, int]]:
+    """
+    Сценарий правки a -> b в формате SequenceMatcher.get_opcodes().
+
+    Args:
+        a: исходная последовательность (строка или список)
+        b: последовательность для сравнения
+        max_edits: ограничение длины поиска в одной подзадаче (см. описание модуля)
+        max_total_edits: суммарное ограничение длины поиска во всех подзадачах
+
+    Returns:
+        Список (тег, i1, i2, j1, j2), теги 'equal', 'replace', 'delete', 'insert'
+    """
+    return bounded_diff(a, b, max_edits, max_total_edits)[0]
+
+
+def opcodes_ratio(opcodes: List[Tuple[str, int, int, int, int]], a_length: int, b_length: int) -> float:
+    """Доля совпадений 2 * M / (n + m) по готовому сценарию правки."""
+    if not a_length and not b_length:
+        return 1.0
+    matched = sum(i2 - i1 for tag, i1, i2, _, _ in opcodes if tag == 'equal')
+    return 2.0 * matched / (a_length + b_length)
+
+
+def opcodes_cost(opcodes: List[Tuple[str, int, int, int, int]]) -> int:
+    """
+    Число правок Левенштейна, которыми выполняется сценарий: участок замены
+    стоит длину большей из сторон (замены плюс вставки или удаления).
+    Это верхняя оценка расстояния Левенштейна.
+    """
+    return sum(max(i2 - i1, j2 - j1) for tag, i1, i2, j1, j2 in opcodes if tag != 'equal')
+
+
+def diff_ratio(a: Sequence, b: Sequence, max_edits: int = DEFAULT_MAX_EDITS,
+               max_total_edits: int = DEFAULT_MAX_TOTAL_EDITS) -> float:
+    """Доля совпадений 2 * M / (n + m), как SequenceMatcher.ratio(), по сценарию Майерса."""
+    if not a and not b:
+        return 1.0
+    return opcodes_ratio(diff_opcodes(a, b, max_edits, max_total_edits), len(a), len(b))
@@ -2,17 +2,20 @@
 Модуль для расчёта метрик качества текста
 """
 
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 import difflib
+from .levenshtein import levenshtein_distance
+from .text_diff import bounded_diff, diff_opcodes, diff_ratio, opcodes_cost, opcodes_ratio
 
 
-def calculate_levenshtein_distance(original: str, compared: str) -> int:
+def calculate_levenshtein_distance(original: str, compared: str, max_distance: Optional[int] = None) -> int:
     """
     Расчёт расстояния Левенштейна (Levenshtein Distance)
     
     Расстояние Левенштейна - это минимальное количество операций редактирования
     (вставка, удаление, замена символа), необходимых для преобразования
-    одной строки в другую.
+    одной строки в другую. Считается бит-параллельным алгоритмом Майерса
+    (см. utils.levenshtein), поэтому годится и для документов в сотни КБ.
     
     Типичные значения:
     - 0: строки идентичны
@@ -22,42 +25,22 @@ def calculate_levenshtein_distance(original: str, compared: str) -> int:
     Args:
         original: Исходная строка
         compared: Строка для сравнения
+        max_distance: Порог: считается только полоса |i - j| <= max_distance,
+            большее расстояние возвращается как max_distance + 1
     
     Returns:
         Расстояние Левенштейна (количество операций)
     """
-    len1, len2 = len(original), len(compared)
-    
-    # Создаём матрицу расстояний
-    dp = [[0] * (len2 + 1) for _ in range(len1 + 1)]
-    
-    # Инициализация первой строки и столбца
-    for i in range(len1 + 1):
-        dp[i][0] = i
-    for j in range(len2 + 1):
-        dp[0][j] = j
-    
-    # Заполнение матрицы
-    for i in range(1, len1 + 1):
-        for j in range(1, len2 + 1):
-            if original[i-1] == compared[j-1]:
-                dp[i][j] = dp[i-1][j-1]
-            else:
-                dp[i][j] = 1 + min(
-                    dp[i-1][j],    # удаление
-                    dp[i][j-1],    # вставка
-                    dp[i-1][j-1]   # замена
-                )
-    
-    return dp[len1][len2]
+    return levenshtein_distance(original, compared, max_distance)
 
 
 def calculate_similarity_ratio(original: str, compared: str) -> float:
     """
     Расчёт коэффициента сходства строк
     
-    Использует алгоритм SequenceMatcher из difflib для расчёта
-    степени сходства двух строк.
+    Доля совпадающих символов 2 * M / (n + m), как у difflib.SequenceMatcher,
+    но M берётся из посимвольного diff Майерса (см. utils.text_diff): он
+    не теряет совпадений на частых символах и быстр на длинных строках.
     
     Значения находятся в диапазоне [0, 1]:
     - 1.0: строки идентичны
@@ -72,7 +55,7 @@ def calculate_similarity_ratio(original: str, compared: str) -> float:
     Returns:
         Коэффициент сходства от 0 до 1
     """
-    return difflib.SequenceMatcher(None, original, compared).ratio()
+    return diff_ratio(original, compared)
 
 
 def calculate_accuracy(original: str, compared: str) -> float:
@@ -88,12 +71,22 @@ def calculate_accuracy(original: str, compared: str) -> float:
     Returns:
         Точность в процентах (0-100)
     """
-    if len(original) == 0:
-        return 100.0 if len(compared) == 0 else 0.0
-    
     distance = calculate_levenshtein_distance(original, compared)
-    accuracy = max(0, (1 - distance / len(original)) * 100)
-    return accuracy
+    return _accuracy(distance, len(original), len(compared))
+
+
+def _accuracy(distance: int, original_length: int, compared_length: int) -> float:
+    """Точность по готовому расстоянию Левенштейна."""
+    if original_length == 0:
+        return 100.0 if compared_length == 0 else 0.0
+    return max(0, (1 - distance / original_length) * 100)
+
+
+def _character_error_rate(distance: int, original_length: int, compared_length: int) -> float:
+    """CER по готовому расстоянию Левенштейна."""
+    if original_length == 0:
+        return 0.0 if compared_length == 0 else 100.0
+    return (distance / original_length) * 100
 
 
 def calculate_character_error_rate(original: str, compared: str) -> float:
@@ -115,12 +108,8 @@ def calculate_character_error_rate(original: str, compared: str) -> float:
     Returns:
         CER в процентах
     """
-    if len(original) == 0:
-        return 0.0 if len(compared) == 0 else 100.0
-    
     distance = calculate_levenshtein_distance(original, compared)
-    cer = (distance / len(original)) * 100
-    return cer
+    return _character_error_rate(distance, len(original), len(compared))
 
 
 def calculate_text_metrics(original: str, compared: str) -> Dict[str, float]:
@@ -132,13 +121,25 @@ def calculate_text_metrics(original: str, compared: str) -> Dict[str, float]:
         compared: Текст для сравнения
     
     Returns:
-        Словарь с метриками: Levenshtein, Similarity, Accuracy, CER
+        Словарь с метриками: Levenshtein, Similarity, Accuracy, CER;
+        levenshtein_exact = False, если строки настолько непохожи, что бюджет
+        diff исчерпан и вместо расстояния дана его верхняя оценка
     """
+    # Один сценарий diff даёт сходство и верхнюю оценку расстояния: с ней
+    # расстояние считается сразу в полосе нужной ширины, без её подбора.
+    # Расстояние считается один раз и используется для точности и CER.
+    # Если бюджет diff исчерпан (мусор при неверном ключе), точный счёт
+    # стоил бы O(N * D): остаётся верхняя оценка по сценарию
+    opcodes, exact = bounded_diff(original, compared)
+    distance = opcodes_cost(opcodes)
+    if exact:
+        distance = calculate_levenshtein_distance(original, compared, max_distance=distance)
     metrics = {
-        'levenshtein_distance': calculate_levenshtein_distance(original, compared),
-        'similarity_ratio': calculate_similarity_ratio(original, compared),
-        'accuracy': calculate_accuracy(original, compared),
-        'character_error_rate': calculate_character_error_rate(original, compared),
+        'levenshtein_distance': distance,
+        'levenshtein_exact': exact,
+        'similarity_ratio': opcodes_ratio(opcodes, len(original), len(compared)),
+        'accuracy': _accuracy(distance, len(original), len(compared)),
+        'character_error_rate': _character_error_rate(distance, len(original), len(compared)),
         'original_length': len(original),
         'compared_length': len(compared)
     }
@@ -175,7 +176,7 @@ def get_text_diff(original: str, compared: str, context_lines: int = 3) -> str:
 
 def get_inline_diff(original: str, compared: str) -> List[Tuple[str, str]]:
     """
-    Получить посимвольное сравнение строк
+    Получить посимвольное сравнение строк (diff Майерса, см. utils.text_diff)
     
     Возвращает список кортежей (тег, текст), где тег может быть:
     - 'equal': одинаковые символы
@@ -190,10 +191,9 @@ def get_inline_diff(original: str, compared: str) -> List[Tuple[str, str]]:
     Returns:
         Список кортежей (тег, текст)
     """
-    matcher = difflib.SequenceMatcher(None, original, compared)
     result = []
     
-    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+    for tag, i1, i2, j1, j2 in diff_opcodes(original, compared):
         if tag == 'equal':
             result.append(('equal', original[i1:i2]))
         elif tag == 'delete':
@@ -262,6 +262,7 @@ def format_metrics(metrics: Dict[str, float]) -> str:
         Отформатированная строка с метриками
     """
     distance = metrics.get('levenshtein_distance', 0)
+    bound = "" if metrics.get('levenshtein_exact', True) else "≤ "
     similarity = metrics.get('similarity_ratio', 0)
     accuracy = metrics.get('accuracy', 0)
     cer = metrics.get('character_error_rate', 0)
@@ -270,7 +271,7 @@ def format_metrics(metrics: Dict[str, float]) -> str:
     
     result = f"""Метрики качества текста:
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-Расстояние Левенштейна:  {distance} операций
+Расстояние Левенштейна:  {bound}{distance} операций
 Коэффициент сходства:    {similarity:.4f} ({similarity*100:.2f}%)
 Точность восстановления: {accuracy:.2f}%
 CER (Character Error Rate): {cer:.2f}%
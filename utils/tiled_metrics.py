@@ -0,0 +1,138 @@
+"""
+Потоковые метрики качества для изображений, не помещающихся в память.
+
+Изображения обрабатываются горизонтальными полосами: из np.memmap
+(tiled_image_metrics) или из двух итераторов полос (streaming_image_metrics),
+например при построчном декодировании. В памяти одновременно находятся
+только текущие полосы.
+
+MSE, MAE, PSNR и максимальная ошибка складываются из накопителей
+difference_sums по полосам и точно совпадают с calculate_image_metrics.
+Для SSIM полосы перекрываются на радиус окна: строки полосы досчитываются,
+когда пришли все строки, попадающие в их окно, поэтому каждая строка
+фильтруется по тем же соседям, что и в полном изображении, а края
+изображения отражаются так же. Итог совпадает с calculate_ssim с точностью
+до порядка суммирования.
+"""
+from itertools import zip_longest
+from typing import Dict, Iterable
+import numpy as np
+from .image_metrics import difference_sums, stats_from_sums, enhanced_difference
+from .ssim import to_gray, gray_ssim_map, window_size
+
+# Высота полосы по умолчанию (в строках)
+DEFAULT_TILE_ROWS = 256
+
+
+def iter_tiles(image: np.ndarray, tile_rows: int = DEFAULT_TILE_ROWS):
+    """Горизонтальные полосы по tile_rows строк; у np.memmap читаются по мере обхода."""
+    if tile_rows < 1:
+        raise ValueError("'tile_rows' должно быть положительным")
+    for row in range(0, image.shape[0], tile_rows):
+        yield np.asarray(image[row:row + tile_rows])
+
+
+class _SSIMStream:
+    """
+    Скользящий буфер строк яркости для SSIM.
+
+    В начале буфера лежат до radius уже учтённых строк (контекст сверху),
+    дальше — строки, карта для которых ещё не посчитана.
+    """
+
+    def __init__(self, window: str, win_size):
+        self.window = window
+        self.win_size = window_size(window, win_size)
+        self.radius = self.win_size // 2
+        self.x = self.y = None
+        self.context = 0
+        self.total = 0.0
+        self.count = 0
+
+    def push(self, x_rows: np.ndarray, y_rows: np.ndarray) -> None:
+        if self.x is None:
+            self.x, self.y = x_rows, y_rows
+        else:
+            self.x = np.concatenate([self.x, x_rows])
+            self.y = np.concatenate([self.y, y_rows])
+        self._flush(final=False)
+
+    def finish(self) -> float:
+        if self.x is not None:
+            self._flush(final=True)
+        return self.total / max(self.count, 1)
+
+    def _flush(self, final: bool) -> None:
+        pending = self.x.shape[0] - self.context
+        # Строки, для которых уже пришли все radius строк снизу
+        ready = pending if final else pending - self.radius
+        if ready <= 0:
+            return
+        ssim_rows = gray_ssim_map(self.x, self.y, self.window, self.win_size)[self.context:self.context + ready]
+        self.total += float(ssim_rows.sum(dtype=np.float64))
+        self.count += ssim_rows.size
+        keep = max(self.context + ready - self.radius, 0)
+        self.x, self.y = self.x[keep:].copy(), self.y[keep:].copy()
+        self.context = self.context + ready - keep
+
+
+def _merge_sums(total, sums):
+    """Складывает накопители difference_sums двух частей изображения."""
+    if total is None:
+        return sums
+    return total[0] + sums[0], total[1] + sums[1], np.maximum(total[2], sums[2]), total[3] + sums[3]
+
+
+def streaming_image_metrics(original_tiles: Iterable[np.ndarray], compared_tiles: Iterable[np.ndarray],
+                            with_ssim: bool = True, window: str = "gaussian", win_size=None,
+                            diff_out=None) -> Dict:
+    """
+    Метрики по двум потокам горизонтальных полос.
+
+    Args:
+        original_tiles: полосы исходного изображения сверху вниз
+        compared_tiles: полосы сравниваемого изображения той же высоты
+        with_ssim: считать ли SSIM (окно 'window' размера 'win_size', как в utils.ssim)
+        diff_out: массив (например, np.memmap) формы изображения для разностного
+            изображения с усиленным контрастом, как у compare_images
+
+    Returns:
+        Словарь как у calculate_image_metrics ('ssim' — только при with_ssim)
+    """
+    sums = None
+    ssim_stream = _SSIMStream(window, win_size) if with_ssim else None
+    row, width = 0, None
+    for first, second in zip_longest(original_tiles, compared_tiles):
+        if first is None or second is None:
+            raise ValueError("Количество полос у изображений не совпадает")
+        first, second = np.asarray(first), np.asarray(second)
+        if first.shape != second.shape:
+            raise ValueError(f"Размеры полос не совпадают: {first.shape} != {second.shape}")
+        if width is None:
+            width = first.shape[1:]
+        elif first.shape[1:] != width:
+            raise ValueError("Полосы одного изображения должны иметь одинаковую ширину")
+        sums = _merge_sums(sums, difference_sums(first, second))
+        if ssim_stream is not None:
+            ssim_stream.push(to_gray(first), to_gray(second))
+        if diff_out is not None:
+            diff_out[row:row + first.shape[0]] = enhanced_difference(first, second)
+        row += first.shape[0]
+    if sums is None:
+        raise ValueError("Изображения не содержат ни одной полосы")
+    metrics = stats_from_sums(*sums)
+    if ssim_stream is not None:
+        metrics['ssim'] = ssim_stream.finish()
+    return metrics
+
+
+def tiled_image_metrics(original: np.ndarray, compared: np.ndarray, tile_rows: int = DEFAULT_TILE_ROWS,
+                        **options) -> Dict:
+    """
+    Метрики для двух массивов (обычно np.memmap) с ограниченным расходом памяти.
+
+    Параметры options — как у streaming_image_metrics.
+    """
+    if original.shape != compared.shape:
+        raise ValueError(f"Размеры изображений не совпадают: {original.shape} != {compared.shape}")
+    return streaming_image_metrics(iter_tiles(original, tile_rows), iter_tiles(compared, tile_rows), **options)
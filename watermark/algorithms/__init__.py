@@ -1,6 +1,7 @@
 from . import lsb
 from . import dct
 from . import dwt
+from . import dwt_dct
 from . import cnn_autoencoder
 
-__all__ = ['lsb', 'dct', 'dwt', 'cnn_autoencoder']
+__all__ = ['lsb', 'dct', 'dwt', 'dwt_dct', 'cnn_autoencoder']
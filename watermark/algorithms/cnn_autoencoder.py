@@ -1,10 +0,0 @@
-def embed(image, secret, params):
-    # Заглушка: функция пока не реализована
-    # Можно добавить временную логику или просто pass
-    print("Метод внедрения еще не реализован.")
-    return image
-
-def extract(image, params):
-    # Заглушка: функция пока не реализована
-    print("Метод извлечения еще не реализован.")
-    return None
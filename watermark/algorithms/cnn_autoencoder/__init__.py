@@ -0,0 +1,3 @@
+from .cnn_autoencoder import embed, extract
+
+__all__ = ['embed', 'extract']
@@ -0,0 +1,56 @@
+import numpy as np
+from .cnn_text import embed_text, extract_text
+from .cnn_image import embed_image, extract_image
+
+
+def embed(image, secret, params):
+    """
+    Фасад для свёрточного автокодировщика (cnn_ae): выбирает реализацию по типу секрета.
+
+    Args:
+        image: Исходное изображение (numpy массив)
+        secret: Секрет для встраивания (str для текста, np.ndarray для изображения)
+        params: Словарь параметров алгоритма:
+            - 'weights': путь к .npz с весами кодировщика и декодера
+              (по умолчанию аналитическая эталонная модель)
+            - 'strength': запас эталонной модели (по умолчанию 3)
+            - 'batch_size': плиток 128x128 в одном пакете (по умолчанию 32)
+            - 'codec': сжатие текста перед встраиванием
+            - 'image_codec': кодирование секретного изображения
+
+    Returns:
+        Изображение с встроенным водяным знаком
+
+    Raises:
+        ValueError: Если тип секрета не поддерживается
+    """
+    if isinstance(secret, str):
+        return embed_text(image, secret, params)
+    elif isinstance(secret, np.ndarray):
+        return embed_image(image, secret, params)
+    else:
+        raise ValueError("Secret должен быть str (текст) или np.ndarray (изображение)")
+
+
+def extract(image, params):
+    """
+    Фасад для извлечения: выбирает реализацию по параметрам.
+
+    Args:
+        image: Изображение с встроенным водяным знаком
+        params: Параметры модели, как при встраивании, и
+            - 'length' или 'codec' для текста
+            - 'secret_shape' или 'image_codec' для изображения
+
+    Returns:
+        Извлечённый секрет (str или np.ndarray)
+
+    Raises:
+        ValueError: Если не указаны необходимые параметры
+    """
+    if 'length' in params or params.get('codec'):
+        return extract_text(image, params)
+    elif 'secret_shape' in params or params.get('image_codec'):
+        return extract_image(image, params)
+    else:
+        raise ValueError("Для извлечения необходимо указать либо 'length', либо 'secret_shape' в параметрах.")
@@ -0,0 +1,100 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def _relu(x: np.ndarray) -> np.ndarray:
+    return np.maximum(x, 0, out=x)
+
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    np.negative(x, out=x)
+    np.exp(x, out=x)
+    x += 1
+    return np.reciprocal(x, out=x)
+
+
+ACTIVATIONS = {
+    None: lambda x: x,
+    "relu": _relu,
+    "sigmoid": _sigmoid,
+}
+
+
+def im2col(x: np.ndarray, kernel: int, stride: int = 1, padding: int = 0) -> np.ndarray:
+    """
+    Разворачивает окна свёртки в строки матрицы.
+
+    Args:
+        x: тензор (N, C, H, W)
+        kernel: размер квадратного ядра
+        stride: шаг
+        padding: нулевое дополнение с каждой стороны
+
+    Returns:
+        Матрица (N * Ho * Wo, C * kernel * kernel)
+    """
+    if padding:
+        x = np.pad(x, ((0, 0), (0, 0), (padding, padding), (padding, padding)))
+    windows = sliding_window_view(x, (kernel, kernel), axis=(2, 3))[:, :, ::stride, ::stride]
+    n, c, ho, wo = windows.shape[:4]
+    # (N, Ho, Wo, C, kh, kw) — строка матрицы соответствует одной выходной позиции
+    return windows.transpose(0, 2, 3, 1, 4, 5).reshape(n * ho * wo, c * kernel * kernel)
+
+
+def conv2d(x: np.ndarray, weight: np.ndarray, bias: np.ndarray, stride: int = 1,
+           padding: int = 0, activation=None) -> np.ndarray:
+    """
+    Свёртка через im2col и одно матричное умножение.
+
+    Смещение и активация применяются на месте к результату GEMM, без
+    промежуточных тензоров.
+
+    Args:
+        x: тензор (N, C, H, W) float32
+        weight: ядра (O, C, k, k)
+        bias: смещения (O,)
+        stride: шаг
+        padding: нулевое дополнение
+        activation: None, 'relu' или 'sigmoid'
+
+    Returns:
+        Тензор (N, O, Ho, Wo)
+    """
+    out_channels, _, kernel, _ = weight.shape
+    n, _, h, w = x.shape
+    ho = (h + 2 * padding - kernel) // stride + 1
+    wo = (w + 2 * padding - kernel) // stride + 1
+    if kernel == 1 and stride == 1 and not padding:
+        columns = x.transpose(0, 2, 3, 1).reshape(-1, x.shape[1])
+    else:
+        columns = im2col(x, kernel, stride, padding)
+    out = columns @ weight.reshape(out_channels, -1).T
+    out += bias
+    ACTIVATIONS[activation](out)
+    return out.reshape(n, ho, wo, out_channels).transpose(0, 3, 1, 2)
+
+
+def conv_transpose2d(x: np.ndarray, weight: np.ndarray, bias: np.ndarray, activation=None) -> np.ndarray:
+    """
+    Транспонированная свёртка с шагом, равным размеру ядра.
+
+    Окна не перекрываются, поэтому это одно матричное умножение и
+    перестановка осей, без col2im со сложением.
+
+    Args:
+        x: тензор (N, C, H, W)
+        weight: ядра (C, O, k, k)
+        bias: смещения (O,)
+        activation: None, 'relu' или 'sigmoid'
+
+    Returns:
+        Тензор (N, O, H * k, W * k)
+    """
+    in_channels, out_channels, kernel, _ = weight.shape
+    n, _, h, w = x.shape
+    rows = x.transpose(0, 2, 3, 1).reshape(-1, in_channels)
+    out = rows @ weight.reshape(in_channels, -1)
+    out = out.reshape(n, h, w, out_channels, kernel, kernel)
+    out += bias[:, None, None]
+    ACTIVATIONS[activation](out)
+    return out.transpose(0, 3, 1, 4, 2, 5).reshape(n, out_channels, h * kernel, w * kernel)
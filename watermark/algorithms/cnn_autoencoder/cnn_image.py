@@ -0,0 +1,70 @@
+import numpy as np
+from watermark.payload import HEADER_SIZE, pack_payload, unpack_payload, encode_image, decode_image
+from watermark.utils import bytes_to_bits, image_to_bits, bits_to_image, image_bits_needed
+from watermark.algorithms.dct.dct_core import to_luma, from_luma
+from .cnn_model import BATCH_SIZE, TileGrid, resolve_weights, embed_bits, extract_bits, iter_bytes
+
+
+def embed_image(image: np.ndarray, secret_img: np.ndarray, params: dict) -> np.ndarray:
+    """
+    Внедрение секретного изображения свёрточным автокодировщиком.
+
+    Args:
+        image: Исходное изображение-контейнер
+        secret_img: Секретное изображение для встраивания
+        params: Словарь параметров:
+            - 'weights', 'strength', 'batch_size': как для текста
+            - 'image_codec': встраивать закодированный файл ('png', 'webp', 'jpeg', 'webp-lossy')
+            - 'quality': качество для кодеков с потерями (по умолчанию 90)
+            - 'layout': 'raster' (по умолчанию) или 'planes'
+
+    Returns:
+        Изображение с внедрённым секретным изображением
+    """
+    max_bits = TileGrid(image.shape).capacity()
+    codec = params.get("image_codec")
+    if codec:
+        max_body = max_bits // 8 - HEADER_SIZE
+        encoded = encode_image(secret_img, codec, params.get("quality", 90), max_size=max_body)
+        secret_bits = bytes_to_bits(pack_payload(encoded, "none"))
+    else:
+        if secret_img.size * 8 > max_bits:
+            raise ValueError(f"Секрет слишком большой! Максимум {max_bits} бит, требуется {secret_img.size * 8}")
+        secret_bits = image_to_bits(secret_img.flatten(), params.get("layout", "raster"))
+
+    y_channel, ycrcb = to_luma(image)
+    embed_bits(y_channel, secret_bits, resolve_weights(params), params.get("batch_size", BATCH_SIZE))
+    return from_luma(np.round(y_channel), ycrcb)
+
+
+def extract_image(image: np.ndarray, params: dict) -> np.ndarray:
+    """
+    Извлечение секретного изображения декодером автокодировщика.
+
+    Args:
+        image: Изображение-контейнер с встроенным секретом
+        params: Те же параметры модели, что при встраивании, и
+            - 'secret_shape': форма секретного изображения (tuple)
+            - 'image_codec': изображение встроено как файл, форма берётся из него
+            - 'layout', 'planes': раскладка и превью из k старших плоскостей
+
+    Returns:
+        Извлечённое секретное изображение
+    """
+    weights = resolve_weights(params)
+    batch_size = params.get("batch_size", BATCH_SIZE)
+    y_channel, _ = to_luma(image)
+
+    if params.get("image_codec"):
+        max_body = TileGrid(image.shape).capacity() // 8
+        encoded = unpack_payload(iter_bytes(y_channel, weights, batch_size), max_body_size=max_body)
+        return decode_image(encoded)
+
+    secret_shape = params.get("secret_shape")
+    if secret_shape is None:
+        raise ValueError("Необходимо указать 'secret_shape' в параметрах!")
+    layout = params.get("layout", "raster")
+    planes = params.get("planes", 8)
+    num_secret_pixels = int(np.prod(secret_shape))
+    bits = extract_bits(y_channel, image_bits_needed(num_secret_pixels, layout, planes), weights, batch_size)
+    return bits_to_image(bits, num_secret_pixels, layout, planes).reshape(secret_shape)
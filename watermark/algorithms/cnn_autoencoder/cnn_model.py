@@ -0,0 +1,209 @@
+import numpy as np
+from watermark.utils import bits_to_bytes
+from watermark.algorithms.model_registry import default_registry, load_npz_mmap
+from .cnn_core import conv2d, conv_transpose2d
+
+TILE = 128          # размер плитки, которую обрабатывает сеть
+CELL = 8            # одна ячейка 8x8 несёт один бит
+CELLS = TILE // CELL
+BATCH_SIZE = 32     # плиток в одном пакете
+
+# Ключи весов: кодировщик (зонд, затвор, смеситель, несущая) и декодер
+WEIGHT_NAMES = (
+    "enc.probe.weight", "enc.probe.bias",
+    "enc.gate.weight", "enc.gate.bias",
+    "enc.mix.weight", "enc.mix.bias",
+    "enc.carrier.weight", "enc.carrier.bias",
+    "dec.probe.weight", "dec.probe.bias",
+)
+
+
+def save_weights(path, weights: dict) -> None:
+    """Сохраняет веса в .npz без сжатия, чтобы load_weights мог отобразить их в память."""
+    np.savez(path, **{name: np.ascontiguousarray(weights[name], dtype=np.float32) for name in WEIGHT_NAMES})
+
+
+def load_weights(path) -> dict:
+    """
+    Загружает веса из .npz как np.memmap, не читая массивы целиком.
+
+    Raises:
+        ValueError: Если член архива сжат или каких-то весов не хватает
+    """
+    weights = load_npz_mmap(path)
+    missing = [name for name in WEIGHT_NAMES if name not in weights]
+    if missing:
+        raise ValueError(f"В файле весов нет: {', '.join(missing)}")
+    return weights
+
+
+def reference_weights(strength: float = 3.0) -> dict:
+    """
+    Аналитическая эталонная модель с той же архитектурой, что и обученная.
+
+    Несущая — шахматный узор p внутри ячейки 8x8. Зонд (свёртка 8x8 с шагом 8)
+    считает проекцию ячейки на p. Затвор и смеситель — свёртки 1x1 с ReLU —
+    выбирают амплитуду так, чтобы проекция стего-ячейки была не меньше
+    strength по модулю с нужным знаком, учитывая собственную проекцию
+    контейнера. Декодер — такой же зонд с сигмоидой.
+
+    Args:
+        strength: гарантированный запас проекции (в уровнях яркости)
+    """
+    yy, xx = np.mgrid[0:CELL, 0:CELL]
+    carrier = np.where((yy + xx) % 2 == 0, 1.0, -1.0).astype(np.float32)
+    probe = (carrier / carrier.size)[None, None]
+    floor = strength / 2        # минимальная амплитуда несущей
+    margin = strength - floor
+    gate = 1e4                  # больше любой проекции: выключает чужую ветку затвора
+    return {
+        "enc.probe.weight": probe,
+        "enc.probe.bias": np.zeros(1, dtype=np.float32),
+        # Каналы: [проекция c, сообщение m] -> [relu(m + 1), relu(margin - c), relu(margin + c)]
+        "enc.gate.weight": np.array([[0, 1], [-1, gate], [1, -gate]], dtype=np.float32)[:, :, None, None],
+        "enc.gate.bias": np.array([1, margin - gate, margin - gate], dtype=np.float32),
+        # Амплитуда s = floor * m + relu(margin - c) [m = 1] - relu(margin + c) [m = -1]
+        "enc.mix.weight": np.array([[floor, 1, -1]], dtype=np.float32)[:, :, None, None],
+        "enc.mix.bias": np.array([-floor], dtype=np.float32),
+        "enc.carrier.weight": carrier[None, None],
+        "enc.carrier.bias": np.zeros(1, dtype=np.float32),
+        "dec.probe.weight": probe.copy(),
+        "dec.probe.bias": np.zeros(1, dtype=np.float32),
+    }
+
+
+def encode(weights: dict, covers: np.ndarray, messages: np.ndarray) -> np.ndarray:
+    """
+    Кодировщик: остаток водяного знака для пакета плиток.
+
+    Args:
+        weights: веса модели
+        covers: плитки контейнера (N, 1, TILE, TILE) float32
+        messages: сообщения (N, 1, CELLS, CELLS): +1, -1 или 0 (ячейка не используется)
+
+    Returns:
+        Остаток (N, 1, TILE, TILE), который прибавляется к плиткам
+    """
+    projection = conv2d(covers, weights["enc.probe.weight"], weights["enc.probe.bias"], stride=CELL)
+    features = np.concatenate([projection, messages], axis=1)
+    gated = conv2d(features, weights["enc.gate.weight"], weights["enc.gate.bias"], activation="relu")
+    amplitude = conv2d(gated, weights["enc.mix.weight"], weights["enc.mix.bias"])
+    return conv_transpose2d(amplitude, weights["enc.carrier.weight"], weights["enc.carrier.bias"])
+
+
+def decode(weights: dict, stegos: np.ndarray) -> np.ndarray:
+    """Декодер: вероятность единичного бита для каждой ячейки, (N, 1, CELLS, CELLS)."""
+    return conv2d(stegos, weights["dec.probe.weight"], weights["dec.probe.bias"], stride=CELL, activation="sigmoid")
+
+
+class TileGrid:
+    """
+    Разбиение Y-канала на плитки TILE x TILE для изображений любого размера.
+
+    Крайние плитки дополняются повтором края; биты получают только ячейки,
+    целиком лежащие внутри изображения, в порядке плитка за плиткой.
+    """
+
+    def __init__(self, shape):
+        self.height, self.width = shape[:2]
+        self.rows = -(-self.height // TILE)
+        self.cols = -(-self.width // TILE)
+
+    def capacity(self) -> int:
+        return (self.height // CELL) * (self.width // CELL)
+
+    def cell_mask(self, tiles: np.ndarray) -> np.ndarray:
+        """Маска (len(tiles), CELLS, CELLS) ячеек внутри изображения."""
+        top = (tiles // self.cols) * TILE
+        left = (tiles % self.cols) * TILE
+        offsets = np.arange(CELLS) * CELL + CELL
+        rows_ok = top[:, None] + offsets <= self.height
+        cols_ok = left[:, None] + offsets <= self.width
+        return rows_ok[:, :, None] & cols_ok[:, None, :]
+
+    def tiles_for(self, count: int) -> int:
+        """Сколько первых плиток нужно, чтобы вместить `count` битов."""
+        tiles = np.arange(self.rows * self.cols)
+        filled = np.cumsum(self.cell_mask(tiles).sum(axis=(1, 2)))
+        return int(np.searchsorted(filled, count)) + 1 if count else 0
+
+    def gather(self, y_channel: np.ndarray, tiles: np.ndarray) -> np.ndarray:
+        """Пакет плиток (N, 1, TILE, TILE) float32."""
+        batch = np.empty((tiles.size, 1, TILE, TILE), dtype=np.float32)
+        for i, tile in enumerate(tiles):
+            top, left = (tile // self.cols) * TILE, (tile % self.cols) * TILE
+            patch = y_channel[top:top + TILE, left:left + TILE]
+            batch[i, 0] = np.pad(patch, ((0, TILE - patch.shape[0]), (0, TILE - patch.shape[1])), mode="edge")
+        return batch
+
+    def scatter_add(self, y_channel: np.ndarray, tiles: np.ndarray, residual: np.ndarray) -> None:
+        """Прибавляет остаток к плиткам, отбрасывая дополнение."""
+        for i, tile in enumerate(tiles):
+            top, left = (tile // self.cols) * TILE, (tile % self.cols) * TILE
+            target = y_channel[top:top + TILE, left:left + TILE]
+            target += residual[i, 0, :target.shape[0], :target.shape[1]]
+
+
+def embed_bits(y_channel: np.ndarray, bits: np.ndarray, weights: dict, batch_size: int = BATCH_SIZE) -> None:
+    """
+    Встраивает биты в Y-канал (на месте), пакетами по batch_size плиток.
+
+    Обрабатываются только плитки, на которые пришлась полезная нагрузка.
+    """
+    grid = TileGrid(y_channel.shape)
+    total_tiles = grid.tiles_for(bits.size)
+    signs = bits.astype(np.float32) * 2 - 1
+    written = 0
+    for first in range(0, total_tiles, batch_size):
+        tiles = np.arange(first, min(first + batch_size, total_tiles))
+        mask = grid.cell_mask(tiles)
+        messages = np.zeros(mask.shape, dtype=np.float32)
+        slots = np.flatnonzero(mask)[:bits.size - written]
+        messages.reshape(-1)[slots] = signs[written:written + slots.size]
+        written += slots.size
+        residual = encode(weights, grid.gather(y_channel, tiles), messages[:, None])
+        grid.scatter_add(y_channel, tiles, residual)
+
+
+def iter_bits(y_channel: np.ndarray, weights: dict, batch_size: int = BATCH_SIZE):
+    """Потоково отдаёт биты, декодируя плитки пакетами."""
+    grid = TileGrid(y_channel.shape)
+    total_tiles = grid.rows * grid.cols
+    for first in range(0, total_tiles, batch_size):
+        tiles = np.arange(first, min(first + batch_size, total_tiles))
+        probabilities = decode(weights, grid.gather(y_channel, tiles))[:, 0]
+        yield (probabilities[grid.cell_mask(tiles)] > 0.5).astype(np.uint8)
+
+
+def extract_bits(y_channel: np.ndarray, count: int, weights: dict, batch_size: int = BATCH_SIZE) -> np.ndarray:
+    """Читает первые `count` битов."""
+    chunks, total = [], 0
+    for bits in iter_bits(y_channel, weights, batch_size):
+        if total >= count:
+            break
+        chunks.append(bits)
+        total += bits.size
+    return np.concatenate(chunks)[:count] if chunks else np.zeros(0, dtype=np.uint8)
+
+
+def iter_bytes(y_channel: np.ndarray, weights: dict, batch_size: int = BATCH_SIZE):
+    """Потоковое чтение встроенных байтов: по куску на пакет плиток."""
+    pending = np.zeros(0, dtype=np.uint8)
+    for bits in iter_bits(y_channel, weights, batch_size):
+        pending = np.concatenate([pending, bits])
+        usable = pending.size // 8 * 8
+        if usable:
+            yield bits_to_bytes(pending[:usable])
+            pending = pending[usable:]
+
+
+def resolve_weights(params: dict) -> dict:
+    """
+    Веса из params['weights'] (путь к .npz или имя в реестре) или эталонная
+    модель с params['strength']. Загружаются один раз через default_registry.
+    """
+    source = params.get("weights")
+    if source is None:
+        strength = float(params.get("strength", 3.0))
+        return default_registry.get(("reference", strength), lambda _: reference_weights(strength))
+    return default_registry.get(source, load_weights)
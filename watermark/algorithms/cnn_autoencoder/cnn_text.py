@@ -0,0 +1,65 @@
+import numpy as np
+from watermark.payload import pack_payload, unpack_payload
+from watermark.utils import bytes_to_bits, bits_to_bytes
+from watermark.algorithms.dct.dct_core import to_luma, from_luma
+from .cnn_model import BATCH_SIZE, TileGrid, resolve_weights, embed_bits, extract_bits, iter_bytes
+
+
+def embed_text(image: np.ndarray, secret_text: str, params: dict) -> np.ndarray:
+    """
+    Внедрение текстовой строки свёрточным автокодировщиком.
+
+    Args:
+        image: Исходное изображение (numpy массив)
+        secret_text: Строка для встраивания
+        params: Словарь параметров:
+            - 'weights': путь к .npz с весами (по умолчанию эталонная модель)
+            - 'strength': запас эталонной модели (по умолчанию 3)
+            - 'batch_size': плиток 128x128 в одном пакете (по умолчанию 32)
+            - 'codec': сжатие перед встраиванием ('auto', 'zlib', 'bz2', 'lzma', 'none')
+
+    Returns:
+        Изображение с внедрённым текстом
+    """
+    codec = params.get("codec")
+    secret_bytes = secret_text.encode("utf-8")
+    if codec:
+        secret_bytes = pack_payload(secret_bytes, codec)
+    secret_bits = bytes_to_bits(secret_bytes)
+
+    max_bits = TileGrid(image.shape).capacity()
+    if secret_bits.size > max_bits:
+        raise ValueError(f"Текст слишком длинный! Максимум {max_bits} бит, требуется {secret_bits.size}")
+
+    y_channel, ycrcb = to_luma(image)
+    embed_bits(y_channel, secret_bits, resolve_weights(params), params.get("batch_size", BATCH_SIZE))
+    return from_luma(np.round(y_channel), ycrcb)
+
+
+def extract_text(image: np.ndarray, params: dict) -> str:
+    """
+    Извлечение текста декодером автокодировщика.
+
+    Args:
+        image: Изображение с встроенным текстом
+        params: Те же 'weights', 'strength', 'batch_size', что при встраивании, и
+            - 'length': количество байтов для извлечения
+            - 'codec': если указан, длина и кодек читаются из заголовка
+
+    Returns:
+        Извлечённая текстовая строка
+    """
+    weights = resolve_weights(params)
+    batch_size = params.get("batch_size", BATCH_SIZE)
+    y_channel, _ = to_luma(image)
+
+    if params.get("codec"):
+        max_body = TileGrid(image.shape).capacity() // 8
+        secret_bytes = unpack_payload(iter_bytes(y_channel, weights, batch_size), max_body_size=max_body)
+        return secret_bytes.decode("utf-8", errors="replace")
+
+    length = params.get("length")
+    if length is None:
+        raise ValueError("Необходимо указать 'length' в параметрах!")
+    bits = extract_bits(y_channel, length * 8, weights, batch_size)
+    return bits_to_bytes(bits).decode("utf-8", errors="replace")
@@ -1,6 +1,7 @@
 import numpy as np
 from .dct_text import embed_text, extract_text
 from .dct_image import embed_image, extract_image
+from . import dct_jpeg
 
 
 def embed(image, secret, params):
@@ -8,11 +9,21 @@ def embed(image, secret, params):
     Фасад для DCT-алгоритма: выбирает нужную реализацию в зависимости от типа секрета.
     
     Args:
-        image: Исходное изображение (numpy массив)
+        image: Исходное изображение (numpy массив) или байты baseline JPEG —
+            тогда биты пишутся прямо в квантованные коэффициенты (dct_jpeg),
+            без декодирования и повторного сжатия, и возвращаются байты JPEG
         secret: Секрет для встраивания (str для текста, np.ndarray для изображения)
         params: Словарь параметров алгоритма:
             - 'strength': коэффициент силы встраивания
             - 'block_size': размер блока для DCT (по умолчанию 8)
+            - 'bits_per_block': сколько среднечастотных коэффициентов блока несут биты
+            - 'positions': явный список позиций (u, v) вместо 'bits_per_block'
+            - 'transform': 'float' (по умолчанию) или 'int' — целочисленное DCT 8x8
+            - 'channel_order': порядок каналов цветного изображения, 'bgr' (cv2) или 'rgb' (PIL)
+            - 'adaptive': только текстурные блоки по карте активности, порог 'min_activity'
+            - 'codec': сжатие текста перед встраиванием ('auto', 'zlib', 'bz2', 'lzma', 'none')
+            - 'image_codec': кодирование секретного изображения ('png', 'webp', 'jpeg', 'webp-lossy')
+            - 'return_info': вернуть пару (изображение, info) с отпечатком изменений (кроме JPEG)
     
     Returns:
         Изображение с встроенным водяным знаком
@@ -20,10 +31,11 @@ def embed(image, secret, params):
     Raises:
         ValueError: Если тип секрета не поддерживается
     """
+    jpeg = isinstance(image, (bytes, bytearray))
     if isinstance(secret, str):
-        return embed_text(image, secret, params)
+        return dct_jpeg.embed_text(image, secret, params) if jpeg else embed_text(image, secret, params)
     elif isinstance(secret, np.ndarray):
-        return embed_image(image, secret, params)
+        return dct_jpeg.embed_image(image, secret, params) if jpeg else embed_image(image, secret, params)
     else:
         raise ValueError("Secret должен быть str (текст) или np.ndarray (изображение)")
 
@@ -33,10 +45,12 @@ def extract(image, params):
     Фасад для извлечения: выбирает реализацию по параметрам.
     
     Args:
-        image: Изображение с встроенным водяным знаком
+        image: Изображение с встроенным водяным знаком или байты JPEG
         params: Словарь параметров:
             - 'length': количество символов (для текста)
+            - 'codec': текст встроен со сжатием, длина берётся из заголовка
             - 'secret_shape': форма секретного изображения (для изображения)
+            - 'image_codec': изображение встроено как закодированный файл
             - 'block_size': размер блока DCT (по умолчанию 8)
     
     Returns:
@@ -45,9 +59,10 @@ def extract(image, params):
     Raises:
         ValueError: Если не указаны необходимые параметры
     """
-    if 'length' in params:
-        return extract_text(image, params)
-    elif 'secret_shape' in params:
-        return extract_image(image, params)
+    jpeg = isinstance(image, (bytes, bytearray))
+    if 'length' in params or params.get('codec'):
+        return dct_jpeg.extract_text(image, params) if jpeg else extract_text(image, params)
+    elif 'secret_shape' in params or params.get('image_codec'):
+        return dct_jpeg.extract_image(image, params) if jpeg else extract_image(image, params)
     else:
         raise ValueError("Для извлечения необходимо указать либо 'length', либо 'secret_shape' в параметрах.")
@@ -0,0 +1,148 @@
+"""
+Карта активности блоков и адаптивный выбор блоков для DCT.
+
+Активность блока — дисперсия его пикселей без вклада коэффициентов-носителей.
+Суммы яркости и её квадрата по блокам берутся из интегральных изображений
+за один проход, энергия носителей вычитается (по ортонормированности DCT
+сумма квадратов отклонений от среднего равна энергии AC-коэффициентов).
+Поэтому само встраивание активность почти не меняет, и извлекающая сторона
+строит ту же карту по стего-изображению.
+
+В адаптивном режиме носителями служат только блоки с активностью не ниже
+порога (текстурные области), в растровом порядке: плоские области, где
+изменения заметны, не трогаются. Округление пикселей может опустить
+активность блока-носителя чуть ниже порога. Встраивание проверяет карту
+по стего и исключает такие блоки, повторяя запись в оставшиеся; блоки вне
+множества не меняются, поэтому множество только сужается и процесс сходится.
+"""
+import hashlib
+from collections import OrderedDict
+import numpy as np
+from .dct_core import basis, luma, embed_luma
+
+# Сколько карт (по разным контейнерам) держать в кэше
+CACHE_SIZE = 8
+# Сколько раз уточнять множество блоков при встраивании
+REFINE_ROUNDS = 8
+# Порог активности по умолчанию: дисперсия яркости в блоке (СКО около 4)
+DEFAULT_MIN_ACTIVITY = 16.0
+
+_cache = OrderedDict()
+
+
+def integral_image(values: np.ndarray) -> np.ndarray:
+    """Интегральное изображение float64 с нулевыми первой строкой и столбцом."""
+    result = np.zeros((values.shape[0] + 1, values.shape[1] + 1), dtype=np.float64)
+    np.cumsum(values, axis=0, dtype=np.float64, out=result[1:, 1:])
+    np.cumsum(result[1:, 1:], axis=1, out=result[1:, 1:])
+    return result
+
+
+def _block_sums(integral: np.ndarray, block_size: int, blocks_y: int, blocks_x: int) -> np.ndarray:
+    """Суммы по блокам из угловых значений интегрального изображения."""
+    corners = integral[:blocks_y * block_size + 1:block_size, :blocks_x * block_size + 1:block_size]
+    return corners[1:, 1:] - corners[:-1, 1:] - corners[1:, :-1] + corners[:-1, :-1]
+
+
+def block_activity(y_channel: np.ndarray, block_size: int, positions) -> np.ndarray:
+    """
+    Активность каждого блока: дисперсия пикселей без вклада коэффициентов-носителей.
+
+    Args:
+        y_channel: Y-канал
+        block_size: размер блока
+        positions: позиции коэффициентов-носителей
+
+    Returns:
+        Массив float64 (блоков по вертикали, блоков по горизонтали)
+    """
+    blocks_y, blocks_x = y_channel.shape[0] // block_size, y_channel.shape[1] // block_size
+    area = y_channel[:blocks_y * block_size, :blocks_x * block_size].astype(np.float64)
+    sums = _block_sums(integral_image(area), block_size, blocks_y, blocks_x)
+    squares = _block_sums(integral_image(np.square(area)), block_size, blocks_y, blocks_x)
+    energy = squares - sums ** 2 / block_size ** 2
+    blocks = area.reshape(blocks_y, block_size, blocks_x, block_size).swapaxes(1, 2)
+    carriers = np.einsum("yxab,jab->yxj", blocks, basis(block_size, positions).astype(np.float64))
+    return np.maximum(energy - np.square(carriers).sum(axis=-1), 0) / block_size ** 2
+
+
+def activity_map(y_channel: np.ndarray, block_size: int, positions) -> np.ndarray:
+    """
+    Карта активности с кэшем по содержимому Y-канала.
+
+    Повторные вызовы для того же контейнера (встраивание, оценка ёмкости,
+    извлечение) не пересчитывают карту. Возвращаемый массив только для чтения.
+    """
+    digest = hashlib.blake2b(np.ascontiguousarray(y_channel).view(np.uint8), digest_size=16).digest()
+    key = (digest, y_channel.shape, block_size, tuple(positions))
+    if key in _cache:
+        _cache.move_to_end(key)
+        return _cache[key]
+    activity = block_activity(y_channel, block_size, positions)
+    activity.setflags(write=False)
+    _cache[key] = activity
+    while len(_cache) > CACHE_SIZE:
+        _cache.popitem(last=False)
+    return activity
+
+
+def clear_cache() -> None:
+    """Очищает кэш карт активности."""
+    _cache.clear()
+
+
+def carrier_blocks(y_channel: np.ndarray, block_size: int, positions,
+                   min_activity: float = DEFAULT_MIN_ACTIVITY) -> np.ndarray:
+    """Номера блоков (в растре) с активностью не ниже порога — порядок обхода для embed_bits."""
+    return np.flatnonzero(activity_map(y_channel, block_size, positions).reshape(-1) >= min_activity)
+
+
+def resolve_min_activity(params: dict):
+    """Порог активности из параметров: None без 'adaptive', иначе 'min_activity' (по умолчанию 16)."""
+    if not params.get("adaptive"):
+        return None
+    min_activity = float(params.get("min_activity", DEFAULT_MIN_ACTIVITY))
+    if min_activity < 0:
+        raise ValueError("'min_activity' не может быть отрицательным")
+    return min_activity
+
+
+def block_order(y_channel: np.ndarray, block_size: int, positions, min_activity):
+    """Порядок обхода блоков для embed_bits/extract_bits: None (растр) или блоки-носители."""
+    if min_activity is None:
+        return None
+    return carrier_blocks(y_channel, block_size, positions, min_activity)
+
+
+def embed_adaptive(image: np.ndarray, bits: np.ndarray, strength: float, block_size: int, positions,
+                   transform: str = "float", channel_order: str = "bgr",
+                   min_activity: float = DEFAULT_MIN_ACTIVITY, return_blocks: bool = False):
+    """
+    Встраивание только в блоки с активностью не ниже порога.
+
+    После записи карта пересчитывается по стего. Блоки, чья активность
+    опустилась ниже порога, исключаются (извлекающая сторона их тоже
+    пропустит), и биты переписываются в оставшиеся блоки того же стего.
+    С return_blocks возвращается пара (стего, номера всех блоков, в которые
+    шла запись за все попытки) — для отпечатка изменений.
+
+    Raises:
+        ValueError: Если блоков-носителей не хватает или множество
+            не стабилизировалось за REFINE_ROUNDS попыток
+    """
+    num_blocks = -(-bits.size // len(positions))
+    order = carrier_blocks(luma(image, channel_order), block_size, positions, min_activity)
+    stego = image
+    touched = np.zeros(0, dtype=np.int64)
+    for _ in range(REFINE_ROUNDS):
+        if order.size < num_blocks:
+            raise ValueError(f"Недостаточно текстурных блоков: нужно {num_blocks}, доступно {order.size}; "
+                             f"уменьшите 'min_activity'")
+        stego = embed_luma(stego, bits, strength, block_size, positions, transform, channel_order, order=order)
+        touched = np.union1d(touched, order[:num_blocks])
+        # Неиспользованные и исключённые блоки не меняются, поэтому новых носителей не появляется
+        current = carrier_blocks(luma(stego, channel_order), block_size, positions, min_activity)
+        if np.array_equal(current[:num_blocks], order[:num_blocks]):
+            return (stego, touched) if return_blocks else stego
+        order = order[np.isin(order, current)]
+    raise ValueError("Не удалось согласовать блоки-носители; измените 'strength' или 'min_activity'")
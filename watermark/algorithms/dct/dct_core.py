@@ -0,0 +1,379 @@
+import numpy as np
+import cv2
+from watermark.utils import bits_to_bytes, modification_footprint
+from . import dct_int
+
+
+def to_luma(image: np.ndarray):
+    """
+    Выделяет канал яркости для встраивания.
+
+    Args:
+        image: Изображение (ч/б или цветное BGR)
+
+    Returns:
+        Кортеж (Y-канал float32, YCrCb-изображение или None для ч/б)
+    """
+    if len(image.shape) == 3:
+        ycrcb = cv2.cvtColor(image.astype(np.uint8), cv2.COLOR_BGR2YCrCb)
+        return ycrcb[:, :, 0].astype(np.float32), ycrcb
+    return image.astype(np.float32), None
+
+
+def from_luma(y_channel: np.ndarray, ycrcb) -> np.ndarray:
+    """
+    Собирает изображение обратно из изменённого Y-канала.
+
+    Args:
+        y_channel: Изменённый Y-канал
+        ycrcb: YCrCb-изображение из to_luma (None для ч/б)
+
+    Returns:
+        Изображение uint8 исходной формы
+    """
+    y_uint8 = np.clip(y_channel, 0, 255).astype(np.uint8)
+    if ycrcb is None:
+        return y_uint8
+    ycrcb[:, :, 0] = y_uint8
+    return cv2.cvtColor(ycrcb, cv2.COLOR_YCrCb2BGR)
+
+
+# Веса яркости BT.601 (те же, что у Y в cv2 YCrCb) для каждого порядка каналов
+LUMA_WEIGHTS = {
+    "bgr": np.array([0.114, 0.587, 0.299], dtype=np.float32),
+    "rgb": np.array([0.299, 0.587, 0.114], dtype=np.float32),
+}
+
+
+def resolve_channel_order(params: dict) -> str:
+    """
+    Порядок каналов цветного изображения из params['channel_order'].
+
+    'bgr' (по умолчанию) — массивы cv2.imread, 'rgb' — массивы PIL.
+    """
+    order = params.get("channel_order", "bgr")
+    if order not in LUMA_WEIGHTS:
+        raise ValueError(f"Порядок каналов '{order}' не поддерживается. Доступны: {', '.join(LUMA_WEIGHTS)}")
+    return order
+
+
+def luma(image: np.ndarray, channel_order: str = "bgr") -> np.ndarray:
+    """
+    Y-канал float32 одной взвешенной суммой, без преобразования всего изображения в YCrCb.
+
+    Альфа-канал (четвёртый) игнорируется.
+    """
+    if image.ndim == 2:
+        return image.astype(np.float32)
+    return np.dot(image[..., :3], LUMA_WEIGHTS[channel_order])
+
+
+# Позиции коэффициентов по умолчанию: один бит на блок в [4, 4]
+# (для блоков меньше 5x5 — default_positions)
+DEFAULT_POSITIONS = ((4, 4),)
+
+
+def dct_matrix(size: int) -> np.ndarray:
+    """Ортонормированная матрица DCT-II (та же нормировка, что у cv2.dct)."""
+    k = np.arange(size)[:, None]
+    n = np.arange(size)[None, :]
+    matrix = np.sqrt(2.0 / size) * np.cos(np.pi * (2 * n + 1) * k / (2 * size))
+    matrix[0] /= np.sqrt(2.0)
+    return matrix
+
+
+def basis(block_size: int, positions=DEFAULT_POSITIONS) -> np.ndarray:
+    """Базисные функции DCT для позиций, массив (len(positions), block_size, block_size) float32."""
+    matrix = dct_matrix(block_size)
+    return np.stack([np.outer(matrix[u], matrix[v]) for u, v in positions]).astype(np.float32)
+
+
+def mid_frequency_positions(count: int, block_size: int = 8):
+    """
+    Первые `count` среднечастотных позиций блока.
+
+    Позиции упорядочены по удалённости от антидиагонали u + v = block_size,
+    затем по |u - v|; для блока 8x8 первой идёт [4, 4].
+    """
+    candidates = [(u, v) for u in range(1, block_size) for v in range(1, block_size)]
+    candidates.sort(key=lambda p: (abs(p[0] + p[1] - block_size), abs(p[0] - p[1]), -p[0]))
+    if not 1 <= count <= len(candidates):
+        raise ValueError(f"'bits_per_block' должно быть от 1 до {len(candidates)}")
+    return tuple(candidates[:count])
+
+
+def default_positions(block_size: int):
+    """
+    Позиция одного бита на блок: [4, 4], как у прежних стего-изображений,
+    а в блоках меньше 5x5, где её нет, — первая среднечастотная.
+    """
+    if block_size < 5:
+        return mid_frequency_positions(1, block_size)
+    return DEFAULT_POSITIONS
+
+
+def resolve_positions(params: dict, block_size: int):
+    """
+    Позиции коэффициентов из параметров.
+
+    'positions' — явный список пар (u, v); 'bits_per_block' — количество
+    среднечастотных позиций (mid_frequency_positions). Без них — одна
+    позиция default_positions(block_size).
+    """
+    if params.get("positions") is not None:
+        positions = tuple((int(u), int(v)) for u, v in params["positions"])
+    elif params.get("bits_per_block"):
+        positions = mid_frequency_positions(params["bits_per_block"], block_size)
+    else:
+        positions = default_positions(block_size)
+    if not positions or len(set(positions)) != len(positions):
+        raise ValueError("'positions' должны быть непустыми и не повторяться")
+    for u, v in positions:
+        if not (0 <= u < block_size and 0 <= v < block_size) or (u, v) == (0, 0):
+            raise ValueError(f"Позиция ({u}, {v}) вне блока {block_size}x{block_size} или DC-коэффициент")
+    return positions
+
+
+# Реализации преобразования: 'float' — проекции на базис DCT в float32,
+# 'int' — целочисленное LLM-DCT из libjpeg (только блоки 8x8)
+TRANSFORMS = ("float", "int")
+
+
+def resolve_transform(params: dict, block_size: int) -> str:
+    """Реализация DCT из params['transform'] с проверкой размера блока."""
+    transform = params.get("transform", "float")
+    if transform not in TRANSFORMS:
+        raise ValueError(f"Преобразование '{transform}' не поддерживается. Доступны: {', '.join(TRANSFORMS)}")
+    if transform == "int" and block_size != 8:
+        raise ValueError("Целочисленное DCT реализовано только для блоков 8x8")
+    return transform
+
+
+def capacity_bits(shape, block_size: int, positions=DEFAULT_POSITIONS) -> int:
+    """Ёмкость контейнера в битах: len(positions) битов на блок."""
+    return (shape[0] // block_size) * (shape[1] // block_size) * len(positions)
+
+
+def _blocks_view(y_channel: np.ndarray, block_size: int, first_row: int, last_row: int) -> np.ndarray:
+    """Представление строк блоков [first_row, last_row) формы (строк, блоков в строке, B, B) без копии."""
+    blocks_per_row = y_channel.shape[1] // block_size
+    region = y_channel[first_row * block_size:last_row * block_size, :blocks_per_row * block_size]
+    return region.reshape(last_row - first_row, block_size, blocks_per_row, block_size).swapaxes(1, 2)
+
+
+def block_indices(y_channel: np.ndarray, block_size: int, start: int, stop: int, order=None):
+    """
+    Блоки с номерами [start, stop) в растровом порядке или в порядке `order` (номера блоков).
+
+    Returns:
+        (view, rows, cols): представление блоков без копии и индексы блоков в нём,
+        блок k — view[rows[k], cols[k]]
+    """
+    blocks_per_row = y_channel.shape[1] // block_size
+    if order is not None:
+        index = np.asarray(order[start:stop])
+        view = _blocks_view(y_channel, block_size, 0, y_channel.shape[0] // block_size)
+        return view, index // blocks_per_row, index % blocks_per_row
+    first_row, last_row = start // blocks_per_row, -(-stop // blocks_per_row)
+    index = np.arange(start, stop)
+    view = _blocks_view(y_channel, block_size, first_row, last_row)
+    return view, index // blocks_per_row - first_row, index % blocks_per_row
+
+
+# Блоки целочисленного пути обрабатываются пачками: промежуточные массивы
+# int32 бабочек не растут с размером изображения
+INT_CHUNK_BLOCKS = 4096
+
+
+def _int_coefficients(view, rows, cols, positions) -> np.ndarray:
+    """Коэффициенты позиций (в масштабе x8) целочисленного DCT, массив (N, k) int32."""
+    u, v = np.array(positions).T
+    result = np.empty((rows.size, len(positions)), dtype=np.int32)
+    for first in range(0, rows.size, INT_CHUNK_BLOCKS):
+        part = slice(first, first + INT_CHUNK_BLOCKS)
+        # Y цветного изображения — взвешенная сумма каналов (luma), не целая:
+        # целочисленный путь работает с округлённым Y. Изменения idct_islow
+        # целые, поэтому rint(Y + ΔY) = rint(Y) + ΔY и встраивание согласовано
+        blocks = np.rint(view[rows[part], cols[part]]).astype(np.int32) - 128
+        result[part] = dct_int.fdct_islow(blocks)[:, u, v]
+    return result
+
+
+def _embed_bits_int(view, rows, cols, bits, strength, positions) -> None:
+    """Целочисленный вариант embed_bits: изменение пикселей — обратное DCT изменений коэффициентов."""
+    num_blocks, k = rows.size, len(positions)
+    coefficients = _int_coefficients(view, rows, cols, positions).reshape(-1)[:bits.size]
+    delta = np.zeros(num_blocks * k, dtype=np.int32)
+    delta[:bits.size] = dct_int.qim_embed(coefficients, bits, dct_int.quantizer_step(strength)) - coefficients
+    delta = delta.reshape(num_blocks, k)
+    u, v = np.array(positions).T
+    for first in range(0, num_blocks, INT_CHUNK_BLOCKS):
+        part = slice(first, first + INT_CHUNK_BLOCKS)
+        spectrum = np.zeros((delta[part].shape[0], 8, 8), dtype=np.int32)
+        spectrum[:, u, v] = delta[part]
+        view[rows[part], cols[part]] += dct_int.idct_islow(spectrum)
+
+
+def embed_bits(y_channel: np.ndarray, bits: np.ndarray, strength: float, block_size: int,
+               positions=DEFAULT_POSITIONS, transform: str = "float", order=None) -> None:
+    """
+    Встраивает биты в коэффициенты DCT блоков (на месте).
+
+    Блоки обходятся в растровом порядке, бит t попадает в блок t // k,
+    в позицию positions[t % k], где k = len(positions). Все блоки с нагрузкой
+    обрабатываются одной векторной операцией: коэффициенты — проекции блоков
+    на базисные функции, а обратное DCT сводится к прибавлению изменений
+    коэффициентов, умноженных на те же базисные функции.
+
+    Args:
+        y_channel: Y-канал float32
+        bits: массив нулей и единиц
+        strength: шаг квантования
+        block_size: размер блока DCT
+        positions: позиции коэффициентов (u, v) в блоке
+        transform: 'float' или 'int' (целочисленное LLM-DCT по округлённому Y, см. dct_int)
+        order: порядок обхода блоков (номера в растре) вместо растрового, см. dct_activity
+    """
+    if bits.size == 0:
+        return
+    k = len(positions)
+    num_blocks = -(-bits.size // k)
+    view, rows, cols = block_indices(y_channel, block_size, 0, num_blocks, order)
+    if transform == "int":
+        _embed_bits_int(view, rows, cols, bits, strength, positions)
+        return
+    patterns = basis(block_size, positions)
+    coefficients = np.einsum("nab,jab->nj", view[rows, cols], patterns).reshape(-1)[:bits.size]
+    # Квантуем коэффициенты с шагом strength и встраиваем бит через чётность:
+    # 1 — нечётное, 0 — чётное
+    quantized = np.round(coefficients / strength)
+    odd = np.abs(quantized) % 2 == 1
+    quantized[(bits == 1) & ~odd] += 1
+    quantized[(bits == 0) & odd] -= 1
+    delta = np.zeros(num_blocks * k, dtype=np.float32)
+    delta[:bits.size] = quantized * strength - coefficients
+    view[rows, cols] += np.einsum("nj,jab->nab", delta.reshape(num_blocks, k), patterns)
+
+
+def extract_bits(y_channel: np.ndarray, count: int, strength: float, block_size: int, start: int = 0,
+                 positions=DEFAULT_POSITIONS, transform: str = "float", order=None) -> np.ndarray:
+    """
+    Читает `count` битов, начиная с бита `start`.
+
+    Args:
+        y_channel: Y-канал float32
+        count: сколько битов прочитать
+        strength: шаг квантования
+        block_size: размер блока DCT
+        start: номер первого бита
+        positions: позиции коэффициентов, использованные при встраивании
+        transform: реализация DCT, использованная при встраивании
+        order: порядок обхода блоков, использованный при встраивании
+
+    Returns:
+        Массив uint8 из нулей и единиц
+    """
+    if count <= 0:
+        return np.zeros(0, dtype=np.uint8)
+    k = len(positions)
+    first_block, last_block = start // k, -(-(start + count) // k)
+    view, rows, cols = block_indices(y_channel, block_size, first_block, last_block, order)
+    offset = start - first_block * k
+    if transform == "int":
+        coefficients = _int_coefficients(view, rows, cols, positions).reshape(-1)
+        return dct_int.qim_extract(coefficients[offset:offset + count], dct_int.quantizer_step(strength))
+    coefficients = np.einsum("nab,jab->nj", view[rows, cols], basis(block_size, positions)).reshape(-1)
+    # Декодируем через проверку чётности квантованного коэффициента
+    quantized = np.round(coefficients[offset:offset + count] / strength)
+    return (np.abs(quantized) % 2).astype(np.uint8)
+
+
+def iter_bytes(y_channel: np.ndarray, strength: float, block_size: int, chunk_size: int = 64,
+               positions=DEFAULT_POSITIONS, transform: str = "float", order=None):
+    """
+    Потоковое чтение встроенных байтов кусками по `chunk_size`.
+
+    DCT считается только для блоков, которые реально понадобились распаковщику.
+    """
+    if order is None:
+        total_bytes = capacity_bits(y_channel.shape, block_size, positions) // 8
+    else:
+        total_bytes = len(order) * len(positions) // 8
+    for offset in range(0, total_bytes, chunk_size):
+        count = min(chunk_size, total_bytes - offset)
+        bits = extract_bits(y_channel, count * 8, strength, block_size, start=offset * 8,
+                            positions=positions, transform=transform, order=order)
+        yield bits_to_bytes(bits)
+
+
+def embed_luma(image: np.ndarray, bits: np.ndarray, strength: float, block_size: int,
+               positions=DEFAULT_POSITIONS, transform: str = "float", channel_order: str = "bgr",
+               order=None) -> np.ndarray:
+    """
+    Встраивает биты в яркость и возвращает новое изображение uint8.
+
+    Яркость считается только для строк блоков с нагрузкой. Изменение ΔY
+    прибавляется ко всем цветовым каналам: веса яркости в сумме дают 1,
+    поэтому Y меняется ровно на ΔY, а цветоразностные Cr и Cb не меняются.
+    Обратного преобразования YCrCb -> BGR и полноразмерных копий каналов нет.
+
+    Args:
+        image: изображение (ч/б или цветное в порядке channel_order)
+        bits: массив нулей и единиц
+        strength, block_size, positions, transform: как у embed_bits
+        channel_order: 'bgr' или 'rgb'
+        order: порядок обхода блоков; с ним яркость считается по всему изображению
+
+    Returns:
+        Изображение uint8 той же формы
+    """
+    stego = image.astype(np.uint8)
+    if bits.size == 0:
+        return stego
+    blocks_per_row = image.shape[1] // block_size
+    num_blocks = -(-bits.size // len(positions))
+    region = stego if order is not None else stego[:-(-num_blocks // blocks_per_row) * block_size]
+    y_channel = luma(region, channel_order)
+    original = y_channel.copy()
+    embed_bits(y_channel, bits, strength, block_size, positions, transform, order)
+    delta = np.subtract(y_channel, original, out=y_channel)
+    channels = region[..., :3] if region.ndim == 3 else region
+    updated = channels + (delta[..., None] if region.ndim == 3 else delta)
+    np.rint(updated, out=updated)
+    channels[...] = np.clip(updated, 0, 255, out=updated)
+    return stego
+
+
+def block_samples(shape, block_size: int, blocks) -> np.ndarray:
+    """Номера отсчётов (в image.reshape(-1)) всех пикселей и каналов блоков с растровыми номерами blocks."""
+    blocks = np.asarray(blocks, dtype=np.int64)
+    width = shape[1]
+    channels = shape[2] if len(shape) == 3 else 1
+    blocks_per_row = width // block_size
+    offsets = np.arange(block_size)
+    ys = (blocks // blocks_per_row)[:, None] * block_size + offsets
+    xs = (blocks % blocks_per_row)[:, None] * block_size + offsets
+    pixels = ys[:, :, None] * width + xs[:, None, :]
+    return (pixels[..., None] * channels + np.arange(channels)).reshape(-1)
+
+
+def embedding_info(image: np.ndarray, stego: np.ndarray, num_bits: int, block_size: int,
+                   positions=DEFAULT_POSITIONS, blocks=None) -> dict:
+    """
+    Метаданные встраивания, возвращаемые при params['return_info'].
+
+    'footprint' — отпечаток изменений (см. modification_footprint). Без blocks
+    кандидаты — строки блоков с нагрузкой (embed_luma меняет только их),
+    с blocks — пиксели перечисленных блоков (адаптивный режим).
+    """
+    num_blocks = -(-num_bits // len(positions))
+    if blocks is None:
+        rows = -(-num_blocks // (image.shape[1] // block_size)) * block_size
+        candidates = slice(0, rows * int(np.prod(image.shape[1:])))
+    else:
+        candidates = block_samples(image.shape, block_size, blocks)
+    return {
+        "bits": num_bits,
+        "blocks_used": num_blocks,
+        "footprint": modification_footprint(image, stego, candidates),
+    }
@@ -1,5 +1,24 @@
 import numpy as np
-import cv2
+from watermark.payload import HEADER_SIZE, pack_payload, unpack_payload, encode_image, decode_image
+from watermark.utils import bytes_to_bits, image_to_bits, bits_to_image, image_bits_needed
+from .dct_core import (luma, embed_luma, capacity_bits, extract_bits, iter_bytes, resolve_positions,
+                       resolve_transform, resolve_channel_order, embedding_info)
+from .dct_activity import resolve_min_activity, block_order, embed_adaptive
+
+
+def image_payload_bits(secret_img: np.ndarray, params: dict, max_capacity_bits: int) -> np.ndarray:
+    """
+    Биты, которые embed_image пишет в контейнер ёмкостью max_capacity_bits:
+    с 'image_codec' — файл изображения с заголовком, иначе пиксели в раскладке 'layout'.
+    """
+    codec = params.get("image_codec")
+    if codec:
+        # Закодированный поток обычно в разы меньше сырых пикселей;
+        # lossy-кодек при нехватке места сам понижает качество
+        max_body = max_capacity_bits // 8 - HEADER_SIZE
+        encoded = encode_image(secret_img, codec, params.get("quality", 90), max_size=max_body)
+        return bytes_to_bits(pack_payload(encoded, "none"))
+    return image_to_bits(secret_img.flatten(), params.get("layout", "raster"))
 
 
 def embed_image(image: np.ndarray, secret_img: np.ndarray, params: dict) -> np.ndarray:
@@ -12,26 +31,45 @@ def embed_image(image: np.ndarray, secret_img: np.ndarray, params: dict) -> np.n
         params: Словарь параметров:
             - 'strength': коэффициент силы встраивания (по умолчанию 15)
             - 'block_size': размер блока для DCT (по умолчанию 8)
+            - 'image_codec': встраивать закодированный файл ('png', 'webp', 'jpeg',
+              'webp-lossy') вместо сырых пикселей; масштабирование тогда не применяется
+            - 'quality': качество для кодеков с потерями (по умолчанию 90)
+            - 'layout': 'raster' (по умолчанию) или 'planes' — сначала старшие
+              битовые плоскости всех пикселей, затем младшие
+            - 'bits_per_block' / 'positions': несколько битов на блок, ёмкость
+              (и допустимый размер секрета) растёт во столько же раз
+            - 'transform': 'float' (по умолчанию) или 'int' — целочисленное DCT 8x8
+            - 'channel_order': 'bgr' (по умолчанию, cv2) или 'rgb' (PIL)
+            - 'adaptive' / 'min_activity': писать только в текстурные блоки
+            - 'return_info': вернуть пару (изображение, info) с отпечатком изменений
     
     Returns:
         Изображение с внедрённым секретным изображением
     """
     strength = params.get("strength", 15)
     block_size = params.get("block_size", 8)
+    positions = resolve_positions(params, block_size)
+    transform = resolve_transform(params, block_size)
+    channel_order = resolve_channel_order(params)
+    
+    min_activity = resolve_min_activity(params)
+    order = block_order(luma(image, channel_order), block_size, positions, min_activity)
+    # k битов на блок (в адаптивном режиме — на текстурный блок)
+    max_capacity_bits = (capacity_bits(image.shape, block_size, positions) if order is None
+                         else order.size * len(positions))
+    
+    def write(bits):
+        if min_activity is None:
+            stego, blocks = embed_luma(image, bits, strength, block_size, positions, transform, channel_order), None
+        else:
+            stego, blocks = embed_adaptive(image, bits, strength, block_size, positions, transform, channel_order,
+                                           min_activity, return_blocks=True)
+        if params.get("return_info"):
+            return stego, embedding_info(image, stego, bits.size, block_size, positions, blocks)
+        return stego
     
-    # Работаем с копией изображения
-    stego = image.astype(np.float32)
-    
-    # Если цветное изображение, работаем с Y-каналом
-    if len(stego.shape) == 3:
-        stego_ycrcb = cv2.cvtColor(stego.astype(np.uint8), cv2.COLOR_BGR2YCrCb)
-        y_channel = stego_ycrcb[:, :, 0].astype(np.float32)
-    else:
-        y_channel = stego.copy()
-    
-    h, w = y_channel.shape
-    max_blocks = (h // block_size) * (w // block_size)
-    max_capacity_bits = max_blocks  # 1 бит на блок
+    if params.get("image_codec"):
+        return write(image_payload_bits(secret_img, params, max_capacity_bits))
     
     # Проверяем и автоматически масштабируем секретное изображение если нужно
     original_secret_shape = secret_img.shape
@@ -67,60 +105,8 @@ def embed_image(image: np.ndarray, secret_img: np.ndarray, params: dict) -> np.n
         print(f"⚠️ Секретное изображение автоматически масштабировано: {original_secret_shape} → {secret_img.shape}")
         print(f"   Причина: требуется {required_bits} бит, доступно {max_capacity_bits} бит")
     
-    # Преобразуем секретное изображение в биты
-    flat_secret = secret_img.flatten()
-    secret_bits = ''.join(format(byte, '08b') for byte in flat_secret)
-    total_bits = len(secret_bits)
-    
-    bit_idx = 0
-    
-    # Встраиваем биты в DCT коэффициенты
-    for i in range(0, h - block_size + 1, block_size):
-        for j in range(0, w - block_size + 1, block_size):
-            if bit_idx >= total_bits:
-                break
-            
-            # Извлекаем блок
-            block = y_channel[i:i+block_size, j:j+block_size]
-            
-            # DCT преобразование
-            dct_block = cv2.dct(block)
-            
-            # Встраиваем бит в средне-частотный коэффициент
-            # Используем простую модуляцию на основе знака
-            bit_value = int(secret_bits[bit_idx])
-            coeff = dct_block[4, 4]
-            
-            # Квантуем с использованием strength
-            quantized = round(coeff / strength)
-            
-            # Встраиваем бит через модуляцию 2
-            if bit_value == 1:
-                if quantized % 2 == 0:
-                    quantized += 1
-            else:  # bit_value == 0
-                if quantized % 2 != 0:
-                    quantized += 1
-            
-            dct_block[4, 4] = quantized * strength
-            
-            # Обратное DCT
-            idct_block = cv2.idct(dct_block)
-            y_channel[i:i+block_size, j:j+block_size] = idct_block
-            
-            bit_idx += 1
-        
-        if bit_idx >= total_bits:
-            break
-    
-    # Собираем изображение
-    if len(stego.shape) == 3:
-        stego_ycrcb[:, :, 0] = np.clip(y_channel, 0, 255).astype(np.uint8)
-        stego = cv2.cvtColor(stego_ycrcb, cv2.COLOR_YCrCb2BGR)
-    else:
-        stego = np.clip(y_channel, 0, 255).astype(np.uint8)
-    
-    return stego
+    # Преобразуем секретное изображение в биты и встраиваем в DCT коэффициенты яркости
+    return write(image_payload_bits(secret_img, params, max_capacity_bits))
 
 
 def extract_image(image: np.ndarray, params: dict) -> np.ndarray:
@@ -132,66 +118,47 @@ def extract_image(image: np.ndarray, params: dict) -> np.ndarray:
         params: Словарь параметров:
             - 'secret_shape': форма секретного изображения (tuple)
             - 'block_size': размер блока DCT (по умолчанию 8)
+            - 'image_codec': изображение встроено как файл, форма берётся из него
+            - 'layout': раскладка, использованная при встраивании
+            - 'planes': при layout='planes' читать только k старших плоскостей (превью)
+            - 'bits_per_block' / 'positions', 'transform', 'channel_order',
+              'adaptive' / 'min_activity': те же, что при встраивании
     
     Returns:
         Извлечённое секретное изображение
     """
+    if params.get("image_codec"):
+        strength = params.get("strength", 15)
+        block_size = params.get("block_size", 8)
+        positions = resolve_positions(params, block_size)
+        transform = resolve_transform(params, block_size)
+        y_channel = luma(image, resolve_channel_order(params))
+        order = block_order(y_channel, block_size, positions, resolve_min_activity(params))
+        max_body = (capacity_bits(y_channel.shape, block_size, positions) if order is None
+                    else order.size * len(positions)) // 8
+        chunks = iter_bytes(y_channel, strength, block_size, positions=positions, transform=transform, order=order)
+        encoded = unpack_payload(chunks, max_body_size=max_body)
+        return decode_image(encoded)
+    
     secret_shape = params.get("secret_shape")
     if secret_shape is None:
         raise ValueError("Необходимо указать 'secret_shape' в параметрах!")
     
     strength = params.get("strength", 15)
     block_size = params.get("block_size", 8)
-    num_secret_pixels = np.prod(secret_shape)
-    num_bits = num_secret_pixels * 8
-    
-    # Преобразуем изображение
-    if len(image.shape) == 3:
-        image_ycrcb = cv2.cvtColor(image, cv2.COLOR_BGR2YCrCb)
-        y_channel = image_ycrcb[:, :, 0].astype(np.float32)
-    else:
-        y_channel = image.astype(np.float32)
-    
-    h, w = y_channel.shape
-    bits = []
-    bit_idx = 0
-    
-    # Извлекаем биты из DCT коэффициентов
-    for i in range(0, h - block_size + 1, block_size):
-        for j in range(0, w - block_size + 1, block_size):
-            if bit_idx >= num_bits:
-                break
-            
-            # Извлекаем блок
-            block = y_channel[i:i+block_size, j:j+block_size]
-            
-            # DCT преобразование
-            dct_block = cv2.dct(block)
-            
-            # Извлекаем бит из коэффициента
-            # Декодируем через проверку остатка от деления
-            coeff = dct_block[4, 4]
-            quantized = round(coeff / strength)
-            bit = 1 if (abs(quantized) % 2) == 1 else 0
-            bits.append(bit)
-            
-            bit_idx += 1
-        
-        if bit_idx >= num_bits:
-            break
-    
-    # Конвертируем биты обратно в байты
-    secret_bytes = []
-    for i in range(0, len(bits), 8):
-        if i + 8 <= len(bits):
-            byte_bits = bits[i:i+8]
-            byte_value = int(''.join(map(str, byte_bits)), 2)
-            secret_bytes.append(byte_value)
-    
-    # Восстанавливаем форму секретного изображения
-    result = np.array(secret_bytes, dtype=np.uint8)
-    
-    # Обрезаем до нужного размера и восстанавливаем форму
-    result = result[:num_secret_pixels].reshape(secret_shape)
+    layout = params.get("layout", "raster")
+    planes = params.get("planes", 8)
+    num_secret_pixels = int(np.prod(secret_shape))
+    # Для превью декодируются только блоки с k старшими плоскостями
+    num_bits = image_bits_needed(num_secret_pixels, layout, planes)
+    
+    positions = resolve_positions(params, block_size)
+    y_channel = luma(image, resolve_channel_order(params))
+    order = block_order(y_channel, block_size, positions, resolve_min_activity(params))
+    bits = extract_bits(y_channel, num_bits, strength, block_size, positions=positions,
+                        transform=resolve_transform(params, block_size), order=order)
+    
+    # Конвертируем биты обратно в пиксели и восстанавливаем форму
+    result = bits_to_image(bits, num_secret_pixels, layout, planes).reshape(secret_shape)
     
     return result
@@ -0,0 +1,129 @@
+"""
+Встраивание прямо в квантованные коэффициенты JPEG.
+
+Контейнер — байты baseline JPEG. Коэффициенты читаются jpeg_coeffs без
+декодирования в пиксели, бит пишется в чётность модуля AC-коэффициента
+яркости, после чего файл кодируется обратно. Второго квантования нет,
+а вне изменённых коэффициентов файл декодируется в те же пиксели.
+
+Носители — AC-коэффициенты канала Y с |c| >= 2 в порядке блоков и зигзага.
+Изменение |c| -> |c| xor 1 не выводит коэффициент из множества носителей
+и не создаёт новых нулей, поэтому извлечение находит те же позиции.
+"""
+import numpy as np
+from watermark.payload import HEADER_SIZE, pack_payload, unpack_payload, encode_image, decode_image
+from watermark.utils import bytes_to_bits, bits_to_bytes, image_to_bits, bits_to_image, image_bits_needed
+from .jpeg_coeffs import read_jpeg, write_jpeg
+
+
+def _carriers(jpeg) -> tuple:
+    """Коэффициенты видимых блоков яркости подряд и номера носителей среди них."""
+    flat = jpeg.visible(0).reshape(-1).copy()
+    carrier = np.abs(flat) >= 2
+    carrier[::64] = False  # DC не используется
+    return flat, np.flatnonzero(carrier)
+
+
+def capacity_bits(jpeg) -> int:
+    """Ёмкость в битах: количество AC-коэффициентов яркости с |c| >= 2."""
+    return int(_carriers(jpeg)[1].size)
+
+
+def embed_bits(jpeg, bits: np.ndarray) -> int:
+    """
+    Встраивает биты в чётность модулей носителей (на месте).
+
+    Returns:
+        Количество изменённых коэффициентов
+    """
+    flat, index = _carriers(jpeg)
+    if bits.size > index.size:
+        raise ValueError(f"Секрет слишком большой! Максимум {index.size} бит, требуется {bits.size}")
+    values = flat[index[:bits.size]]
+    magnitude = np.abs(values)
+    changed = (magnitude & 1) != bits
+    magnitude[changed] ^= 1
+    flat[index[:bits.size]] = np.where(values < 0, -magnitude, magnitude)
+    visible = jpeg.visible(0)
+    visible[...] = flat.reshape(visible.shape)
+    return int(np.count_nonzero(changed))
+
+
+def extract_bits(jpeg, count: int, start: int = 0) -> np.ndarray:
+    """Читает `count` битов, начиная с бита `start`."""
+    flat, index = _carriers(jpeg)
+    return (np.abs(flat[index[start:start + count]]) & 1).astype(np.uint8)
+
+
+def iter_bytes(jpeg, chunk_size: int = 4096):
+    """Потоковое чтение встроенных байтов кусками по `chunk_size`."""
+    flat, index = _carriers(jpeg)
+    bits = (np.abs(flat[index]) & 1).astype(np.uint8)
+    for offset in range(0, bits.size // 8, chunk_size):
+        yield bits_to_bytes(bits[offset * 8:(offset + chunk_size) * 8])
+
+
+def embed_text(data: bytes, secret_text: str, params: dict) -> bytes:
+    """
+    Внедрение текста в JPEG без декодирования в пиксели.
+
+    Args:
+        data: байты baseline JPEG
+        secret_text: строка для встраивания
+        params: 'codec' — сжатие с заголовком, как у остальных методов
+
+    Returns:
+        Байты JPEG с внедрённым текстом
+    """
+    secret_bytes = secret_text.encode("utf-8")
+    if params.get("codec"):
+        secret_bytes = pack_payload(secret_bytes, params["codec"])
+    jpeg = read_jpeg(data)
+    embed_bits(jpeg, bytes_to_bits(secret_bytes))
+    return write_jpeg(jpeg)
+
+
+def extract_text(data: bytes, params: dict) -> str:
+    """Извлечение текста из JPEG: 'length' в байтах или 'codec' (длина из заголовка)."""
+    jpeg = read_jpeg(data)
+    if params.get("codec"):
+        secret_bytes = unpack_payload(iter_bytes(jpeg), max_body_size=capacity_bits(jpeg) // 8)
+        return secret_bytes.decode("utf-8", errors="replace")
+    length = params.get("length")
+    if length is None:
+        raise ValueError("Необходимо указать 'length' в параметрах!")
+    return bits_to_bytes(extract_bits(jpeg, length * 8)).decode("utf-8", errors="replace")
+
+
+def embed_image(data: bytes, secret_img: np.ndarray, params: dict) -> bytes:
+    """
+    Внедрение изображения в JPEG без декодирования в пиксели.
+
+    Параметры 'image_codec', 'quality' и 'layout' — как у embed_image для пикселей;
+    автоматического масштабирования секрета нет.
+    """
+    jpeg = read_jpeg(data)
+    codec = params.get("image_codec")
+    if codec:
+        max_body = capacity_bits(jpeg) // 8 - HEADER_SIZE
+        encoded = encode_image(secret_img, codec, params.get("quality", 90), max_size=max_body)
+        bits = bytes_to_bits(pack_payload(encoded, "none"))
+    else:
+        bits = image_to_bits(secret_img.flatten(), params.get("layout", "raster"))
+    embed_bits(jpeg, bits)
+    return write_jpeg(jpeg)
+
+
+def extract_image(data: bytes, params: dict) -> np.ndarray:
+    """Извлечение изображения из JPEG: 'secret_shape' (и 'layout', 'planes') или 'image_codec'."""
+    jpeg = read_jpeg(data)
+    if params.get("image_codec"):
+        return decode_image(unpack_payload(iter_bytes(jpeg), max_body_size=capacity_bits(jpeg) // 8))
+    secret_shape = params.get("secret_shape")
+    if secret_shape is None:
+        raise ValueError("Необходимо указать 'secret_shape' в параметрах!")
+    layout = params.get("layout", "raster")
+    planes = params.get("planes", 8)
+    num_secret_pixels = int(np.prod(secret_shape))
+    bits = extract_bits(jpeg, image_bits_needed(num_secret_pixels, layout, planes))
+    return bits_to_image(bits, num_secret_pixels, layout, planes).reshape(secret_shape)
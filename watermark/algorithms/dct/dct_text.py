@@ -1,160 +1,112 @@
 import numpy as np
-import cv2
+from watermark.payload import pack_payload, unpack_payload
+from watermark.utils import bytes_to_bits, bits_to_bytes
+from .dct_core import (luma, embed_luma, capacity_bits, extract_bits, iter_bytes, resolve_positions,
+                       resolve_transform, resolve_channel_order, embedding_info)
+from .dct_activity import resolve_min_activity, block_order, embed_adaptive
+
+
+def text_payload_bits(secret_text: str, params: dict) -> np.ndarray:
+    """Биты, которые embed_text пишет в контейнер: UTF-8 текста, с 'codec' — сжатый поток с заголовком."""
+    secret_bytes = secret_text.encode("utf-8")
+    if params.get("codec"):
+        secret_bytes = pack_payload(secret_bytes, params["codec"])
+    return bytes_to_bits(secret_bytes)
 
 
 def embed_text(image: np.ndarray, secret_text: str, params: dict) -> np.ndarray:
     """
     Внедрение текстовой строки в изображение методом DCT.
-    
+
     Args:
         image: Исходное изображение (numpy массив)
         secret_text: Строка для встраивания
         params: Словарь параметров:
             - 'strength': коэффициент силы встраивания (по умолчанию 10)
             - 'block_size': размер блока для DCT (по умолчанию 8)
-    
+            - 'codec': сжатие перед встраиванием ('auto', 'zlib', 'bz2', 'lzma', 'none');
+              без параметра текст пишется как есть
+            - 'bits_per_block': сколько среднечастотных коэффициентов блока несут биты
+              (по умолчанию 1 — коэффициент [4, 4], в блоках меньше 5x5 — [B/2, B/2])
+            - 'positions': явный список позиций (u, v) вместо 'bits_per_block'
+            - 'transform': 'float' (по умолчанию) или 'int' — целочисленное
+              DCT 8x8 без float и тригонометрии (см. dct_int)
+            - 'channel_order': порядок каналов цветного изображения, 'bgr'
+              (по умолчанию, cv2) или 'rgb' (PIL)
+            - 'adaptive': писать только в текстурные блоки (см. dct_activity),
+              'min_activity' — порог дисперсии блока (по умолчанию 16)
+            - 'return_info': вернуть пару (изображение, info) с отпечатком
+              изменений info['footprint'] (см. dct_core.embedding_info)
+
     Returns:
         Изображение с внедрённым текстом
     """
     strength = params.get("strength", 10)
     block_size = params.get("block_size", 8)
-    
-    # Преобразуем текст в биты
-    secret_bytes = secret_text.encode("utf-8")
-    secret_bits = ''.join(format(b, '08b') for b in secret_bytes)
-    total_bits = len(secret_bits)
-    
-    # Работаем с копией изображения в формате float
-    stego = image.astype(np.float32)
-    
-    # Если изображение цветное, работаем только с Y-каналом (YCrCb)
-    if len(stego.shape) == 3:
-        stego_ycrcb = cv2.cvtColor(stego.astype(np.uint8), cv2.COLOR_BGR2YCrCb)
-        y_channel = stego_ycrcb[:, :, 0].astype(np.float32)
+    positions = resolve_positions(params, block_size)
+    transform = resolve_transform(params, block_size)
+
+    # Преобразуем текст в биты (со сжатием — вместе с заголовком)
+    secret_bits = text_payload_bits(secret_text, params)
+    total_bits = secret_bits.size
+
+    channel_order = resolve_channel_order(params)
+    min_activity = resolve_min_activity(params)
+    if min_activity is None:
+        max_bits = capacity_bits(image.shape, block_size, positions)
     else:
-        y_channel = stego.copy()
-    
-    h, w = y_channel.shape
-    max_blocks = (h // block_size) * (w // block_size)
-    
-    if total_bits > max_blocks:
-        raise ValueError(f"Текст слишком длинный! Максимум {max_blocks} бит, требуется {total_bits}")
-    
-    bit_idx = 0
-    
-    # Проходим по блокам изображения
-    for i in range(0, h - block_size + 1, block_size):
-        for j in range(0, w - block_size + 1, block_size):
-            if bit_idx >= total_bits:
-                break
-            
-            # Извлекаем блок
-            block = y_channel[i:i+block_size, j:j+block_size]
-            
-            # Применяем DCT
-            dct_block = cv2.dct(block)
-            
-            # Встраиваем бит в средний коэффициент DCT (например, [4, 4])
-            # Используем простую модуляцию на основе знака
-            bit_value = int(secret_bits[bit_idx])
-            coeff = dct_block[4, 4]
-            
-            # Квантуем с использованием strength
-            quantized = round(coeff / strength)
-            
-            # Встраиваем бит через модуляцию 2
-            if bit_value == 1:
-                # Для бита 1: делаем число нечётным
-                if quantized % 2 == 0:
-                    quantized += 1
-            else:  # bit_value == 0
-                # Для бита 0: делаем число чётным
-                if quantized % 2 != 0:
-                    quantized -= 1  # Исправлено: было += 1
-            
-            dct_block[4, 4] = quantized * strength
-            
-            # Обратное DCT преобразование
-            idct_block = cv2.idct(dct_block)
-            y_channel[i:i+block_size, j:j+block_size] = idct_block
-            
-            bit_idx += 1
-        
-        if bit_idx >= total_bits:
-            break
-    
-    # Собираем изображение обратно
-    if len(stego.shape) == 3:
-        stego_ycrcb[:, :, 0] = np.clip(y_channel, 0, 255).astype(np.uint8)
-        stego = cv2.cvtColor(stego_ycrcb, cv2.COLOR_YCrCb2BGR)
+        max_bits = block_order(luma(image, channel_order), block_size, positions, min_activity).size * len(positions)
+    if total_bits > max_bits:
+        raise ValueError(f"Текст слишком длинный! Максимум {max_bits} бит, требуется {total_bits}")
+
+    # Встраиваем по len(positions) битов в блок яркости; у цветного изображения
+    # изменение яркости прибавляется к каналам напрямую
+    if min_activity is not None:
+        stego, blocks = embed_adaptive(image, secret_bits, strength, block_size, positions, transform,
+                                       channel_order, min_activity, return_blocks=True)
     else:
-        stego = np.clip(y_channel, 0, 255).astype(np.uint8)
-    
+        stego, blocks = embed_luma(image, secret_bits, strength, block_size, positions, transform, channel_order), None
+    if params.get("return_info"):
+        return stego, embedding_info(image, stego, total_bits, block_size, positions, blocks)
     return stego
 
 
 def extract_text(image: np.ndarray, params: dict) -> str:
     """
     Извлечение текста из изображения с DCT водяным знаком.
-    
+
     Args:
         image: Изображение с встроенным текстом
         params: Словарь параметров:
-            - 'length': количество символов для извлечения
+            - 'length': количество байтов для извлечения
+            - 'codec': если указан, длина и кодек читаются из заголовка
             - 'block_size': размер блока DCT (по умолчанию 8)
-    
+            - 'bits_per_block' / 'positions', 'transform', 'channel_order',
+              'adaptive' / 'min_activity': те же, что при встраивании
+
     Returns:
         Извлечённая текстовая строка
     """
+    strength = params.get("strength", 10)
+    block_size = params.get("block_size", 8)
+    positions = resolve_positions(params, block_size)
+    transform = resolve_transform(params, block_size)
+    y_channel = luma(image, resolve_channel_order(params))
+    # В адаптивном режиме блоки-носители находятся по карте активности стего
+    order = block_order(y_channel, block_size, positions, resolve_min_activity(params))
+
+    if params.get("codec"):
+        # Блоки декодируются по мере того, как распаковщику нужны новые байты
+        max_body = (capacity_bits(y_channel.shape, block_size, positions) if order is None
+                    else order.size * len(positions)) // 8
+        chunks = iter_bytes(y_channel, strength, block_size, positions=positions, transform=transform, order=order)
+        secret_bytes = unpack_payload(chunks, max_body_size=max_body)
+        return secret_bytes.decode("utf-8", errors="replace")
+
     length = params.get("length")
     if length is None:
         raise ValueError("Необходимо указать 'length' в параметрах!")
-    
-    strength = params.get("strength", 10)
-    block_size = params.get("block_size", 8)
-    num_bits = length * 8
-    
-    # Преобразуем изображение
-    if len(image.shape) == 3:
-        image_ycrcb = cv2.cvtColor(image, cv2.COLOR_BGR2YCrCb)
-        y_channel = image_ycrcb[:, :, 0].astype(np.float32)
-    else:
-        y_channel = image.astype(np.float32)
-    
-    h, w = y_channel.shape
-    bits = []
-    bit_idx = 0
-    
-    # Проходим по блокам
-    for i in range(0, h - block_size + 1, block_size):
-        for j in range(0, w - block_size + 1, block_size):
-            if bit_idx >= num_bits:
-                break
-            
-            # Извлекаем блок
-            block = y_channel[i:i+block_size, j:j+block_size]
-            
-            # Применяем DCT
-            dct_block = cv2.dct(block)
-            
-            # Извлекаем бит из коэффициента [4, 4]
-            # Декодируем через проверку остатка от деления
-            coeff = dct_block[4, 4]
-            quantized = round(coeff / strength)
-            bit = 1 if (abs(quantized) % 2) == 1 else 0
-            bits.append(bit)
-            
-            bit_idx += 1
-        
-        if bit_idx >= num_bits:
-            break
-    
-    # Конвертируем биты в байты и затем в строку
-    secret_bytes = []
-    for i in range(0, len(bits), 8):
-        if i + 8 <= len(bits):
-            byte_bits = bits[i:i+8]
-            byte_value = int(''.join(map(str, byte_bits)), 2)
-            secret_bytes.append(byte_value)
-    
-    return bytes(secret_bytes).decode("utf-8", errors="replace")
+
+    bits = extract_bits(y_channel, length * 8, strength, block_size, positions=positions, transform=transform,
+                        order=order)
+    return bits_to_bytes(bits).decode("utf-8", errors="replace")
@@ -0,0 +1,312 @@
+"""
+Автоматический подбор силы встраивания DCT (strength) под цель качества.
+
+Цель — минимальный PSNR стего или максимальный BER после сжатия JPEG
+с качеством quality. С max_ber ищется наименьшая сила, при которой BER
+не выше цели (min_psnr тогда — ограничение), только с min_psnr —
+наибольшая сила, при которой PSNR не ниже цели.
+
+StrengthTuner считает яркость и коэффициенты-носители контейнера один раз:
+проба только переквантует их, без прямого DCT, а стего собирается лишь
+для BER. Граница ищется делением пополам с подсказками по секущей
+(см. _search); метрики монотонны по силе лишь в среднем, поэтому
+результат — сила, при которой цель выполнена, а в пробе на расстоянии
+не больше tolerance от неё — нет.
+"""
+import math
+from typing import Dict, Optional
+import numpy as np
+import cv2
+from .dct_core import (DEFAULT_POSITIONS, basis, luma, extract_bits, capacity_bits, resolve_positions,
+                       resolve_transform, resolve_channel_order, block_indices)
+from .dct_activity import resolve_min_activity
+from .dct_text import text_payload_bits
+from .dct_image import image_payload_bits
+
+# Границы поиска по умолчанию — диапазон поля strength в GUI
+DEFAULT_RANGE = (5.0, 50.0)
+# Точность границы по strength
+DEFAULT_TOLERANCE = 0.5
+# Сколько проб по секущей делать до перехода к делению пополам
+MAX_GUESSES = 5
+# BER, начиная с которого извлечённые биты считаются случайными
+RANDOM_BER = 0.25
+# Качество JPEG для цели по BER
+DEFAULT_JPEG_QUALITY = 75
+# Строки под нагрузкой, сжимаемые вместе с ней: сглаживающая интерполяция
+# цветности при декодировании JPEG заходит в соседнюю строку MCU (до 16 пикселей)
+JPEG_MARGIN = 16
+
+
+class StrengthTuner:
+    """
+    Пробы силы встраивания по однажды посчитанным коэффициентам-носителям.
+
+    Args:
+        image: контейнер (ч/б или цветной в порядке channel_order)
+        bits: встраиваемые биты (как у embed_luma)
+        block_size, positions, channel_order: как у embed_luma (transform='float', растровый порядок)
+    """
+
+    def __init__(self, image: np.ndarray, bits: np.ndarray, block_size: int = 8,
+                 positions=DEFAULT_POSITIONS, channel_order: str = "bgr"):
+        self.image = np.asarray(image, dtype=np.uint8)
+        self.bits = np.asarray(bits, dtype=np.uint8).reshape(-1)
+        self.block_size = block_size
+        self.positions = positions
+        self.channel_order = channel_order
+        max_bits = capacity_bits(self.image.shape, block_size, positions)
+        if self.bits.size > max_bits:
+            raise ValueError(f"Секрет слишком большой! Максимум {max_bits} бит, требуется {self.bits.size}")
+        self.num_blocks = -(-self.bits.size // len(positions))
+        self.height = -(-self.num_blocks // (self.image.shape[1] // block_size)) * block_size
+        self.luma = luma(self.image[:self.height], channel_order)
+        self.patterns = basis(block_size, positions)
+        view, rows, cols = block_indices(self.luma, block_size, 0, self.num_blocks)
+        self.coefficients = np.einsum("nab,jab->nj", view[rows, cols], self.patterns).reshape(-1)[:self.bits.size]
+        # Самый тёмный и самый светлый канал пикселей строк с нагрузкой (для psnr, при первом вызове)
+        self._darkest = self._brightest = None
+        self.evaluations = 0
+
+    def luma_change(self, strength: float) -> np.ndarray:
+        """Изменение яркости ΔY строк с нагрузкой для силы strength, как в embed_luma."""
+        # Те же операции, что в embed_bits, но над сохранёнными коэффициентами
+        quantized = np.round(self.coefficients / strength)
+        odd = np.abs(quantized) % 2 == 1
+        quantized[(self.bits == 1) & ~odd] += 1
+        quantized[(self.bits == 0) & odd] -= 1
+        k = len(self.positions)
+        delta = np.zeros(self.num_blocks * k, dtype=np.float32)
+        delta[:self.bits.size] = quantized * strength - self.coefficients
+        y_channel = self.luma.copy()
+        view, rows, cols = block_indices(y_channel, self.block_size, 0, self.num_blocks)
+        view[rows, cols] += np.einsum("nj,jab->nab", delta.reshape(self.num_blocks, k), self.patterns)
+        return np.subtract(y_channel, self.luma, out=y_channel)
+
+    def stego(self, strength: float, change: Optional[np.ndarray] = None, rows: Optional[int] = None) -> np.ndarray:
+        """
+        Стего для силы strength, то же, что embed_luma(image, bits, strength, ...).
+
+        change — готовый результат luma_change(strength); rows — вернуть только первые строки.
+        """
+        stego = self.image[:rows].copy()
+        if self.bits.size == 0:
+            return stego
+        change = self.luma_change(strength) if change is None else change
+        region = stego[:self.height]
+        channels = region[..., :3] if region.ndim == 3 else region
+        updated = channels + (change[..., None] if region.ndim == 3 else change)
+        np.rint(updated, out=updated)
+        channels[...] = np.clip(updated, 0, 255, out=updated)
+        return stego
+
+    def psnr(self, change: np.ndarray) -> float:
+        """
+        PSNR стего с изменением яркости change (см. luma_change) без сборки стего.
+
+        Каналы целые, поэтому каждый меняется на rint(ΔY), если только пиксель
+        не упирается в 0 или 255 и ΔY не кончается ровно на половину (тогда
+        округление зависит от чётности канала). Такие пиксели пересчитываются
+        по каналам, как в embed_luma, так что PSNR совпадает с PSNR стего.
+        """
+        if self.bits.size == 0:
+            return float("inf")
+        change = change.reshape(-1)
+        shift = np.rint(change)
+        channels = self.image[:self.height]
+        channels = channels[..., :3].reshape(-1, min(3, channels.shape[-1])) if channels.ndim == 3 \
+            else channels.reshape(-1, 1)
+        flat_shift = shift.astype(np.float64)
+        total = channels.shape[1] * np.dot(flat_shift, flat_shift)
+        if self._darkest is None:
+            # Поэлементно по столбцам-каналам: быстрее, чем min/max по короткой оси
+            columns = [channels[:, index] for index in range(channels.shape[1])]
+            self._darkest, self._brightest = np.minimum.reduce(columns), np.maximum.reduce(columns)
+        limit = np.abs(shift).max()
+        near = (self._darkest < limit) | (self._brightest > 255 - limit) | (np.abs(change - shift) == 0.5)
+        if near.any():
+            samples = channels[near]
+            exact = np.clip(np.rint(samples + change[near, None]), 0, 255) - samples
+            total += np.square(exact, dtype=np.float64).sum() - channels.shape[1] * np.dot(flat_shift[near],
+                                                                                          flat_shift[near])
+        mse = total / self.image.size
+        return float("inf") if mse == 0 else float(10 * np.log10(255.0 ** 2 / mse))
+
+    def jpeg_ber(self, stego: np.ndarray, strength: float, quality: int = DEFAULT_JPEG_QUALITY) -> float:
+        """Доля ошибочных битов, извлечённых из стего после сжатия JPEG с качеством quality."""
+        if self.bits.size == 0:
+            return 0.0
+        region = stego[:min(stego.shape[0], self.height + JPEG_MARGIN)]
+        region = np.ascontiguousarray(region[..., :3] if region.ndim == 3 else region)
+        ok, encoded = cv2.imencode(".jpg", region, [cv2.IMWRITE_JPEG_QUALITY, int(quality)])
+        if not ok:
+            raise ValueError("Не удалось сжать изображение в JPEG")
+        attacked = cv2.imdecode(encoded, cv2.IMREAD_UNCHANGED).reshape(region.shape)
+        y_channel = luma(attacked[:self.height], self.channel_order)
+        extracted = extract_bits(y_channel, self.bits.size, strength, self.block_size, positions=self.positions)
+        return float(np.count_nonzero(extracted != self.bits) / self.bits.size)
+
+    def evaluate(self, strength: float, quality: Optional[int] = None) -> Dict:
+        """Метрики пробы: 'strength', 'psnr' и, если задано quality, 'ber' после JPEG."""
+        self.evaluations += 1
+        change = self.luma_change(strength) if self.bits.size else None
+        result = {"strength": float(strength), "psnr": self.psnr(change)}
+        if quality is not None:
+            stego = self.stego(strength, change, rows=self.height + JPEG_MARGIN)
+            result["ber"] = self.jpeg_ber(stego, strength, quality)
+        return result
+
+    def tune(self, min_psnr: Optional[float] = None, max_ber: Optional[float] = None,
+             quality: int = DEFAULT_JPEG_QUALITY, low: float = DEFAULT_RANGE[0], high: float = DEFAULT_RANGE[1],
+             tolerance: float = DEFAULT_TOLERANCE) -> Dict:
+        """
+        Подбор силы на отрезке [low, high] (см. описание модуля).
+
+        Returns:
+            Словарь метрик найденной силы ('strength', 'psnr', 'ber' с max_ber)
+            и 'evaluations' — число проб
+
+        Raises:
+            ValueError: цель не задана или недостижима на отрезке
+        """
+        if min_psnr is None and max_ber is None:
+            raise ValueError("Нужна цель: 'min_psnr' и/или 'max_ber'")
+        if not 0 < low < high or tolerance <= 0:
+            raise ValueError("Нужны 0 < low < high и tolerance > 0")
+        start = self.evaluations
+        if max_ber is not None:
+            # Наименьшая сила с BER <= max_ber: хороший конец — верхний
+            measure = lambda strength: self.evaluate(strength, quality)
+            feasible = lambda result: result["ber"] <= max_ber
+            score = lambda result: _ber_score(result["ber"], max_ber, self.bits.size)
+            good, bad = high, low
+        else:
+            # Наибольшая сила с PSNR >= min_psnr: хороший конец — нижний
+            measure = self.evaluate
+            feasible = lambda result: result["psnr"] >= min_psnr
+            score = lambda result: min_psnr - result["psnr"] if math.isfinite(result["psnr"]) else None
+            good, bad = low, high
+        best = _search(measure, feasible, score, good, bad, tolerance)
+        if min_psnr is not None and best["psnr"] < min_psnr:
+            raise ValueError(f"Цели недостижимы вместе: при strength={best['strength']:.2f} "
+                             f"BER {best['ber']:.4f}, но PSNR {best['psnr']:.2f} < {min_psnr}")
+        return dict(best, evaluations=self.evaluations - start)
+
+
+def _search(measure, feasible, score, good: float, bad: float, tolerance: float) -> Dict:
+    """
+    Граница между концом good (цель выполнена) и bad по strength.
+
+    score(result) < 0 на стороне good и > 0 на стороне bad (None — проба
+    не информативна); его нуль оценивается по секущей через две последние
+    информативные пробы в координатах log(strength). Без них и после
+    MAX_GUESSES подсказок поиск идёт делением пополам.
+    """
+    good_result = measure(good)
+    if not feasible(good_result):
+        raise ValueError(f"Цель недостижима: не выполняется даже при strength={good:g}")
+    bad_result = measure(bad)
+    if feasible(bad_result):
+        return bad_result
+    direction = 1.0 if good > bad else -1.0
+    probes = [(good, score(good_result)), (bad, score(bad_result))]
+    guesses = MAX_GUESSES
+    while abs(good - bad) > tolerance:
+        candidate = _secant(probes) if guesses else None
+        if candidate is None:
+            candidate = (good + bad) / 2
+        else:
+            guesses -= 1
+            # Смещение на tolerance / 2 к good: точная подсказка попадает на сторону good
+            candidate += direction * tolerance / 2
+            if (candidate - good) * direction > -tolerance:
+                # Подсказка у самого good: проверяем точку на tolerance ближе к bad
+                candidate = good - direction * tolerance
+            else:
+                # Не ближе 5% ширины к bad
+                candidate = good - direction * min(abs(candidate - good), 0.95 * abs(good - bad))
+        result = measure(candidate)
+        probes.append((candidate, score(result)))
+        if feasible(result):
+            good, good_result = candidate, result
+        else:
+            bad, bad_result = candidate, result
+    return good_result
+
+
+def _secant(probes) -> Optional[float]:
+    """Нуль прямой через две последние информативные пробы (strength, score) в координатах log(strength)."""
+    informative = [(strength, value) for strength, value in probes if value is not None]
+    if len(informative) < 2:
+        return None
+    (first, first_score), (second, second_score) = informative[-2:]
+    if first_score == second_score:
+        return None
+    log_first, log_second = math.log(first), math.log(second)
+    return math.exp(log_first + (log_second - log_first) * -first_score / (second_score - first_score))
+
+
+def _ber_score(ber: float, max_ber: float, bits: int) -> Optional[float]:
+    """
+    Логарифм отношения BER к цели; None, если BER ничего не говорит о расстоянии
+    до границы: ноль ошибок или почти случайные биты (насыщение кривой).
+    """
+    if ber == 0 or ber >= RANDOM_BER:
+        return None
+    # Сдвиг на полбита: цель max_ber = 0 остаётся в логарифмической шкале
+    floor = 0.5 / bits
+    return math.log((ber + floor) / (max_ber + 2 * floor))
+
+
+def payload_bits(image: np.ndarray, secret, params: dict) -> np.ndarray:
+    """
+    Биты, которые embed_text / embed_image запишут в контейнер.
+
+    Секрет-изображение без 'image_codec' должно помещаться без масштабирования.
+    """
+    if isinstance(secret, str):
+        return text_payload_bits(secret, params)
+    if not isinstance(secret, np.ndarray):
+        raise ValueError("Secret должен быть str (текст) или np.ndarray (изображение)")
+    block_size = params.get("block_size", 8)
+    max_bits = capacity_bits(image.shape, block_size, resolve_positions(params, block_size))
+    if not params.get("image_codec") and secret.size * 8 > max_bits:
+        raise ValueError(f"Секретное изображение не помещается без масштабирования: "
+                         f"требуется {secret.size * 8} бит, доступно {max_bits}")
+    return image_payload_bits(secret, params, max_bits)
+
+
+def tune_strength(image: np.ndarray, secret, params: Optional[dict] = None, min_psnr: Optional[float] = None,
+                  max_ber: Optional[float] = None, quality: int = DEFAULT_JPEG_QUALITY,
+                  low: float = DEFAULT_RANGE[0], high: float = DEFAULT_RANGE[1],
+                  tolerance: float = DEFAULT_TOLERANCE) -> Dict:
+    """
+    Подбор 'strength' для встраивания secret в image с параметрами params.
+
+    Args:
+        image: контейнер
+        secret: текст или изображение, как у embed
+        params: параметры DCT ('block_size', 'bits_per_block' / 'positions',
+            'channel_order', 'codec', 'image_codec', 'layout'); 'strength' не нужен
+        min_psnr: минимальный PSNR стего, дБ
+        max_ber: максимальная доля ошибочных битов после JPEG с качеством quality
+        quality: качество JPEG для цели по BER
+        low, high: отрезок поиска strength (по умолчанию — диапазон GUI)
+        tolerance: точность границы по strength
+
+    Returns:
+        Словарь 'strength', 'psnr', 'ber' (с max_ber), 'evaluations'
+
+    Raises:
+        ValueError: цель недостижима, секрет не помещается или параметры
+            не поддерживаются (transform='int', adaptive)
+    """
+    params = params or {}
+    block_size = params.get("block_size", 8)
+    if resolve_transform(params, block_size) != "float":
+        raise ValueError("Подбор силы поддерживает только transform='float'")
+    if resolve_min_activity(params) is not None:
+        raise ValueError("Подбор силы не поддерживает адаптивный режим")
+    tuner = StrengthTuner(image, payload_bits(image, secret, params), block_size,
+                          resolve_positions(params, block_size), resolve_channel_order(params))
+    return tuner.tune(min_psnr, max_ber, quality, low, high, tolerance)
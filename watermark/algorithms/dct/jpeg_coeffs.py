@@ -0,0 +1,495 @@
+"""
+Чтение и запись квантованных коэффициентов DCT baseline JPEG.
+
+Файл разбирается до энтропийного уровня: декодер Хаффмана на чистом
+Python восстанавливает квантованные коэффициенты всех блоков, а запись
+строит поток символов векторно (NumPy) и кодирует его обратно
+с оптимальными таблицами Хаффмана (ITU T.81, K.2).
+Обратного DCT, цветового преобразования и повторного квантования нет,
+поэтому файл без изменений коэффициентов декодируется в те же пиксели.
+
+Поддерживаются baseline (SOF0) и extended (SOF1) с 8-битной точностью,
+любые коэффициенты прореживания, чередующиеся и нечередующиеся сканы,
+интервалы перезапуска. Прогрессивный и арифметический JPEG не поддерживаются.
+Маркеры перезапуска при записи не используются.
+"""
+import struct
+import numpy as np
+
+# Позиция в блоке 8x8 (строка * 8 + столбец) для каждого номера зигзага
+ZIGZAG = np.array([
+    0, 1, 8, 16, 9, 2, 3, 10, 17, 24, 32, 25, 18, 11, 4, 5,
+    12, 19, 26, 33, 40, 48, 41, 34, 27, 20, 13, 6, 7, 14, 21, 28,
+    35, 42, 49, 56, 57, 50, 43, 36, 29, 22, 15, 23, 30, 37, 44, 51,
+    58, 59, 52, 45, 38, 31, 39, 46, 53, 60, 61, 54, 47, 55, 62, 63,
+])
+
+SOI, EOI, SOS, DHT, DQT, DRI = 0xD8, 0xD9, 0xDA, 0xC4, 0xDB, 0xDD
+SUPPORTED_FRAMES = (0xC0, 0xC1)
+# Остальные SOFn: прогрессивный, lossless, арифметическое кодирование
+UNSUPPORTED_FRAMES = (0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF)
+
+
+class JpegCoefficients:
+    """
+    Квантованные коэффициенты JPEG и всё, что нужно для записи файла.
+
+    Attributes:
+        width, height: размер изображения
+        components: список словарей {'id', 'h', 'v', 'tq', 'blocks_y', 'blocks_x'};
+            blocks_y/blocks_x — размер видимой области компонента в блоках
+        coefficients: по массиву int16 на компонент, форма
+            (блоков по вертикали, блоков по горизонтали, 64) с дополнением до MCU,
+            коэффициенты в порядке зигзага
+        segments: сохраняемые сегменты заголовка (APPn, COM, DQT, SOF) как есть
+    """
+
+    def __init__(self, width, height, components, coefficients, segments):
+        self.width = width
+        self.height = height
+        self.components = components
+        self.coefficients = coefficients
+        self.segments = segments
+
+    def visible(self, index: int = 0) -> np.ndarray:
+        """Блоки компонента без дополнения до MCU (представление без копии)."""
+        component = self.components[index]
+        return self.coefficients[index][:component["blocks_y"], :component["blocks_x"]]
+
+
+def _lookup_table(counts, symbols) -> list:
+    """
+    Таблица декодирования Хаффмана по 16-битному префиксу.
+
+    Элемент — (длина кода << 8) | символ, 0 — недопустимый префикс.
+    """
+    table = [0] * 65536
+    code = 0
+    k = 0
+    for length in range(1, 17):
+        for _ in range(counts[length - 1]):
+            first = code << (16 - length)
+            entry = (length << 8) | symbols[k]
+            table[first:first + (1 << (16 - length))] = [entry] * (1 << (16 - length))
+            code += 1
+            k += 1
+        code <<= 1
+    return table
+
+
+def _segment_end(data: bytes, pos: int) -> int:
+    """Конец энтропийных данных скана: первый маркер, кроме RSTn."""
+    while True:
+        pos = data.find(b"\xff", pos)
+        if pos < 0 or pos + 1 >= len(data):
+            raise ValueError("JPEG обрывается внутри энтропийных данных")
+        marker = data[pos + 1]
+        if marker == 0 or 0xD0 <= marker <= 0xD7:
+            pos += 2
+            continue
+        return pos
+
+
+def _restart_intervals(entropy: bytes) -> list:
+    """Энтропийные данные, разбитые по маркерам RSTn, без вставленных нулевых байтов."""
+    parts = []
+    start = 0
+    pos = entropy.find(b"\xff", 0)
+    while pos >= 0:
+        if 0xD0 <= entropy[pos + 1] <= 0xD7:
+            parts.append(entropy[start:pos].replace(b"\xff\x00", b"\xff"))
+            start = pos + 2
+        pos = entropy.find(b"\xff", pos + 2)
+    parts.append(entropy[start:].replace(b"\xff\x00", b"\xff"))
+    return parts
+
+
+def _decode_scan(parts, units, restart_interval, total_units) -> None:
+    """
+    Декодирует коэффициенты скана.
+
+    Args:
+        parts: интервалы перезапуска (см. _restart_intervals)
+        units: для каждого блока MCU — (список коэффициентов, функция смещения блока,
+            таблица DC, таблица AC, номер предсказателя DC)
+        restart_interval: MCU в интервале (0 — без перезапусков)
+        total_units: количество MCU в скане
+    """
+    per_part = restart_interval or total_units
+    mcu = 0
+    for data in parts:
+        if mcu >= total_units:
+            break
+        size = len(data)
+        pos = acc = nbits = 0
+        predictions = [0] * 4
+        for mcu in range(mcu, min(mcu + per_part, total_units)):
+            for out, offset_of, dc_table, ac_table, slot in units:
+                base = offset_of(mcu)
+                # DC: категория и дополнительные биты разности
+                while nbits < 16:
+                    acc = ((acc << 8) | (data[pos] if pos < size else 0xFF)) & 0xFFFFFF
+                    pos += 1
+                    nbits += 8
+                entry = dc_table[(acc >> (nbits - 16)) & 0xFFFF]
+                if not entry:
+                    raise ValueError("Повреждённые данные Хаффмана в JPEG")
+                nbits -= entry >> 8
+                s = entry & 0xFF
+                value = 0
+                if s:
+                    while nbits < s:
+                        acc = ((acc << 8) | (data[pos] if pos < size else 0xFF)) & 0xFFFFFF
+                        pos += 1
+                        nbits += 8
+                    nbits -= s
+                    value = (acc >> nbits) & ((1 << s) - 1)
+                    if value < (1 << (s - 1)):
+                        value -= (1 << s) - 1
+                predictions[slot] += value
+                out[base] = predictions[slot]
+                # AC: пары (серия нулей, категория) до EOB
+                k = 1
+                while k < 64:
+                    while nbits < 16:
+                        acc = ((acc << 8) | (data[pos] if pos < size else 0xFF)) & 0xFFFFFF
+                        pos += 1
+                        nbits += 8
+                    entry = ac_table[(acc >> (nbits - 16)) & 0xFFFF]
+                    if not entry:
+                        raise ValueError("Повреждённые данные Хаффмана в JPEG")
+                    nbits -= entry >> 8
+                    s = entry & 0x0F
+                    if not s:
+                        if entry & 0xF0 != 0xF0:
+                            break
+                        k += 16
+                        continue
+                    k += (entry >> 4) & 0x0F
+                    while nbits < s:
+                        acc = ((acc << 8) | (data[pos] if pos < size else 0xFF)) & 0xFFFFFF
+                        pos += 1
+                        nbits += 8
+                    nbits -= s
+                    value = (acc >> nbits) & ((1 << s) - 1)
+                    if value < (1 << (s - 1)):
+                        value -= (1 << s) - 1
+                    if k > 63:
+                        raise ValueError("Повреждённые данные Хаффмана в JPEG")
+                    out[base + k] = value
+                    k += 1
+        mcu += 1
+
+
+def read_jpeg(data: bytes) -> JpegCoefficients:
+    """
+    Разбирает baseline JPEG до квантованных коэффициентов.
+
+    Raises:
+        ValueError: Если файл не JPEG, повреждён или не baseline
+    """
+    data = bytes(data)
+    if data[:2] != b"\xff\xd8":
+        raise ValueError("Данные не являются JPEG-файлом")
+    pos = 2
+    segments = []
+    tables = {}
+    restart_interval = 0
+    frame = None
+    coefficients = None
+    while pos < len(data):
+        if data[pos] != 0xFF:
+            raise ValueError("Повреждённая структура маркеров JPEG")
+        marker = data[pos + 1]
+        if marker == 0xFF:
+            pos += 1
+            continue
+        if marker == EOI:
+            break
+        length = struct.unpack(">H", data[pos + 2:pos + 4])[0]
+        body = data[pos + 4:pos + 2 + length]
+        segment = data[pos:pos + 2 + length]
+        pos += 2 + length
+        if marker in UNSUPPORTED_FRAMES:
+            raise ValueError("Поддерживаются только baseline JPEG (прогрессивный и арифметический — нет)")
+        if marker in SUPPORTED_FRAMES:
+            frame = _parse_frame(body)
+            coefficients = [np.zeros((c["mcu_rows"] * c["v"], c["mcu_cols"] * c["h"], 64), dtype=np.int16)
+                            for c in frame["components"]]
+            segments.append(segment)
+        elif marker == DHT:
+            offset = 0
+            while offset < len(body):
+                table_class, table_id = body[offset] >> 4, body[offset] & 0x0F
+                counts = list(body[offset + 1:offset + 17])
+                symbols = list(body[offset + 17:offset + 17 + sum(counts)])
+                tables[(table_class, table_id)] = _lookup_table(counts, symbols)
+                offset += 17 + sum(counts)
+        elif marker == DRI:
+            restart_interval = struct.unpack(">H", body[:2])[0]
+        elif marker == SOS:
+            if frame is None:
+                raise ValueError("Скан JPEG до заголовка кадра")
+            end = _segment_end(data, pos)
+            _read_scan(body, frame, coefficients, tables, restart_interval, data[pos:end])
+            pos = end
+        else:
+            segments.append(segment)
+    if frame is None:
+        raise ValueError("В JPEG нет заголовка кадра")
+    components = [{key: c[key] for key in ("id", "h", "v", "tq", "blocks_y", "blocks_x")}
+                  for c in frame["components"]]
+    return JpegCoefficients(frame["width"], frame["height"], components, coefficients, segments)
+
+
+def _parse_frame(body: bytes) -> dict:
+    precision, height, width, count = struct.unpack(">BHHB", body[:6])
+    if precision != 8:
+        raise ValueError("Поддерживается только 8-битная точность JPEG")
+    components = []
+    for i in range(count):
+        cid, sampling, tq = body[6 + 3 * i:9 + 3 * i]
+        components.append({"id": cid, "h": sampling >> 4, "v": sampling & 0x0F, "tq": tq})
+    h_max = max(c["h"] for c in components)
+    v_max = max(c["v"] for c in components)
+    for c in components:
+        c["mcu_rows"] = -(-height // (8 * v_max))
+        c["mcu_cols"] = -(-width // (8 * h_max))
+        c["blocks_y"] = -(-(-(-height * c["v"] // v_max)) // 8)
+        c["blocks_x"] = -(-(-(-width * c["h"] // h_max)) // 8)
+    return {"width": width, "height": height, "components": components}
+
+
+def _read_scan(header, frame, coefficients, tables, restart_interval, entropy) -> None:
+    count = header[0]
+    by_id = {c["id"]: i for i, c in enumerate(frame["components"])}
+    scan = []
+    for i in range(count):
+        index = by_id[header[1 + 2 * i]]
+        selectors = header[2 + 2 * i]
+        scan.append((index, selectors >> 4, selectors & 0x0F))
+    units = []
+    if count == 1:
+        # Нечередующийся скан: MCU — один блок видимой области компонента
+        index, dc_id, ac_id = scan[0]
+        component = frame["components"][index]
+        flat = [0] * coefficients[index][:component["blocks_y"], :component["blocks_x"]].size
+        width = component["blocks_x"]
+        units.append((flat, lambda mcu: mcu * 64, tables[(0, dc_id)], tables[(1, ac_id)], 0))
+        total = component["blocks_y"] * width
+        _decode_scan(_restart_intervals(entropy), units, restart_interval, total)
+        coefficients[index][:component["blocks_y"], :width] = np.array(flat, dtype=np.int16).reshape(-1, width, 64)
+        return
+    mcu_cols = frame["components"][0]["mcu_cols"]
+    total = frame["components"][0]["mcu_rows"] * mcu_cols
+    outputs = []
+    for slot, (index, dc_id, ac_id) in enumerate(scan):
+        component = frame["components"][index]
+        h, v = component["h"], component["v"]
+        blocks_x = mcu_cols * h
+        flat = [0] * coefficients[index].size
+        outputs.append((index, flat))
+        for by in range(v):
+            for bx in range(h):
+                def offset_of(mcu, by=by, bx=bx, h=h, v=v, blocks_x=blocks_x):
+                    row, col = divmod(mcu, mcu_cols)
+                    return ((row * v + by) * blocks_x + col * h + bx) * 64
+                units.append((flat, offset_of, tables[(0, dc_id)], tables[(1, ac_id)], slot))
+    _decode_scan(_restart_intervals(entropy), units, restart_interval, total)
+    for index, flat in outputs:
+        coefficients[index][...] = np.array(flat, dtype=np.int16).reshape(coefficients[index].shape)
+
+
+def _optimal_table(frequencies) -> tuple:
+    """
+    Оптимальная таблица Хаффмана с длинами кодов не больше 16 (T.81, K.2).
+
+    Returns:
+        (counts[16], symbols) — содержимое сегмента DHT
+    """
+    freq = list(frequencies) + [1]  # символ 256 резервирует код из одних единиц
+    codesize = [0] * 257
+    others = [-1] * 257
+    while True:
+        candidates = [(f, -i) for i, f in enumerate(freq) if f > 0]
+        if len(candidates) < 2:
+            break
+        candidates.sort()
+        c1, c2 = -candidates[0][1], -candidates[1][1]
+        freq[c1] += freq[c2]
+        freq[c2] = 0
+        codesize[c1] += 1
+        while others[c1] >= 0:
+            c1 = others[c1]
+            codesize[c1] += 1
+        others[c1] = c2
+        codesize[c2] += 1
+        while others[c2] >= 0:
+            c2 = others[c2]
+            codesize[c2] += 1
+    bits = [0] * 33
+    for size in codesize:
+        if size:
+            bits[size] += 1
+    for i in range(32, 16, -1):
+        while bits[i] > 0:
+            j = i - 2
+            while bits[j] == 0:
+                j -= 1
+            bits[i] -= 2
+            bits[i - 1] += 1
+            bits[j + 1] += 2
+            bits[j] -= 1
+    i = 16
+    while bits[i] == 0:
+        i -= 1
+    bits[i] -= 1  # убираем зарезервированный код
+    order = sorted((size, symbol) for symbol, size in enumerate(codesize[:256]) if size)
+    return bits[1:17], [symbol for _, symbol in order]
+
+
+def _code_table(counts, symbols) -> tuple:
+    """Канонические коды Хаффмана: массивы кодов и длин, индексированные символом."""
+    codes = np.zeros(256, dtype=np.int64)
+    lengths = np.zeros(256, dtype=np.int64)
+    code = 0
+    k = 0
+    for length in range(1, 17):
+        for _ in range(counts[length - 1]):
+            codes[symbols[k]] = code
+            lengths[symbols[k]] = length
+            code += 1
+            k += 1
+        code <<= 1
+    return codes, lengths
+
+
+def _category(values: np.ndarray) -> tuple:
+    """Категории (число битов) и дополнительные биты значений коэффициентов."""
+    magnitude = np.abs(values)
+    size = np.zeros(values.shape, dtype=np.int64)
+    nonzero = magnitude > 0
+    size[nonzero] = np.frexp(magnitude[nonzero].astype(np.float64))[1]
+    extra = np.where(values >= 0, values, values + (1 << size) - 1)
+    return size, extra
+
+
+def _symbol_stream(blocks: np.ndarray, slots: np.ndarray) -> dict:
+    """
+    Символы Хаффмана блоков в порядке кодирования, одной векторной операцией.
+
+    Для каждого блока: разность DC, затем на каждый ненулевой AC — серии ZRL
+    (16 нулей) и символ (серия << 4) | категория, в конце EOB, если блок
+    кончается нулями.
+
+    Args:
+        blocks: (N, 64) коэффициенты в порядке зигзага и в порядке кодирования
+        slots: (N,) номер компонента скана для каждого блока
+
+    Returns:
+        Словарь массивов одинаковой длины: slot, cls, symbol, extra, size
+    """
+    blocks = blocks.astype(np.int64)
+    count = blocks.shape[0]
+    diff = np.empty(count, dtype=np.int64)
+    for slot in np.unique(slots):
+        mask = slots == slot
+        diff[mask] = np.diff(blocks[mask, 0], prepend=0)
+    block, k = np.nonzero(blocks[:, 1:])
+    k += 1
+    values = blocks[block, k]
+    same = np.r_[False, block[1:] == block[:-1]]
+    previous = np.where(same, np.r_[0, k[:-1]], 0)
+    run = k - previous - 1
+    zrl = run // 16
+    last = np.zeros(count, dtype=np.int64)
+    last[block] = k  # номера внутри блока возрастают, остаётся последний
+    eob = np.flatnonzero(last < 63)
+    # Элементы: DC (позиция -1), ненулевые AC (позиция k), EOB (позиция 64)
+    item_block = np.concatenate([np.arange(count), block, eob])
+    item_position = np.concatenate([np.full(count, -1), k, np.full(eob.size, 64)])
+    order = np.lexsort((item_position, item_block))
+    dc_size, dc_extra = _category(diff)
+    ac_size, ac_extra = _category(values)
+    fields = {
+        "slot": np.concatenate([slots, slots[block], slots[eob]])[order],
+        "cls": np.concatenate([np.zeros(count, np.int64), np.ones(k.size + eob.size, np.int64)])[order],
+        "symbol": np.concatenate([dc_size, ((run % 16) << 4) | ac_size, np.zeros(eob.size, np.int64)])[order],
+        "extra": np.concatenate([dc_extra, ac_extra, np.zeros(eob.size, np.int64)])[order],
+        "size": np.concatenate([dc_size, ac_size, np.zeros(eob.size, np.int64)])[order],
+    }
+    repeats = np.concatenate([np.ones(count, np.int64), zrl + 1, np.ones(eob.size, np.int64)])[order]
+    if not np.any(repeats > 1):
+        return fields
+    # Перед символом с длинной серией нулей вставляем ZRL: символ 0xF0 без битов
+    expanded = {name: np.repeat(array, repeats) for name, array in fields.items()}
+    is_last = np.zeros(expanded["symbol"].size, dtype=bool)
+    is_last[np.cumsum(repeats) - 1] = True
+    expanded["symbol"][~is_last] = 0xF0
+    expanded["extra"][~is_last] = 0
+    expanded["size"][~is_last] = 0
+    return expanded
+
+
+def _pack_bits(values: np.ndarray, lengths: np.ndarray) -> bytes:
+    """Склеивает коды переменной длины, дополняет единицами и вставляет 0x00 после 0xFF."""
+    total = int(lengths.sum())
+    starts = np.cumsum(lengths) - lengths
+    owner = np.repeat(np.arange(values.size), lengths)
+    offset = np.arange(total) - starts[owner]
+    bits = ((values[owner] >> (lengths[owner] - 1 - offset)) & 1).astype(np.uint8)
+    bits = np.concatenate([bits, np.ones(-total % 8, dtype=np.uint8)])
+    packed = np.packbits(bits)
+    return np.insert(packed, np.flatnonzero(packed == 0xFF) + 1, 0).tobytes()
+
+
+def write_jpeg(jpeg: JpegCoefficients) -> bytes:
+    """
+    Кодирует коэффициенты обратно в JPEG с оптимальными таблицами Хаффмана.
+
+    Яркость (первый компонент) и цветность получают отдельные пары таблиц.
+    Один компонент пишется нечередующимся сканом, несколько — одним чередующимся.
+    """
+    components = jpeg.components
+    table_of = np.array([0 if i == 0 else 1 for i in range(len(components))])
+    if len(components) == 1:
+        blocks = jpeg.visible(0).reshape(-1, 64)
+        slots = np.zeros(blocks.shape[0], dtype=np.int64)
+    else:
+        mcu_rows = jpeg.coefficients[0].shape[0] // components[0]["v"]
+        mcu_cols = jpeg.coefficients[0].shape[1] // components[0]["h"]
+        # Блоки каждого компонента в порядке MCU: (строка MCU, столбец MCU, by, bx)
+        ordered, unit_slots = [], []
+        for index, component in enumerate(components):
+            h, v = component["h"], component["v"]
+            units = jpeg.coefficients[index].reshape(mcu_rows, v, mcu_cols, h, 64).transpose(0, 2, 1, 3, 4)
+            ordered.append(units.reshape(mcu_rows * mcu_cols, h * v, 64))
+            unit_slots += [index] * (h * v)
+        blocks = np.concatenate(ordered, axis=1).reshape(-1, 64)
+        slots = np.tile(np.array(unit_slots), mcu_rows * mcu_cols)
+    stream = _symbol_stream(blocks, slots)
+    tables = table_of[stream["slot"]]
+    codes = np.zeros(stream["symbol"].size, dtype=np.int64)
+    lengths = np.zeros(stream["symbol"].size, dtype=np.int64)
+    dht = bytearray()
+    for cls in (0, 1):
+        for table in np.unique(table_of):
+            mask = (stream["cls"] == cls) & (tables == table)
+            counts, values = _optimal_table(np.bincount(stream["symbol"][mask], minlength=256))
+            dht += bytes([(cls << 4) | int(table)]) + bytes(counts) + bytes(values)
+            table_codes, table_lengths = _code_table(counts, values)
+            codes[mask] = table_codes[stream["symbol"][mask]]
+            lengths[mask] = table_lengths[stream["symbol"][mask]]
+    entropy = _pack_bits((codes << stream["size"]) | stream["extra"], lengths + stream["size"])
+    sos = bytearray([len(components)])
+    for slot, component in enumerate(components):
+        sos += bytes([component["id"], (int(table_of[slot]) << 4) | int(table_of[slot])])
+    sos += bytes([0, 63, 0])
+    return b"".join([
+        b"\xff\xd8",
+        *jpeg.segments,
+        b"\xff\xc4" + struct.pack(">H", len(dht) + 2) + bytes(dht),
+        b"\xff\xda" + struct.pack(">H", len(sos) + 2) + bytes(sos),
+        entropy,
+        b"\xff\xd9",
+    ])
@@ -0,0 +1,3 @@
+from .dwt import embed, extract
+
+__all__ = ['embed', 'extract']
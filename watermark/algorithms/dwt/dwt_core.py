@@ -0,0 +1,201 @@
+import numpy as np
+from watermark.utils import bits_to_bytes
+
+WAVELETS = ("haar", "cdf53")
+BANDS = ("LL", "LH", "HL", "HH")
+
+
+def _lift_haar(even: np.ndarray, odd: np.ndarray) -> None:
+    """Прямой шаг Хаара: odd -> деталь, even -> среднее (на месте)."""
+    odd -= even
+    even += odd * 0.5
+
+
+def _unlift_haar(even: np.ndarray, odd: np.ndarray) -> None:
+    even -= odd * 0.5
+    odd += even
+
+
+def _lift_cdf53(even: np.ndarray, odd: np.ndarray) -> None:
+    """
+    Прямой шаг CDF 5/3 (на месте) с симметричным продолжением на границах.
+
+    Предсказание: d[n] = x[2n+1] - (x[2n] + x[2n+2]) / 2,
+    обновление:   s[n] = x[2n] + (d[n-1] + d[n]) / 4.
+    """
+    odd[:-1] -= (even[:-1] + even[1:]) * 0.5
+    odd[-1:] -= even[-1:]
+    even[1:] += (odd[:-1] + odd[1:]) * 0.25
+    even[:1] += odd[:1] * 0.5
+
+
+def _unlift_cdf53(even: np.ndarray, odd: np.ndarray) -> None:
+    even[:1] -= odd[:1] * 0.5
+    even[1:] -= (odd[:-1] + odd[1:]) * 0.25
+    odd[-1:] += even[-1:]
+    odd[:-1] += (even[:-1] + even[1:]) * 0.5
+
+
+_LIFTING = {
+    "haar": (_lift_haar, _unlift_haar),
+    "cdf53": (_lift_cdf53, _unlift_cdf53),
+}
+
+
+def _steps(wavelet: str):
+    if wavelet not in _LIFTING:
+        raise ValueError(f"Вейвлет '{wavelet}' не поддерживается. Доступны: {', '.join(WAVELETS)}")
+    return _LIFTING[wavelet]
+
+
+def transform_region(shape, levels: int):
+    """
+    Размер области, которую можно разложить на `levels` уровней.
+
+    Стороны округляются вниз до кратных 2^levels; остаток справа и снизу
+    не преобразуется и не меняется.
+    """
+    if levels < 1:
+        raise ValueError("'levels' должно быть не меньше 1")
+    step = 1 << levels
+    return (shape[0] // step) * step, (shape[1] // step) * step
+
+
+def forward(data: np.ndarray, levels: int, wavelet: str = "haar") -> None:
+    """
+    Многоуровневое прямое преобразование лифтингом (на месте).
+
+    Коэффициенты остаются на своих местах (чередующаяся раскладка): уровень l
+    работает со страйдовым представлением data[::2^(l-1), ::2^(l-1)], поэтому
+    промежуточных буферов для поддиапазонов не нужно. Получить поддиапазон
+    можно через subband().
+
+    Args:
+        data: двумерный массив float (стороны кратны 2^levels, см. transform_region)
+        levels: количество уровней
+        wavelet: 'haar' или 'cdf53'
+    """
+    lift, _ = _steps(wavelet)
+    for level in range(levels):
+        view = data[::1 << level, ::1 << level]
+        # Сначала по столбцам (вдоль оси x), затем по строкам
+        lift(view[:, 0::2].T, view[:, 1::2].T)
+        lift(view[0::2], view[1::2])
+
+
+def inverse(data: np.ndarray, levels: int, wavelet: str = "haar") -> None:
+    """Обратное преобразование к forward (на месте)."""
+    _, unlift = _steps(wavelet)
+    for level in reversed(range(levels)):
+        view = data[::1 << level, ::1 << level]
+        unlift(view[0::2], view[1::2])
+        unlift(view[:, 0::2].T, view[:, 1::2].T)
+
+
+def subband(data: np.ndarray, levels: int, band: str) -> np.ndarray:
+    """
+    Страйдовое представление поддиапазона самого глубокого уровня.
+
+    'LL' — аппроксимация, 'HL' — горизонтальные частоты (вертикальные границы),
+    'LH' — вертикальные частоты, 'HH' — диагональные.
+    """
+    if band not in BANDS:
+        raise ValueError(f"Поддиапазон '{band}' не поддерживается. Доступны: {', '.join(BANDS)}")
+    step = 1 << levels
+    half = step >> 1
+    row = half if band[1] == "H" else 0
+    col = half if band[0] == "H" else 0
+    return data[row::step, col::step]
+
+
+def capacity_bits(shape, levels: int) -> int:
+    """Ёмкость в битах: 1 бит на коэффициент выбранного поддиапазона."""
+    height, width = transform_region(shape, levels)
+    return (height >> levels) * (width >> levels)
+
+
+def qim_embed(values: np.ndarray, bits: np.ndarray, strength: float) -> np.ndarray:
+    """
+    QIM по чётности: квантует значения так, чтобы чётность уровня совпала с битом.
+
+    При несовпадении значение сдвигается к ближайшему уровню нужной чётности.
+
+    Returns:
+        Новые значения (массив той же формы)
+    """
+    scaled = values / strength
+    quantized = np.round(scaled)
+    mismatch = (np.abs(quantized) % 2) != bits
+    quantized[mismatch] += np.where(scaled[mismatch] >= quantized[mismatch], 1, -1)
+    return quantized * strength
+
+
+def qim_extract(values: np.ndarray, strength: float) -> np.ndarray:
+    """Биты по чётности квантованных значений (массив uint8)."""
+    return (np.abs(np.round(values / strength)) % 2).astype(np.uint8)
+
+
+def embed_bits(coeffs: np.ndarray, bits: np.ndarray, strength: float) -> None:
+    """
+    QIM: встраивает биты в чётность квантованных коэффициентов (на месте).
+
+    Бит t попадает в коэффициент t поддиапазона в растровом порядке. Все
+    коэффициенты обрабатываются одной векторной операцией.
+
+    Args:
+        coeffs: поддиапазон (страйдовое представление из subband)
+        bits: массив нулей и единиц
+        strength: шаг квантования
+    """
+    if bits.size == 0:
+        return
+    width = coeffs.shape[1]
+    rows = -(-bits.size // width)
+    region = coeffs[:rows]
+    updated = region.reshape(-1).copy()
+    updated[:bits.size] = qim_embed(updated[:bits.size], bits, strength)
+    region[...] = updated.reshape(region.shape)
+
+
+def extract_bits(coeffs: np.ndarray, count: int, strength: float, start: int = 0) -> np.ndarray:
+    """
+    Читает `count` битов, начиная с коэффициента `start`.
+
+    Returns:
+        Массив uint8 из нулей и единиц
+    """
+    if count <= 0:
+        return np.zeros(0, dtype=np.uint8)
+    width = coeffs.shape[1]
+    first_row = start // width
+    last_row = -(-(start + count) // width)
+    values = coeffs[first_row:last_row].reshape(-1)
+    offset = start - first_row * width
+    return qim_extract(values[offset:offset + count], strength)
+
+
+def iter_bytes(coeffs: np.ndarray, strength: float, chunk_size: int = 4096):
+    """Потоковое чтение встроенных байтов кусками по `chunk_size`."""
+    total_bytes = coeffs.size // 8
+    for offset in range(0, total_bytes, chunk_size):
+        count = min(chunk_size, total_bytes - offset)
+        yield bits_to_bytes(extract_bits(coeffs, count * 8, strength, start=offset * 8))
+
+
+def decompose(y_channel: np.ndarray, params: dict):
+    """
+    Раскладывает Y-канал по параметрам алгоритма.
+
+    Returns:
+        Кортеж (область преобразования, представление поддиапазона)
+    """
+    levels = params.get("levels", 2)
+    height, width = transform_region(y_channel.shape, levels)
+    region = y_channel[:height, :width]
+    forward(region, levels, params.get("wavelet", "haar"))
+    return region, subband(region, levels, params.get("band", "HL"))
+
+
+def reconstruct(region: np.ndarray, params: dict) -> None:
+    """Обратное преобразование области после встраивания (на месте)."""
+    inverse(region, params.get("levels", 2), params.get("wavelet", "haar"))
@@ -0,0 +1,86 @@
+import numpy as np
+from watermark.payload import HEADER_SIZE, pack_payload, unpack_payload, encode_image, decode_image
+from watermark.utils import bytes_to_bits, image_to_bits, bits_to_image, image_bits_needed
+from watermark.algorithms.dct.dct_core import to_luma, from_luma
+from .dwt_core import capacity_bits, decompose, reconstruct, embed_bits, extract_bits, iter_bytes
+from .dwt_stream import embed_bits_stream, extract_bits_stream, iter_bytes_stream
+
+
+def embed_image(image: np.ndarray, secret_img: np.ndarray, params: dict) -> np.ndarray:
+    """
+    Внедрение секретного изображения методом DWT.
+
+    Args:
+        image: Исходное изображение-контейнер
+        secret_img: Секретное изображение для встраивания
+        params: Словарь параметров:
+            - 'strength', 'wavelet', 'levels', 'band': как для текста
+            - 'image_codec': встраивать закодированный файл ('png', 'webp', 'jpeg', 'webp-lossy')
+            - 'quality': качество для кодеков с потерями (по умолчанию 90)
+            - 'layout': 'raster' (по умолчанию) или 'planes'
+            - 'strip_rows', 'out': потоковый режим, как для текста
+
+    Returns:
+        Изображение с внедрённым секретным изображением
+    """
+    strength = params.get("strength", 8)
+    codec = params.get("image_codec")
+    max_bits = capacity_bits(image.shape, params.get("levels", 2))
+
+    if codec:
+        max_body = max_bits // 8 - HEADER_SIZE
+        encoded = encode_image(secret_img, codec, params.get("quality", 90), max_size=max_body)
+        secret_bits = bytes_to_bits(pack_payload(encoded, "none"))
+    else:
+        if secret_img.size * 8 > max_bits:
+            raise ValueError(f"Секрет слишком большой! Максимум {max_bits} бит, требуется {secret_img.size * 8}")
+        secret_bits = image_to_bits(secret_img.flatten(), params.get("layout", "raster"))
+
+    if params.get("strip_rows"):
+        return embed_bits_stream(image, secret_bits, params, params.get("out"))
+
+    y_channel, ycrcb = to_luma(image)
+    region, coeffs = decompose(y_channel, params)
+    embed_bits(coeffs, secret_bits, strength)
+    reconstruct(region, params)
+    return from_luma(np.round(y_channel), ycrcb)
+
+
+def extract_image(image: np.ndarray, params: dict) -> np.ndarray:
+    """
+    Извлечение секретного изображения из контейнера с DWT водяным знаком.
+
+    Args:
+        image: Изображение-контейнер с встроенным секретом
+        params: Те же параметры преобразования, что при встраивании, и
+            - 'secret_shape': форма секретного изображения (tuple)
+            - 'image_codec': изображение встроено как файл, форма берётся из него
+            - 'layout', 'planes': раскладка и превью из k старших плоскостей
+            - 'strip_rows': читать полосами, не раскладывая изображение целиком
+
+    Returns:
+        Извлечённое секретное изображение
+    """
+    strength = params.get("strength", 8)
+    streaming = params.get("strip_rows")
+    if not streaming:
+        y_channel, _ = to_luma(image)
+        _, coeffs = decompose(y_channel, params)
+
+    if params.get("image_codec"):
+        max_body = capacity_bits(image.shape, params.get("levels", 2)) // 8
+        chunks = iter_bytes_stream(image, params) if streaming else iter_bytes(coeffs, strength)
+        return decode_image(unpack_payload(chunks, max_body_size=max_body))
+
+    secret_shape = params.get("secret_shape")
+    if secret_shape is None:
+        raise ValueError("Необходимо указать 'secret_shape' в параметрах!")
+    layout = params.get("layout", "raster")
+    planes = params.get("planes", 8)
+    num_secret_pixels = int(np.prod(secret_shape))
+    num_bits = image_bits_needed(num_secret_pixels, layout, planes)
+    if streaming:
+        bits = extract_bits_stream(image, num_bits, params)
+    else:
+        bits = extract_bits(coeffs, num_bits, strength)
+    return bits_to_image(bits, num_secret_pixels, layout, planes).reshape(secret_shape)
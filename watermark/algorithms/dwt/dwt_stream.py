@@ -0,0 +1,141 @@
+import numpy as np
+from watermark.algorithms.dct.dct_core import to_luma, from_luma
+from .dwt_core import transform_region, forward, inverse, subband, embed_bits, extract_bits
+
+# Высота полосы по умолчанию (строк изображения)
+STRIP_ROWS = 256
+
+
+def halo_rows(levels: int, wavelet: str) -> int:
+    """
+    Сколько соседних строк нужно полосе с каждой стороны.
+
+    У Хаара блоки 2^levels строк независимы. У CDF 5/3 радиус зависимости
+    анализа и синтеза на уровне l — по 2^l строк, в сумме по всем уровням
+    меньше 2^(levels + 2).
+    """
+    return 0 if wavelet == "haar" else 4 << levels
+
+
+def _strips(params: dict, shape):
+    """Границы полос [top, bottom) внутри области преобразования."""
+    levels = params.get("levels", 2)
+    step = 1 << levels
+    strip = max(step, params.get("strip_rows", STRIP_ROWS) // step * step)
+    height, _ = transform_region(shape, levels)
+    for top in range(0, height, strip):
+        yield top, min(top + strip, height)
+
+
+def _window(image, params: dict, top: int, bottom: int):
+    """
+    Загружает полосу с ореолом и раскладывает её.
+
+    Строки полосы внутри окна вычисляются теми же операциями, что и при
+    разложении всего изображения, поэтому результат совпадает побитово.
+
+    Returns:
+        Кортеж (начало окна, Y-канал окна, YCrCb окна или None, область, поддиапазон)
+    """
+    levels = params.get("levels", 2)
+    height, width = transform_region(image.shape, levels)
+    halo = halo_rows(levels, params.get("wavelet", "haar"))
+    first, last = max(0, top - halo), min(height, bottom + halo)
+    y_channel, ycrcb = to_luma(np.asarray(image[first:last]))
+    region = y_channel[:, :width]
+    forward(region, levels, params.get("wavelet", "haar"))
+    return first, y_channel, ycrcb, region, subband(region, levels, params.get("band", "HL"))
+
+
+def embed_bits_stream(image, bits: np.ndarray, params: dict, out=None) -> np.ndarray:
+    """
+    Встраивание в поддиапазон DWT полосами, без разложения всего изображения.
+
+    В памяти одновременно находится только полоса 'strip_rows' строк с ореолом
+    (halo_rows), поэтому image и out могут быть np.memmap больше оперативной
+    памяти. Полосы за пределами полезной нагрузки только проходят через
+    преобразование цвета. Результат совпадает с обычным embed_bits.
+
+    Args:
+        image: контейнер uint8 (ч/б или BGR), в том числе np.memmap
+        bits: массив нулей и единиц
+        params: параметры DWT ('strength', 'wavelet', 'levels', 'band', 'strip_rows')
+        out: массив для результата той же формы (по умолчанию создаётся новый);
+             не должен совпадать с image — ореол читается из исходных строк
+
+    Returns:
+        Массив out
+    """
+    if out is None:
+        out = np.empty(image.shape, dtype=np.uint8)
+    if out is image:
+        raise ValueError("Потоковое встраивание не работает на месте: нужен отдельный 'out'")
+    levels = params.get("levels", 2)
+    strength = params.get("strength", 8)
+    wavelet = params.get("wavelet", "haar")
+    height, width = transform_region(image.shape, levels)
+    band_width = width >> levels
+    # Строки, которых может коснуться изменение коэффициентов
+    payload_rows = -(-bits.size // band_width) << levels
+    affected = payload_rows + halo_rows(levels, wavelet)
+    for top, bottom in _strips(params, image.shape):
+        if top >= affected:
+            out[top:bottom] = from_luma(*to_luma(np.asarray(image[top:bottom])))
+            continue
+        first, y_channel, ycrcb, region, coeffs = _window(image, params, top, bottom)
+        # Коэффициенты окна получают свои биты, включая коэффициенты ореола
+        begin = (first >> levels) * band_width
+        end = min(bits.size, begin + coeffs.size)
+        if begin < end:
+            embed_bits(coeffs, bits[begin:end], strength)
+        inverse(region, levels, wavelet)
+        rows = slice(top - first, bottom - first)
+        out[top:bottom] = from_luma(np.round(y_channel[rows]), None if ycrcb is None else ycrcb[rows])
+    # Строки ниже области преобразования
+    if height < image.shape[0]:
+        out[height:] = from_luma(*to_luma(np.asarray(image[height:])))
+    return out
+
+
+def iter_subband_rows(image, params: dict):
+    """
+    Потоково отдаёт строки выбранного поддиапазона, полоса за полосой.
+
+    Yields:
+        Массивы коэффициентов (строк поддиапазона, ширина поддиапазона)
+    """
+    levels = params.get("levels", 2)
+    for top, bottom in _strips(params, image.shape):
+        first, _, _, _, coeffs = _window(image, params, top, bottom)
+        yield coeffs[(top - first) >> levels:(bottom - first) >> levels]
+
+
+def iter_bits_stream(image, params: dict):
+    """Потоково отдаёт извлечённые биты по полосам."""
+    strength = params.get("strength", 8)
+    for rows in iter_subband_rows(image, params):
+        yield extract_bits(rows, rows.size, strength)
+
+
+def extract_bits_stream(image, count: int, params: dict) -> np.ndarray:
+    """Читает первые `count` битов, разлагая только нужные полосы."""
+    chunks, total = [], 0
+    for bits in iter_bits_stream(image, params):
+        if total >= count:
+            break
+        chunks.append(bits)
+        total += bits.size
+    if not chunks:
+        return np.zeros(0, dtype=np.uint8)
+    return np.concatenate(chunks)[:count]
+
+
+def iter_bytes_stream(image, params: dict):
+    """Потоковое чтение встроенных байтов: по куску на полосу."""
+    pending = np.zeros(0, dtype=np.uint8)
+    for bits in iter_bits_stream(image, params):
+        pending = np.concatenate([pending, bits])
+        usable = pending.size // 8 * 8
+        if usable:
+            yield np.packbits(pending[:usable]).tobytes()
+            pending = pending[usable:]
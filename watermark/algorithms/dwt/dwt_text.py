@@ -0,0 +1,84 @@
+import numpy as np
+from watermark.payload import pack_payload, unpack_payload
+from watermark.utils import bytes_to_bits, bits_to_bytes
+from watermark.algorithms.dct.dct_core import to_luma, from_luma
+from .dwt_core import capacity_bits, decompose, reconstruct, embed_bits, extract_bits, iter_bytes
+from .dwt_stream import embed_bits_stream, extract_bits_stream, iter_bytes_stream
+
+
+def embed_text(image: np.ndarray, secret_text: str, params: dict) -> np.ndarray:
+    """
+    Внедрение текстовой строки в изображение методом DWT.
+
+    Args:
+        image: Исходное изображение (numpy массив)
+        secret_text: Строка для встраивания
+        params: Словарь параметров:
+            - 'strength': шаг квантования QIM (по умолчанию 8)
+            - 'wavelet': 'haar' (по умолчанию) или 'cdf53'
+            - 'levels': количество уровней разложения (по умолчанию 2)
+            - 'band': поддиапазон последнего уровня 'LL', 'LH', 'HL' (по умолчанию), 'HH'
+            - 'codec': сжатие перед встраиванием ('auto', 'zlib', 'bz2', 'lzma', 'none')
+            - 'strip_rows': обрабатывать изображение полосами такой высоты
+              (для np.memmap больше оперативной памяти)
+            - 'out': массив для результата в потоковом режиме (например, np.memmap)
+
+    Returns:
+        Изображение с внедрённым текстом
+    """
+    strength = params.get("strength", 8)
+    codec = params.get("codec")
+
+    secret_bytes = secret_text.encode("utf-8")
+    if codec:
+        secret_bytes = pack_payload(secret_bytes, codec)
+    secret_bits = bytes_to_bits(secret_bytes)
+
+    max_bits = capacity_bits(image.shape, params.get("levels", 2))
+    if secret_bits.size > max_bits:
+        raise ValueError(f"Текст слишком длинный! Максимум {max_bits} бит, требуется {secret_bits.size}")
+
+    if params.get("strip_rows"):
+        return embed_bits_stream(image, secret_bits, params, params.get("out"))
+
+    y_channel, ycrcb = to_luma(image)
+    region, coeffs = decompose(y_channel, params)
+    embed_bits(coeffs, secret_bits, strength)
+    reconstruct(region, params)
+    return from_luma(np.round(y_channel), ycrcb)
+
+
+def extract_text(image: np.ndarray, params: dict) -> str:
+    """
+    Извлечение текста из изображения с DWT водяным знаком.
+
+    Args:
+        image: Изображение с встроенным текстом
+        params: Те же 'strength', 'wavelet', 'levels', 'band', что при встраивании, и
+            - 'length': количество байтов для извлечения
+            - 'codec': если указан, длина и кодек читаются из заголовка
+            - 'strip_rows': читать полосами, не раскладывая изображение целиком
+
+    Returns:
+        Извлечённая текстовая строка
+    """
+    strength = params.get("strength", 8)
+    streaming = params.get("strip_rows")
+    if not streaming:
+        y_channel, _ = to_luma(image)
+        _, coeffs = decompose(y_channel, params)
+
+    if params.get("codec"):
+        max_body = capacity_bits(image.shape, params.get("levels", 2)) // 8
+        chunks = iter_bytes_stream(image, params) if streaming else iter_bytes(coeffs, strength)
+        secret_bytes = unpack_payload(chunks, max_body_size=max_body)
+        return secret_bytes.decode("utf-8", errors="replace")
+
+    length = params.get("length")
+    if length is None:
+        raise ValueError("Необходимо указать 'length' в параметрах!")
+    if streaming:
+        bits = extract_bits_stream(image, length * 8, params)
+    else:
+        bits = extract_bits(coeffs, length * 8, strength)
+    return bits_to_bytes(bits).decode("utf-8", errors="replace")
@@ -0,0 +1,3 @@
+from .dwt_dct import embed, extract
+
+__all__ = ['embed', 'extract']
@@ -0,0 +1,55 @@
+import numpy as np
+from .dwt_dct_text import embed_text, extract_text
+from .dwt_dct_image import embed_image, extract_image
+
+
+def embed(image, secret, params):
+    """
+    Фасад для гибридного DWT-DCT: выбирает реализацию по типу секрета.
+
+    Args:
+        image: Исходное изображение (numpy массив)
+        secret: Секрет для встраивания (str для текста, np.ndarray для изображения)
+        params: Словарь параметров алгоритма:
+            - 'strength': шаг квантования QIM (по умолчанию 8)
+            - 'levels': уровень поддиапазона LL вейвлета Хаара (по умолчанию 1)
+            - 'block_size': размер блока DCT внутри LL (по умолчанию 8)
+            - 'codec': сжатие текста перед встраиванием
+            - 'image_codec': кодирование секретного изображения
+
+    Returns:
+        Изображение с встроенным водяным знаком
+
+    Raises:
+        ValueError: Если тип секрета не поддерживается
+    """
+    if isinstance(secret, str):
+        return embed_text(image, secret, params)
+    elif isinstance(secret, np.ndarray):
+        return embed_image(image, secret, params)
+    else:
+        raise ValueError("Secret должен быть str (текст) или np.ndarray (изображение)")
+
+
+def extract(image, params):
+    """
+    Фасад для извлечения: выбирает реализацию по параметрам.
+
+    Args:
+        image: Изображение с встроенным водяным знаком
+        params: Параметры 'strength', 'levels', 'block_size', как при встраивании, и
+            - 'length' или 'codec' для текста
+            - 'secret_shape' или 'image_codec' для изображения
+
+    Returns:
+        Извлечённый секрет (str или np.ndarray)
+
+    Raises:
+        ValueError: Если не указаны необходимые параметры
+    """
+    if 'length' in params or params.get('codec'):
+        return extract_text(image, params)
+    elif 'secret_shape' in params or params.get('image_codec'):
+        return extract_image(image, params)
+    else:
+        raise ValueError("Для извлечения необходимо указать либо 'length', либо 'secret_shape' в параметрах.")
@@ -0,0 +1,102 @@
+import numpy as np
+from watermark.utils import bits_to_bytes
+from watermark.algorithms.dct.dct_core import basis, default_positions
+from watermark.algorithms.dwt.dwt_core import qim_embed, qim_extract
+
+
+class BlockGrid:
+    """
+    Блоки DCT в поддиапазоне LL вейвлета Хаара уровня `levels`.
+
+    LL Хаара (в нормировке лифтинга из dwt_core) — среднее по квадрату
+    2^levels x 2^levels пикселей, поэтому блоку LL соответствует свой квадрат
+    изображения со стороной block_size * 2^levels, и его LL считается без
+    разложения остального изображения.
+    """
+
+    def __init__(self, shape, levels: int = 1, block_size: int = 8):
+        if levels < 1:
+            raise ValueError("'levels' должно быть не меньше 1")
+        if block_size < 2:
+            raise ValueError("'block_size' должно быть не меньше 2")
+        self.scale = 1 << levels
+        self.block_size = block_size
+        self.span = block_size * self.scale
+        self.blocks_per_row = shape[1] // self.span
+        self.block_rows = shape[0] // self.span
+
+    def capacity(self) -> int:
+        return self.blocks_per_row * self.block_rows
+
+    def _rows(self, start: int, stop: int):
+        return start // self.blocks_per_row, -(-stop // self.blocks_per_row)
+
+    def ll_blocks(self, y_channel: np.ndarray, start: int, stop: int) -> np.ndarray:
+        """Блоки LL с номерами [start, stop): массив (stop - start, block_size, block_size)."""
+        first_row, last_row = self._rows(start, stop)
+        region = y_channel[first_row * self.span:last_row * self.span, :self.blocks_per_row * self.span]
+        rows = (last_row - first_row) * self.block_size
+        cols = self.blocks_per_row * self.block_size
+        ll = region.reshape(rows, self.scale, cols, self.scale).mean(axis=(1, 3), dtype=np.float32)
+        blocks = ll.reshape(last_row - first_row, self.block_size, self.blocks_per_row, self.block_size)
+        blocks = blocks.transpose(0, 2, 1, 3).reshape(-1, self.block_size, self.block_size)
+        offset = start - first_row * self.blocks_per_row
+        return blocks[offset:offset + stop - start]
+
+    def add_to_blocks(self, y_channel: np.ndarray, start: int, deltas: np.ndarray) -> None:
+        """
+        Прибавляет изменения блоков LL к пикселям (на месте).
+
+        Детали Хаара не меняются, поэтому обратное преобразование сводится к
+        прибавлению изменения LL ко всем пикселям его квадрата 2^levels x 2^levels.
+        """
+        stop = start + deltas.shape[0]
+        first_row, last_row = self._rows(start, stop)
+        full = np.zeros(((last_row - first_row) * self.blocks_per_row, self.block_size, self.block_size),
+                        dtype=np.float32)
+        full[start - first_row * self.blocks_per_row:stop - first_row * self.blocks_per_row] = deltas
+        full = full.reshape(last_row - first_row, self.blocks_per_row, self.block_size, self.block_size)
+        ll_delta = full.transpose(0, 2, 1, 3).reshape((last_row - first_row) * self.block_size, -1)
+        pixels = np.repeat(np.repeat(ll_delta, self.scale, axis=0), self.scale, axis=1)
+        y_channel[first_row * self.span:last_row * self.span, :self.blocks_per_row * self.span] += pixels
+
+
+def embed_bits(y_channel: np.ndarray, bits: np.ndarray, strength: float, levels: int = 1,
+               block_size: int = 8) -> None:
+    """
+    Встраивает биты в коэффициент default_positions(block_size) блоков DCT
+    поддиапазона LL (на месте): [4, 4], в блоках меньше 5x5 — [B/2, B/2].
+
+    Считаются только блоки с полезной нагрузкой: LL — усреднением их квадратов,
+    DCT — одной проекцией на базисную функцию. Изменение коэффициента QIM
+    возвращается в пиксели как delta * базис (обратное DCT единственного
+    коэффициента) и повтором по квадратам Хаара, только в этих блоках.
+    """
+    if bits.size == 0:
+        return
+    grid = BlockGrid(y_channel.shape, levels, block_size)
+    pattern = basis(block_size, default_positions(block_size))[0]
+    blocks = grid.ll_blocks(y_channel, 0, bits.size)
+    coefficients = np.einsum("nij,ij->n", blocks, pattern)
+    delta = qim_embed(coefficients, bits, strength) - coefficients
+    grid.add_to_blocks(y_channel, 0, delta.astype(np.float32)[:, None, None] * pattern)
+
+
+def extract_bits(y_channel: np.ndarray, count: int, strength: float, levels: int = 1,
+                 block_size: int = 8, start: int = 0) -> np.ndarray:
+    """Читает `count` битов, начиная с блока `start`."""
+    if count <= 0:
+        return np.zeros(0, dtype=np.uint8)
+    grid = BlockGrid(y_channel.shape, levels, block_size)
+    blocks = grid.ll_blocks(y_channel, start, start + count)
+    return qim_extract(np.einsum("nij,ij->n", blocks, basis(block_size, default_positions(block_size))[0]), strength)
+
+
+def iter_bytes(y_channel: np.ndarray, strength: float, levels: int = 1, block_size: int = 8,
+               chunk_size: int = 256):
+    """Потоковое чтение встроенных байтов: блоки считаются по мере надобности."""
+    total_bytes = BlockGrid(y_channel.shape, levels, block_size).capacity() // 8
+    for offset in range(0, total_bytes, chunk_size):
+        count = min(chunk_size, total_bytes - offset)
+        bits = extract_bits(y_channel, count * 8, strength, levels, block_size, start=offset * 8)
+        yield bits_to_bytes(bits)
@@ -0,0 +1,76 @@
+import numpy as np
+from watermark.payload import HEADER_SIZE, pack_payload, unpack_payload, encode_image, decode_image
+from watermark.utils import bytes_to_bits, image_to_bits, bits_to_image, image_bits_needed
+from watermark.algorithms.dct.dct_core import to_luma, from_luma
+from .dwt_dct_core import BlockGrid, embed_bits, extract_bits, iter_bytes
+
+
+def embed_image(image: np.ndarray, secret_img: np.ndarray, params: dict) -> np.ndarray:
+    """
+    Внедрение секретного изображения гибридным методом DWT-DCT.
+
+    Args:
+        image: Исходное изображение-контейнер
+        secret_img: Секретное изображение для встраивания
+        params: Словарь параметров:
+            - 'strength', 'levels', 'block_size': как для текста
+            - 'image_codec': встраивать закодированный файл ('png', 'webp', 'jpeg', 'webp-lossy')
+            - 'quality': качество для кодеков с потерями (по умолчанию 90)
+            - 'layout': 'raster' (по умолчанию) или 'planes'
+
+    Returns:
+        Изображение с внедрённым секретным изображением
+    """
+    strength = params.get("strength", 8)
+    levels = params.get("levels", 1)
+    block_size = params.get("block_size", 8)
+    max_bits = BlockGrid(image.shape, levels, block_size).capacity()
+
+    codec = params.get("image_codec")
+    if codec:
+        max_body = max_bits // 8 - HEADER_SIZE
+        encoded = encode_image(secret_img, codec, params.get("quality", 90), max_size=max_body)
+        secret_bits = bytes_to_bits(pack_payload(encoded, "none"))
+    else:
+        if secret_img.size * 8 > max_bits:
+            raise ValueError(f"Секрет слишком большой! Максимум {max_bits} бит, требуется {secret_img.size * 8}")
+        secret_bits = image_to_bits(secret_img.flatten(), params.get("layout", "raster"))
+
+    y_channel, ycrcb = to_luma(image)
+    embed_bits(y_channel, secret_bits, strength, levels, block_size)
+    return from_luma(np.round(y_channel), ycrcb)
+
+
+def extract_image(image: np.ndarray, params: dict) -> np.ndarray:
+    """
+    Извлечение секретного изображения, встроенного методом DWT-DCT.
+
+    Args:
+        image: Изображение-контейнер с встроенным секретом
+        params: Те же 'strength', 'levels', 'block_size', что при встраивании, и
+            - 'secret_shape': форма секретного изображения (tuple)
+            - 'image_codec': изображение встроено как файл, форма берётся из него
+            - 'layout', 'planes': раскладка и превью из k старших плоскостей
+
+    Returns:
+        Извлечённое секретное изображение
+    """
+    strength = params.get("strength", 8)
+    levels = params.get("levels", 1)
+    block_size = params.get("block_size", 8)
+    y_channel, _ = to_luma(image)
+
+    if params.get("image_codec"):
+        max_body = BlockGrid(image.shape, levels, block_size).capacity() // 8
+        encoded = unpack_payload(iter_bytes(y_channel, strength, levels, block_size), max_body_size=max_body)
+        return decode_image(encoded)
+
+    secret_shape = params.get("secret_shape")
+    if secret_shape is None:
+        raise ValueError("Необходимо указать 'secret_shape' в параметрах!")
+    layout = params.get("layout", "raster")
+    planes = params.get("planes", 8)
+    num_secret_pixels = int(np.prod(secret_shape))
+    num_bits = image_bits_needed(num_secret_pixels, layout, planes)
+    bits = extract_bits(y_channel, num_bits, strength, levels, block_size)
+    return bits_to_image(bits, num_secret_pixels, layout, planes).reshape(secret_shape)
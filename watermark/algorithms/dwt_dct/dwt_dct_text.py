@@ -0,0 +1,71 @@
+import numpy as np
+from watermark.payload import pack_payload, unpack_payload
+from watermark.utils import bytes_to_bits, bits_to_bytes
+from watermark.algorithms.dct.dct_core import to_luma, from_luma
+from .dwt_dct_core import BlockGrid, embed_bits, extract_bits, iter_bytes
+
+
+def embed_text(image: np.ndarray, secret_text: str, params: dict) -> np.ndarray:
+    """
+    Внедрение текстовой строки гибридным методом DWT-DCT.
+
+    Args:
+        image: Исходное изображение (numpy массив)
+        secret_text: Строка для встраивания
+        params: Словарь параметров:
+            - 'strength': шаг квантования QIM (по умолчанию 8)
+            - 'levels': уровень поддиапазона LL вейвлета Хаара (по умолчанию 1)
+            - 'block_size': размер блока DCT внутри LL (по умолчанию 8)
+            - 'codec': сжатие перед встраиванием ('auto', 'zlib', 'bz2', 'lzma', 'none')
+
+    Returns:
+        Изображение с внедрённым текстом
+    """
+    strength = params.get("strength", 8)
+    levels = params.get("levels", 1)
+    block_size = params.get("block_size", 8)
+    codec = params.get("codec")
+
+    secret_bytes = secret_text.encode("utf-8")
+    if codec:
+        secret_bytes = pack_payload(secret_bytes, codec)
+    secret_bits = bytes_to_bits(secret_bytes)
+
+    max_bits = BlockGrid(image.shape, levels, block_size).capacity()
+    if secret_bits.size > max_bits:
+        raise ValueError(f"Текст слишком длинный! Максимум {max_bits} бит, требуется {secret_bits.size}")
+
+    y_channel, ycrcb = to_luma(image)
+    embed_bits(y_channel, secret_bits, strength, levels, block_size)
+    return from_luma(np.round(y_channel), ycrcb)
+
+
+def extract_text(image: np.ndarray, params: dict) -> str:
+    """
+    Извлечение текста, встроенного методом DWT-DCT.
+
+    Args:
+        image: Изображение с встроенным текстом
+        params: Те же 'strength', 'levels', 'block_size', что при встраивании, и
+            - 'length': количество байтов для извлечения
+            - 'codec': если указан, длина и кодек читаются из заголовка
+
+    Returns:
+        Извлечённая текстовая строка
+    """
+    strength = params.get("strength", 8)
+    levels = params.get("levels", 1)
+    block_size = params.get("block_size", 8)
+    y_channel, _ = to_luma(image)
+
+    if params.get("codec"):
+        max_body = BlockGrid(image.shape, levels, block_size).capacity() // 8
+        chunks = iter_bytes(y_channel, strength, levels, block_size)
+        secret_bytes = unpack_payload(chunks, max_body_size=max_body)
+        return secret_bytes.decode("utf-8", errors="replace")
+
+    length = params.get("length")
+    if length is None:
+        raise ValueError("Необходимо указать 'length' в параметрах!")
+    bits = extract_bits(y_channel, length * 8, strength, levels, block_size)
+    return bits_to_bytes(bits).decode("utf-8", errors="replace")
@@ -18,12 +18,12 @@ def embed(image, secret, params):
 def extract(image, params):
     """
     Фасад для извлечения: выбирает реализацию по параметрам.
-    Если в params есть 'length' — извлекает текст.
-    Если есть 'secret_shape' — извлекает изображение.
+    Если в params есть 'length' или 'codec' — извлекает текст.
+    Если есть 'secret_shape' или 'image_codec' — извлекает изображение.
     """
-    if 'length' in params:
+    if 'length' in params or params.get('codec'):
         return extract_text(image, params)
-    elif 'secret_shape' in params:
+    elif 'secret_shape' in params or params.get('image_codec'):
         return extract_image(image, params)
     else:
         raise ValueError("Для извлечения необходимо указать либо 'length', либо 'secret_shape' в параметрах.")
@@ -0,0 +1,285 @@
+import hashlib
+import numpy as np
+from watermark.utils import bits_to_bytes, modification_footprint
+
+# Количество раундов сети Фейстеля для ключевой перестановки
+FEISTEL_ROUNDS = 4
+
+
+def _round_keys(key, rounds: int) -> np.ndarray:
+    """Раундовые ключи из произвольного ключа пользователя (str, bytes или int)."""
+    if isinstance(key, str):
+        key = key.encode("utf-8")
+    elif not isinstance(key, (bytes, bytearray)):
+        key = str(key).encode("utf-8")
+    seed = hashlib.sha256(bytes(key)).digest()
+    return np.array([int.from_bytes(hashlib.sha256(seed + bytes([i])).digest()[:8], "little")
+                     for i in range(rounds)], dtype=np.uint64)
+
+
+def _mix(values: np.ndarray, round_key: np.uint64) -> np.ndarray:
+    """Раундовая функция: перемешивание splitmix64."""
+    z = (values + round_key) * np.uint64(0x9E3779B97F4A7C15)
+    z ^= z >> np.uint64(30)
+    z *= np.uint64(0xBF58476D1CE4E5B9)
+    z ^= z >> np.uint64(27)
+    z *= np.uint64(0x94D049BB133111EB)
+    z ^= z >> np.uint64(31)
+    return z
+
+
+def _feistel(values: np.ndarray, half_bits: int, round_keys: np.ndarray) -> np.ndarray:
+    """Сбалансированная сеть Фейстеля на 2 * half_bits битах — биекция."""
+    shift = np.uint64(half_bits)
+    mask = np.uint64((1 << half_bits) - 1)
+    left = values >> shift
+    right = values & mask
+    for round_key in round_keys:
+        left, right = right, left ^ (_mix(right, round_key) & mask)
+    return (left << shift) | right
+
+
+def keyed_indices(key, domain_size: int, start: int, stop: int) -> np.ndarray:
+    """
+    Позиции отсчётов для ключевого (разбросанного) встраивания.
+
+    Перестановка индексов [0, domain_size) задаётся сетью Фейстеля с циклическим
+    обходом (cycle walking): значения, выпавшие за границу домена, шифруются
+    повторно, пока не попадут в него. Вычисляются только позиции для номеров
+    [start, stop), поэтому стоимость зависит от длины секрета, а не от размера
+    контейнера, и разные номера никогда не попадают в один отсчёт.
+
+    Args:
+        key: ключ встраивания
+        domain_size: количество отсчётов контейнера
+        start: номер первой нужной позиции
+        stop: номер за последней нужной позицией
+
+    Returns:
+        Массив int64 индексов отсчётов длиной stop - start
+    """
+    if not 0 <= start <= stop <= domain_size:
+        raise ValueError("Запрошенные позиции выходят за пределы контейнера")
+    half_bits = max(1, ((domain_size - 1).bit_length() + 1) // 2)
+    round_keys = _round_keys(key, FEISTEL_ROUNDS)
+    result = _feistel(np.arange(start, stop, dtype=np.uint64), half_bits, round_keys)
+    # Домен сети не больше 4 * domain_size, так что в среднем хватает пары проходов
+    outside = np.nonzero(result >= np.uint64(domain_size))[0]
+    while outside.size:
+        result[outside] = _feistel(result[outside], half_bits, round_keys)
+        outside = outside[result[outside] >= np.uint64(domain_size)]
+    return result.astype(np.int64)
+
+
+def _sample_bits(samples: np.ndarray, depth: int) -> np.ndarray:
+    """Разворачивает младшие `depth` битов каждого отсчёта в матрицу (n, depth)."""
+    shifts = np.arange(depth, dtype=np.uint8)
+    return (samples[:, None] >> shifts) & 1
+
+
+def _sample_range(flat: np.ndarray, first: int, last: int, key):
+    """Позиции отсчётов с номерами [first, last): подряд или по ключу."""
+    if key is None:
+        return slice(first, last)
+    return keyed_indices(key, flat.size, first, last)
+
+
+def capacity_bits(num_samples: int, depth: int, matrix_k=None) -> int:
+    """Ёмкость в битах: depth битов на отсчёт или k битов на группу из 2^k - 1 отсчётов."""
+    if matrix_k:
+        return (num_samples // ((1 << matrix_k) - 1)) * matrix_k
+    return num_samples * depth
+
+
+def embedding_info(total_bits: int, changes: int, depth: int, matrix_k=None) -> dict:
+    """
+    Метаданные встраивания, возвращаемые при params['return_info'].
+
+    bits_per_change — эффективность встраивания: сколько битов секрета
+    приходится на один изменённый отсчёт (у обычного LSB около 2,
+    у матричного k * 2^k / (2^k - 1)).
+    """
+    if matrix_k:
+        samples_used = -(-total_bits // matrix_k) * ((1 << matrix_k) - 1)
+    else:
+        samples_used = -(-total_bits // depth)
+    return {
+        "bits": total_bits,
+        "samples_used": samples_used,
+        "changes": changes,
+        "bits_per_change": total_bits / changes if changes else float("inf"),
+        "matrix_k": matrix_k,
+    }
+
+
+def embedding_footprint(image: np.ndarray, stego: np.ndarray, samples_used: int, key=None) -> dict:
+    """
+    Отпечаток изменений для params['return_info'] (см. modification_footprint).
+
+    Кандидаты — первые samples_used отсчётов в порядке записи (подряд
+    или по ключевой перестановке), поэтому стоимость зависит от длины секрета.
+    """
+    return modification_footprint(image, stego, _sample_range(stego.reshape(-1), 0, samples_used, key))
+
+
+def write_bits(flat: np.ndarray, bits: np.ndarray, depth: int, start: int = 0, key=None, matrix_k=None) -> int:
+    """
+    Записывает биты в младшие разряды отсчётов (на месте).
+
+    Порядок совпадает с исходным побитовым циклом: бит t попадает в отсчёт
+    t // depth, в разряд t % depth. С ключом отсчёты берутся не подряд,
+    а по ключевой перестановке keyed_indices. С matrix_k используется
+    матричное встраивание (write_bits_matrix), depth при этом игнорируется.
+
+    Args:
+        flat: одномерный массив uint8 (копия изображения)
+        bits: массив нулей и единиц
+        depth: количество используемых младших битов
+        start: номер бита, с которого начинается запись
+        key: ключ разбросанного встраивания (None — растровый порядок)
+        matrix_k: параметр кода Хэмминга для матричного встраивания
+
+    Returns:
+        Количество изменённых отсчётов
+    """
+    if matrix_k:
+        return write_bits_matrix(flat, bits, matrix_k, start=start, key=key)
+    if bits.size == 0:
+        return 0
+    first = start // depth
+    last = (start + bits.size + depth - 1) // depth
+    positions = _sample_range(flat, first, last, key)
+    segment = flat[positions]
+    # Берём текущие биты отсчётов, чтобы не испортить неиспользуемые разряды
+    planes = _sample_bits(segment, depth).reshape(-1)
+    offset = start - first * depth
+    planes[offset:offset + bits.size] = bits
+    shifts = np.arange(depth, dtype=np.uint16)
+    values = (planes.reshape(-1, depth).astype(np.uint16) << shifts).sum(axis=1)
+    keep = np.uint8(0xFF ^ ((1 << depth) - 1))
+    updated = (segment & keep) | values.astype(np.uint8)
+    changes = int(np.count_nonzero(updated != segment))
+    flat[positions] = updated
+    return changes
+
+
+def read_bits(flat: np.ndarray, count: int, depth: int, start: int = 0, key=None, matrix_k=None) -> np.ndarray:
+    """
+    Читает `count` битов, начиная с бита `start`.
+
+    Args:
+        flat: одномерный массив uint8
+        count: сколько битов прочитать
+        depth: количество используемых младших битов
+        start: номер первого бита
+        key: ключ разбросанного встраивания (None — растровый порядок)
+        matrix_k: параметр кода Хэмминга, если встраивание было матричным
+
+    Returns:
+        Массив uint8 из нулей и единиц
+    """
+    if matrix_k:
+        return read_bits_matrix(flat, count, matrix_k, start=start, key=key)
+    if count <= 0:
+        return np.zeros(0, dtype=np.uint8)
+    first = start // depth
+    last = (start + count + depth - 1) // depth
+    planes = _sample_bits(flat[_sample_range(flat, first, last, key)], depth).reshape(-1)
+    offset = start - first * depth
+    return planes[offset:offset + count]
+
+
+def _group_syndromes(lsb_groups: np.ndarray) -> np.ndarray:
+    """Синдромы кода Хэмминга: XOR номеров (с единицы) позиций с единичным LSB."""
+    weights = np.arange(1, lsb_groups.shape[1] + 1, dtype=np.uint16)
+    return np.bitwise_xor.reduce(lsb_groups * weights, axis=1)
+
+
+def _group_samples(flat: np.ndarray, first_group: int, last_group: int, group_size: int, key):
+    """Позиции отсчётов групп [first_group, last_group) в виде матрицы (групп, group_size)."""
+    positions = _sample_range(flat, first_group * group_size, last_group * group_size, key)
+    if isinstance(positions, slice):
+        positions = np.arange(positions.start, positions.stop)
+    return positions.reshape(-1, group_size)
+
+
+def write_bits_matrix(flat: np.ndarray, bits: np.ndarray, k: int, start: int = 0, key=None) -> int:
+    """
+    Матричное встраивание (синдромное кодирование кодом Хэмминга).
+
+    Каждые k битов прячутся в группе из n = 2^k - 1 младших битов так, чтобы
+    синдром группы совпал с сообщением. Для этого достаточно изменить не больше
+    одного отсчёта на группу (на ±1), против ~k/2 изменений у обычного LSB.
+    Все группы обрабатываются одной векторной операцией.
+
+    Args:
+        flat: одномерный массив uint8 (копия изображения)
+        bits: массив нулей и единиц
+        k: число битов на группу (2 и больше)
+        start: номер бита, с которого начинается запись (кратен k)
+        key: ключ разбросанного встраивания
+
+    Returns:
+        Количество изменённых отсчётов
+    """
+    if k < 2:
+        raise ValueError("'matrix_k' должно быть не меньше 2")
+    if start % k:
+        raise ValueError("Матричная запись должна начинаться с границы группы")
+    if bits.size == 0:
+        return 0
+    group_size = (1 << k) - 1
+    num_groups = (bits.size + k - 1) // k
+    # Хвост последней группы дополняем нулями
+    padded = np.zeros(num_groups * k, dtype=np.int64)
+    padded[:bits.size] = bits
+    messages = (padded.reshape(num_groups, k) << np.arange(k - 1, -1, -1)).sum(axis=1)
+    first_group = start // k
+    positions = _group_samples(flat, first_group, first_group + num_groups, group_size, key)
+    syndromes = _group_syndromes((flat[positions] & 1).astype(np.uint16))
+    # Номер отсчёта, который нужно изменить в группе (0 — менять ничего не нужно)
+    flip = syndromes.astype(np.int64) ^ messages
+    groups = np.nonzero(flip)[0]
+    targets = positions[groups, flip[groups] - 1]
+    flat[targets] ^= 1
+    return int(groups.size)
+
+
+def read_bits_matrix(flat: np.ndarray, count: int, k: int, start: int = 0, key=None) -> np.ndarray:
+    """
+    Чтение битов, встроенных write_bits_matrix: сообщение группы — её синдром.
+
+    Args:
+        flat: одномерный массив uint8
+        count: сколько битов прочитать
+        k: число битов на группу
+        start: номер первого бита
+        key: ключ разбросанного встраивания
+
+    Returns:
+        Массив uint8 из нулей и единиц
+    """
+    if count <= 0:
+        return np.zeros(0, dtype=np.uint8)
+    group_size = (1 << k) - 1
+    first_group = start // k
+    last_group = (start + count + k - 1) // k
+    positions = _group_samples(flat, first_group, last_group, group_size, key)
+    syndromes = _group_syndromes((flat[positions] & 1).astype(np.uint16))
+    bits = ((syndromes[:, None] >> np.arange(k - 1, -1, -1)) & 1).astype(np.uint8).reshape(-1)
+    offset = start - first_group * k
+    return bits[offset:offset + count]
+
+
+def iter_bytes(flat: np.ndarray, depth: int, chunk_size: int = 4096, key=None, matrix_k=None):
+    """
+    Потоковое чтение встроенных байтов кусками по `chunk_size`.
+
+    Используется при извлечении сжатой полезной нагрузки: читается
+    ровно столько отсчётов, сколько нужно распаковщику.
+    """
+    total_bytes = capacity_bits(flat.size, depth, matrix_k) // 8
+    for offset in range(0, total_bytes, chunk_size):
+        count = min(chunk_size, total_bytes - offset)
+        bits = read_bits(flat, count * 8, depth, start=offset * 8, key=key, matrix_k=matrix_k)
+        yield bits_to_bytes(bits)
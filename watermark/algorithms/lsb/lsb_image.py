@@ -1,54 +1,72 @@
 import numpy as np
+from watermark.payload import HEADER_SIZE, pack_payload, unpack_payload, encode_image, decode_image
+from watermark.utils import bytes_to_bits, image_to_bits, bits_to_image, image_bits_needed
+from .lsb_core import write_bits, read_bits, iter_bytes, capacity_bits, embedding_info, embedding_footprint
 
 def embed_image(image: np.ndarray, secret_img: np.ndarray, params: dict) -> np.ndarray:
     """
     Внедряет секретное изображение в исходное методом LSB.
     image — исходное изображение (numpy-массив)
     secret_img — секретное изображение, такое же или меньше по размеру
-    params — должен содержать 'depth'
+    params — должен содержать 'depth'; 'image_codec' ('png', 'webp', 'jpeg', 'webp-lossy')
+             включает встраивание закодированного файла вместо сырых пикселей,
+             'quality' задаёт качество для кодеков с потерями;
+             'layout' = 'planes' пишет сначала старшие битовые плоскости всех пикселей;
+             'key' включает разбросанное по ключу встраивание;
+             'matrix_k' — матричное встраивание, 'return_info' — вернуть (изображение, info)
     """
     depth = params.get("depth", 1)
-    flat_secret = secret_img.flatten()  # переводим картинку в 1D
-    total_bits = flat_secret.size * 8   # всего бит в картинке
-    max_capacity = image.size * depth   # сколько бит можно внедрить
-    if total_bits > max_capacity:
-        raise ValueError("Секрет слишком большой для внедрения!")
-    # Переводим байты секрета в битовую строку
-    secret_bits = ''.join(format(byte, '08b') for byte in flat_secret)
-    stego = image.flatten().astype(int)
-    bit_idx = 0
-    for i in range(len(stego)):
-        for d in range(depth):
-            if bit_idx < total_bits:
-                stego[i] &= ~(1 << d)
-                stego[i] |= (int(secret_bits[bit_idx]) << d)
-                bit_idx += 1
-            else:
-                break
-    stego = np.array(stego, dtype=np.uint8).reshape(image.shape)
+    codec = params.get("image_codec")
+    key = params.get("key")
+    matrix_k = params.get("matrix_k")
+    stego = image.flatten().astype(np.uint8)
+    max_capacity = capacity_bits(stego.size, depth, matrix_k)  # сколько бит можно внедрить
+    if codec:
+        # Встраиваем закодированный файл: форма секрета хранится в самом потоке
+        max_body = max_capacity // 8 - HEADER_SIZE
+        encoded = encode_image(secret_img, codec, params.get("quality", 90), max_size=max_body)
+        secret_bits = bytes_to_bits(pack_payload(encoded, "none"))
+    else:
+        flat_secret = secret_img.flatten()  # переводим картинку в 1D
+        total_bits = flat_secret.size * 8   # всего бит в картинке
+        if total_bits > max_capacity:
+            raise ValueError("Секрет слишком большой для внедрения!")
+        # Переводим байты секрета в биты (построчно или по битовым плоскостям)
+        secret_bits = image_to_bits(flat_secret, params.get("layout", "raster"))
+    changes = write_bits(stego, secret_bits, depth, key=key, matrix_k=matrix_k)
+    stego = stego.reshape(image.shape)
+    if params.get("return_info"):
+        info = embedding_info(secret_bits.size, changes, depth, matrix_k)
+        info["footprint"] = embedding_footprint(image, stego, info["samples_used"], key)
+        return stego, info
     return stego
 
 def extract_image(image: np.ndarray, params: dict) -> np.ndarray:
     """
     Извлекает секретное изображение из исходной картинки.
     image — картинка-носитель
-    params — должен содержать 'depth' и 'secret_shape' (размер внедрённого секрета)
+    params — должен содержать 'depth' и 'secret_shape' (размер внедрённого секрета);
+             при 'image_codec' форма не нужна — она читается из закодированного файла;
+             при layout='planes' параметр 'planes' (1-8) читает только старшие плоскости
+             и возвращает квантованное превью; 'key' — ключ разбросанного встраивания,
+             'matrix_k' — тот же, что при встраивании
     """
     depth = params.get("depth", 1)
+    key = params.get("key")
+    matrix_k = params.get("matrix_k")
+    stego = image.reshape(-1)  # без копии: читаются только нужные отсчёты
+    if params.get("image_codec"):
+        stream = iter_bytes(stego, depth, key=key, matrix_k=matrix_k)
+        encoded = unpack_payload(stream, max_body_size=capacity_bits(stego.size, depth, matrix_k) // 8)
+        return decode_image(encoded)
     secret_shape = params.get("secret_shape")  # кортеж (h, w) или (h, w, c)
     if secret_shape is None:
         raise ValueError("Нужно указать 'secret_shape'!")
-    num_secret_pixels = np.prod(secret_shape)  # сколько всего элементов
-    num_bits = num_secret_pixels * 8          # сколько бит
-    bits = []
-    stego = image.flatten()
-    bit_idx = 0
-    for i in range(len(stego)):
-        for d in range(depth):
-            if bit_idx < num_bits:
-                bits.append((stego[i] >> d) & 1)  # из каждого пикселя забираем бит
-                bit_idx += 1
-    secret_bytes = [int(''.join(str(bits[j]) for j in range(i*8, (i+1)*8)), 2) for i in range(num_secret_pixels)]
+    layout = params.get("layout", "raster")
+    planes = params.get("planes", 8)
+    num_secret_pixels = int(np.prod(secret_shape))  # сколько всего элементов
+    num_bits = image_bits_needed(num_secret_pixels, layout, planes)  # сколько бит
+    bits = read_bits(stego, num_bits, depth, key=key, matrix_k=matrix_k)  # из каждого пикселя забираем биты
     # Собираем секрет обратно в форму оригинальной картинки
-    result = np.array(secret_bytes, dtype=np.uint8).reshape(secret_shape)
+    result = bits_to_image(bits, num_secret_pixels, layout, planes).reshape(secret_shape)
     return result
@@ -1,60 +1,71 @@
 import numpy as np
+from watermark.payload import pack_payload, unpack_payload
+from watermark.utils import bytes_to_bits, bits_to_bytes
+from .lsb_core import write_bits, read_bits, iter_bytes, capacity_bits, embedding_info, embedding_footprint
 
 def embed_text(image: np.ndarray, secret_text: str, params: dict) -> np.ndarray:
     """
     Внедрение текстовой строки в изображение методом LSB.
     image — исходное изображение, numpy-массив
     secret_text — строка, которую нужно спрятать
-    params — словарь с параметрами ('depth' — количество младших битов)
-    Возвращает изображение с внедрённым секретом.
+    params — словарь с параметрами ('depth' — количество младших битов,
+             'codec' — необязательное сжатие: 'auto', 'zlib', 'bz2', 'lzma', 'none',
+             'key' — ключ разбросанного встраивания вместо растрового порядка,
+             'matrix_k' — матричное встраивание: k битов в 2^k - 1 отсчётах
+             не больше чем одним изменением, 'return_info' — вернуть ещё и метаданные
+             с отпечатком изменений info['footprint'])
+    Возвращает изображение с внедрённым секретом
+    (или пару (изображение, info) при 'return_info').
     """
     depth = params.get("depth", 1)
+    codec = params.get("codec")
+    key = params.get("key")
+    matrix_k = params.get("matrix_k")
     # Преобразуем секрет в байты
     secret_bytes = secret_text.encode("utf-8")
-    # Переводим байты текста в строку битов
-    secret_bits = ''.join(format(b, '08b') for b in secret_bytes)
-    total_bits = len(secret_bits)
-    # Выделяем память под копию изображения и чтобы избежать проблем с типами
-    stego = image.flatten().astype(int)
-    max_capacity = stego.size * depth
+    # Со сжатием перед данными пишется заголовок с кодеком и длиной
+    if codec:
+        secret_bytes = pack_payload(secret_bytes, codec)
+    # Переводим байты текста в массив битов
+    secret_bits = bytes_to_bits(secret_bytes)
+    total_bits = secret_bits.size
+    # Выделяем копию изображения, исходный массив не трогаем
+    stego = image.flatten().astype(np.uint8)
+    max_capacity = capacity_bits(stego.size, depth, matrix_k)
     if total_bits > max_capacity:
         raise ValueError("Текст слишком длинный для внедрения!")
     # Записываем биты текста в младшие биты
-    bit_idx = 0
-    for i in range(len(stego)):
-        for d in range(depth):
-            if bit_idx < total_bits:
-                # Очищаем нужный бит
-                stego[i] &= ~(1 << d)
-                # Вставляем бит секрета
-                stego[i] |= (int(secret_bits[bit_idx]) << d)
-                bit_idx += 1
-            else:
-                break
-    # Переводим обратно в массив uint8 и исходную форму
-    stego = np.array(stego, dtype=np.uint8).reshape(image.shape)
+    changes = write_bits(stego, secret_bits, depth, key=key, matrix_k=matrix_k)
+    # Возвращаем исходную форму
+    stego = stego.reshape(image.shape)
+    if params.get("return_info"):
+        info = embedding_info(total_bits, changes, depth, matrix_k)
+        info["footprint"] = embedding_footprint(image, stego, info["samples_used"], key)
+        return stego, info
     return stego
 
 def extract_text(image: np.ndarray, params: dict) -> str:
     """
     Извлекает встроенный текст из изображения (LSB).
     image — картинка, numpy-массив
-    params — должен содержать 'depth' и 'length' (количество символов)
+    params — должен содержать 'depth' и 'length' (количество байтов);
+             если при встраивании был указан 'codec', длина берётся из заголовка;
+             'key' и 'matrix_k' — те же, что при встраивании
     Возвращает строку.
     """
     depth = params.get("depth", 1)
+    key = params.get("key")
+    matrix_k = params.get("matrix_k")
+    stego = image.reshape(-1)  # без копии: читаются только нужные отсчёты
+    if params.get("codec"):
+        # Заголовок и тело читаются потоково, распаковка идёт по мере чтения
+        max_body = capacity_bits(stego.size, depth, matrix_k) // 8
+        stream = iter_bytes(stego, depth, key=key, matrix_k=matrix_k)
+        secret_bytes = unpack_payload(stream, max_body_size=max_body)
+        return secret_bytes.decode("utf-8", errors="replace")
     length = params.get("length")  # сколько символов было внедрено
     if length is None:
         raise ValueError("Нужно указать 'length' в параметрах!")
-    num_bits = length * 8
-    stego = image.flatten()
-    bits = []
-    bit_idx = 0
-    for i in range(len(stego)):
-        for d in range(depth):
-            if bit_idx < num_bits:
-                bits.append((stego[i] >> d) & 1)  # забираем нужный младший бит
-                bit_idx += 1
+    bits = read_bits(stego, length * 8, depth, key=key, matrix_k=matrix_k)
     # Собираем биты в байты, затем в строку
-    secret_bytes = [int(''.join(str(bits[b*8 + i]) for i in range(8)), 2) for b in range(length)]
-    return bytes(secret_bytes).decode("utf-8", errors="replace")
+    return bits_to_bytes(bits).decode("utf-8", errors="replace")
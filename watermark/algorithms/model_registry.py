@@ -0,0 +1,145 @@
+import os
+import struct
+import threading
+import zipfile
+from collections import OrderedDict
+import numpy as np
+
+# Сколько моделей держать загруженными по умолчанию
+MAX_MODELS = 4
+
+
+def load_npz_mmap(path) -> dict:
+    """
+    Открывает массивы .npz как np.memmap только для чтения.
+
+    np.load не умеет отображать в память члены архива, поэтому смещения
+    данных берутся из локальных заголовков zip и заголовков .npy. Страницы
+    файла общие для всех процессов, открывших те же веса.
+
+    Raises:
+        ValueError: Если член архива сжат
+    """
+    arrays = {}
+    with zipfile.ZipFile(path) as archive, open(path, "rb") as handle:
+        for info in archive.infolist():
+            if not info.filename.endswith(".npy"):
+                continue
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ValueError(f"'{info.filename}' сжат: отображение в память возможно только для np.savez без сжатия")
+            handle.seek(info.header_offset)
+            local_header = handle.read(30)
+            name_length, extra_length = struct.unpack("<HH", local_header[26:30])
+            handle.seek(info.header_offset + 30 + name_length + extra_length)
+            version = np.lib.format.read_magic(handle)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(handle)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(handle)
+            arrays[info.filename[:-4]] = np.memmap(path, dtype=dtype, mode="r", offset=handle.tell(),
+                                                   shape=shape, order="F" if fortran_order else "C")
+    return arrays
+
+
+def _freeze(weights: dict) -> dict:
+    """Запрещает запись в массивы: кэшированные веса общие для всех потоков."""
+    for array in weights.values():
+        if isinstance(array, np.ndarray):
+            array.setflags(write=False)
+    return weights
+
+
+class ModelRegistry:
+    """
+    Реестр весов моделей с LRU-вытеснением.
+
+    Каждый файл весов загружается один раз и дальше отдаётся из памяти:
+    повторный вызов get() не открывает файлов. Веса доступны только для
+    чтения и разделяются между потоками; файлы .npz без сжатия отображаются
+    в память, поэтому страницы общие и между процессами. Если загружено
+    больше max_models моделей, вытесняется давно не использованная.
+
+    Ключ — имя, зарегистрированное через register(), путь к файлу или любой
+    хешируемый объект вместе с собственной функцией загрузки.
+    """
+
+    def __init__(self, max_models: int = MAX_MODELS, loader=load_npz_mmap):
+        if max_models < 1:
+            raise ValueError("'max_models' должно быть не меньше 1")
+        self.max_models = max_models
+        self._loader = loader
+        self._paths = {}
+        self._models = OrderedDict()
+        self._key_locks = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.loads = 0
+
+    def register(self, name, path) -> None:
+        """Связывает имя модели с файлом весов (загрузка — при первом get)."""
+        with self._lock:
+            self._paths[name] = os.path.abspath(path)
+
+    def _key(self, key):
+        """Ключ кэша: путь зарегистрированного имени или абсолютный путь (вызывать под self._lock)."""
+        if key in self._paths:
+            return self._paths[key]
+        if isinstance(key, (str, os.PathLike)):
+            return os.path.abspath(key)
+        return key
+
+    def get(self, key, loader=None) -> dict:
+        """
+        Веса модели: из кэша или загруженные один раз.
+
+        Args:
+            key: имя модели, путь к файлу весов или произвольный ключ
+            loader: функция загрузки key -> dict (по умолчанию загрузчик реестра)
+
+        Returns:
+            Словарь массивов только для чтения
+        """
+        with self._lock:
+            # _paths меняется в register(), поэтому ключ разрешается под блокировкой
+            key = self._key(key)
+            if key in self._models:
+                self._models.move_to_end(key)
+                self.hits += 1
+                return self._models[key]
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        # Разные модели грузятся параллельно, одна и та же — ровно один раз
+        with key_lock:
+            with self._lock:
+                if key in self._models:
+                    self._models.move_to_end(key)
+                    self.hits += 1
+                    return self._models[key]
+            weights = _freeze((loader or self._loader)(key))
+            with self._lock:
+                self._models[key] = weights
+                self.loads += 1
+                while len(self._models) > self.max_models:
+                    self._models.popitem(last=False)
+                self._key_locks.pop(key, None)
+        return weights
+
+    def evict(self, key) -> None:
+        """Выгружает модель (например, после обновления файла весов)."""
+        with self._lock:
+            self._models.pop(self._key(key), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._models.clear()
+
+    def __contains__(self, key) -> bool:
+        with self._lock:
+            return self._key(key) in self._models
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._models)
+
+
+# Общий реестр пакета
+default_registry = ModelRegistry()
@@ -1,9 +1,10 @@
-from watermark.algorithms import lsb, dct, dwt, cnn_autoencoder
+from watermark.algorithms import lsb, dct, dwt, dwt_dct, cnn_autoencoder
 
 algorithms = {
     "lsb": lsb,
     "dct": dct,
     "dwt": dwt,
+    "dwt_dct": dwt_dct,
     "cnn_ae": cnn_autoencoder
 }
 
@@ -0,0 +1,258 @@
+"""
+Подготовка полезной нагрузки перед встраиванием: сжатие и заголовок.
+
+Перед записью в контейнер байты секрета можно сжать одним из кодеков
+(zlib, lzma, bz2 или none). Выбранный кодек и длина тела записываются в
+короткий заголовок, поэтому при извлечении не нужно знать ни кодек, ни длину:
+заголовок читается первым, а тело распаковывается потоково по мере чтения.
+
+Формат: [1 байт — id кодека][4 байта — длина тела, big-endian][тело]
+
+Секретные изображения можно вместо сырых пикселей встраивать в виде
+закодированного файла (PNG/WebP без потерь или JPEG/WebP с потерями):
+форма и содержимое восстанавливаются из самого потока.
+"""
+
+import bz2
+import io
+import lzma
+import struct
+import zlib
+from typing import Iterable, Optional
+
+import numpy as np
+
+HEADER_FORMAT = ">BI"
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+
+# Объём выборки для пробного сжатия при автоматическом выборе кодека
+SAMPLE_SIZE = 4096
+
+# Формат FORMAT_ALONE даёт заголовок 13 байт вместо ~60 у контейнера xz
+_LZMA_FORMAT = lzma.FORMAT_ALONE
+
+CODECS = {
+    "none": 0,
+    "zlib": 1,
+    "bz2": 2,
+    "lzma": 3,
+}
+_CODEC_NAMES = {codec_id: name for name, codec_id in CODECS.items()}
+
+
+def _compress(data: bytes, codec: str) -> bytes:
+    if codec == "none":
+        return bytes(data)
+    if codec == "zlib":
+        return zlib.compress(data, 9)
+    if codec == "bz2":
+        return bz2.compress(data, 9)
+    if codec == "lzma":
+        return lzma.compress(data, format=_LZMA_FORMAT)
+    raise ValueError(f"Кодек '{codec}' не поддерживается. Доступны: {', '.join(CODECS)}")
+
+
+# Исключения распаковщиков на повреждённых данных: zlib.error, OSError (bz2),
+# lzma.LZMAError, EOFError (данные после конца сжатого потока)
+_DECOMPRESS_ERRORS = (zlib.error, OSError, lzma.LZMAError, EOFError)
+
+
+def _decompressor(codec: str):
+    """Возвращает (decompress(chunk), flush(), finished()) для потоковой распаковки."""
+    if codec == "none":
+        return bytes, bytes, lambda: True
+    if codec == "zlib":
+        obj = zlib.decompressobj()
+        return obj.decompress, obj.flush, lambda: obj.eof
+    if codec == "bz2":
+        obj = bz2.BZ2Decompressor()
+        return obj.decompress, bytes, lambda: obj.eof
+    if codec == "lzma":
+        obj = lzma.LZMADecompressor(format=_LZMA_FORMAT)
+        return obj.decompress, bytes, lambda: obj.eof
+    raise ValueError(f"Кодек '{codec}' не поддерживается.")
+
+
+def choose_codec(data: bytes, sample_size: int = SAMPLE_SIZE) -> str:
+    """
+    Выбор кодека пробным сжатием выборки из начала данных.
+
+    Args:
+        data: Байты секрета
+        sample_size: Размер выборки в байтах
+
+    Returns:
+        Имя кодека, дающего наименьший результат на выборке,
+        или 'none', если сжатие не выигрывает
+    """
+    sample = bytes(data[:sample_size])
+    best_codec, best_size = "none", len(sample)
+    for codec in ("zlib", "bz2", "lzma"):
+        size = len(_compress(sample, codec))
+        if size < best_size:
+            best_codec, best_size = codec, size
+    return best_codec
+
+
+def pack_payload(data: bytes, codec: str = "auto") -> bytes:
+    """
+    Сжатие секрета и добавление заголовка.
+
+    Args:
+        data: Байты секрета
+        codec: 'auto', 'none', 'zlib', 'bz2' или 'lzma'
+
+    Returns:
+        Заголовок + тело, готовые к встраиванию
+    """
+    if codec == "auto":
+        codec = choose_codec(data)
+    body = _compress(data, codec)
+    # Если сжатие на полных данных не окупилось, пишем их как есть
+    if codec != "none" and len(body) >= len(data):
+        codec, body = "none", bytes(data)
+    return struct.pack(HEADER_FORMAT, CODECS[codec], len(body)) + body
+
+
+def unpack_payload(chunks: Iterable[bytes], max_body_size: Optional[int] = None) -> bytes:
+    """
+    Потоковая распаковка полезной нагрузки.
+
+    Заголовок читается из первых байтов потока, дальше тело подаётся
+    в распаковщик кусками; чтение прекращается, как только тело закончилось.
+
+    Args:
+        chunks: Итератор кусков байтов, извлекаемых из контейнера
+        max_body_size: Верхняя граница длины тела (ёмкость контейнера),
+            чтобы сразу отбросить повреждённый заголовок
+
+    Returns:
+        Исходные байты секрета
+
+    Raises:
+        ValueError: Если заголовок повреждён, поток закончился раньше тела
+            или сжатое тело повреждено
+    """
+    stream = iter(chunks)
+    buffer = b""
+    for chunk in stream:
+        buffer += chunk
+        if len(buffer) >= HEADER_SIZE:
+            break
+    if len(buffer) < HEADER_SIZE:
+        raise ValueError("Контейнер слишком мал: заголовок полезной нагрузки не найден")
+
+    codec_id, body_size = struct.unpack(HEADER_FORMAT, buffer[:HEADER_SIZE])
+    codec = _CODEC_NAMES.get(codec_id)
+    if codec is None:
+        raise ValueError(f"Неизвестный кодек в заголовке: {codec_id}")
+    if max_body_size is not None and body_size > max_body_size:
+        raise ValueError(f"Длина тела в заголовке ({body_size} байт) превышает ёмкость контейнера")
+
+    decompress, flush, finished = _decompressor(codec)
+    result = []
+    remaining = body_size
+    piece = buffer[HEADER_SIZE:]
+    try:
+        while True:
+            piece = piece[:remaining]
+            if piece:
+                result.append(decompress(piece))
+                remaining -= len(piece)
+            if remaining == 0:
+                break
+            piece = next(stream, None)
+            if piece is None:
+                raise ValueError("Поток данных закончился раньше тела полезной нагрузки")
+        result.append(flush())
+    except _DECOMPRESS_ERRORS as error:
+        raise ValueError(f"Повреждённые данные: тело не распаковывается кодеком '{codec}' ({error})") from error
+    if not finished():
+        raise ValueError(f"Повреждённые данные: сжатый поток '{codec}' не завершён")
+    return b"".join(result)
+
+
+# Кодеки изображений: имя -> (формат PIL, работает ли с потерями)
+IMAGE_CODECS = {
+    "png": ("PNG", False),
+    "webp": ("WEBP", False),
+    "jpeg": ("JPEG", True),
+    "webp-lossy": ("WEBP", True),
+}
+
+# Шаг и нижняя граница качества при подгонке lossy-кодека под ёмкость
+QUALITY_STEP = 5
+MIN_QUALITY = 30
+
+
+def _encode_image_once(image: np.ndarray, codec: str, quality: int) -> bytes:
+    from PIL import Image as PILImage
+
+    pil_format, lossy = IMAGE_CODECS[codec]
+    buffer = io.BytesIO()
+    pil_image = PILImage.fromarray(np.ascontiguousarray(image, dtype=np.uint8))
+    if pil_format == "PNG":
+        pil_image.save(buffer, format="PNG", optimize=True)
+    elif pil_format == "WEBP":
+        if lossy:
+            pil_image.save(buffer, format="WEBP", quality=quality)
+        else:
+            pil_image.save(buffer, format="WEBP", lossless=True, quality=100, method=6)
+    else:
+        pil_image.save(buffer, format="JPEG", quality=quality, optimize=True)
+    return buffer.getvalue()
+
+
+def encode_image(image: np.ndarray, codec: str = "png", quality: int = 90,
+                 max_size: Optional[int] = None, min_quality: int = MIN_QUALITY) -> bytes:
+    """
+    Кодирование секретного изображения в байтовый поток в памяти.
+
+    Для lossy-кодеков при заданном max_size качество понижается с шагом
+    QUALITY_STEP, пока результат не поместится, но не ниже min_quality.
+
+    Args:
+        image: Секретное изображение uint8 (h, w) или (h, w, 3)
+        codec: 'png', 'webp' (без потерь), 'jpeg' или 'webp-lossy'
+        quality: Качество для lossy-кодеков (1-100)
+        max_size: Допустимый размер результата в байтах
+        min_quality: Нижняя граница качества при подгонке
+
+    Returns:
+        Закодированный файл изображения
+
+    Raises:
+        ValueError: Если кодек неизвестен или результат не помещается в max_size
+    """
+    if codec not in IMAGE_CODECS:
+        raise ValueError(f"Кодек изображения '{codec}' не поддерживается. Доступны: {', '.join(IMAGE_CODECS)}")
+    lossy = IMAGE_CODECS[codec][1]
+    data = _encode_image_once(image, codec, quality)
+    while lossy and max_size is not None and len(data) > max_size and quality - QUALITY_STEP >= min_quality:
+        quality -= QUALITY_STEP
+        data = _encode_image_once(image, codec, quality)
+    if max_size is not None and len(data) > max_size:
+        raise ValueError(
+            f"Секретное изображение слишком большое даже после кодирования '{codec}': "
+            f"{len(data)} байт, доступно {max_size} байт"
+        )
+    return data
+
+
+def decode_image(data: bytes) -> np.ndarray:
+    """
+    Декодирование секретного изображения из байтового потока.
+
+    Args:
+        data: Байты, полученные из encode_image
+
+    Returns:
+        Изображение uint8 в исходной форме
+    """
+    from PIL import Image as PILImage
+
+    try:
+        with PILImage.open(io.BytesIO(data)) as pil_image:
+            return np.array(pil_image)
+    except Exception as exc:
+        raise ValueError(f"Не удалось декодировать секретное изображение: {exc}")
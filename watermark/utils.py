@@ -1 +1,136 @@
-#Тут будут храниться вспомогательные функции
\ No newline at end of file
+#Тут будут храниться вспомогательные функции
+import numpy as np
+
+
+def bytes_to_bits(data) -> np.ndarray:
+    """
+    Переводит байты в массив битов (старший бит первым, как format(b, '08b')).
+
+    Args:
+        data: bytes, bytearray или np.ndarray с dtype uint8
+
+    Returns:
+        Одномерный массив uint8 из нулей и единиц
+    """
+    return np.unpackbits(np.frombuffer(bytes(data), dtype=np.uint8))
+
+
+def bits_to_bytes(bits: np.ndarray) -> bytes:
+    """
+    Собирает массив битов обратно в байты (неполный хвостовой байт отбрасывается).
+
+    Args:
+        bits: массив нулей и единиц
+
+    Returns:
+        Байтовая строка
+    """
+    bits = np.asarray(bits, dtype=np.uint8)
+    usable = (bits.size // 8) * 8
+    return np.packbits(bits[:usable]).tobytes()
+
+
+def pixels_to_plane_bits(flat_pixels: np.ndarray) -> np.ndarray:
+    """
+    Раскладывает пиксели по битовым плоскостям: сначала старшие биты всех
+    пикселей, затем следующие и так до младших.
+
+    При такой раскладке первые k/8 потока дают грубое превью секрета.
+
+    Args:
+        flat_pixels: одномерный массив uint8
+
+    Returns:
+        Массив битов длиной 8 * flat_pixels.size
+    """
+    return np.unpackbits(flat_pixels.astype(np.uint8)[:, None], axis=1).T.reshape(-1)
+
+
+def plane_bits_to_pixels(bits: np.ndarray, num_pixels: int, planes: int = 8) -> np.ndarray:
+    """
+    Собирает пиксели из первых `planes` битовых плоскостей.
+
+    Недостающие младшие биты заменяются серединой интервала квантования,
+    чтобы превью не было систематически темнее оригинала.
+
+    Args:
+        bits: биты в порядке pixels_to_plane_bits (не меньше planes * num_pixels)
+        num_pixels: количество пикселей
+        planes: сколько старших плоскостей прочитано (1-8)
+
+    Returns:
+        Массив uint8 длиной num_pixels
+    """
+    plane_matrix = np.asarray(bits[:planes * num_pixels], dtype=np.uint8).reshape(planes, num_pixels)
+    weights = (1 << np.arange(7, 7 - planes, -1)).astype(np.uint8)
+    pixels = (plane_matrix * weights[:, None]).sum(axis=0, dtype=np.uint16)
+    if planes < 8:
+        pixels += 1 << (7 - planes)
+    return pixels.astype(np.uint8)
+
+
+IMAGE_LAYOUTS = ("raster", "planes")
+
+
+def image_bits_needed(num_pixels: int, layout: str = "raster", planes: int = 8) -> int:
+    """
+    Сколько битов нужно прочитать, чтобы собрать секретное изображение.
+
+    Для раскладки 'planes' превью из k плоскостей требует только k/8 потока.
+
+    Raises:
+        ValueError: Если раскладка неизвестна или превью запрошено без 'planes'
+    """
+    if layout not in IMAGE_LAYOUTS:
+        raise ValueError(f"Раскладка '{layout}' не поддерживается. Доступны: {', '.join(IMAGE_LAYOUTS)}")
+    if not 1 <= planes <= 8:
+        raise ValueError("'planes' должно быть от 1 до 8")
+    if planes != 8 and layout != "planes":
+        raise ValueError("Превью по битовым плоскостям доступно только при layout='planes'")
+    return num_pixels * planes
+
+
+def image_to_bits(flat_pixels: np.ndarray, layout: str = "raster") -> np.ndarray:
+    """Биты секретного изображения в выбранной раскладке ('raster' или 'planes')."""
+    image_bits_needed(flat_pixels.size, layout)
+    if layout == "planes":
+        return pixels_to_plane_bits(flat_pixels)
+    return bytes_to_bits(flat_pixels.astype(np.uint8))
+
+
+def bits_to_image(bits: np.ndarray, num_pixels: int, layout: str = "raster", planes: int = 8) -> np.ndarray:
+    """Обратная операция к image_to_bits; для 'planes' можно собрать превью из части плоскостей."""
+    if layout == "planes":
+        return plane_bits_to_pixels(bits, num_pixels, planes)
+    return np.packbits(np.asarray(bits, dtype=np.uint8)[:num_pixels * 8])
+
+
+def modification_footprint(cover: np.ndarray, stego: np.ndarray, candidates) -> dict:
+    """
+    Отпечаток изменений встраивания: какие отсчёты изменились и на сколько.
+
+    Сравниваются только отсчёты-кандидаты (те, которые встраивание могло
+    тронуть), поэтому стоимость зависит от объёма нагрузки, а не от размера
+    контейнера. По отпечатку utils.footprint_metrics считает метрики качества.
+
+    Args:
+        cover: исходное изображение
+        stego: результат встраивания той же формы
+        candidates: срез или массив номеров отсчётов в cover.reshape(-1)
+
+    Returns:
+        Словарь: 'shape' — форма изображения, 'indices' — возрастающие номера
+        изменённых отсчётов (int64), 'deltas' — stego - cover в них (int16)
+    """
+    if isinstance(candidates, slice):
+        candidates = np.arange(*candidates.indices(cover.size), dtype=np.int64)
+    else:
+        candidates = np.unique(np.asarray(candidates, dtype=np.int64))
+    before = cover.reshape(-1)[candidates].astype(np.int16)
+    after = stego.reshape(-1)[candidates].astype(np.int16)
+    changed = np.flatnonzero(after != before)
+    return {
+        "shape": tuple(cover.shape),
+        "indices": candidates[changed],
+        "deltas": after[changed] - before[changed],
+    }